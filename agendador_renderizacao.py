@@ -0,0 +1,185 @@
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from exportador_dot import exportar_ast_dot, renderizar_dot
+from semantic_analysis import escrever_grafo_arvore_semantica, escrever_grafo_fluxo_de_controle
+
+_EXTENSAO_HASH = ".sha256"
+_TAMANHO_BLOCO = 1 << 16
+
+
+class _ArquivoComHash:
+    """Repassa as escritas para o arquivo e calcula o hash do que foi escrito"""
+
+    def __init__(self, arquivo, formato):
+        self.arquivo = arquivo
+        self.hash = hashlib.sha256(f"{formato}\0".encode())
+
+    def write(self, texto):
+        self.hash.update(texto.encode('utf-8'))
+        return self.arquivo.write(texto)
+
+
+def hash_do_dot(caminho_dot, formato):
+    """Hash do arquivo DOT junto com o formato de saída (o mesmo DOT em outro formato é outro resultado)"""
+    h = hashlib.sha256(f"{formato}\0".encode())
+    with open(caminho_dot, "rb") as f:
+        for bloco in iter(lambda: f.read(_TAMANHO_BLOCO), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _ler_hash(caminho_saida):
+    try:
+        with open(caminho_saida + _EXTENSAO_HASH, "r", encoding="ascii") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _gravar_hash(caminho_saida, valor):
+    diretorio = os.path.dirname(caminho_saida) or '.'
+    descritor, temporario = tempfile.mkstemp(dir=diretorio, suffix=".tmp")
+    with os.fdopen(descritor, "w", encoding="ascii") as f:
+        f.write(valor + "\n")
+    os.replace(temporario, caminho_saida + _EXTENSAO_HASH)
+
+
+def _concluido(valor):
+    futuro = Future()
+    futuro.set_result(valor)
+    return futuro
+
+
+class AgendadorRenderizacao:
+    """
+    Renderiza grafos DOT em paralelo, com no máximo max_simultaneos processos dot ao mesmo tempo.
+    Ao lado de cada saída fica um arquivo .sha256 com o hash do DOT que a gerou; se o DOT não mudou
+    e a saída ainda existe, a renderização é pulada.
+    Cada agendamento retorna um Future cujo resultado é 'renderizado' ou 'pulado'.
+    """
+
+    def __init__(self, max_simultaneos=None, formato='png', pular_inalterados=True):
+        self.formato = formato
+        self.pular_inalterados = pular_inalterados
+        self.renderizados = 0
+        self.pulados = 0
+        self._trava = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_simultaneos or os.cpu_count() or 1,
+                                            thread_name_prefix='dot')
+        self._futuros = []
+
+    def agendar(self, escrever, caminho_saida, formato=None):
+        """
+        Chama escrever(arquivo) para gravar o DOT (nesta thread) e agenda a renderização em caminho_saida.
+        O DOT temporário é apagado quando a renderização termina.
+        """
+        formato = formato or self.formato
+        diretorio = os.path.dirname(caminho_saida) or '.'
+        os.makedirs(diretorio, exist_ok=True)
+        descritor, caminho_dot = tempfile.mkstemp(dir=diretorio, suffix='.dot')
+        try:
+            with os.fdopen(descritor, "w", encoding="utf-8") as f:
+                arquivo = _ArquivoComHash(f, formato)
+                escrever(arquivo)
+        except BaseException:
+            os.remove(caminho_dot)
+            raise
+        return self._agendar(caminho_dot, caminho_saida, formato, arquivo.hash.hexdigest(), remover_dot=True)
+
+    def agendar_dot(self, caminho_dot, caminho_saida=None, formato=None, remover_dot=False):
+        """Agenda a renderização de um arquivo DOT já existente (por padrão, ao lado dele)"""
+        formato = formato or self.formato
+        if caminho_saida is None:
+            caminho_saida = f"{os.path.splitext(caminho_dot)[0]}.{formato}"
+        valor = hash_do_dot(caminho_dot, formato)
+        return self._agendar(caminho_dot, caminho_saida, formato, valor, remover_dot)
+
+    def _agendar(self, caminho_dot, caminho_saida, formato, valor, remover_dot):
+        if self.pular_inalterados and os.path.exists(caminho_saida) and _ler_hash(caminho_saida) == valor:
+            self.pulados += 1
+            if remover_dot:
+                os.remove(caminho_dot)
+            futuro = _concluido('pulado')
+        else:
+            futuro = self._executor.submit(self._renderizar, caminho_dot, caminho_saida, formato, valor, remover_dot)
+        self._futuros.append(futuro)
+        return futuro
+
+    def _renderizar(self, caminho_dot, caminho_saida, formato, valor, remover_dot):
+        try:
+            renderizar_dot(caminho_dot, caminho_saida, formato)
+        finally:
+            if remover_dot:
+                os.remove(caminho_dot)
+        _gravar_hash(caminho_saida, valor)
+        with self._trava:
+            self.renderizados += 1
+        return 'renderizado'
+
+    def aguardar(self):
+        """Espera todas as renderizações agendadas e retorna seus resultados (propaga o primeiro erro)"""
+        futuros, self._futuros = self._futuros, []
+        return [futuro.result() for futuro in futuros]
+
+    def fechar(self):
+        try:
+            self.aguardar()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, rastreamento):
+        if tipo is None:
+            self.fechar()
+        else:
+            # Já há um erro em andamento: só espera os processos em execução terminarem
+            self._executor.shutdown(wait=True)
+        return False
+
+
+def escrever_diagramas(tree, diretorio, limite_nos=None):
+    """
+    Escreve em diretorio os arquivos DOT dos três diagramas (AST, árvore semântica e fluxo de controle)
+    e retorna seus caminhos. limite_nos limita o tamanho do grafo da AST, o maior dos três.
+    """
+    escritores = {
+        'ast_tree': lambda f: exportar_ast_dot(tree, f, limite_nos=limite_nos),
+        'arvore_semantica': lambda f: escrever_grafo_arvore_semantica(tree, f),
+        'fluxo_de_controle': lambda f: escrever_grafo_fluxo_de_controle(tree, f),
+    }
+    os.makedirs(diretorio, exist_ok=True)
+    caminhos = []
+    for nome, escrever in escritores.items():
+        caminho = os.path.join(diretorio, f"{nome}.dot")
+        with open(caminho, "w", encoding="utf-8") as f:
+            escrever(f)
+        caminhos.append(caminho)
+    return caminhos
+
+
+def gerar_diagramas(tree, diretorio, agendador, limite_nos=None):
+    """Agenda os três diagramas de uma árvore e retorna os Futures das renderizações"""
+    return [
+        agendador.agendar_dot(caminho, remover_dot=True)
+        for caminho in escrever_diagramas(tree, diretorio, limite_nos)
+    ]
+
+
+# Exemplo de uso:
+if __name__ == "__main__":
+    import ast
+    import sys
+
+    formato = sys.argv[1] if len(sys.argv) > 1 else 'png'
+    with open("main.py", "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+
+    with AgendadorRenderizacao(formato=formato) as agendador:
+        gerar_diagramas(tree, "./images/diagramas", agendador)
+    print(f"{agendador.renderizados} diagramas renderizados, {agendador.pulados} inalterados")
@@ -0,0 +1,386 @@
+import ast
+import timeit
+
+from semantic_analysis import RegraSemantica, _executar_regra
+from tabela_simbolos import EMBUTIDO, Simbolo
+
+SEVERIDADES = ('baixa', 'media', 'alta')
+
+_FUNCOES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+_COMPREENSOES = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+# Exceções que normalmente sinalizam uma entrada inválida, não uma falha
+_EXCECOES_DE_CONTROLE = frozenset(['ValueError', 'KeyError', 'IndexError', 'TypeError', 'AttributeError',
+                                   'StopIteration', 'Exception'])
+# Listas e tuplas literais até esse tamanho ainda são rápidas de percorrer
+_PERTINENCIA_CURTA = 8
+
+
+# Cada achado aponta para um destes pares de trechos; medir_microbenchmark(nome) compara os dois.
+# O preparo roda como código de módulo, então os nomes dele são globais para os trechos
+MICROBENCHMARKS = {
+    'pertinencia_em_lista': {
+        'preparo': "x = 15",
+        'lento': "x in [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]",
+        'rapido': "x in {0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15}",
+    },
+    'concatenacao_em_laco': {
+        'preparo': "partes = [str(i) for i in range(2000)]\nclass Relatorio: texto = ''\nr = Relatorio()",
+        'lento': "r.texto = ''\nfor parte in partes:\n    r.texto += parte",
+        'rapido': "r.texto = ''.join(partes)",
+    },
+    # Desde o Python 3.11 o interpretador guarda essas buscas em cache e a diferença é pequena
+    'busca_repetida_em_laco': {
+        'preparo': "import math\ndados = [float(i) for i in range(1000)]\nLIMITE = 10.0",
+        'lento': "saida = []\nfor x in dados:\n    saida.append(math.sqrt(x) + LIMITE)",
+        'rapido': ("saida = []\nadicionar, raiz, limite = saida.append, math.sqrt, LIMITE\n"
+                   "for x in dados:\n    adicionar(raiz(x) + limite)"),
+    },
+    'invariante_em_laco': {
+        'preparo': "dados = [float(i) for i in range(1000)]\ncapital, taxa = 1000.0, 5.0",
+        'lento': "total = 0.0\nfor x in dados:\n    total += x * capital * (1 + taxa / 100)",
+        'rapido': "total = 0.0\nfator = capital * (1 + taxa / 100)\nfor x in dados:\n    total += x * fator",
+    },
+    'potencia_constante': {
+        'preparo': "dados = [float(i) for i in range(1000)]",
+        'lento': "for x in dados:\n    y = x ** 2",
+        'rapido': "for x in dados:\n    y = x * x",
+    },
+    'excecao_como_controle': {
+        'preparo': "entradas = [str(i) if i % 2 else 'x' + str(i) for i in range(1000)]",
+        'lento': ("for texto in entradas:\n    try:\n        valor = int(texto)\n"
+                  "    except ValueError:\n        valor = 0"),
+        'rapido': "for texto in entradas:\n    valor = int(texto) if texto.isdigit() else 0",
+    },
+}
+
+
+def medir_microbenchmark(nome, repeticoes=5):
+    """
+    Executa as duas versões do microbenchmark e retorna o menor tempo de cada uma por execução
+    (em segundos) e quantas vezes a versão lenta é mais lenta
+    """
+    trechos = MICROBENCHMARKS[nome]
+    tempos = {}
+    for versao in ('lento', 'rapido'):
+        espaco = {}
+        exec(trechos['preparo'], espaco)
+        temporizador = timeit.Timer(trechos[versao], globals=espaco)
+        numero, _ = temporizador.autorange()
+        tempos[versao] = min(temporizador.repeat(repeticoes, numero)) / numero
+    tempos['razao'] = tempos['lento'] / tempos['rapido']
+    return tempos
+
+
+def _severidade(base, agravantes):
+    return SEVERIDADES[min(SEVERIDADES.index(base) + max(agravantes, 0), len(SEVERIDADES) - 1)]
+
+
+def _raiz(no):
+    while isinstance(no, ast.Attribute):
+        no = no.value
+    return no
+
+
+def _filhos(no, lacos, funcao):
+    """Filhos do nó com os laços e a função em que cada um é avaliado"""
+    if isinstance(no, _FUNCOES):
+        internos = set(no.body) if isinstance(no.body, list) else {no.body}
+        return [(filho, (), no) if filho in internos else (filho, lacos, funcao) for filho in ast.iter_child_nodes(no)]
+    if isinstance(no, ast.ClassDef):
+        return [(filho, lacos, None) for filho in ast.iter_child_nodes(no)]
+    dentro = lacos + (no,)
+    if isinstance(no, (ast.For, ast.AsyncFor)):
+        pares = [(no.target, dentro), (no.iter, lacos)] + [(filho, dentro) for filho in no.body]
+        pares += [(filho, lacos) for filho in no.orelse]
+    elif isinstance(no, ast.While):
+        pares = [(no.test, dentro)] + [(filho, dentro) for filho in no.body] + [(filho, lacos) for filho in no.orelse]
+    elif isinstance(no, _COMPREENSOES):
+        primeiro = no.generators[0]
+        pares = [(filho, dentro) for filho in ast.iter_child_nodes(no) if filho is not primeiro]
+        pares += [(primeiro.iter, lacos), (primeiro.target, dentro)] + [(condicao, dentro) for condicao in primeiro.ifs]
+    else:
+        return [(filho, lacos, funcao) for filho in ast.iter_child_nodes(no)]
+    return [(filho, contexto, funcao) for filho, contexto in pares]
+
+
+def _percorrer(tree):
+    """
+    Gera (nó, laços, função) em pré-ordem: os laços que executam o nó a cada iteração, de fora
+    para dentro, e a função em que ele está. O iterável do for e o primeiro iterável de uma
+    compreensão são avaliados uma vez só; o corpo de uma função definida no laço só roda quando
+    ela é chamada, então conta como fora dele.
+    """
+    pilha = [(tree, (), None)]
+    while pilha:
+        no, lacos, funcao = pilha.pop()
+        yield no, lacos, funcao
+        filhos = _filhos(no, lacos, funcao)
+        filhos.reverse()
+        pilha.extend(filhos)
+
+
+def _achado(regra, no, severidade, mensagem, sugestao):
+    return {
+        'regra': regra,
+        'severidade': severidade,
+        'linha': no.lineno,
+        'coluna': no.col_offset,
+        'mensagem': mensagem,
+        'sugestao': sugestao,
+        'microbenchmark': regra,
+    }
+
+
+class RegraDesempenho(RegraSemantica):
+    """
+    Padrões com custo de execução evitável. Cada achado é um dict com regra, severidade
+    ('baixa', 'media' ou 'alta'), linha, coluna, mensagem, sugestão de correção e o nome do
+    microbenchmark de MICROBENCHMARKS que mostra o custo. A severidade sobe com o número de laços
+    em volta; laços que esperam input() não contam, porque o tempo deles é dominado pela espera.
+    """
+    nome = 'desempenho'
+    usa_tabela_simbolos = True
+
+    def iniciar(self, contexto):
+        super().iniciar(contexto)
+        self._atribuidos = {}
+        self._interativos = {}
+
+    def resultado(self):
+        tabela = self.contexto.tabela_simbolos
+        achados = []
+        # Laço mais interno -> (laços quentes, {texto buscado: ocorrências})
+        buscas = {}
+        chamados = set()
+        raizes_de_cadeias = set()
+        cobertos = set()
+        # O tipo de um except só é avaliado quando uma exceção chega até ele
+        ignorados = set()
+        for no, lacos, funcao in _percorrer(self.contexto.tree):
+            quentes = [laco for laco in lacos if not self._interativo(laco)]
+            if isinstance(no, ast.Call):
+                chamados.add(no.func)
+            elif isinstance(no, ast.ExceptHandler) and no.type is not None:
+                ignorados.update(ast.walk(no.type))
+            elif isinstance(no, ast.Compare):
+                achados.extend(self._pertinencia(no, quentes))
+            elif isinstance(no, (ast.AugAssign, ast.Assign)) and quentes:
+                achado = self._concatenacao(no, quentes)
+                if achado is not None:
+                    achados.append(achado)
+            elif isinstance(no, ast.Try) and lacos:
+                achado = self._excecao_como_controle(no, lacos, quentes)
+                if achado is not None:
+                    achados.append(achado)
+            elif isinstance(no, ast.BinOp) and no not in cobertos:
+                achado = self._invariante(no, quentes, funcao) if quentes and funcao is not None else None
+                if achado is not None:
+                    cobertos.update(ast.walk(no))
+                    achados.append(achado)
+                elif isinstance(no.op, ast.Pow):
+                    achado = self._potencia(no, quentes)
+                    if achado is not None:
+                        achados.append(achado)
+            if (not quentes or funcao is None or no in ignorados
+                    or not isinstance(getattr(no, 'ctx', None), ast.Load)):
+                continue
+            # Buscas de atributos e de globais a cada iteração (só dentro de funções, onde as
+            # variáveis locais são acessadas sem busca em dicionário)
+            texto = None
+            if isinstance(no, ast.Attribute) and no in chamados and isinstance(_raiz(no), ast.Name):
+                raiz = _raiz(no)
+                if raiz.id not in self._atribuidos_em(quentes[-1]):
+                    raizes_de_cadeias.add(raiz)
+                    texto = ast.unparse(no)
+            elif isinstance(no, ast.Name) and no not in raizes_de_cadeias:
+                simbolo = tabela.resolver(no)
+                if simbolo is EMBUTIDO or (isinstance(simbolo, Simbolo) and simbolo.escopo is tabela.modulo):
+                    texto = no.id
+            if texto is not None:
+                contagem = buscas.setdefault(quentes[-1], (len(quentes), {}))[1]
+                contagem[texto] = contagem.get(texto, 0) + 1
+
+        for laco, (profundidade, contagem) in buscas.items():
+            nomes = ', '.join(f"{texto} ({vezes}x)" if vezes > 1 else texto for texto, vezes in contagem.items())
+            achados.append(_achado(
+                'busca_repetida_em_laco', laco, 'baixa' if profundidade == 1 else 'media',
+                f"Globais, embutidos e métodos buscados a cada iteração do laço: {nomes}",
+                "Nos laços mais executados, copie-os para variáveis locais antes do laço "
+                "(ex.: adicionar = lista.append)",
+            ))
+        achados.sort(key=lambda a: (a['linha'], a['coluna'], a['regra']))
+        return achados
+
+    # -- laços ---------------------------------------------------------------------
+
+    def _atribuidos_em(self, laco):
+        """Nomes que recebem valor em algum ponto do laço (inclusive o alvo do for)"""
+        nomes = self._atribuidos.get(laco)
+        if nomes is None:
+            nomes = set()
+            for no in ast.walk(laco):
+                if isinstance(no, ast.Name) and isinstance(no.ctx, (ast.Store, ast.Del)):
+                    nomes.add(no.id)
+                elif isinstance(no, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    nomes.add(no.name)
+                elif isinstance(no, (ast.Import, ast.ImportFrom)):
+                    nomes.update((alias.asname or alias.name).split('.')[0] for alias in no.names)
+                elif isinstance(no, (ast.Global, ast.Nonlocal)):
+                    nomes.update(no.names)
+            self._atribuidos[laco] = nomes
+        return nomes
+
+    def _interativo(self, laco):
+        """Laços que leem do teclado: o custo de cada iteração é a espera pelo usuário"""
+        interativo = self._interativos.get(laco)
+        if interativo is None:
+            interativo = self._interativos[laco] = any(
+                isinstance(no, ast.Call) and isinstance(no.func, ast.Name) and no.func.id == 'input'
+                for no in ast.walk(laco)
+            )
+        return interativo
+
+    # -- padrões -------------------------------------------------------------------
+
+    def _pertinencia(self, no, quentes):
+        for op, colecao in zip(no.ops, no.comparators):
+            if not isinstance(op, (ast.In, ast.NotIn)) or not isinstance(colecao, (ast.List, ast.Tuple)):
+                continue
+            constantes = all(isinstance(e, ast.Constant) for e in colecao.elts)
+            # Elementos que não são constantes fazem a lista ser montada de novo a cada avaliação
+            base = 'baixa' if constantes and len(colecao.elts) <= _PERTINENCIA_CURTA else 'media'
+            tipo = 'lista' if isinstance(colecao, ast.List) else 'tupla'
+            if constantes:
+                conjunto = '{' + ', '.join(ast.unparse(e) for e in colecao.elts) + '}'
+                sugestao = f"Use um conjunto literal: {ast.unparse(no.left)} {'not in' if isinstance(op, ast.NotIn) else 'in'} {conjunto}"
+            else:
+                sugestao = "Monte um conjunto com os valores uma vez, fora do laço, e teste a pertinência nele"
+            yield _achado('pertinencia_em_lista', no, _severidade(base, len(quentes)),
+                          f"Teste de pertinência em {tipo} literal com {len(colecao.elts)} elementos: "
+                          f"busca linear a cada avaliação", sugestao)
+
+    def _concatenacao(self, no, quentes):
+        tabela, tipos = self.contexto.tabela_simbolos, self.contexto.tipos
+        if isinstance(no, ast.AugAssign):
+            if not isinstance(no.op, ast.Add):
+                return None
+            alvo, valor = no.target, no.value
+        elif (len(no.targets) == 1 and isinstance(no.value, ast.BinOp) and isinstance(no.value.op, ast.Add)
+              and isinstance(no.targets[0], ast.Name) and isinstance(no.value.left, ast.Name)
+              and no.value.left.id == no.targets[0].id):
+            alvo, valor = no.targets[0], no.value.right
+        else:
+            return None
+        if isinstance(alvo, ast.Name):
+            simbolo = tabela.resolver_nome(alvo.id, alvo)
+            tipo_alvo = tipos.tipo_do_simbolo(simbolo) if isinstance(simbolo, Simbolo) else None
+        else:
+            tipo_alvo = None
+        if str not in (tipo_alvo, tipos.tipo_de(valor)):
+            return None
+        texto = ast.unparse(alvo)
+        return _achado('concatenacao_em_laco', no, _severidade('media', len(quentes) - 1),
+                       f"Concatenação de strings em '{texto}' dentro de laço: cada + pode copiar o texto inteiro",
+                       "Acumule as partes em uma lista e junte no final com ''.join(partes)")
+
+    def _invariante(self, no, quentes, funcao):
+        nomes = set()
+        for parte in ast.walk(no):
+            if isinstance(parte, ast.Name):
+                nomes.add(parte.id)
+            elif not isinstance(parte, (ast.BinOp, ast.UnaryOp, ast.Constant, ast.Load, ast.operator, ast.unaryop)):
+                # Chamadas, atributos e índices podem ter efeitos ou mudar a cada iteração
+                return None
+        if not nomes:
+            return None
+        # Só variáveis locais da função: globais podem ser alteradas por chamadas feitas no laço
+        tabela = self.contexto.tabela_simbolos
+        for parte in ast.walk(no):
+            if isinstance(parte, ast.Name):
+                simbolo = tabela.resolver(parte)
+                if not isinstance(simbolo, Simbolo) or simbolo.escopo.no is not funcao:
+                    return None
+        for posicao, laco in enumerate(quentes):
+            if not nomes & self._atribuidos_em(laco):
+                return _achado('invariante_em_laco', no, _severidade('baixa', len(quentes) - posicao - 1),
+                               f"'{ast.unparse(no)}' não muda dentro do laço da linha {laco.lineno} "
+                               f"mas é recalculada a cada iteração",
+                               "Calcule a expressão uma vez antes do laço (o passo 'invariantes' de "
+                               "otimizador_ast faz isso automaticamente)")
+        return None
+
+    def _potencia(self, no, quentes):
+        expoente = no.right
+        if not (isinstance(expoente, ast.Constant) and type(expoente.value) is int and expoente.value in (2, 3)):
+            return None
+        if isinstance(no.left, ast.Constant):
+            # O compilador já calcula potências de constantes
+            return None
+        base = ast.unparse(no.left)
+        if isinstance(no.left, (ast.Name, ast.Attribute)):
+            sugestao = f"Use a multiplicação: {' * '.join([base] * expoente.value)}"
+        else:
+            sugestao = f"Guarde {base} em uma variável b e use a multiplicação: {' * '.join(['b'] * expoente.value)}"
+        return _achado('potencia_constante', no, _severidade('baixa', len(quentes)),
+                       f"Potência com expoente constante {expoente.value}: ** chama a rotina genérica de potência",
+                       sugestao)
+
+    def _excecao_como_controle(self, no, lacos, quentes):
+        capturadas = []
+        for manipulador in no.handlers:
+            tipos = manipulador.type.elts if isinstance(manipulador.type, ast.Tuple) else [manipulador.type]
+            for tipo in tipos:
+                nome = 'except:' if tipo is None else ast.unparse(tipo)
+                if tipo is None or (isinstance(tipo, ast.Name) and tipo.id in _EXCECOES_DE_CONTROLE):
+                    capturadas.append(nome)
+        if not capturadas:
+            return None
+        # raise dentro do próprio try, capturado logo abaixo, funciona como um desvio
+        lancadas = [
+            parte for comando in no.body for parte in ast.walk(comando)
+            if isinstance(parte, ast.Raise) and parte.exc is not None
+            and ast.unparse(parte.exc.func if isinstance(parte.exc, ast.Call) else parte.exc) in capturadas
+        ]
+        laco = lacos[-1]
+        if lancadas:
+            mensagem = (f"raise {ast.unparse(lancadas[0].exc.func if isinstance(lancadas[0].exc, ast.Call) else lancadas[0].exc)}"
+                        f" na linha {lancadas[0].lineno} é capturado pelo próprio try: exceção usada como desvio "
+                        f"no laço da linha {laco.lineno}")
+        else:
+            mensagem = (f"try/except {', '.join(capturadas)} a cada iteração do laço da linha {laco.lineno}: "
+                        f"lançar e capturar exceções é bem mais caro que testar uma condição")
+        if self._interativo(laco):
+            severidade = 'baixa'
+            mensagem += " (o laço espera input(), então o custo quase não aparece)"
+        else:
+            severidade = _severidade('media', len(quentes) - 1)
+        return _achado('excecao_como_controle', no, severidade, mensagem,
+                       "Valide a entrada com uma condição (str.isdigit(), 'in' em um conjunto...) e use "
+                       "if/continue no lugar de raise/except para os casos esperados")
+
+
+def analisar_desempenho(tree):
+    return _executar_regra(tree, RegraDesempenho())
+
+
+def formatar_achados(achados):
+    linhas = []
+    for achado in achados:
+        linhas.append(f"[{achado['severidade']}] linha {achado['linha']}: {achado['mensagem']}")
+        linhas.append(f"    sugestão: {achado['sugestao']}")
+    return "\n".join(linhas)
+
+
+# Exemplo de uso:
+if __name__ == "__main__":
+    import sys
+
+    caminho = sys.argv[1] if len(sys.argv) > 1 else "main.py"
+    with open(caminho, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+
+    achados = analisar_desempenho(tree)
+    print(formatar_achados(achados) or "Nenhum problema de desempenho encontrado.")
+    for nome in sorted({achado['microbenchmark'] for achado in achados}):
+        tempos = medir_microbenchmark(nome)
+        print(f"{nome}: {tempos['lento'] * 1e6:.2f} µs -> {tempos['rapido'] * 1e6:.2f} µs ({tempos['razao']:.1f}x)")
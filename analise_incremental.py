@@ -0,0 +1,272 @@
+import ast
+import re
+import tokenize
+from bisect import bisect_left
+
+from lexical_analysis import registros_de_tokens
+from semantic_analysis import analisar_arvore
+
+# Tokens que não iniciam uma linha lógica: linhas em branco, comentários e mudanças de indentação
+_NAO_INICIAM_LINHA = (tokenize.NL, tokenize.COMMENT, tokenize.INDENT, tokenize.DEDENT)
+_FIM_DE_ARQUIVO = (tokenize.NEWLINE, tokenize.ENDMARKER)
+# Só \n, \r\n e \r quebram linha para o tokenize e o ast (str.splitlines também quebra em \f, \x1c...)
+_QUEBRA_DE_LINHA = re.compile(r'(?<=\n)|(?<=\r)(?!\n)')
+
+
+def _dividir_linhas(texto):
+    linhas = _QUEBRA_DE_LINHA.split(texto)
+    if linhas[-1] == '':
+        linhas.pop()
+    return linhas
+
+
+def _tokenizar(linhas, inicio=0):
+    """Tokeniza linhas[inicio:] como se fosse o começo de um arquivo, com as posições no arquivo todo"""
+    leitor = iter(linhas[inicio:])
+    for tok in tokenize.generate_tokens(lambda: next(leitor, '')):
+        yield _deslocar(tok, inicio) if inicio else tok
+
+
+def _deslocar(tok, delta):
+    (linha_inicio, coluna_inicio), (linha_fim, coluna_fim) = tok.start, tok.end
+    return tok._replace(start=(linha_inicio + delta, coluna_inicio), end=(linha_fim + delta, coluna_fim))
+
+
+class _Retomadas:
+    """
+    Acompanha o tokenize para saber em quais tokens começa uma linha lógica na coluna 0 com
+    os parênteses equilibrados. Nesses pontos o tokenize não carrega estado nenhum (a pilha de
+    indentação está vazia), então dá para recomeçar ou retomar a tokenização ali.
+    Seguir um NEWLINE não basta: depois de um ')' sem par o tokenize continua emitindo NEWLINE,
+    mas trata o resto do arquivo como continuação da mesma instrução; e uma linha só com
+    indentação e '\\' não gera token nenhum, mas continua na linha seguinte.
+    """
+
+    def __init__(self):
+        self.parenteses = 0
+        self.apos_newline = True
+        # Linha em que terminou o último token (INDENT/DEDENT não contam: não ocupam a linha)
+        self.ultima_linha = None
+
+    def inicia_linha(self, tok):
+        """Avança sobre tok; indica se ele é um ponto de retomada"""
+        if tok.type in (tokenize.INDENT, tokenize.DEDENT):
+            return False
+        linha_anterior, self.ultima_linha = self.ultima_linha, tok.end[0]
+        if tok.type in _NAO_INICIAM_LINHA:
+            return False
+        inicia = (self.apos_newline and self.parenteses == 0 and tok.start[1] == 0
+                  and tok.type not in _FIM_DE_ARQUIVO
+                  and (linha_anterior is None or tok.start[0] == linha_anterior + 1))
+        self.apos_newline = tok.type == tokenize.NEWLINE
+        if tok.type == tokenize.OP:
+            if tok.string in '([{':
+                self.parenteses += 1
+            elif tok.string in ')]}':
+                self.parenteses -= 1
+        return inicia
+
+
+def _inicio_instrucao(no):
+    # Os decoradores ficam antes da linha do def/class
+    decoradores = getattr(no, 'decorator_list', None)
+    if decoradores:
+        return min(no.lineno, *(d.lineno for d in decoradores))
+    return no.lineno
+
+
+class AnaliseIncremental:
+    """
+    Mantém tokens e AST de um módulo e os atualiza a cada edição, refazendo só o trecho afetado.
+
+    Os tokens são retokenizados a partir da última linha lógica na coluna 0 antes da edição e
+    voltam a usar os antigos (com as linhas deslocadas) no primeiro início de linha lógica na
+    coluna 0 depois dela. Na AST, só as instruções de nível superior que tocam a edição (e a
+    anterior, que pode ganhar linhas indentadas) são reanalisadas; se o trecho não fizer sentido
+    isolado, o módulo inteiro é reanalisado.
+    """
+
+    def __init__(self, codigo_fonte):
+        self.linhas = _dividir_linhas(codigo_fonte)
+        self.tokens = None
+        # Índices, em self.tokens, dos pontos de retomada (ver _Retomadas)
+        self._retomadas = []
+        self.arvore = None
+        self.erro_lexico = None
+        self.erro_sintaxe = None
+        self._semantica = None
+        self._retokenizar_tudo()
+        self._reanalisar_tudo()
+
+    @property
+    def codigo_fonte(self):
+        return ''.join(self.linhas)
+
+    def registros(self):
+        """Tokens no formato de analisar_lexico"""
+        if self.tokens is None:
+            return []
+        return list(registros_de_tokens(self.tokens))
+
+    def diagnosticos(self):
+        """Resultados de analisar_arvore sobre a AST atual (None se houver erro de sintaxe)"""
+        if self._semantica is None and self.arvore is not None:
+            self._semantica, _ = analisar_arvore(self.arvore)
+        return self._semantica
+
+    def aplicar_edicao(self, linha_inicio, coluna_inicio, linha_fim, coluna_fim, texto):
+        """
+        Substitui o trecho entre (linha_inicio, coluna_inicio) e (linha_fim, coluna_fim) por texto.
+        Linhas começam em 1 e colunas em 0, contadas em caracteres, como no tokenize e no ast.
+        Retorna um resumo do que foi refeito.
+        """
+        total = len(self.linhas)
+        # A linha depois da última só existe se o texto terminar em quebra de linha
+        limite = total + 1 if not self.linhas or self.linhas[-1].endswith(('\n', '\r')) else total
+        if not 1 <= linha_inicio <= linha_fim <= limite:
+            raise ValueError(f"Intervalo de linhas inválido: {linha_inicio}-{linha_fim} (arquivo com {total})")
+        antes = self.linhas[linha_inicio - 1] if linha_inicio <= total else ''
+        depois = self.linhas[linha_fim - 1] if linha_fim <= total else ''
+        novas = _dividir_linhas(antes[:coluna_inicio] + texto + depois[coluna_fim:])
+        removidas = min(linha_fim, total) - linha_inicio + 1
+        self.linhas[linha_inicio - 1:linha_inicio - 1 + removidas] = novas
+        delta = len(novas) - removidas
+        # Última linha (já no texto novo) tocada pela edição
+        ultima_editada = linha_inicio + max(len(novas), 1) - 1
+
+        self._semantica = None
+        return {
+            'tokens': self._retokenizar(linha_inicio, ultima_editada, delta),
+            'arvore': self._reanalisar(linha_inicio, linha_fim, delta),
+        }
+
+    # -- tokens ---------------------------------------------------------------------
+
+    def _retokenizar_tudo(self):
+        retomadas = _Retomadas()
+        try:
+            self.tokens = list(_tokenizar(self.linhas))
+            self.erro_lexico = None
+        except (tokenize.TokenError, SyntaxError) as e:
+            self.tokens = None
+            self.erro_lexico = e
+        self._retomadas = [i for i, tok in enumerate(self.tokens or ()) if retomadas.inicia_linha(tok)]
+        return {'modo': 'completo', 'novos': len(self.tokens or ())}
+
+    def _retokenizar(self, linha_inicio, ultima_editada, delta):
+        if self.tokens is None:
+            return self._retokenizar_tudo()
+        antigos = self.tokens
+
+        # Recomeça no último ponto de retomada estritamente antes da linha editada: aquela linha
+        # não mudou, e os DEDENTs emitidos antes dela continuam valendo
+        posicao = bisect_left(self._retomadas, linha_inicio, key=lambda i: antigos[i].start[0]) - 1
+        if posicao < 0:
+            return self._retokenizar_tudo()
+        indice = self._retomadas[posicao]
+        recomeco = antigos[indice].start[0]
+
+        novos = []
+        retomadas_novas = []
+        retomada = None
+        estado = _Retomadas()
+        try:
+            for tok in _tokenizar(self.linhas, recomeco - 1):
+                if estado.inicia_linha(tok):
+                    # Depois da edição, o primeiro ponto que também era de retomada no texto antigo
+                    # encerra a tokenização: dali em diante os tokens antigos valem, só deslocados
+                    if tok.start[0] > ultima_editada:
+                        retomada = self._ponto_de_retomada(tok, delta)
+                        if retomada is not None:
+                            break
+                    retomadas_novas.append(indice + len(novos))
+                novos.append(tok)
+        except (tokenize.TokenError, SyntaxError):
+            return self._retokenizar_tudo()
+
+        self.tokens = antigos[:indice] + novos
+        retomadas = self._retomadas[:posicao] + retomadas_novas
+        if retomada is not None:
+            restantes = antigos[retomada:]
+            self.tokens.extend((_deslocar(t, delta) for t in restantes) if delta else restantes)
+            ajuste = indice + len(novos) - retomada
+            seguintes = bisect_left(self._retomadas, retomada)
+            retomadas.extend(i + ajuste for i in self._retomadas[seguintes:])
+        self._retomadas = retomadas
+        return {
+            'modo': 'incremental',
+            'linhas': (recomeco, novos[-1].end[0] if novos else recomeco),
+            'novos': len(novos),
+        }
+
+    def _ponto_de_retomada(self, tok, delta):
+        """Índice do token antigo na mesma posição de tok (no texto antigo), se ele era ponto de retomada"""
+        antigos = self.tokens
+        posicao = (tok.start[0] - delta, 0)
+        i = bisect_left(self._retomadas, posicao, key=lambda i: antigos[i].start)
+        if i == len(self._retomadas):
+            return None
+        antigo = antigos[self._retomadas[i]]
+        if antigo.start != posicao or antigo.type != tok.type or antigo.string != tok.string:
+            return None
+        return self._retomadas[i]
+
+    # -- AST ------------------------------------------------------------------------
+
+    def _reanalisar_tudo(self):
+        try:
+            self.arvore = ast.parse(self.codigo_fonte)
+            self.erro_sintaxe = None
+        except SyntaxError as e:
+            self.arvore = None
+            self.erro_sintaxe = e
+        return {'modo': 'completo'}
+
+    def _reanalisar(self, linha_inicio, linha_fim, delta):
+        if self.arvore is None or not self.arvore.body:
+            return self._reanalisar_tudo()
+        corpo = self.arvore.body
+        inicios = [_inicio_instrucao(no) for no in corpo]
+
+        # Instruções afetadas (em linhas antigas): da anterior à edição até a última que começa nela
+        primeira = max(bisect_left(inicios, linha_inicio) - 1, 0)
+        fim = bisect_left(inicios, linha_fim + 1)
+        # Várias instruções na mesma linha, separadas por ';', entram ou saem juntas
+        while primeira > 0 and corpo[primeira - 1].end_lineno >= inicios[primeira]:
+            primeira -= 1
+        while 0 < fim < len(corpo) and corpo[fim - 1].end_lineno >= inicios[fim]:
+            fim += 1
+        linha_regiao = min(inicios[primeira], linha_inicio)
+        # A região vai até a linha antes da próxima instrução intacta, já no texto novo
+        fim_regiao = (inicios[fim] - 1 + delta) if fim < len(corpo) else len(self.linhas)
+
+        trecho = ''.join(self.linhas[linha_regiao - 1:fim_regiao])
+        try:
+            parcial = ast.parse(trecho)
+        except SyntaxError:
+            return self._reanalisar_tudo()
+
+        for no in parcial.body:
+            ast.increment_lineno(no, linha_regiao - 1)
+        if delta:
+            for no in corpo[fim:]:
+                ast.increment_lineno(no, delta)
+        corpo[primeira:fim] = parcial.body
+        return {
+            'modo': 'incremental',
+            'linhas': (linha_regiao, fim_regiao),
+            'instrucoes': len(parcial.body),
+        }
+
+
+if __name__ == "__main__":
+    with open("main.py", "r", encoding="utf-8") as f:
+        analise = AnaliseIncremental(f.read())
+    print(f"{len(analise.tokens)} tokens, {len(analise.arvore.body)} instruções de nível superior")
+
+    # Troca "taxa / 100" por "taxa / 100.0" dentro de calcular_juros_simples (linha 4)
+    coluna = analise.linhas[3].index("100")
+    print("Troca de literal:", analise.aplicar_edicao(4, coluna, 4, coluna + 3, "100.0"))
+    # Nova instrução no corpo da função, logo depois do return
+    print("Linha inserida:", analise.aplicar_edicao(7, 0, 7, 0, "  taxa_nao_usada = 0\n"))
+    print("Variáveis não utilizadas:", analise.diagnosticos()['variaveis_nao_utilizadas'])
@@ -0,0 +1,220 @@
+import argparse
+import glob
+import hashlib
+import os
+import re
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
+
+from agendador_renderizacao import AgendadorRenderizacao, escrever_diagramas
+from cache_analise import CacheAnalise, analisar_fonte
+
+
+class TempoEsgotado(Exception):
+    pass
+
+
+def coletar_arquivos(padroes):
+    """
+    Expande diretórios (todos os .py, recursivamente) e padrões glob em uma lista
+    de arquivos sem repetições, em ordem determinística.
+    """
+    arquivos = []
+    vistos = set()
+    for padrao in padroes:
+        if os.path.isdir(padrao):
+            encontrados = []
+            for raiz, pastas, nomes in os.walk(padrao):
+                pastas.sort()
+                encontrados.extend(os.path.join(raiz, nome) for nome in sorted(nomes) if nome.endswith('.py'))
+        elif os.path.isfile(padrao):
+            encontrados = [padrao]
+        else:
+            encontrados = sorted(glob.glob(padrao, recursive=True))
+        for caminho in encontrados:
+            if caminho not in vistos and os.path.isfile(caminho):
+                vistos.add(caminho)
+                arquivos.append(caminho)
+    return arquivos
+
+
+def _alarme(signum, frame):
+    raise TempoEsgotado()
+
+
+@contextmanager
+def _limite_de_tempo(segundos):
+    # O limite usa SIGALRM, disponível só em sistemas Unix; nos demais a análise não é interrompida
+    if not segundos or not hasattr(signal, 'setitimer'):
+        yield
+        return
+    anterior = signal.signal(signal.SIGALRM, _alarme)
+    signal.setitimer(signal.ITIMER_REAL, segundos)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, anterior)
+
+
+def _resultados_serializaveis(resultados):
+    # Conjuntos viram listas ordenadas para que a saída seja sempre a mesma
+    return {
+        nome: sorted(valor) if isinstance(valor, set) else valor
+        for nome, valor in resultados.items()
+    }
+
+
+# Um cache por processo e diretório, criado no primeiro uso dentro de cada processo do pool
+_CACHES = {}
+
+
+def _cache_do_processo(diretorio_cache, limite_cache):
+    cache = _CACHES.get(diretorio_cache)
+    if cache is None:
+        cache = _CACHES[diretorio_cache] = CacheAnalise(diretorio_cache, limite_cache)
+    return cache
+
+
+def pasta_diagramas(diretorio_diagramas, caminho):
+    """
+    Pasta dos diagramas de um arquivo: o caminho relativo dele com separadores trocados por '_',
+    mais um hash curto do caminho, para que a/b.py e a_b.py não escrevam na mesma pasta
+    """
+    relativo = os.path.relpath(caminho)
+    nome = re.sub(r'[^\w.-]+', '_', os.path.splitext(relativo)[0])
+    resumo = hashlib.sha256(relativo.encode("utf-8", "surrogateescape")).hexdigest()[:8]
+    return os.path.join(diretorio_diagramas, f"{nome}_{resumo}")
+
+
+def analisar_arquivo(caminho, limite_segundos=None, diretorio_cache=None, limite_cache=256 * 1024 * 1024,
+                     diretorio_diagramas=None, limite_nos_diagramas=None):
+    """
+    Executa as análises léxica, sintática e semântica de um arquivo sem imprimir nada.
+    Com diretorio_diagramas, também escreve os arquivos DOT dos diagramas (a renderização fica com quem chamou).
+    """
+    resultado = {
+        'arquivo': caminho,
+        'status': 'ok',
+        'tokens': 0,
+        'erro_sintaxe': None,
+        'semantica': None,
+        'mensagem': None,
+        'cache': None,
+        'diagramas': [],
+    }
+    cache = _cache_do_processo(diretorio_cache, limite_cache) if diretorio_cache else None
+    inicio = time.perf_counter()
+    try:
+        with _limite_de_tempo(limite_segundos):
+            with open(caminho, "r", encoding="utf-8") as f:
+                codigo = f.read()
+            acertos = cache.acertos if cache is not None else 0
+            entrada = analisar_fonte(codigo, cache)
+            if cache is not None:
+                resultado['cache'] = 'acerto' if cache.acertos > acertos else 'falha'
+            resultado['tokens'] = len(entrada['tokens']) if entrada['tokens'] is not None else None
+            if entrada['erro_sintaxe'] is not None:
+                resultado['status'] = 'erro_sintaxe'
+                resultado['erro_sintaxe'] = entrada['erro_sintaxe']
+            else:
+                resultado['semantica'] = _resultados_serializaveis(entrada['semantica'])
+                if diretorio_diagramas:
+                    resultado['diagramas'] = escrever_diagramas(
+                        entrada['arvore'], pasta_diagramas(diretorio_diagramas, caminho), limite_nos_diagramas
+                    )
+    except TempoEsgotado:
+        resultado['status'] = 'tempo_esgotado'
+        resultado['mensagem'] = f"análise interrompida após {limite_segundos}s"
+    except Exception as e:
+        # Erros de leitura, de decodificação ou inesperados ficam registrados no resultado do arquivo
+        resultado['status'] = 'erro'
+        resultado['mensagem'] = f"{type(e).__name__}: {e}"
+    resultado['tempo'] = time.perf_counter() - inicio
+    return resultado
+
+
+def analisar_projeto(padroes, trabalhadores=None, tamanho_lote=16, limite_segundos=30,
+                     diretorio_cache=None, limite_cache=256 * 1024 * 1024,
+                     diretorio_diagramas=None, limite_nos_diagramas=None):
+    """
+    Analisa todos os arquivos encontrados em paralelo, em um pool de processos.
+    Os arquivos são distribuídos em lotes de tamanho_lote e os resultados são gerados
+    na mesma ordem de coletar_arquivos, independentemente de qual processo terminar primeiro.
+    Com diretorio_cache, arquivos cujo conteúdo não mudou reaproveitam os resultados em disco.
+    Com diretorio_diagramas, cada resultado traz em 'diagramas' os arquivos DOT escritos para o arquivo.
+    """
+    arquivos = coletar_arquivos(padroes)
+    argumentos = (repeat(limite_segundos), repeat(diretorio_cache), repeat(limite_cache),
+                  repeat(diretorio_diagramas), repeat(limite_nos_diagramas))
+    if trabalhadores == 1:
+        yield from map(analisar_arquivo, arquivos, *argumentos)
+    else:
+        with ProcessPoolExecutor(max_workers=trabalhadores) as executor:
+            yield from executor.map(analisar_arquivo, arquivos, *argumentos, chunksize=max(1, tamanho_lote))
+    if diretorio_cache:
+        # Cada processo só conhece as próprias gravações; o limite de tamanho é aplicado no final
+        CacheAnalise(diretorio_cache, limite_cache).compactar()
+
+
+def contar_diagnosticos(resultado):
+    if not resultado['semantica']:
+        return 0
+    return sum(len(valor) for valor in resultado['semantica'].values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Análise léxica, sintática e semântica de um projeto inteiro")
+    parser.add_argument('caminhos', nargs='+', help="arquivos, diretórios ou padrões glob (ex.: 'src/**/*.py')")
+    parser.add_argument('-j', '--trabalhadores', type=int, default=None, help="processos no pool (padrão: nº de CPUs)")
+    parser.add_argument('--lote', type=int, default=16, help="arquivos enviados a cada processo por vez")
+    parser.add_argument('--limite', type=float, default=30, help="tempo máximo por arquivo, em segundos (0 desativa)")
+    parser.add_argument('--cache', default=None, help="diretório do cache de resultados")
+    parser.add_argument('--cache-limite', type=float, default=256, help="tamanho máximo do cache, em MB")
+    parser.add_argument('--diagramas', default=None, help="diretório onde renderizar os diagramas de cada arquivo")
+    parser.add_argument('--formato', choices=['png', 'svg'], default='png', help="formato dos diagramas (svg é mais rápido)")
+    parser.add_argument('--renderizacoes', type=int, default=None, help="processos dot simultâneos (padrão: nº de CPUs)")
+    parser.add_argument('--limite-nos', type=int, default=2000, help="nós no diagrama da AST antes de resumir o restante")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    total = com_problemas = 0
+    acertos = falhas = 0
+    resultados = analisar_projeto(
+        args.caminhos, args.trabalhadores, args.lote, args.limite,
+        args.cache, int(args.cache_limite * 1024 * 1024),
+        args.diagramas, args.limite_nos
+    )
+    # As renderizações rodam em segundo plano enquanto os próximos arquivos são analisados
+    agendador = AgendadorRenderizacao(args.renderizacoes, args.formato)
+    for resultado in resultados:
+        total += 1
+        for caminho_dot in resultado['diagramas']:
+            agendador.agendar_dot(caminho_dot, remover_dot=True)
+        acertos += resultado['cache'] == 'acerto'
+        falhas += resultado['cache'] == 'falha'
+        if resultado['status'] == 'ok':
+            diagnosticos = contar_diagnosticos(resultado)
+            com_problemas += bool(diagnosticos)
+            print(f"✅ {resultado['arquivo']}: {resultado['tokens']} tokens, {diagnosticos} diagnósticos")
+        elif resultado['status'] == 'erro_sintaxe':
+            com_problemas += 1
+            erro = resultado['erro_sintaxe']
+            print(f"❌ {resultado['arquivo']}: erro de sintaxe na linha {erro['linha']}: {erro['mensagem']}")
+        else:
+            com_problemas += 1
+            print(f"⚠️ {resultado['arquivo']}: {resultado['mensagem']}")
+    agendador.fechar()
+    duracao = time.perf_counter() - inicio
+    print(f"\n{total} arquivos analisados em {duracao:.2f}s ({com_problemas} com problemas)")
+    if args.cache:
+        print(f"Cache: {acertos} acertos, {falhas} falhas")
+    if args.diagramas:
+        print(f"Diagramas: {agendador.renderizados} renderizados, {agendador.pulados} inalterados")
+
+
+if __name__ == "__main__":
+    main()
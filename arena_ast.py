@@ -0,0 +1,487 @@
+import ast
+from array import array
+
+from tabela_simbolos import NOMES_EMBUTIDOS, NOMES_IMPLICITOS_CLASSE, NOMES_IMPLICITOS_MODULO
+from tabela_tokens import Interning
+
+# Código de cada classe de nó e de cada nome de campo (na ordem alfabética, estável entre execuções)
+TIPOS = sorted((c for c in vars(ast).values() if isinstance(c, type) and issubclass(c, ast.AST)),
+               key=lambda c: c.__name__)
+CODIGO_TIPO = {c: i for i, c in enumerate(TIPOS)}
+CAMPOS = sorted({campo for c in TIPOS for campo in c._fields})
+CODIGO_CAMPO = {campo: i for i, campo in enumerate(CAMPOS)}
+
+# O contexto (Load/Store/Del) vira uma coluna em vez de um nó filho
+SEM_CONTEXTO, LOAD, STORE, DEL = 0, 1, 2, 3
+_CONTEXTOS = {ast.Load: LOAD, ast.Store: STORE, ast.Del: DEL}
+
+_COMPREENSOES = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+
+def _codigo(tipo):
+    return CODIGO_TIPO[getattr(ast, tipo) if isinstance(tipo, str) else tipo]
+
+
+class ArenaAST:
+    """
+    AST de um módulo achatada em colunas paralelas (struct-of-arrays), com os nós em pré-ordem
+    (a mesma ordem do MotorSemantico); o nó 0 é o Module. Por nó: código do tipo, campo do pai
+    em que ele está, contexto, pai, primeiro filho, próximo irmão, fim da subárvore (os
+    descendentes de i são i+1..fim[i]-1), linha, coluna e identificador (Name.id, nomes de
+    funções, classes, parâmetros, atributos e imports) como código em uma tabela de textos.
+    Os nós Load/Store/Del não entram: viram a coluna de contexto.
+    As consultas vetorizadas usam NumPy, importado só quando a primeira delas é feita.
+    """
+
+    def __init__(self):
+        self.tipos = array('B')
+        self.campos = array('B')
+        self.contextos = array('B')
+        self.pais = array('i')
+        self.primeiros_filhos = array('i')
+        self.proximos_irmaos = array('i')
+        self.fins = array('i')
+        self.linhas = array('i')
+        self.colunas = array('i')
+        self.nomes = array('i')
+        self.textos = Interning()
+        # Global e Nonlocal ligam vários nomes: nó -> tupla de códigos
+        self.nomes_multiplos = {}
+        self._numpy = None
+
+    @classmethod
+    def de_arvore(cls, tree):
+        arena = cls()
+        arena._adicionar(tree)
+        return arena
+
+    def _adicionar(self, tree):
+        tipos, campos, contextos = self.tipos, self.campos, self.contextos
+        pais, primeiros, proximos = self.pais, self.primeiros_filhos, self.proximos_irmaos
+        linhas, colunas, nomes = self.linhas, self.colunas, self.nomes
+        codigo_texto = self.textos.codigo
+        codigo_tipo = CODIGO_TIPO
+        codigo_campo = CODIGO_CAMPO
+        ultimos_filhos = []
+        pilha = [(tree, -1, 0)]
+        while pilha:
+            no, pai, campo = pilha.pop()
+            i = len(tipos)
+            tipos.append(codigo_tipo[type(no)])
+            campos.append(campo)
+            pais.append(pai)
+            primeiros.append(-1)
+            proximos.append(-1)
+            ultimos_filhos.append(-1)
+            linhas.append(getattr(no, 'lineno', -1))
+            colunas.append(getattr(no, 'col_offset', -1))
+            if pai >= 0:
+                anterior = ultimos_filhos[pai]
+                if anterior < 0:
+                    primeiros[pai] = i
+                else:
+                    proximos[anterior] = i
+                ultimos_filhos[pai] = i
+
+            contexto = SEM_CONTEXTO
+            nome = _identificador(no)
+            if isinstance(nome, tuple):
+                self.nomes_multiplos[i] = tuple(codigo_texto(n) for n in nome)
+                nome = None
+            nomes.append(-1 if nome is None else codigo_texto(nome))
+
+            filhos = []
+            for nome_campo, valor in ast.iter_fields(no):
+                if isinstance(valor, list):
+                    codigo = codigo_campo[nome_campo]
+                    filhos.extend((item, i, codigo) for item in valor if isinstance(item, ast.AST))
+                elif isinstance(valor, ast.AST):
+                    if nome_campo == 'ctx':
+                        contexto = _CONTEXTOS[type(valor)]
+                    else:
+                        filhos.append((valor, i, codigo_campo[nome_campo]))
+            contextos.append(contexto)
+            filhos.reverse()
+            pilha.extend(filhos)
+
+        # Fim da subárvore: na pré-ordem, o maior fim entre os filhos
+        fins = array('i', range(1, len(tipos) + 1))
+        for i in range(len(tipos) - 1, 0, -1):
+            pai = pais[i]
+            if fins[i] > fins[pai]:
+                fins[pai] = fins[i]
+        self.fins = fins
+
+    def __len__(self):
+        return len(self.tipos)
+
+    # -- navegação -----------------------------------------------------------------
+
+    def tipo(self, i):
+        """Classe do nó i"""
+        return TIPOS[self.tipos[i]]
+
+    def nome(self, i):
+        """Identificador do nó i, ou None"""
+        codigo = self.nomes[i]
+        return None if codigo < 0 else self.textos.textos[codigo]
+
+    def filhos(self, i):
+        filho = self.primeiros_filhos[i]
+        proximos = self.proximos_irmaos
+        while filho >= 0:
+            yield filho
+            filho = proximos[filho]
+
+    def filhos_por_campo(self, i):
+        """Filhos do nó i agrupados pelo nome do campo, na ordem dos campos"""
+        grupos = {}
+        for filho in self.filhos(i):
+            grupos.setdefault(CAMPOS[self.campos[filho]], []).append(filho)
+        return grupos
+
+    # -- consultas vetorizadas (NumPy) ---------------------------------------------------
+
+    def np(self):
+        """Visões NumPy das colunas, sem cópia (montadas uma vez)"""
+        if self._numpy is None:
+            import numpy as np
+
+            self._numpy = {
+                'tipos': np.frombuffer(self.tipos, dtype=np.uint8),
+                'campos': np.frombuffer(self.campos, dtype=np.uint8),
+                'contextos': np.frombuffer(self.contextos, dtype=np.uint8),
+                'pais': np.frombuffer(self.pais, dtype=np.int32),
+                'primeiros_filhos': np.frombuffer(self.primeiros_filhos, dtype=np.int32),
+                'fins': np.frombuffer(self.fins, dtype=np.int32),
+                'linhas': np.frombuffer(self.linhas, dtype=np.int32),
+                'nomes': np.frombuffer(self.nomes, dtype=np.int32),
+            }
+        return self._numpy
+
+    def mascara(self, *tipos, contexto=None, nome=None, dentro_de=None):
+        """
+        Máscara booleana dos nós de um dos tipos (classes ou nomes, ex.: 'Name'), opcionalmente
+        com o contexto, o identificador e dentro da subárvore do nó dentro_de
+        """
+        import numpy as np
+
+        colunas = self.np()
+        mascara = np.isin(colunas['tipos'], [_codigo(t) for t in tipos])
+        if contexto is not None:
+            mascara &= colunas['contextos'] == contexto
+        if nome is not None:
+            codigo = self.textos.codigos.get(nome)
+            if codigo is None:
+                return np.zeros(len(self), dtype=bool)
+            mascara &= colunas['nomes'] == codigo
+        if dentro_de is not None:
+            mascara[:dentro_de + 1] = False
+            mascara[self.fins[dentro_de]:] = False
+        return mascara
+
+    def indices(self, mascara):
+        import numpy as np
+
+        return np.flatnonzero(mascara)
+
+    def funcao(self, nome):
+        """Índice da primeira definição de função com esse nome (ou None)"""
+        indices = self.indices(self.mascara(ast.FunctionDef, ast.AsyncFunctionDef, nome=nome))
+        return int(indices[0]) if len(indices) else None
+
+    def nomes_lidos(self, funcao=None):
+        """Índices dos Name lidos (Load), no módulo todo ou dentro da função (nome ou índice)"""
+        if isinstance(funcao, str):
+            funcao = self.funcao(funcao)
+            if funcao is None:
+                return self.indices(self.mascara())
+        return self.indices(self.mascara(ast.Name, contexto=LOAD, dentro_de=funcao))
+
+    def chamadas_a(self, nome):
+        """Índices das chamadas nome(...) diretas (Call cujo func é um Name com esse nome)"""
+        colunas = self.np()
+        chamadas = self.indices(self.mascara(ast.Call))
+        # func é o primeiro campo de Call, portanto o primeiro filho
+        funcs = colunas['primeiros_filhos'][chamadas]
+        codigo = self.textos.codigos.get(nome, -2)
+        alvo = (colunas['tipos'][funcs] == CODIGO_TIPO[ast.Name]) & (colunas['nomes'][funcs] == codigo)
+        return chamadas[alvo]
+
+    def textos_de(self, indices):
+        """Identificadores dos nós, na ordem dos índices"""
+        textos = self.textos.textos
+        nomes = self.nomes
+        return [textos[nomes[i]] if nomes[i] >= 0 else None for i in indices]
+
+
+def _identificador(no):
+    if isinstance(no, ast.Name):
+        return no.id
+    if isinstance(no, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return no.name
+    if isinstance(no, ast.arg):
+        return no.arg
+    if isinstance(no, ast.Attribute):
+        return no.attr
+    if isinstance(no, ast.alias):
+        # O nome que o import liga no escopo (None para "from x import *")
+        if no.name == '*':
+            return None
+        return no.asname or no.name.split('.')[0]
+    if isinstance(no, ast.keyword):
+        return no.arg
+    if isinstance(no, (ast.ExceptHandler, ast.MatchAs, ast.MatchStar)):
+        return no.name
+    if isinstance(no, ast.MatchMapping):
+        return no.rest
+    if isinstance(no, (ast.Global, ast.Nonlocal)):
+        return tuple(no.names)
+    return None
+
+
+def construir_arena(codigo_fonte):
+    """ArenaAST a partir do código-fonte ou de uma AST já pronta (por exemplo a de gerar_ast)"""
+    tree = ast.parse(codigo_fonte) if isinstance(codigo_fonte, str) else codigo_fonte
+    return ArenaAST.de_arvore(tree)
+
+
+# -- regras semânticas sobre a arena ----------------------------------------------------
+
+class _Escopos:
+    """
+    Escopos e resolução de nomes sobre a arena, com as mesmas regras de construir_tabela_simbolos:
+    escopos identificados pelo índice do nó dono e símbolos por (escopo, código do nome).
+    """
+
+    def __init__(self, arena):
+        self.arena = arena
+        # escopo -> (tipo, nome, escopo pai)
+        self.escopos = {0: ('modulo', '<módulo>', None)}
+        self.globais = {}
+        self.nao_locais = {}
+        # (escopo, nome) -> [definições, atribuições simples, usos]
+        self.simbolos = {}
+        self.leituras = []
+        self.resolucoes = []
+        textos = arena.textos.codigos
+        self._embutidos = {codigo for texto, codigo in textos.items()
+                           if texto in NOMES_EMBUTIDOS or texto in NOMES_IMPLICITOS_MODULO}
+        self._implicitos_classe = {textos[t] for t in NOMES_IMPLICITOS_CLASSE if t in textos}
+        self._classe = textos.get('__class__', -2)
+        self._cache = {}
+        self._percorrer()
+        self._resolver()
+
+    def _percorrer(self):
+        arena = self.arena
+        tipos, nomes, contextos = arena.tipos, arena.nomes, arena.contextos
+        por_campo = arena.filhos_por_campo
+        escopos = self.escopos
+        ligacoes = []
+        leituras = self.leituras
+        c = CODIGO_TIPO
+        funcoes = {c[ast.FunctionDef], c[ast.AsyncFunctionDef]}
+        classe, lambda_, argumentos = c[ast.ClassDef], c[ast.Lambda], c[ast.arguments]
+        compreensoes = {c[t] for t in _COMPREENSOES}
+        name, assign, named_expr = c[ast.Name], c[ast.Assign], c[ast.NamedExpr]
+        imports = {c[ast.Import], c[ast.ImportFrom]}
+        ligam_nome = {c[ast.ExceptHandler], c[ast.MatchAs], c[ast.MatchStar], c[ast.MatchMapping]}
+        global_, nonlocal_ = c[ast.Global], c[ast.Nonlocal]
+
+        pilha = [(0, 0)]
+        while pilha:
+            i, escopo = pilha.pop()
+            tipo = tipos[i]
+            if tipo in funcoes or tipo == classe:
+                ligacoes.append((escopo, nomes[i], False))
+                escopos[i] = ('classe' if tipo == classe else 'funcao', arena.nome(i), escopo)
+                grupos = por_campo(i)
+                filhos = [(n, escopo) for n in grupos.get('decorator_list', ())]
+                if tipo == classe:
+                    filhos.extend((n, escopo) for n in grupos.get('bases', ()))
+                    filhos.extend((n, escopo) for n in grupos.get('keywords', ()))
+                else:
+                    filhos.extend((n, i) for n in grupos['args'])
+                    filhos.extend((n, escopo) for n in grupos.get('returns', ()))
+                filhos.extend((n, i) for n in grupos['body'])
+            elif tipo == lambda_:
+                escopos[i] = ('funcao', '<lambda>', escopo)
+                filhos = [(n, i) for n in arena.filhos(i)]
+            elif tipo == argumentos:
+                grupos = por_campo(i)
+                externo = escopos[escopo][2]
+                filhos = []
+                for campo in ('posonlyargs', 'args', 'kwonlyargs', 'vararg', 'kwarg'):
+                    for a in grupos.get(campo, ()):
+                        ligacoes.append((escopo, nomes[a], False))
+                        filhos.extend((n, externo) for n in arena.filhos(a))
+                filhos.extend((n, externo) for n in grupos.get('defaults', ()))
+                filhos.extend((n, externo) for n in grupos.get('kw_defaults', ()))
+            elif tipo in compreensoes:
+                nome_tipo = TIPOS[tipo].__name__.lower()
+                escopos[i] = ('compreensao', f'<{nome_tipo}>', escopo)
+                grupos = por_campo(i)
+                primeiro, *outros = grupos['generators']
+                do_primeiro = por_campo(primeiro)
+                filhos = [(do_primeiro['iter'][0], escopo), (do_primeiro['target'][0], i)]
+                filhos.extend((n, i) for n in do_primeiro.get('ifs', ()))
+                filhos.extend((n, i) for n in outros)
+                for campo in ('key', 'value', 'elt'):
+                    filhos.extend((n, i) for n in grupos.get(campo, ()))
+            else:
+                if tipo == name:
+                    if contextos[i] == LOAD:
+                        leituras.append((i, escopo))
+                    else:
+                        ligacoes.append((escopo, nomes[i], False))
+                elif tipo == assign:
+                    for alvo in por_campo(i)['targets']:
+                        if tipos[alvo] == name:
+                            ligacoes.append((escopo, nomes[alvo], True))
+                elif tipo == named_expr:
+                    # O alvo de ":=" em uma compreensão pertence ao escopo que a contém
+                    destino = escopo
+                    while escopos[destino][0] == 'compreensao':
+                        destino = escopos[destino][2]
+                    grupos = por_campo(i)
+                    ligacoes.append((destino, nomes[grupos['target'][0]], False))
+                    pilha.append((grupos['value'][0], escopo))
+                    continue
+                elif tipo in imports:
+                    ligacoes.extend((escopo, nomes[a], False) for a in arena.filhos(i) if nomes[a] >= 0)
+                elif tipo in ligam_nome and nomes[i] >= 0:
+                    ligacoes.append((escopo, nomes[i], False))
+                elif tipo == global_:
+                    self.globais.setdefault(escopo, set()).update(arena.nomes_multiplos[i])
+                elif tipo == nonlocal_:
+                    self.nao_locais.setdefault(escopo, set()).update(arena.nomes_multiplos[i])
+                filhos = [(n, escopo) for n in arena.filhos(i)]
+            filhos.reverse()
+            pilha.extend(filhos)
+
+        # Mesma ordem de distribuição da tabela de símbolos: as ligações nonlocal por último
+        vazio = frozenset()
+        ligacoes.sort(key=lambda ligacao: ligacao[1] in self.nao_locais.get(ligacao[0], vazio))
+        simbolos = self.simbolos
+        for escopo, nome, atribuicao in ligacoes:
+            simbolo = simbolos.setdefault((self._escopo_da_ligacao(escopo, nome), nome), [0, 0, 0])
+            simbolo[0] += 1
+            if atribuicao:
+                simbolo[1] += 1
+
+    def _escopo_da_ligacao(self, escopo, nome):
+        if nome in self.globais.get(escopo, ()):
+            return 0
+        if nome in self.nao_locais.get(escopo, ()):
+            atual = self.escopos[escopo][2]
+            while atual is not None:
+                if (self.escopos[atual][0] == 'funcao' and (atual, nome) in self.simbolos
+                        and nome not in self.nao_locais.get(atual, ())):
+                    return atual
+                atual = self.escopos[atual][2]
+        return escopo
+
+    def _resolver(self):
+        nomes = self.arena.nomes
+        cache = self._cache
+        for i, escopo in self.leituras:
+            chave = (escopo, nomes[i])
+            if chave in cache:
+                resultado = cache[chave]
+            else:
+                resultado = cache[chave] = self._buscar(nomes[i], escopo)
+            self.resolucoes.append(resultado)
+            if isinstance(resultado, tuple):
+                self.simbolos[resultado][2] += 1
+
+    def _buscar(self, nome, escopo):
+        escopos, simbolos = self.escopos, self.simbolos
+        if nome in self.globais.get(escopo, ()):
+            return self._buscar_global(nome)
+        if (escopo, nome) in simbolos and nome not in self.nao_locais.get(escopo, ()):
+            return (escopo, nome)
+        if escopos[escopo][0] == 'classe' and nome in self._implicitos_classe:
+            return 'embutido'
+        atual = escopos[escopo][2]
+        while atual is not None and escopos[atual][0] != 'modulo':
+            if escopos[atual][0] != 'classe':
+                if nome in self.globais.get(atual, ()):
+                    return self._buscar_global(nome)
+                if (atual, nome) in simbolos and nome not in self.nao_locais.get(atual, ()):
+                    return (atual, nome)
+            elif nome == self._classe:
+                return 'embutido'
+            atual = escopos[atual][2]
+        return self._buscar_global(nome)
+
+    def _buscar_global(self, nome):
+        if (0, nome) in self.simbolos:
+            return (0, nome)
+        if nome in self._embutidos:
+            return 'embutido'
+        return None
+
+    def funcao_envolvente(self, escopo):
+        while escopo is not None and self.escopos[escopo][0] != 'funcao':
+            escopo = self.escopos[escopo][2]
+        return escopo
+
+
+def analisar_arena(arena):
+    """
+    As regras semânticas que dependem só da estrutura e dos escopos, sobre a arena, com os mesmos
+    resultados de analisar_arvore: variáveis não utilizadas, funções não chamadas, escopo e
+    fluxo de controle. Tipos, atribuições mortas e uso antes da definição precisam da inferência
+    e do grafo de fluxo, que continuam sobre a AST.
+    """
+    colunas = arena.np()
+    textos = arena.textos.textos
+    escopos = _Escopos(arena)
+
+    nao_usadas = {textos[nome] for (_, nome), (_, atribuicoes, usos) in escopos.simbolos.items()
+                  if atribuicoes and not usos}
+
+    definidas = set(arena.textos_de(arena.indices(arena.mascara(ast.FunctionDef))))
+    chamadas = arena.indices(arena.mascara(ast.Call))
+    funcs = colunas['primeiros_filhos'][chamadas]
+    funcs = funcs[colunas['tipos'][funcs] == CODIGO_TIPO[ast.Name]]
+    chamadas_nomes = set(arena.textos_de(funcs))
+
+    fora_de_escopo = []
+    for (i, escopo), resultado in zip(escopos.leituras, escopos.resolucoes):
+        if resultado is None:
+            funcao = escopos.funcao_envolvente(escopo)
+            if funcao is not None:
+                fora_de_escopo.append(f"Variável '{textos[arena.nomes[i]]}' usada fora do escopo "
+                                      f"na função '{escopos.escopos[funcao][1]}' (linha {arena.linhas[i]})")
+
+    # Blocos sem nenhum filho no campo body (só acontecem em árvores montadas à mão)
+    avisos = []
+    corpo = CODIGO_CAMPO['body']
+    blocos = arena.indices(arena.mascara(ast.If, ast.While, ast.For))
+    com_corpo = set(colunas['pais'][colunas['campos'] == corpo].tolist())
+    for i in blocos.tolist():
+        if i not in com_corpo:
+            avisos.append(f"Bloco {arena.tipo(i).__name__.lower()} vazio na linha {arena.linhas[i]}")
+
+    return {
+        'variaveis_nao_utilizadas': nao_usadas,
+        'funcoes_nao_chamadas': definidas - chamadas_nomes,
+        'escopo': fora_de_escopo,
+        'fluxo_de_controle': avisos,
+    }
+
+
+# Exemplo de uso:
+if __name__ == "__main__":
+    with open("main.py", "r", encoding="utf-8") as f:
+        arena = construir_arena(f.read())
+
+    print(f"{len(arena)} nós, {len(arena.textos.textos)} identificadores distintos")
+    for i in arena.chamadas_a('input'):
+        print(f"input() na linha {arena.linhas[i]}")
+    for funcao in ('calcular_juros_simples', 'calcular_juros_compostos'):
+        print(f"{funcao} lê {sorted(set(arena.textos_de(arena.nomes_lidos(funcao))))}")
+    for regra, resultado in analisar_arena(arena).items():
+        print(f"{regra}: {resultado}")
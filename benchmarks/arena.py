@@ -0,0 +1,77 @@
+import ast
+import time
+import tracemalloc
+
+from arena_ast import analisar_arena, construir_arena
+from semantic_analysis import (
+    MotorSemantico, RegraEscopo, RegraFluxoDeControle, RegraFuncoesNaoChamadas, RegraVariaveisNaoUtilizadas,
+)
+from benchmarks.comum import gerar_fonte_grande, medir
+
+REGRAS_ARENA = [RegraVariaveisNaoUtilizadas, RegraFuncoesNaoChamadas, RegraEscopo, RegraFluxoDeControle]
+
+
+def _memoria_retida(construir):
+    """Memória que continua alocada depois de construir a estrutura (em bytes)"""
+    tracemalloc.start()
+    try:
+        estrutura = construir()
+        return estrutura, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def nomes_lidos_ast(tree, funcao):
+    for no in ast.walk(tree):
+        if isinstance(no, ast.FunctionDef) and no.name == funcao:
+            return [n for n in ast.walk(no) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Load)]
+    return []
+
+
+def chamadas_ast(tree, nome):
+    return [n for n in ast.walk(tree)
+            if isinstance(n, ast.Call) and isinstance(n.func, ast.Name) and n.func.id == nome]
+
+
+def regras_ast(tree):
+    return MotorSemantico([regra() for regra in REGRAS_ARENA]).executar(tree)
+
+
+if __name__ == "__main__":
+    print(f"{'Cópias':>7} {'Nós':>8} {'AST (MB)':>9} {'Arena (MB)':>11} {'Redução':>8}")
+    for copias in (10, 50, 200):
+        codigo = gerar_fonte_grande(copias)
+        tree, memoria_ast = _memoria_retida(lambda: ast.parse(codigo))
+        arena, memoria_arena = _memoria_retida(lambda: construir_arena(tree))
+        print(f"{copias:>7} {len(arena):>8} {memoria_ast / 1e6:>9.2f} {memoria_arena / 1e6:>11.2f}"
+              f" {memoria_ast / memoria_arena:>7.1f}x")
+
+    codigo = gerar_fonte_grande(200)
+    tree = ast.parse(codigo)
+    arena = construir_arena(tree)
+    arena.np()
+    funcao = 'calcular_juros_compostos_199'
+
+    if len(arena.nomes_lidos(funcao)) != len(nomes_lidos_ast(tree, funcao)):
+        raise SystemExit("❌ nomes_lidos diverge de ast.walk")
+    if len(arena.chamadas_a('input')) != len(chamadas_ast(tree, 'input')):
+        raise SystemExit("❌ chamadas_a diverge de ast.walk")
+    if analisar_arena(arena) != regras_ast(tree):
+        raise SystemExit("❌ analisar_arena diverge de MotorSemantico")
+
+    print(f"\nConsultas sobre main.py repetido 200 vezes ({len(arena)} nós)")
+    print(f"{'Consulta':<50} {'ast (ms)':>9} {'Arena (ms)':>11} {'Aceleração':>11}")
+    casos = [
+        (f"Name lidos em {funcao}", lambda: nomes_lidos_ast(tree, funcao), lambda: arena.nomes_lidos(funcao)),
+        ("Chamadas a input", lambda: chamadas_ast(tree, 'input'), lambda: arena.chamadas_a('input')),
+        ("Regras (não usadas, não chamadas, escopo, fluxo)", lambda: regras_ast(tree), lambda: analisar_arena(arena)),
+    ]
+    for rotulo, com_ast, com_arena in casos:
+        tempo_ast = medir(com_ast)
+        tempo_arena = medir(com_arena)
+        print(f"{rotulo:<50} {tempo_ast * 1000:>9.2f} {tempo_arena * 1000:>11.2f} {tempo_ast / tempo_arena:>10.1f}x")
+
+    inicio = time.perf_counter()
+    construir_arena(tree)
+    print(f"\nConversão AST -> arena: {(time.perf_counter() - inicio) * 1000:.1f} ms "
+          f"(ast.parse: {medir(ast.parse, codigo) * 1000:.1f} ms)")
@@ -0,0 +1,31 @@
+import os
+import tempfile
+import time
+
+from analise_projeto import analisar_projeto
+from cache_analise import CacheAnalise
+from benchmarks.comum import gerar_fonte_grande
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as pasta:
+        fontes = os.path.join(pasta, "fontes")
+        diretorio_cache = os.path.join(pasta, "cache")
+        os.makedirs(fontes)
+        for i in range(200):
+            with open(os.path.join(fontes, f"modulo_{i:04d}.py"), "w", encoding="utf-8") as f:
+                f.write(gerar_fonte_grande(5).replace("Calculadora", f"Calculadora {i}"))
+
+        print(f"{'Execução':<10} {'Tempo (s)':>10} {'Acertos':>8} {'Falhas':>7}")
+        tempos = {}
+        for rotulo in ("fria", "quente"):
+            inicio = time.perf_counter()
+            resultados = list(analisar_projeto([fontes], trabalhadores=1, diretorio_cache=diretorio_cache))
+            tempos[rotulo] = time.perf_counter() - inicio
+            acertos = sum(r['cache'] == 'acerto' for r in resultados)
+            falhas = sum(r['cache'] == 'falha' for r in resultados)
+            print(f"{rotulo:<10} {tempos[rotulo]:>10.3f} {acertos:>8} {falhas:>7}")
+
+        estatisticas = CacheAnalise(diretorio_cache).estatisticas()
+        print(f"\nExecução quente: {tempos['quente'] / tempos['fria']:.1%} do tempo da fria")
+        print(f"Cache: {estatisticas['entradas']} entradas, {estatisticas['bytes'] / 1e6:.2f} MB")
@@ -0,0 +1,32 @@
+import os
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def ler_exemplo():
+    """Lê o programa de exemplo (main.py) usado como base das entradas sintéticas"""
+    with open(os.path.join(RAIZ, "main.py"), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def gerar_fonte_grande(repeticoes):
+    """Gera um módulo grande repetindo main.py com funções renomeadas a cada cópia"""
+    base = ler_exemplo()
+    partes = []
+    for i in range(repeticoes):
+        partes.append(
+            base.replace("calcular_juros_simples", f"calcular_juros_simples_{i}")
+                .replace("calcular_juros_compostos", f"calcular_juros_compostos_{i}")
+        )
+    return "\n".join(partes)
+
+
+def medir(funcao, *args, repeticoes=3):
+    """Executa a função algumas vezes e retorna o menor tempo em segundos"""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
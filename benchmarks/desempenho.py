@@ -0,0 +1,19 @@
+import ast
+
+from analise_desempenho import MICROBENCHMARKS, analisar_desempenho, medir_microbenchmark
+from semantic_analysis import analisar_arvore
+from benchmarks.comum import gerar_fonte_grande, medir
+from benchmarks.gerador_corpus import gerar_corpus
+
+if __name__ == "__main__":
+    print(f"{'Microbenchmark':<26} {'Lento (µs)':>11} {'Rápido (µs)':>12} {'Razão':>7}")
+    for nome in MICROBENCHMARKS:
+        tempos = medir_microbenchmark(nome)
+        print(f"{nome:<26} {tempos['lento'] * 1e6:>11.2f} {tempos['rapido'] * 1e6:>12.2f} {tempos['razao']:>6.1f}x")
+
+    print(f"\n{'Entrada':<28} {'Achados':>8} {'Regra (ms)':>11} {'Regras padrão (ms)':>19}")
+    for rotulo, codigo in (("main.py x 200", gerar_fonte_grande(200)), ("corpus sintético, 5000 linhas", gerar_corpus(linhas=5000))):
+        tree = ast.parse(codigo)
+        achados = analisar_desempenho(tree)
+        print(f"{rotulo:<28} {len(achados):>8} {medir(analisar_desempenho, tree) * 1000:>11.1f}"
+              f" {medir(analisar_arvore, tree) * 1000:>19.1f}")
@@ -0,0 +1,28 @@
+import os
+import tempfile
+import time
+
+from analise_projeto import analisar_projeto
+from benchmarks.comum import gerar_fonte_grande
+
+
+def _criar_corpus(pasta, arquivos, repeticoes):
+    codigo = gerar_fonte_grande(repeticoes)
+    for i in range(arquivos):
+        with open(os.path.join(pasta, f"modulo_{i:05d}.py"), "w", encoding="utf-8") as f:
+            f.write(codigo)
+
+
+if __name__ == "__main__":
+    cpus = os.cpu_count() or 1
+    contagens = sorted({1, 2, 4, 8, cpus})
+    with tempfile.TemporaryDirectory() as pasta:
+        _criar_corpus(pasta, arquivos=400, repeticoes=5)
+        print(f"{'Processos':>10} {'Tempo (s)':>10} {'Arquivos/s':>11} {'Aceleração':>11}")
+        base = None
+        for trabalhadores in contagens:
+            inicio = time.perf_counter()
+            resultados = list(analisar_projeto([pasta], trabalhadores=trabalhadores, tamanho_lote=8))
+            duracao = time.perf_counter() - inicio
+            base = base or duracao
+            print(f"{trabalhadores:>10} {duracao:>10.2f} {len(resultados) / duracao:>11.1f} {base / duracao:>10.2f}x")
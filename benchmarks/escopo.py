@@ -0,0 +1,51 @@
+import ast
+
+from semantic_analysis import analisar_escopo, analisar_variaveis_nao_utilizadas
+from tabela_simbolos import construir_tabela_simbolos
+from benchmarks.comum import medir
+
+
+def analisar_escopo_anterior(tree):
+    """Versão anterior: ast.walk por função (funções aninhadas são percorridas de novo) e dir() por nome"""
+    erros = []
+
+    class EscopoVisitor(ast.NodeVisitor):
+        def visit_FunctionDef(self, node):
+            local_escopo = set(arg.arg for arg in node.args.args)
+            for n in ast.walk(node):
+                if isinstance(n, ast.Assign):
+                    for target in n.targets:
+                        if isinstance(target, ast.Name):
+                            local_escopo.add(target.id)
+                if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Load):
+                    if n.id not in local_escopo and n.id not in dir(__builtins__):
+                        erros.append(f"Variável '{n.id}' usada fora do escopo na função '{node.name}' (linha {n.lineno})")
+            self.generic_visit(node)
+
+    EscopoVisitor().visit(tree)
+    return erros
+
+
+def gerar_funcoes_aninhadas(quantidade, profundidade):
+    """Módulo com várias cadeias de funções aninhadas que leem variáveis das funções externas"""
+    linhas = []
+    for i in range(quantidade):
+        for nivel in range(profundidade):
+            recuo = "    " * nivel
+            linhas.append(f"{recuo}def f{i}_{nivel}(a{nivel}):")
+            linhas.append(f"{recuo}    v{nivel} = a{nivel} + {nivel}")
+            linhas.append(f"{recuo}    print(v{nivel}, a0)")
+        linhas.append("    " * profundidade + "return v0")
+    return "\n".join(linhas) + "\n"
+
+
+if __name__ == "__main__":
+    print(f"{'Funções':>8} {'Profundidade':>13} {'Anterior (s)':>13} {'Tabela de símbolos (s)':>23}")
+    for quantidade, profundidade in ((50, 5), (50, 20), (20, 60)):
+        tree = ast.parse(gerar_funcoes_aninhadas(quantidade, profundidade))
+        t_antigo = medir(analisar_escopo_anterior, tree, repeticoes=1)
+        t_novo = medir(lambda t: (analisar_escopo(t), analisar_variaveis_nao_utilizadas(t)), tree)
+        print(f"{quantidade:>8} {profundidade:>13} {t_antigo:>13.3f} {t_novo:>23.3f}")
+
+    tabela = construir_tabela_simbolos(tree)
+    print(f"\n{len(tabela.escopos)} escopos, {len(tabela.leituras)} leituras resolvidas")
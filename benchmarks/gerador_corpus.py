@@ -0,0 +1,183 @@
+import argparse
+import random
+
+# Palavras usadas nos textos gerados, no estilo das mensagens de main.py
+_PALAVRAS = [
+    "capital", "taxa", "tempo", "juros", "montante", "valor", "opção", "digite", "insira",
+    "simples", "compostos", "meses", "resultado", "parcela", "saldo", "total",
+]
+_OPERADORES = ["+", "-", "*", "/"]
+_COMPARACOES = ["<", ">", "<=", ">=", "==", "!="]
+_FORMATOS = ["", ":.2f", ":>10", ":.1%"]
+# O compilador do Python aceita no máximo 20 blocos de laço/try aninhados; ifs não entram na conta
+_MAX_BLOCOS = 18
+# O tokenizador limita a indentação a 100 níveis
+_MAX_PROFUNDIDADE = 90
+
+
+class GeradorCorpus:
+    """
+    Gera módulos Python sintéticos, determinísticos para uma mesma semente, com as construções de main.py:
+    funções aritméticas que retornam tuplas, laços while True com try/except, if/elif/else,
+    print de strings e f-strings, input convertido com int/float e raise ValueError.
+    """
+
+    def __init__(self, semente=0, funcoes=10, profundidade=3, instrucoes_por_bloco=4,
+                 densidade_strings=0.3, densidade_fstrings=0.2):
+        if not 1 <= profundidade <= _MAX_PROFUNDIDADE:
+            raise ValueError(f"profundidade deve estar entre 1 e {_MAX_PROFUNDIDADE}")
+        self.rng = random.Random(semente)
+        self.funcoes = funcoes
+        self.profundidade = profundidade
+        self.instrucoes_por_bloco = instrucoes_por_bloco
+        self.densidade_strings = densidade_strings
+        self.densidade_fstrings = densidade_fstrings
+        self._contador = 0
+        self._definidas = []
+
+    def _nome(self, prefixo):
+        self._contador += 1
+        return f"{prefixo}_{self._contador}"
+
+    def _texto(self, minimo=1, maximo=5):
+        return " ".join(self.rng.choice(_PALAVRAS) for _ in range(self.rng.randint(minimo, maximo)))
+
+    def _string(self, variaveis):
+        if variaveis and self.rng.random() < self.densidade_fstrings:
+            variavel = self.rng.choice(variaveis)
+            formato = self.rng.choice(_FORMATOS)
+            return f'f"\\n{self._texto().capitalize()}: R$ {{{variavel}{formato}}}"'
+        return f'"{self._texto().capitalize()}"'
+
+    def _expressao(self, variaveis, nivel=0):
+        escolha = self.rng.random()
+        if nivel >= 2 or escolha < 0.3:
+            if variaveis and self.rng.random() < 0.6:
+                return self.rng.choice(variaveis)
+            return str(self.rng.choice([1, 2, 100, self.rng.randint(0, 999), round(self.rng.uniform(0, 10), 2)]))
+        if escolha < 0.85:
+            operador = self.rng.choice(_OPERADORES)
+            return f"{self._expressao(variaveis, nivel + 1)} {operador} {self._expressao(variaveis, nivel + 1)}"
+        if escolha < 0.95:
+            return f"({self._expressao(variaveis, nivel + 1)}) ** {self.rng.randint(1, 3)}"
+        return f"(1 + {self._expressao(variaveis, nivel + 1)} / 100)"
+
+    def _condicao(self, variaveis):
+        if not variaveis or self.rng.random() < 0.2:
+            return "True"
+        variavel = self.rng.choice(variaveis)
+        if self.rng.random() < 0.2:
+            return f"{variavel} not in [1, 2]"
+        partes = [
+            f"{self.rng.choice(variaveis)} {self.rng.choice(_COMPARACOES)} {self.rng.randint(0, 100)}"
+            for _ in range(self.rng.randint(1, 3))
+        ]
+        return f" {self.rng.choice(['or', 'and'])} ".join(partes)
+
+    def _bloco(self, indentacao, variaveis, nivel, blocos, no_laco):
+        """Linhas de um bloco; nivel é a profundidade de aninhamento e blocos conta laços e try"""
+        linhas = []
+        variaveis = list(variaveis)
+        prefixo = "  " * indentacao
+        # No máximo uma instrução composta aninhada por bloco (e só no primeiro ramo de um if):
+        # assim o tamanho cresce linearmente com a profundidade, e não exponencialmente
+        aninhou = False
+        for _ in range(max(1, self.instrucoes_por_bloco)):
+            escolha = self.rng.random()
+            pode_aninhar = nivel < self.profundidade and not aninhou
+            if escolha < self.densidade_strings:
+                linhas.append(f"{prefixo}print({self._string(variaveis)})")
+            elif escolha < 0.55 or not pode_aninhar:
+                nova = self._nome("valor")
+                if self.rng.random() < 0.2:
+                    conversor = self.rng.choice(["int", "float"])
+                    linhas.append(f'{prefixo}{nova} = {conversor}(input("{self._texto().capitalize()}: "))')
+                elif self._definidas and self.rng.random() < 0.3:
+                    funcao, parametros = self.rng.choice(self._definidas)
+                    argumentos = ", ".join(self._expressao(variaveis, 2) for _ in range(parametros))
+                    outra = self._nome("valor")
+                    linhas.append(f"{prefixo}{nova}, {outra} = {funcao}({argumentos})")
+                    variaveis.append(outra)
+                else:
+                    linhas.append(f"{prefixo}{nova} = {self._expressao(variaveis)}")
+                variaveis.append(nova)
+            elif escolha < 0.75 or blocos >= _MAX_BLOCOS:
+                aninhou = True
+                linhas.append(f"{prefixo}if {self._condicao(variaveis)}:")
+                linhas.extend(self._bloco(indentacao + 1, variaveis, nivel + 1, blocos, no_laco))
+                if self.rng.random() < 0.5:
+                    linhas.append(f"{prefixo}elif {self._condicao(variaveis)}:")
+                    linhas.extend(self._bloco(indentacao + 1, variaveis, self.profundidade, blocos, no_laco))
+                if self.rng.random() < 0.5:
+                    linhas.append(f"{prefixo}else:")
+                    linhas.extend(self._bloco(indentacao + 1, variaveis, self.profundidade, blocos, no_laco))
+            elif escolha < 0.85:
+                aninhou = True
+                contador = self._nome("i")
+                linhas.append(f"{prefixo}for {contador} in range({self.rng.randint(1, 12)}):")
+                linhas.extend(self._bloco(indentacao + 1, variaveis + [contador], nivel + 1, blocos + 1, True))
+            else:
+                aninhou = True
+                linhas.extend(self._laco_validacao(indentacao, variaveis, nivel, blocos))
+        if no_laco and self.rng.random() < 0.1:
+            linhas.append(f"{prefixo}{self.rng.choice(['break', 'continue'])}")
+        return linhas
+
+    def _laco_validacao(self, indentacao, variaveis, nivel, blocos):
+        """while True com try/except ValueError, como os laços de leitura de main.py"""
+        prefixo = "  " * indentacao
+        linhas = [f"{prefixo}while True:", f"{prefixo}  try:"]
+        corpo = self._bloco(indentacao + 2, variaveis, nivel + 1, blocos + 2, True)
+        linhas.extend(corpo)
+        linhas.append(f"{prefixo}    if {self._condicao(variaveis)}:")
+        linhas.append(f'{prefixo}      raise ValueError("\\n{self._texto().capitalize()}.\\n")')
+        linhas.append(f"{prefixo}    break")
+        linhas.append(f"{prefixo}  except ValueError as e:")
+        linhas.append(f"{prefixo}    print(e)")
+        if self.rng.random() < 0.5:
+            linhas.append(f"{prefixo}    continue")
+        return linhas
+
+    def _funcao(self):
+        nome = self._nome("calcular")
+        parametros = [self._nome(p) for p in self.rng.sample(["capital", "taxa", "tempo", "valor"], self.rng.randint(1, 3))]
+        linhas = [f"def {nome}({', '.join(parametros)}):"]
+        corpo = self._bloco(1, parametros, 1, 0, False)
+        resultado, outro = self._nome("juros"), self._nome("montante")
+        corpo.append(f"  {resultado} = {self._expressao(parametros)}")
+        corpo.append(f"  {outro} = {self._expressao(parametros + [resultado])}")
+        corpo.append(f"  return {resultado}, {outro}")
+        self._definidas.append((nome, len(parametros)))
+        return linhas + corpo
+
+    def gerar(self, linhas_alvo=200):
+        """Módulo com as funções configuradas seguido de laços de nível superior até ter ~linhas_alvo linhas"""
+        linhas = [f'print("{self._texto().capitalize()}\\n")', ""]
+        for _ in range(self.funcoes):
+            linhas.extend(self._funcao())
+            linhas.append("")
+        while len(linhas) < linhas_alvo:
+            linhas.extend(self._laco_validacao(0, [], 1, 0))
+            linhas.append("")
+        return "\n".join(linhas) + "\n"
+
+
+def gerar_corpus(semente=0, linhas=200, **opcoes):
+    """Atalho para GeradorCorpus(semente, **opcoes).gerar(linhas)"""
+    return GeradorCorpus(semente, **opcoes).gerar(linhas)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera um módulo Python sintético para benchmarks")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--linhas", type=int, default=200, help="tamanho aproximado em linhas")
+    parser.add_argument("--funcoes", type=int, default=10)
+    parser.add_argument("--profundidade", type=int, default=3, help="aninhamento máximo de blocos")
+    parser.add_argument("--instrucoes", type=int, default=4, help="instruções por bloco")
+    parser.add_argument("--strings", type=float, default=0.3, help="fração de instruções que são print de texto")
+    parser.add_argument("--fstrings", type=float, default=0.2, help="fração dos textos que são f-strings")
+    args = parser.parse_args()
+    print(gerar_corpus(
+        args.semente, args.linhas, funcoes=args.funcoes, profundidade=args.profundidade,
+        instrucoes_por_bloco=args.instrucoes, densidade_strings=args.strings, densidade_fstrings=args.fstrings,
+    ), end="")
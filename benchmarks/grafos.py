@@ -0,0 +1,47 @@
+import ast
+import os
+import time
+import tracemalloc
+
+from exportador_dot import exportar_ast_dot
+from benchmarks.comum import gerar_fonte_grande
+
+
+def medir_exportacao(tree, **opcoes):
+    """Tempo e pico de memória de exportar_ast_dot escrevendo em /dev/null"""
+    with open(os.devnull, "w", encoding="utf-8") as f:
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        exportar_ast_dot(tree, f, **opcoes)
+        duracao = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return duracao, pico
+
+
+def arvore_profunda(profundidade):
+    """Expressão 1 + 1 + ... aninhada; montada à mão porque ast.parse recusa profundidades grandes"""
+    expressao = ast.Constant(1)
+    for _ in range(profundidade):
+        expressao = ast.BinOp(expressao, ast.Add(), ast.Constant(1))
+    return ast.Module(body=[ast.Expr(expressao)], type_ignores=[])
+
+
+if __name__ == "__main__":
+    print(f"{'Cópias':>7} {'Nós':>9} {'Tempo (s)':>10} {'µs/nó':>7} {'Pico (KB)':>10} {'B/nó':>6}")
+    for repeticoes in (10, 40, 160, 640):
+        tree = ast.parse(gerar_fonte_grande(repeticoes))
+        nos = sum(1 for _ in ast.walk(tree))
+        duracao, pico = medir_exportacao(tree)
+        print(f"{repeticoes:>7} {nos:>9} {duracao:>10.3f} {duracao / nos * 1e6:>7.2f} "
+              f"{pico / 1024:>10.1f} {pico / nos:>6.1f}")
+
+    tree = ast.parse(gerar_fonte_grande(640))
+    print("\nCom limites (640 cópias):")
+    for opcoes in ({'profundidade_maxima': 4}, {'limite_nos': 5000}):
+        duracao, pico = medir_exportacao(tree, **opcoes)
+        print(f"  {opcoes}: {duracao:.3f}s, pico {pico / 1024:.1f} KB")
+
+    profundidade = 100_000
+    duracao, pico = medir_exportacao(arvore_profunda(profundidade))
+    print(f"\nÁrvore com profundidade {profundidade}: {duracao:.3f}s, pico {pico / 1024:.1f} KB")
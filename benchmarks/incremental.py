@@ -0,0 +1,185 @@
+import argparse
+import ast
+import io
+import random
+import sys
+import time
+import tokenize
+import warnings
+
+from analise_incremental import AnaliseIncremental
+from semantic_analysis import analisar_arvore
+from benchmarks.gerador_corpus import gerar_corpus
+
+# Trechos usados nas edições aleatórias; alguns quebram a sintaxe de propósito
+TRECHOS = [
+    "", "x", "1", " + 1", "\n", "\n\n", "# comentário\n", "valor = 2\n", "    valor = 2\n",
+    "  print(valor)\n", "if valor:\n    pass\n", "def extra(a):\n    return a\n",
+    "(", ")", "[1,\n 2]", "'texto'", '"""', "\\\n", ":", "else:\n", "  ", "\t",
+    "f'{valor}'", "return\n", "lambda: 0", ";",
+]
+LINHAS_VALIDAS = ["valor = 2", "print(valor)", "pass", "total = valor * 3 + 1", "x, y = 1, 2"]
+
+
+def _resumo_tokens(tokens):
+    return None if tokens is None else [(t.type, t.string, t.start, t.end) for t in tokens]
+
+
+def _edicao_aleatoria(aleatorio, linhas):
+    total = len(linhas)
+    if linhas and aleatorio.random() < 0.4:
+        # Linha nova com a mesma indentação de uma existente: quase sempre mantém o código válido
+        numero = aleatorio.randint(1, total)
+        linha = linhas[numero - 1]
+        indentacao = linha[:len(linha) - len(linha.lstrip(" \t"))]
+        return numero, 0, numero, 0, indentacao + aleatorio.choice(LINHAS_VALIDAS) + "\n"
+    # Depois da última linha só dá para editar se o texto terminar em quebra de linha
+    limite = total + 1 if not linhas or linhas[-1].endswith("\n") else total
+    linha_inicio = aleatorio.randint(1, limite)
+    linha_fim = min(linha_inicio + aleatorio.choice([0, 0, 0, 1, 2, 5]), limite)
+    tamanho_inicio = len(linhas[linha_inicio - 1].rstrip("\r\n")) if linha_inicio <= total else 0
+    tamanho_fim = len(linhas[linha_fim - 1].rstrip("\r\n")) if linha_fim <= total else 0
+    coluna_inicio = aleatorio.randint(0, tamanho_inicio)
+    coluna_fim = aleatorio.randint(coluna_inicio if linha_fim == linha_inicio else 0, tamanho_fim)
+    return linha_inicio, coluna_inicio, linha_fim, coluna_fim, aleatorio.choice(TRECHOS)
+
+
+def _desfazer(linhas, edicao):
+    """Edição inversa: devolve o texto original no trecho que a edição passou a ocupar"""
+    linha_inicio, coluna_inicio, linha_fim, coluna_fim, texto = edicao
+    trecho = linhas[linha_inicio - 1:linha_fim]
+    juntas = "".join(trecho)
+    if linha_fim <= len(linhas):
+        original = juntas[coluna_inicio:len(juntas) - len(trecho[-1]) + coluna_fim]
+    else:
+        # A edição terminava depois da última linha
+        original = juntas[coluna_inicio:]
+    partes = texto.split("\n")
+    if len(partes) == 1:
+        return linha_inicio, coluna_inicio, linha_inicio, coluna_inicio + len(texto), original
+    return linha_inicio, coluna_inicio, linha_inicio + len(partes) - 1, len(partes[-1]), original
+
+
+def _analise_completa(codigo):
+    """Referência: tudo refeito do zero sobre o texto atual"""
+    try:
+        tokens = list(tokenize.generate_tokens(io.StringIO(codigo, newline="").readline))
+    except (tokenize.TokenError, SyntaxError):
+        tokens = None
+    try:
+        arvore = ast.parse(codigo)
+    except SyntaxError:
+        arvore = None
+    return tokens, arvore
+
+
+def _conferir(analise, conferir_semantica):
+    """Lista o que diverge entre o estado incremental e uma análise completa do mesmo texto"""
+    tokens, arvore = _analise_completa(analise.codigo_fonte)
+    problemas = []
+    if _resumo_tokens(analise.tokens) != _resumo_tokens(tokens):
+        problemas.append("tokens")
+    esperado = None if arvore is None else ast.dump(arvore, include_attributes=True)
+    obtido = None if analise.arvore is None else ast.dump(analise.arvore, include_attributes=True)
+    if esperado != obtido:
+        problemas.append("AST")
+    if arvore is not None and conferir_semantica and analise.diagnosticos() != analisar_arvore(arvore)[0]:
+        problemas.append("semântica")
+    return problemas, arvore is not None
+
+
+def verificar(semente, edicoes, linhas=300, semantica_a_cada=10):
+    """
+    Aplica edições aleatórias e compara, depois de cada uma, tokens e AST (com posições)
+    com uma análise completa do texto resultante. Edições que quebram a sintaxe às vezes
+    recebem outras por cima e depois são todas desfeitas (também por edições), para que o
+    texto não fique inválido para sempre.
+    Retorna o número de divergências e quantas vezes a AST foi refeita de cada modo.
+    """
+    aleatorio = random.Random(semente)
+    analise = AnaliseIncremental(gerar_corpus(semente, linhas))
+    divergencias = 0
+    modos = {'incremental': 0, 'completo': 0}
+
+    def aplicar(i, edicao):
+        nonlocal analise, divergencias
+        modos[analise.aplicar_edicao(*edicao)['arvore']['modo']] += 1
+        problemas, valido = _conferir(analise, i % semantica_a_cada == 0)
+        if problemas:
+            divergencias += 1
+            print(f"  semente {semente}, edição {i} {edicao!r}: divergência em {', '.join(problemas)}",
+                  file=sys.stderr)
+            # Recomeça do texto atual para que um erro não contamine as edições seguintes
+            analise = AnaliseIncremental(analise.codigo_fonte)
+        return valido
+
+    for i in range(edicoes):
+        inversas = []
+        while True:
+            edicao = _edicao_aleatoria(aleatorio, analise.linhas)
+            inversas.append(_desfazer(analise.linhas, edicao))
+            if aplicar(i, edicao):
+                break
+            # Texto inválido: às vezes edita mais um pouco sobre ele, depois desfaz tudo
+            if len(inversas) >= 3 or aleatorio.random() >= 0.3:
+                for inversa in reversed(inversas):
+                    aplicar(i, inversa)
+                break
+    return divergencias, modos
+
+
+def _edicao_no_meio(analise):
+    # Troca um literal numérico perto do meio do arquivo, sem mudar o número de linhas
+    meio = len(analise.linhas) // 2
+    for numero in range(meio, len(analise.linhas)):
+        linha = analise.linhas[numero]
+        for tok in ("0", "1", "2", "3"):
+            coluna = linha.find(tok)
+            if coluna > 0 and not linha[coluna - 1].isalnum():
+                return numero + 1, coluna, numero + 1, coluna + 1, "7"
+    return meio + 1, 0, meio + 1, 0, "\n"
+
+
+def medir_latencia(tamanhos, repeticoes=20):
+    print(f"{'Linhas':>7} {'Completa (ms)':>14} {'Edição (ms)':>12} {'Edição+semântica (ms)':>22}")
+    for tamanho in tamanhos:
+        codigo = gerar_corpus(0, tamanho)
+        inicio = time.perf_counter()
+        _analise_completa(codigo)
+        tempo_completo = time.perf_counter() - inicio
+
+        analise = AnaliseIncremental(codigo)
+        tempos_edicao, tempos_semantica = [], []
+        for _ in range(repeticoes):
+            edicao = _edicao_no_meio(analise)
+            inicio = time.perf_counter()
+            analise.aplicar_edicao(*edicao)
+            tempos_edicao.append(time.perf_counter() - inicio)
+            analise.diagnosticos()
+            tempos_semantica.append(time.perf_counter() - inicio)
+        print(f"{len(codigo.splitlines()):>7} {tempo_completo * 1000:>14.2f} "
+              f"{min(tempos_edicao) * 1000:>12.3f} {min(tempos_semantica) * 1000:>22.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Confere e mede a análise incremental contra a análise completa")
+    parser.add_argument('--sementes', type=int, default=5)
+    parser.add_argument('--edicoes', type=int, default=200)
+    parser.add_argument('--tamanhos', default='200,1000,5000,20000')
+    args = parser.parse_args(argv)
+
+    # Edições aleatórias produzem literais como "1x", que o compilador só avisa
+    warnings.simplefilter('ignore', SyntaxWarning)
+    total = 0
+    for semente in range(args.sementes):
+        divergencias, modos = verificar(semente, args.edicoes)
+        total += divergencias
+        print(f"Semente {semente}: {args.edicoes} edições, {divergencias} divergências "
+              f"(AST incremental {modos['incremental']}, completa {modos['completo']})")
+    print()
+    medir_latencia([int(t) for t in args.tamanhos.split(',')])
+    return 1 if total else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import time
+
+from indice_projeto import IndiceProjeto
+from benchmarks.comum import gerar_fonte_grande, medir
+
+# Cada módulo importa dois módulos anteriores e chama funções deles; uma em cada dez fica sem uso
+MODELO = '''from pacote_{pa}.modulo_{a} import processar_{a}
+from pacote_{pb} import modulo_{b}
+
+
+def processar_{i}(valores):
+    total = processar_{a}(valores) + modulo_{b}.auxiliar_{b}(len(valores))
+    return total + auxiliar_{i}(total)
+
+
+def auxiliar_{i}(n):
+    return n * 2
+
+
+def {sem_uso}_{i}():
+    return processar_{i}([1, 2, 3])
+
+
+class Relatorio{i}:
+    def resumir(self, valores):
+        return modulo_{b}.Relatorio{b}().resumir(valores)
+
+'''
+
+
+def criar_projeto(pasta, modulos, por_pacote=100):
+    corpo = gerar_fonte_grande(1)
+    for i in range(modulos):
+        pacote = os.path.join(pasta, f"pacote_{i // por_pacote}")
+        if i % por_pacote == 0:
+            os.makedirs(pacote)
+            open(os.path.join(pacote, "__init__.py"), "w").close()
+        a, b = max(i - 1, 0), max(i - 7, 0)
+        codigo = MODELO.format(i=i, a=a, pa=a // por_pacote, b=b, pb=b // por_pacote,
+                               sem_uso='nunca_chamada' if i % 10 == 0 else 'exportar')
+        if i % 10 != 0:
+            codigo += f"exportar_{i}()\n"
+        with open(os.path.join(pacote, f"modulo_{i}.py"), "w", encoding="utf-8") as f:
+            f.write(codigo + corpo)
+
+
+def _ms(segundos):
+    return f"{segundos * 1000:>10.2f}"
+
+
+if __name__ == "__main__":
+    modulos = 3000
+    with tempfile.TemporaryDirectory() as pasta:
+        criar_projeto(pasta, modulos)
+        banco = os.path.join(pasta, "indice.sqlite3")
+        with IndiceProjeto(banco, pasta) as indice:
+            inicio = time.perf_counter()
+            indice.atualizar([pasta])
+            indexacao = time.perf_counter() - inicio
+            estatisticas = indice.estatisticas()
+            print(f"{modulos} módulos: {estatisticas['simbolos']} símbolos, {estatisticas['referencias']} "
+                  f"referências, {estatisticas['bytes'] / 1e6:.1f} MB em disco")
+            print(f"Indexação completa: {indexacao:.2f} s\n")
+
+            alterado = os.path.join(pasta, "pacote_15", "modulo_1500.py")
+            with open(alterado, "a", encoding="utf-8") as f:
+                f.write("\nauxiliar_1500(1)\n")
+            inicio = time.perf_counter()
+            contagens = indice.atualizar([pasta])
+            incremental = time.perf_counter() - inicio
+
+            nao_utilizadas = indice.funcoes_nao_utilizadas()
+            esperadas = modulos // 10
+            if len(nao_utilizadas) != esperadas:
+                raise SystemExit(f"❌ {len(nao_utilizadas)} funções não utilizadas, esperado {esperadas}")
+            if len(indice.referencias('pacote_0.modulo_3.auxiliar_3')) != 2:
+                raise SystemExit("❌ referências entre módulos não encontradas")
+
+            print(f"{'Operação':<52} {'Tempo (ms)':>10}")
+            print(f"{'Atualização após alterar 1 arquivo':<52} {_ms(incremental)}  ({contagens['indexados']} reindexado)")
+            print(f"{'Atualização sem alterações':<52} {_ms(medir(indice.atualizar, [pasta]))}")
+            print(f"{'Funções não utilizadas no projeto':<52} {_ms(medir(indice.funcoes_nao_utilizadas))}"
+                  f"  ({len(nao_utilizadas)} encontradas)")
+            consultas = [
+                ("Referências a pacote_0.modulo_3.auxiliar_3", indice.referencias, 'pacote_0.modulo_3.auxiliar_3'),
+                ("Chamadores de pacote_29.modulo_2990.processar_2990", indice.chamadores,
+                 'pacote_29.modulo_2990.processar_2990'),
+                ("Definições de resumir", indice.definicoes, 'resumir'),
+            ]
+            for rotulo, consulta, nome in consultas:
+                print(f"{rotulo:<52} {_ms(medir(consulta, nome))}")
+            print(f"{'Grafo de chamadas completo':<52} {_ms(medir(indice.grafo_chamadas))}")
+
+        # Sem índice, responder qualquer consulta exige reprocessar o projeto inteiro
+        print(f"\nSem índice (reindexar tudo a cada consulta): {indexacao * 1000:.0f} ms")
@@ -0,0 +1,47 @@
+import ast
+import timeit
+
+import instrumentacao
+from lexical_analysis import analisar_lexico
+from semantic_analysis import analisar_arvore
+from benchmarks.comum import gerar_fonte_grande, ler_exemplo, medir
+
+
+def _sobrecusto_por_chamada(chamadas=200_000):
+    """Custo de uma chamada decorada com a instrumentação desligada, comparado à função original"""
+    @instrumentacao.instrumentar('vazia')
+    def vazia():
+        return None
+
+    original = vazia.__wrapped__
+    tempo_original = min(timeit.repeat(original, number=chamadas, repeat=5))
+    tempo_decorada = min(timeit.repeat(vazia, number=chamadas, repeat=5))
+    tempo_fase = min(timeit.repeat(lambda: instrumentacao.fase('vazia').__enter__(), number=chamadas, repeat=5))
+    return (
+        (tempo_decorada - tempo_original) / chamadas,
+        tempo_fase / chamadas,
+    )
+
+
+if __name__ == "__main__":
+    decorada, fase = _sobrecusto_por_chamada()
+    print(f"Desligada: +{decorada * 1e9:.0f} ns por chamada decorada, {fase * 1e9:.0f} ns por fase()\n")
+
+    entradas = [("main.py", ler_exemplo()), ("50 cópias", gerar_fonte_grande(50))]
+    print(f"{'Entrada':<12} {'Fase':<16} {'Original (s)':>13} {'Desligada (s)':>14} {'Ligada (s)':>11} {'+memória (s)':>13}")
+    for rotulo, codigo in entradas:
+        tree = ast.parse(codigo)
+        casos = [
+            ("analisar_lexico", analisar_lexico.__wrapped__, analisar_lexico, codigo),
+            # O motor não tem versão sem instrumentação; a "original" é a própria chamada desligada
+            ("analisar_arvore", analisar_arvore, analisar_arvore, tree),
+        ]
+        for nome, original, instrumentada, entrada in casos:
+            tempo_original = medir(original, entrada, repeticoes=5)
+            tempo_desligada = medir(instrumentada, entrada, repeticoes=5)
+            with instrumentacao.instrumentar_execucao():
+                tempo_ligada = medir(instrumentada, entrada, repeticoes=5)
+            with instrumentacao.instrumentar_execucao(memoria=True):
+                tempo_memoria = medir(instrumentada, entrada, repeticoes=5)
+            print(f"{rotulo:<12} {nome:<16} {tempo_original:>13.4f} {tempo_desligada:>14.4f} "
+                  f"{tempo_ligada:>11.4f} {tempo_memoria:>13.4f}")
@@ -0,0 +1,38 @@
+import tokenize
+import token
+from io import BytesIO
+
+from lexical_analysis import analisar_lexico, descrever_token, _classificar_sequencial
+from benchmarks.comum import gerar_fonte_grande, medir
+
+
+def analisar_lexico_sequencial(codigo_fonte):
+    """Versão anterior de analisar_lexico: testa cada padrão de TOKENS para cada token"""
+    tokens_resultantes = []
+    bytes_code = BytesIO(codigo_fonte.encode('utf-8'))
+    for tok in tokenize.tokenize(bytes_code.readline):
+        tipo = token.tok_name.get(tok.type)
+        lexema = tok.string
+        token_nome = _classificar_sequencial(lexema)
+        if tipo in ['ENCODING', 'NL', 'NEWLINE', 'INDENT', 'DEDENT', 'ENDMARKER']:
+            continue
+        tokens_resultantes.append({
+            'Token': lexema,
+            'Tipo': tipo,
+            'Descrição': descrever_token(tipo, lexema),
+            'Linha': tok.start[0],
+            'Nome': token_nome if token_nome else '-'
+        })
+    return tokens_resultantes
+
+
+if __name__ == "__main__":
+    print(f"{'Cópias':>8} {'Tokens':>10} {'Sequencial (s)':>15} {'Tabelas (s)':>12} {'Ganho':>7}")
+    for repeticoes in (10, 100, 500):
+        codigo = gerar_fonte_grande(repeticoes)
+        esperado = analisar_lexico_sequencial(codigo)
+        if analisar_lexico(codigo) != esperado:
+            raise SystemExit("❌ Classificação diverge da versão sequencial")
+        t_antigo = medir(analisar_lexico_sequencial, codigo)
+        t_novo = medir(analisar_lexico, codigo)
+        print(f"{repeticoes:>8} {len(esperado):>10} {t_antigo:>15.3f} {t_novo:>12.3f} {t_antigo / t_novo:>6.1f}x")
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import tracemalloc
+
+from lexical_analysis import (
+    analisar_lexico, retorno_analise_lexica_formatado,
+    abrir_fonte_mapeada, iterar_analise_lexica, iterar_analise_lexica_formatada,
+)
+from benchmarks.comum import gerar_fonte_grande
+
+
+def _pico_de_memoria(funcao, caminho):
+    tracemalloc.start()
+    try:
+        funcao(caminho)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _lista_completa(caminho):
+    with open(caminho, "r", encoding="utf-8") as f:
+        codigo = f.read()
+    return len(analisar_lexico(codigo))
+
+
+def _fluxo_mmap(caminho):
+    with abrir_fonte_mapeada(caminho) as fonte:
+        return sum(1 for _ in iterar_analise_lexica(fonte))
+
+
+def _formatado_completo(caminho):
+    with open(caminho, "r", encoding="utf-8") as f:
+        codigo = f.read()
+    return len(retorno_analise_lexica_formatado(codigo))
+
+
+def _formatado_fluxo(caminho):
+    with abrir_fonte_mapeada(caminho) as fonte:
+        return sum(len(linha) for linha in iterar_analise_lexica_formatada(fonte))
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as pasta:
+        print(f"{'Arquivo (MB)':>12} {'Função':<40} {'Pico (MB)':>10}")
+        for repeticoes in (100, 400):
+            caminho = os.path.join(pasta, f"entrada_{repeticoes}.py")
+            with open(caminho, "w", encoding="utf-8") as f:
+                f.write(gerar_fonte_grande(repeticoes))
+            tamanho = os.path.getsize(caminho) / 1e6
+            for nome, funcao in (
+                ("analisar_lexico", _lista_completa),
+                ("iterar_analise_lexica (mmap)", _fluxo_mmap),
+                ("retorno_analise_lexica_formatado", _formatado_completo),
+                ("iterar_analise_lexica_formatada (mmap)", _formatado_fluxo),
+            ):
+                pico = _pico_de_memoria(funcao, caminho) / 1e6
+                print(f"{tamanho:>12.2f} {nome:<40} {pico:>10.2f}")
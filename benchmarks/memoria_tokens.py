@@ -0,0 +1,30 @@
+import tracemalloc
+
+from lexical_analysis import analisar_lexico
+from tabela_tokens import analisar_lexico_compacto
+from benchmarks.comum import gerar_fonte_grande
+
+
+def _memoria_retida(construir):
+    """Memória que continua alocada depois de construir a estrutura (em bytes)"""
+    tracemalloc.start()
+    try:
+        estrutura = construir()
+        retida = tracemalloc.get_traced_memory()[0]
+        return estrutura, retida
+    finally:
+        tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    print(f"{'Tokens':>10} {'Lista de dicts (MB)':>20} {'TabelaTokens (MB)':>18} {'Bytes/token':>12} {'Redução':>8}")
+    for repeticoes in (50, 200, 800):
+        codigo = gerar_fonte_grande(repeticoes)
+        dicts, memoria_dicts = _memoria_retida(lambda: analisar_lexico(codigo))
+        tabela, memoria_tabela = _memoria_retida(lambda: analisar_lexico_compacto(codigo))
+        if tabela.como_dicts() != dicts:
+            raise SystemExit("❌ TabelaTokens diverge de analisar_lexico")
+        print(
+            f"{len(dicts):>10} {memoria_dicts / 1e6:>20.2f} {memoria_tabela / 1e6:>18.2f}"
+            f" {memoria_tabela / len(dicts):>12.1f} {memoria_dicts / memoria_tabela:>7.1f}x"
+        )
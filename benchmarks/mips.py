@@ -0,0 +1,102 @@
+import os
+import subprocess
+import sys
+
+from gerador_mips import ErroGeracao, estatisticas_asm, gerar_mips
+from simulador_mips import simular
+from benchmarks.comum import RAIZ, gerar_fonte_grande, ler_exemplo, medir
+
+COLUNAS = ('instrucoes', 'reais', 'memoria', 'pilha', 'desvios', 'syscalls')
+
+# Programas pequenos (só inteiros: os floats do MIPS têm 32 bits) e a entrada de cada um.
+# Comparar as variantes geradas entre si não pega um erro que todas as otimizadas compartilham;
+# a referência é a saída do próprio CPython
+PROGRAMAS = {
+    'parâmetro reatribuído': ("def dobro(y):\n    y = y * 2\n    return y\nx = 10\nprint(dobro(x))\nprint(x)\n", ''),
+    'argumento reaproveitado': ("def mais_um(y):\n    y = y + 1\n    return y\nx = 5\nprint(mais_um(x), x)\n", ''),
+    'vários parâmetros': ("def soma(a, b, c):\n    a = a + b\n    b = a * c\n    return a + b + c\n"
+                          "x = 1\ny = 2\nz = 3\nprint(soma(x, y, z), x, y, z)\n", ''),
+    'laços': ("total = 0\nfor i in range(10):\n    if i % 3 == 0:\n        continue\n    total = total + i\n"
+              "n = 0\nwhile True:\n    n = n + 1\n    if n * n > total:\n        break\nprint(total, n)\n", ''),
+    'recursão': ("def fib(n):\n    if n < 2:\n        return n\n    return fib(n - 1) + fib(n - 2)\nprint(fib(12))\n", ''),
+    'divisão inteira': ("def divide(a, b):\n    return a // b, a % b\nq, r = divide(-7, 2)\nprint(q, r)\n"
+                        "print(7 // -2, 7 % -2)\n", ''),
+    'try/except': ("def ler():\n    while True:\n        try:\n            n = int(input('n: '))\n"
+                   "            if n < 0:\n                raise ValueError('negativo')\n            return n\n"
+                   "        except ValueError as e:\n            print('inválido:', e)\nprint(ler() * 3)\n", "-4\n7\n"),
+    'raise em função chamada no try': ("def verificar(n):\n    if n < 0:\n        raise ValueError('negativo')\n    return n\n"
+                                       "try:\n    print(verificar(-1))\nexcept ValueError as e:\n    print('erro', e)\n", ''),
+}
+
+
+def ler_assembly_manual():
+    with open(os.path.join(RAIZ, "assembly.asm"), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def saida_cpython(codigo, entrada=''):
+    """O que o programa escreve executado pelo CPython, com a entrada no stdin"""
+    return subprocess.run([sys.executable, "-c", codigo], input=entrada, capture_output=True,
+                          text=True, check=True).stdout
+
+
+def divergencias_cpython():
+    """
+    ([(programa, variante)] em que a saída no simulador difere da do CPython, {programa: motivo}
+    dos recusados pelo gerador). Recusar com ErroGeracao é aceitável; gerar código errado não
+    """
+    variantes = (("gerado", {}), ("sem otimizações", {'otimizar': False}),
+                 ("2 registradores", {'limite_registradores': 2}))
+    divergentes = []
+    recusados = {}
+    for nome, (codigo, entrada) in PROGRAMAS.items():
+        esperado = saida_cpython(codigo, entrada)
+        for variante, opcoes in variantes:
+            try:
+                assembly = gerar_mips(codigo, **opcoes)
+            except ErroGeracao as e:
+                recusados[nome] = str(e)
+                continue
+            if simular(assembly, entrada)[0] != esperado:
+                divergentes.append((nome, variante))
+    return divergentes, recusados
+
+
+def _linha(nome, estatisticas):
+    return f"{nome:<28}" + "".join(f"{estatisticas[c]:>11}" for c in COLUNAS)
+
+
+if __name__ == "__main__":
+    codigo = ler_exemplo()
+    variantes = [
+        ("assembly.asm (manual)", ler_assembly_manual()),
+        ("gerado, sem otimizações", gerar_mips(codigo, otimizar=False)),
+        ("gerado, 2 registradores", gerar_mips(codigo, limite_registradores=2)),
+        ("gerado", gerar_mips(codigo)),
+    ]
+    print("Contagem estática para main.py (reais: depois da expansão das pseudo-instruções; "
+          "pilha: loads/stores em $sp)")
+    print(f"{'':<28}" + "".join(f"{c:>11}" for c in COLUNAS))
+    for nome, assembly in variantes:
+        print(_linha(nome, estatisticas_asm(assembly)))
+
+    manual = estatisticas_asm(variantes[0][1])
+    gerado = estatisticas_asm(variantes[-1][1])
+    print(f"\nGerado tem {manual['instrucoes'] - gerado['instrucoes']} instruções a menos que o manual "
+          f"({manual['reais'] - gerado['reais']} depois da expansão) e {gerado['pilha']} acessos à pilha")
+
+    print(f"\n{'Cópias de main.py':>18} {'Linhas':>7} {'Instruções':>11} {'Geração (s)':>12}")
+    for copias in (1, 10, 50):
+        fonte = gerar_fonte_grande(copias)
+        tempo = medir(gerar_mips, fonte)
+        instrucoes = estatisticas_asm(gerar_mips(fonte))['instrucoes']
+        print(f"{copias:>18} {len(fonte.splitlines()):>7} {instrucoes:>11} {tempo:>12.3f}")
+
+    divergentes, recusados = divergencias_cpython()
+    if divergentes:
+        raise SystemExit("❌ saída diferente da do CPython: "
+                         + ", ".join(f"{nome} ({variante})" for nome, variante in divergentes))
+    print()
+    for nome, motivo in recusados.items():
+        print(f"⚠️  {nome}: recusado pelo gerador ({motivo})")
+    print(f"✅ {len(PROGRAMAS) - len(recusados)} programas com a mesma saída do CPython em todas as variantes")
@@ -0,0 +1,154 @@
+import ast
+import math
+import time
+
+from otimizador_ast import ORDEM_PADRAO, instrucoes_por_funcao, otimizar
+from benchmarks.comum import ler_exemplo
+
+# Funções com o que cada passo procura: constantes locais, divisões por potência de dois,
+# código depois de return e expressões que não mudam dentro dos laços
+SINTETICO = '''
+def area_total(raios):
+    pi = 3.141592653589793
+    dois_pi = 2 * pi
+    total = 0.0
+    for r in raios:
+        total += dois_pi * r * r / 2
+    return total
+
+def juros_acumulados(capital, taxa, meses):
+    total = 0.0
+    for mes in range(meses):
+        total += capital * (1 + taxa / 100) + mes * (taxa / 100) * capital
+    return total
+    print("nunca executado")
+
+def converter_temperaturas(celsius, deslocamento):
+    convertidas = []
+    for c in celsius:
+        convertidas.append(c * (9 / 5) + 32 + deslocamento / 2)
+    return convertidas
+
+def energia_cinetica(massas, velocidade):
+    total = 0.0
+    for m in massas:
+        total += m * velocidade ** 2
+    return total / 2
+
+area_total([0.5, 1.5])
+juros_acumulados(1000.0, 5.0, 12)
+converter_temperaturas([10.0, 25.0], 0.5)
+energia_cinetica([1.0, 2.0], 3.0)
+'''
+
+# Casos em que o tipo inferido não é o tipo em tempo de execução: int ** int com expoente
+# negativo dá float, e a inferência junta bool com int e int com float
+BORDAS = '''
+def potencia_negativa(n, k):
+    return (n ** k) // 1, (n ** k) * 1
+
+def elementos_neutros_bool(x):
+    return x * 1, x + 0, x - 0, +x, -(-x)
+
+def elementos_neutros_mistos(x):
+    return x / 1, x * 1.0, x - 0.0, x + 0, x // 1, (x * 2) / 1, (x * 2) * 1.0, (x * 2) - 0.0, (x * 2) + 0
+
+potencia_negativa(2, 3)
+elementos_neutros_bool(True)
+elementos_neutros_bool(2)
+elementos_neutros_mistos(2)
+elementos_neutros_mistos(2.5)
+'''
+
+# (nome da função, argumentos, repetições da medição)
+CHAMADAS_SINTETICO = [
+    ('area_total', ([float(i % 10) for i in range(1000)],), 300),
+    ('juros_acumulados', (1000.0, 5.0, 1000), 300),
+    ('converter_temperaturas', ([float(i % 40) for i in range(1000)], 0.5), 300),
+    ('energia_cinetica', ([float(i % 7) for i in range(1000)], 3.0), 300),
+]
+CHAMADAS_BORDAS = [
+    ('potencia_negativa', (2, -1), 20_000),
+    ('elementos_neutros_bool', (True,), 20_000),
+    ('elementos_neutros_mistos', (2,), 20_000),
+    ('elementos_neutros_mistos', (-0.0,), 20_000),
+]
+CHAMADAS_EXEMPLO = [
+    ('calcular_juros_simples', (1000.0, 5.0, 12), 200_000),
+    ('calcular_juros_compostos', (1000.0, 5.0, 12), 200_000),
+]
+
+
+def _so_funcoes(tree):
+    """Compila só as definições de funções (o resto de main.py lê do teclado)"""
+    modulo = ast.Module([no for no in tree.body if isinstance(no, ast.FunctionDef)], [])
+    return compile(modulo, '<funcoes>', 'exec')
+
+
+def _tempos(funcoes, argumentos, repeticoes, rodadas=7):
+    """Menor tempo de cada função; as medições se alternam para que o ruído afete todas igualmente"""
+    melhores = [float("inf")] * len(funcoes)
+    for _ in range(rodadas):
+        for i, funcao in enumerate(funcoes):
+            inicio = time.perf_counter()
+            for _ in range(repeticoes):
+                funcao(*argumentos)
+            melhores[i] = min(melhores[i], time.perf_counter() - inicio)
+    return melhores
+
+
+def _iguais(a, b):
+    # O tipo também conta: True == 1 e 2 == 2.0, mas o programa escreveria outra coisa
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(_iguais(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) and a == 0:
+        return math.copysign(1, a) == math.copysign(1, b)
+    return a == b or math.isclose(a, b, rel_tol=1e-12)
+
+
+def comparar(fonte, chamadas, matematica_rapida=False):
+    """
+    Otimiza o módulo inteiro (as chamadas dão os tipos dos parâmetros), mostra o relatório dos
+    passos e mede cada função antes e depois; retorna as chamadas com resultados diferentes
+    """
+    original = _so_funcoes(ast.parse(fonte))
+    resultado = otimizar(fonte, matematica_rapida=matematica_rapida)
+    print(f"{'Passo':<14}{'Alterações':>11}{'Antes':>8}{'Depois':>8}{'Tempo (ms)':>12}")
+    for passo in resultado['relatorio']:
+        print(f"{passo['passo']:<14}{passo['alteracoes']:>11}{passo['instrucoes_antes']:>8}"
+              f"{passo['instrucoes_depois']:>8}{passo['tempo'] * 1000:>12.2f}")
+
+    antes_por_funcao = instrucoes_por_funcao(original)
+    otimizado = _so_funcoes(resultado['arvore'])
+    depois_por_funcao = instrucoes_por_funcao(otimizado)
+    espaco_original, espaco_otimizado = {}, {}
+    exec(original, espaco_original)
+    exec(otimizado, espaco_otimizado)
+    diferentes = []
+    print(f"\n{'Função':<26}{'Bytecode':>12}{'Original (s)':>14}{'Otimizada (s)':>15}{'Aceleração':>12}{'Iguais':>8}")
+    for nome, argumentos, repeticoes in chamadas:
+        lenta, rapida = espaco_original[nome], espaco_otimizado[nome]
+        iguais = _iguais(lenta(*argumentos), rapida(*argumentos))
+        if not iguais:
+            diferentes.append(f"{nome}{argumentos}")
+        tempo_original, tempo_otimizado = _tempos((lenta, rapida), argumentos, repeticoes)
+        bytecode = f"{antes_por_funcao[nome]} -> {depois_por_funcao[nome]}"
+        print(f"{nome:<26}{bytecode:>12}{tempo_original:>14.4f}{tempo_otimizado:>15.4f}"
+              f"{tempo_original / tempo_otimizado:>11.2f}x{'sim' if iguais else 'não':>8}")
+    return diferentes
+
+
+if __name__ == "__main__":
+    print(f"Passos: {', '.join(ORDEM_PADRAO)}\n")
+    print("== Funções sintéticas")
+    diferentes = comparar(SINTETICO, CHAMADAS_SINTETICO)
+    print("\n== Funções sintéticas, com matematica_rapida (resultados iguais até 1e-12)")
+    diferentes += comparar(SINTETICO, CHAMADAS_SINTETICO, matematica_rapida=True)
+    print("\n== Funções de main.py, com matematica_rapida (taxa / 100 -> taxa * 0.01)")
+    diferentes += comparar(ler_exemplo(), CHAMADAS_EXEMPLO, matematica_rapida=True)
+    print("\n== Tipos inferidos diferentes dos de execução (expoente negativo, bool, int e float)")
+    diferentes += comparar(BORDAS, CHAMADAS_BORDAS)
+    if diferentes:
+        raise SystemExit(f"❌ resultados diferentes depois da otimização: {', '.join(diferentes)}")
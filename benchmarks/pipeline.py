@@ -0,0 +1,62 @@
+import os
+import tempfile
+import time
+import tracemalloc
+
+from analise_projeto import _resultados_serializaveis
+from pipeline_estagios import analisar_em_estagios, pipeline_analise
+from semantic_analysis import analisar_arvore
+from syntatic_analysis import analisar_sintaxe
+from tabela_tokens import analisar_lexico_compacto
+from benchmarks.gerador_corpus import gerar_corpus
+
+
+def fontes(quantidade, linhas=150):
+    """Módulos sintéticos gerados sob demanda, sem manter o corpus inteiro em memória"""
+    for i in range(quantidade):
+        yield f"modulo_{i}.py", gerar_corpus(semente=i, linhas=linhas)
+
+
+def materializado(quantidade):
+    """Como antes: cada fase recebe a lista completa produzida pela anterior"""
+    modulos = list(fontes(quantidade))
+    tokens = [analisar_lexico_compacto(codigo) for _, codigo in modulos]
+    arvores = [analisar_sintaxe(codigo)[0] for _, codigo in modulos]
+    diagnosticos = [_resultados_serializaveis(analisar_arvore(arvore)[0]) for arvore in arvores]
+    return [(nome, len(t), d) for (nome, _), t, d in zip(modulos, tokens, diagnosticos)]
+
+
+def em_estagios(quantidade, pipeline=None):
+    pipeline = pipeline or pipeline_analise()
+    resultados = [(r['arquivo'], r['tokens'], r['semantica']) for r in analisar_em_estagios(pipeline, fontes(quantidade))]
+    return sorted(resultados, key=lambda r: int(r[0][7:-3]))
+
+
+def pico_de_memoria(funcao, *args):
+    tracemalloc.start()
+    try:
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        return resultado, tracemalloc.get_traced_memory()[1], time.perf_counter() - inicio
+    finally:
+        tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    print(f"{'Módulos':>8} {'Materializado (MB)':>19} {'Estágios (MB)':>14} {'Tempo mat. (s)':>15} {'Tempo est. (s)':>15}")
+    for quantidade in (20, 60, 180):
+        lista, pico_lista, tempo_lista = pico_de_memoria(materializado, quantidade)
+        estagios, pico_estagios, tempo_estagios = pico_de_memoria(em_estagios, quantidade)
+        if lista != estagios:
+            raise SystemExit("❌ os resultados do pipeline diferem da execução materializada")
+        print(f"{quantidade:>8} {pico_lista / 1e6:>19.1f} {pico_estagios / 1e6:>14.1f}"
+              f" {tempo_lista:>15.2f} {tempo_estagios:>15.2f}")
+
+    # Com a escrita dos diagramas, a saída passa a ser o estágio mais lento: as filas anteriores
+    # enchem e os estágios de cima ficam bloqueados esperando espaço
+    with tempfile.TemporaryDirectory() as pasta:
+        for trabalhadores_saida in (1, 3):
+            pipeline = pipeline_analise(os.path.join(pasta, "diagramas"), trabalhadores={'saida': trabalhadores_saida})
+            em_estagios(100, pipeline)
+            print(f"\nDiagramas DOT com {trabalhadores_saida} trabalhador(es) na saída, 100 módulos")
+            print(pipeline.formatar_metricas())
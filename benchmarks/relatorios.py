@@ -0,0 +1,84 @@
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from lexical_analysis import analisar_lexico
+from gerar_tabela_pdf import gerar_docx_tabela, gerar_pdf_tabela, exportar_csv, exportar_jsonl, exportar_parquet
+from benchmarks.comum import gerar_fonte_grande
+
+
+# Cópias das versões anteriores de gerar_pdf_tabela e gerar_docx_tabela, usadas como referência
+def gerar_pdf_tabela_pandas(tokens, nome_arquivo_pdf="tabela_tokens.pdf"):
+    import pandas as pd
+    from fpdf import FPDF
+
+    df = pd.DataFrame(tokens, columns=["Nome", "Token", "Tipo", "Descrição", "Linha"])
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=10)
+    col_widths = [30, 60, 30, 60, 15]
+    headers = ["Nome", "Token", "Tipo", "Descrição", "Linha"]
+    for i, header in enumerate(headers):
+        pdf.cell(col_widths[i], 10, header, border=1)
+    pdf.ln()
+    for _, row in df.iterrows():
+        pdf.cell(col_widths[0], 10, str(row["Nome"]), border=1)
+        pdf.cell(col_widths[1], 10, str(row["Token"])[:30], border=1)
+        pdf.cell(col_widths[2], 10, str(row["Tipo"]), border=1)
+        pdf.cell(col_widths[3], 10, str(row["Descrição"])[:30], border=1)
+        pdf.cell(col_widths[4], 10, str(row["Linha"]), border=1)
+        pdf.ln()
+    pdf.output(nome_arquivo_pdf)
+
+
+def gerar_docx_tabela_pandas(tokens, nome_arquivo_docx="tabela_tokens.docx"):
+    import pandas as pd
+    from docx import Document
+
+    df = pd.DataFrame(tokens, columns=["Nome", "Token", "Tipo", "Descrição", "Linha"])
+    doc = Document()
+    doc.add_heading('Tabela de Tokens', 0)
+    table = doc.add_table(rows=1, cols=len(df.columns))
+    hdr_cells = table.rows[0].cells
+    for i, col in enumerate(df.columns):
+        hdr_cells[i].text = col
+    for _, row in df.iterrows():
+        row_cells = table.add_row().cells
+        for i, item in enumerate(row):
+            row_cells[i].text = str(item)
+    doc.save(nome_arquivo_docx)
+
+
+def medir_linhas_por_segundo(funcao, tokens, caminho):
+    # Os relatórios imprimem onde foram salvos; a saída é descartada para não poluir a tabela
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        funcao(tokens, caminho)
+        duracao = time.perf_counter() - inicio
+    return len(tokens) / duracao
+
+
+if __name__ == "__main__":
+    tokens = analisar_lexico(gerar_fonte_grande(40))
+    print(f"{len(tokens)} linhas\n")
+    print(f"{'Relatório':<22} {'Linhas/s':>12}")
+    casos = [
+        ("PDF (pandas)", gerar_pdf_tabela_pandas, "pdf"),
+        ("PDF (streaming)", gerar_pdf_tabela, "pdf"),
+        ("DOCX (pandas)", gerar_docx_tabela_pandas, "docx"),
+        ("DOCX (XML em lote)", gerar_docx_tabela, "docx"),
+        ("CSV", exportar_csv, "csv"),
+        ("JSONL", exportar_jsonl, "jsonl"),
+        ("Parquet", exportar_parquet, "parquet"),
+    ]
+    with tempfile.TemporaryDirectory() as pasta:
+        for rotulo, funcao, extensao in casos:
+            caminho = os.path.join(pasta, f"tabela.{extensao}")
+            try:
+                taxa = medir_linhas_por_segundo(funcao, tokens, caminho)
+            except ImportError as e:
+                print(f"{rotulo:<22} {'(' + e.name + ' não instalado)':>12}")
+                continue
+            print(f"{rotulo:<22} {taxa:>12,.0f}")
@@ -0,0 +1,60 @@
+import ast
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from agendador_renderizacao import AgendadorRenderizacao, escrever_diagramas
+from exportador_dot import renderizar_dot
+from benchmarks.comum import gerar_fonte_grande
+
+ARQUIVOS = 8
+
+
+def preparar(pasta):
+    """Escreve os DOT dos três diagramas de ARQUIVOS módulos de tamanhos diferentes"""
+    caminhos = []
+    for i in range(ARQUIVOS):
+        tree = ast.parse(gerar_fonte_grande(i + 1))
+        caminhos.extend(escrever_diagramas(tree, os.path.join(pasta, f"modulo_{i}"), limite_nos=2000))
+    return caminhos
+
+
+def sequencial(caminhos, formato):
+    for caminho in caminhos:
+        renderizar_dot(caminho, f"{os.path.splitext(caminho)[0]}.seq.{formato}", formato)
+
+
+def agendado(caminhos, formato, max_simultaneos):
+    with AgendadorRenderizacao(max_simultaneos, formato) as agendador:
+        for caminho in caminhos:
+            agendador.agendar_dot(caminho)
+    return agendador
+
+
+if __name__ == "__main__":
+    if shutil.which("dot") is None:
+        sys.exit("O executável dot do Graphviz não foi encontrado no PATH")
+
+    simultaneos = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as pasta:
+        caminhos = preparar(pasta)
+        print(f"{len(caminhos)} diagramas, até {simultaneos} renderizações simultâneas\n")
+        print(f"{'Formato':<8} {'Sequencial':>11} {'Agendado':>9} {'Cache':>8}")
+        for formato in ("png", "svg"):
+            inicio = time.perf_counter()
+            sequencial(caminhos, formato)
+            tempo_sequencial = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            agendado(caminhos, formato, simultaneos)
+            tempo_agendado = time.perf_counter() - inicio
+
+            # Segunda execução: os DOT não mudaram, então nada é renderizado
+            inicio = time.perf_counter()
+            agendador = agendado(caminhos, formato, simultaneos)
+            tempo_cache = time.perf_counter() - inicio
+            assert agendador.pulados == len(caminhos)
+
+            print(f"{formato:<8} {tempo_sequencial:>10.3f}s {tempo_agendado:>8.3f}s {tempo_cache:>7.3f}s")
@@ -0,0 +1,34 @@
+import io
+import tokenize
+
+from lexical_analysis import analisar_lexico
+from scanner_lexico import escanear, analisar_lexico_dfa
+from benchmarks.comum import gerar_fonte_grande, medir
+
+
+def _consumir_tokenize(codigo):
+    for _ in tokenize.generate_tokens(io.StringIO(codigo).readline):
+        pass
+
+
+def _consumir_scanner(codigo):
+    for _ in escanear(codigo):
+        pass
+
+
+if __name__ == "__main__":
+    codigo = gerar_fonte_grande(500)
+    megabytes = len(codigo.encode('utf-8')) / 1e6
+    if analisar_lexico_dfa(codigo) != analisar_lexico(codigo):
+        raise SystemExit("❌ Scanner diverge de analisar_lexico")
+
+    print(f"Entrada: {megabytes:.2f} MB")
+    print(f"{'Caminho':<32} {'Tempo (s)':>10} {'MB/s':>8}")
+    for nome, funcao in (
+        ("tokenize (fluxo bruto)", _consumir_tokenize),
+        ("scanner_lexico (fluxo bruto)", _consumir_scanner),
+        ("analisar_lexico", analisar_lexico),
+        ("analisar_lexico_dfa", analisar_lexico_dfa),
+    ):
+        tempo = medir(funcao, codigo)
+        print(f"{nome:<32} {tempo:>10.3f} {megabytes / tempo:>8.2f}")
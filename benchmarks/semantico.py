@@ -0,0 +1,36 @@
+import ast
+
+from semantic_analysis import (
+    REGRAS_PADRAO, analisar_arvore,
+    analisar_variaveis_nao_utilizadas, analisar_funcoes_nao_chamadas,
+    analisar_tipos_e_operacoes, analisar_escopo, analisar_fluxo_de_controle,
+)
+from benchmarks.comum import gerar_fonte_grande, medir
+
+
+def _cinco_travessias(tree):
+    return {
+        'variaveis_nao_utilizadas': analisar_variaveis_nao_utilizadas(tree),
+        'funcoes_nao_chamadas': analisar_funcoes_nao_chamadas(tree),
+        'tipos_e_operacoes': analisar_tipos_e_operacoes(tree),
+        'escopo': analisar_escopo(tree),
+        'fluxo_de_controle': analisar_fluxo_de_controle(tree),
+    }
+
+
+def _travessia_unica(tree):
+    return analisar_arvore(tree)[0]
+
+
+if __name__ == "__main__":
+    print(f"{'Cópias':>8} {'Uma regra por travessia (s)':>28} {'Travessia única (s)':>20}")
+    for repeticoes in (50, 200):
+        tree = ast.parse(gerar_fonte_grande(repeticoes))
+        if _cinco_travessias(tree) != _travessia_unica(tree):
+            raise SystemExit("❌ Resultados divergentes")
+        print(f"{repeticoes:>8} {medir(_cinco_travessias, tree):>28.3f} {medir(_travessia_unica, tree):>20.3f}")
+
+    _, tempos = analisar_arvore(tree, medir_tempo=True)
+    print(f"\nTempo por regra ({len(REGRAS_PADRAO)} regras, {repeticoes} cópias):")
+    for nome, tempo in sorted(tempos.items(), key=lambda item: item[1], reverse=True):
+        print(f"  {nome:<28} {tempo * 1000:>9.3f} ms")
@@ -0,0 +1,89 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.comum import RAIZ, gerar_fonte_grande, ler_exemplo
+
+REPETICOES = 30
+
+
+class ClienteStdio:
+    """Cliente JSON-RPC mínimo para o servidor em um subprocesso (stdin/stdout)"""
+
+    def __init__(self):
+        self.processo = subprocess.Popen(
+            [sys.executable, os.path.join(RAIZ, "servidor_analise.py")],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, encoding="utf-8", cwd=RAIZ,
+        )
+        self._proximo_id = 0
+
+    def chamar(self, metodo, **params):
+        self._proximo_id += 1
+        requisicao = {'jsonrpc': '2.0', 'id': self._proximo_id, 'method': metodo, 'params': params}
+        self.processo.stdin.write(json.dumps(requisicao) + "\n")
+        self.processo.stdin.flush()
+        resposta = json.loads(self.processo.stdout.readline())
+        if 'error' in resposta:
+            raise RuntimeError(resposta['error']['message'])
+        return resposta['result']
+
+    def medir(self, metodo, **params):
+        inicio = time.perf_counter()
+        self.chamar(metodo, **params)
+        return time.perf_counter() - inicio
+
+    def fechar(self):
+        self.chamar('desligar')
+        self.processo.wait()
+
+
+def _processo_novo(caminho):
+    # O que cada integração paga hoje: um interpretador novo que importa tudo e analisa um arquivo
+    codigo = (
+        "import sys; from cache_analise import analisar_fonte; "
+        "analisar_fonte(open(sys.argv[1], encoding='utf-8').read())"
+    )
+    inicio = time.perf_counter()
+    subprocess.run([sys.executable, "-c", codigo, caminho], check=True, cwd=RAIZ)
+    return time.perf_counter() - inicio
+
+
+def _percentis(tempos):
+    tempos = sorted(tempos)
+    return statistics.median(tempos) * 1000, tempos[int(len(tempos) * 0.95) - 1] * 1000
+
+
+if __name__ == "__main__":
+    entradas = [("main.py", ler_exemplo()), ("50 cópias", gerar_fonte_grande(50))]
+    cliente = ClienteStdio()
+    # A primeira requisição paga as importações do próprio servidor
+    cliente.chamar('estatisticas')
+    print(f"{'Entrada':<12} {'Requisição':<32} {'p50 (ms)':>9} {'p95 (ms)':>9}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for rotulo, codigo in entradas:
+            caminho = os.path.join(pasta, f"{rotulo.replace(' ', '_')}.py")
+            with open(caminho, "w", encoding="utf-8") as f:
+                f.write(codigo)
+
+            tempo_processo = statistics.median(_processo_novo(caminho) for _ in range(3))
+            print(f"{rotulo:<12} {'processo novo por arquivo':<32} {tempo_processo * 1000:>9.1f} {'':>9}")
+
+            cliente.chamar('abrir', caminho=caminho, texto=codigo)
+            primeira = cliente.medir('diagnosticos', caminho=caminho)
+            print(f"{rotulo:<12} {'diagnosticos (cache frio)':<32} {primeira * 1000:>9.1f} {'':>9}")
+
+            casos = [
+                ("diagnosticos (cache quente)", lambda: cliente.medir('diagnosticos', caminho=caminho)),
+                ("lexico, linhas 1-20", lambda: cliente.medir('lexico', caminho=caminho, primeira_linha=1, ultima_linha=20)),
+                ("grafo fluxo_de_controle", lambda: cliente.medir('grafo', caminho=caminho, tipo='fluxo_de_controle')),
+                ("alterar + diagnosticos", lambda: cliente.medir('alterar', caminho=caminho, texto=codigo + "\n")
+                 + cliente.medir('diagnosticos', caminho=caminho)),
+            ]
+            for nome, requisicao in casos:
+                p50, p95 = _percentis([requisicao() for _ in range(REPETICOES)])
+                print(f"{rotulo:<12} {nome:<32} {p50:>9.2f} {p95:>9.2f}")
+    cliente.fechar()
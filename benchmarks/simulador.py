@@ -0,0 +1,56 @@
+import time
+
+from gerador_mips import gerar_mips
+from simulador_mips import Simulador, simular
+from benchmarks.comum import ler_exemplo
+from benchmarks.mips import ler_assembly_manual
+
+ENTRADA_EXEMPLO = "3\n1\n1000\n5\n12\n"
+COLUNAS = ('instrucoes', 'reais', 'loads', 'stores', 'desvios_tomados', 'ciclos')
+
+# Programa com laços e chamadas para medir a vazão do simulador
+FIBONACCI = '''
+def fib(n):
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+print(fib(22))
+'''
+
+
+def _linha(nome, estatisticas):
+    return f"{nome:<28}" + "".join(f"{estatisticas[c]:>16}" for c in COLUNAS)
+
+
+def medir_vazao(assembly, entrada=''):
+    """Executa o assembly uma vez e retorna (instruções executadas, segundos de simulação)"""
+    simulador = Simulador(assembly, entrada)
+    inicio = time.perf_counter()
+    simulador.executar()
+    tempo = time.perf_counter() - inicio
+    return simulador.estatisticas()['instrucoes'], tempo
+
+
+if __name__ == "__main__":
+    codigo = ler_exemplo()
+    variantes = [
+        ("assembly.asm (manual)", ler_assembly_manual()),
+        ("gerado, sem otimizações", gerar_mips(codigo, otimizar=False)),
+        ("gerado, 2 registradores", gerar_mips(codigo, limite_registradores=2)),
+        ("gerado", gerar_mips(codigo)),
+    ]
+    print("Contagem dinâmica para main.py com uma opção inválida e depois juros simples")
+    print(f"{'':<28}" + "".join(f"{c:>16}" for c in COLUNAS))
+    saidas = set()
+    for nome, assembly in variantes:
+        saida, estatisticas = simular(assembly, ENTRADA_EXEMPLO)
+        if nome.startswith("gerado"):
+            saidas.add(saida)
+        print(_linha(nome, estatisticas))
+    print(f"Variantes geradas com a mesma saída: {'sim' if len(saidas) == 1 else 'não'}")
+
+    print(f"\n{'Programa':<28}{'Instruções':>12}{'Tempo (s)':>11}{'Instr./s':>12}")
+    for nome, assembly in (("fib(22), gerado", gerar_mips(FIBONACCI)),
+                           ("fib(22), sem otimizações", gerar_mips(FIBONACCI, otimizar=False))):
+        instrucoes, tempo = medir_vazao(assembly)
+        print(f"{nome:<28}{instrucoes:>12}{tempo:>11.3f}{instrucoes / tempo:>12,.0f}")
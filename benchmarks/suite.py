@@ -0,0 +1,190 @@
+import argparse
+import ast
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+from lexical_analysis import analisar_lexico, retorno_analise_lexica_formatado
+from syntatic_analysis import gerar_ast
+from semantic_analysis import (
+    analisar_arvore, analisar_variaveis_nao_utilizadas, analisar_funcoes_nao_chamadas,
+    analisar_tipos_e_operacoes, analisar_escopo, analisar_fluxo_de_controle,
+    analisar_atribuicoes_mortas, analisar_uso_antes_da_definicao,
+    escrever_grafo_arvore_semantica, escrever_grafo_fluxo_de_controle,
+)
+from exportador_dot import exportar_ast_dot
+from benchmarks.gerador_corpus import gerar_corpus
+
+VERSAO_FORMATO = 1
+
+
+def _escrever_em_devnull(escrever):
+    def fase(tree):
+        with open(os.devnull, "w", encoding="utf-8") as f:
+            escrever(tree, f)
+    return fase
+
+
+def _gerar_ast_silenciosa(codigo):
+    # gerar_ast só imprime em caso de erro; a saída é descartada mesmo assim para não afetar o tempo
+    with contextlib.redirect_stdout(io.StringIO()):
+        return gerar_ast(codigo)
+
+
+# Fase -> (função, entrada): 'codigo' recebe o texto do módulo e 'arvore' recebe a AST já pronta
+FASES = {
+    'analisar_lexico': (analisar_lexico, 'codigo'),
+    'retorno_analise_lexica_formatado': (retorno_analise_lexica_formatado, 'codigo'),
+    'gerar_ast': (_gerar_ast_silenciosa, 'codigo'),
+    'analisar_variaveis_nao_utilizadas': (analisar_variaveis_nao_utilizadas, 'arvore'),
+    'analisar_funcoes_nao_chamadas': (analisar_funcoes_nao_chamadas, 'arvore'),
+    'analisar_tipos_e_operacoes': (analisar_tipos_e_operacoes, 'arvore'),
+    'analisar_escopo': (analisar_escopo, 'arvore'),
+    'analisar_fluxo_de_controle': (analisar_fluxo_de_controle, 'arvore'),
+    'analisar_atribuicoes_mortas': (analisar_atribuicoes_mortas, 'arvore'),
+    'analisar_uso_antes_da_definicao': (analisar_uso_antes_da_definicao, 'arvore'),
+    'analisar_arvore': (analisar_arvore, 'arvore'),
+    'grafo_ast': (_escrever_em_devnull(exportar_ast_dot), 'arvore'),
+    'grafo_arvore_semantica': (_escrever_em_devnull(escrever_grafo_arvore_semantica), 'arvore'),
+    'grafo_fluxo_de_controle': (_escrever_em_devnull(escrever_grafo_fluxo_de_controle), 'arvore'),
+}
+
+
+def cronometrar(funcao, entrada, repeticoes):
+    # Uma execução de aquecimento (caches, importações tardias) fica fora da medição
+    funcao(entrada)
+    tempos = []
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        funcao(entrada)
+        tempos.append(time.perf_counter() - inicio)
+    return {
+        'minimo': min(tempos),
+        'mediana': statistics.median(tempos),
+        'repeticoes': repeticoes,
+    }
+
+
+def executar(tamanhos, semente=0, repeticoes=5, fases=None, **opcoes_corpus):
+    """Gera um corpus para cada tamanho (em linhas) e mede cada fase separadamente"""
+    fases = fases or list(FASES)
+    resultados = []
+    for linhas in tamanhos:
+        codigo = gerar_corpus(semente, linhas, **opcoes_corpus)
+        tree = ast.parse(codigo)
+        entradas = {'codigo': codigo, 'arvore': tree}
+        medicoes = {}
+        for nome in fases:
+            funcao, entrada = FASES[nome]
+            medicoes[nome] = cronometrar(funcao, entradas[entrada], repeticoes)
+        resultados.append({
+            'tamanho': linhas,
+            'linhas': len(codigo.splitlines()),
+            'bytes': len(codigo.encode('utf-8')),
+            'nos': sum(1 for _ in ast.walk(tree)),
+            'fases': medicoes,
+        })
+        print(f"  {linhas} linhas: {sum(m['minimo'] for m in medicoes.values()):.3f}s no total", file=sys.stderr)
+    return {
+        'formato': VERSAO_FORMATO,
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'semente': semente,
+        'corpus': opcoes_corpus,
+        'resultados': resultados,
+    }
+
+
+def comparar(base, novo, limiar=0.10, metrica='minimo'):
+    """
+    Compara duas execuções fase a fase (para cada tamanho de corpus presente nas duas).
+    Retorna uma lista de (tamanho, fase, tempo_base, tempo_novo, razao, situacao), com situacao
+    'regressão' quando o novo tempo passa de (1 + limiar) vezes o da base e 'melhora' no caso oposto.
+    """
+    novos = {r['tamanho']: r for r in novo['resultados']}
+    comparacoes = []
+    for resultado_base in base['resultados']:
+        resultado_novo = novos.get(resultado_base['tamanho'])
+        if resultado_novo is None:
+            continue
+        for fase, medicao in resultado_base['fases'].items():
+            if fase not in resultado_novo['fases']:
+                continue
+            tempo_base = medicao[metrica]
+            tempo_novo = resultado_novo['fases'][fase][metrica]
+            razao = tempo_novo / tempo_base if tempo_base else float('inf')
+            if razao > 1 + limiar:
+                situacao = 'regressão'
+            elif razao < 1 - limiar:
+                situacao = 'melhora'
+            else:
+                situacao = 'igual'
+            comparacoes.append((resultado_base['tamanho'], fase, tempo_base, tempo_novo, razao, situacao))
+    return comparacoes
+
+
+def _ler_json(caminho):
+    with open(caminho, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark por fase das análises sobre um corpus sintético")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    p_executar = subparsers.add_parser('executar', help="mede as fases e grava o resultado em JSON")
+    p_executar.add_argument('-o', '--saida', default='benchmark.json')
+    p_executar.add_argument('--tamanhos', default='200,1000,5000', help="tamanhos do corpus em linhas, separados por vírgula")
+    p_executar.add_argument('--semente', type=int, default=0)
+    p_executar.add_argument('--repeticoes', type=int, default=5)
+    p_executar.add_argument('--fases', default=None, help=f"subconjunto de: {', '.join(FASES)}")
+    p_executar.add_argument('--funcoes', type=int, default=10)
+    p_executar.add_argument('--profundidade', type=int, default=3)
+    p_executar.add_argument('--strings', type=float, default=0.3)
+    p_executar.add_argument('--fstrings', type=float, default=0.2)
+
+    p_comparar = subparsers.add_parser('comparar', help="compara duas execuções e aponta regressões")
+    p_comparar.add_argument('base')
+    p_comparar.add_argument('novo')
+    p_comparar.add_argument('--limiar', type=float, default=0.10, help="variação relativa tolerada (padrão: 10%%)")
+    p_comparar.add_argument('--metrica', choices=['minimo', 'mediana'], default='minimo')
+
+    args = parser.parse_args(argv)
+
+    if args.comando == 'executar':
+        fases = args.fases.split(',') if args.fases else None
+        desconhecidas = set(fases or []) - set(FASES)
+        if desconhecidas:
+            parser.error(f"fases desconhecidas: {', '.join(sorted(desconhecidas))}")
+        resultado = executar(
+            [int(t) for t in args.tamanhos.split(',')], args.semente, args.repeticoes, fases,
+            funcoes=args.funcoes, profundidade=args.profundidade,
+            densidade_strings=args.strings, densidade_fstrings=args.fstrings,
+        )
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+        print(f"Resultados salvos em {args.saida}")
+        return 0
+
+    comparacoes = comparar(_ler_json(args.base), _ler_json(args.novo), args.limiar, args.metrica)
+    print(f"{'Tamanho':>7} {'Fase':<36} {'Base (ms)':>10} {'Novo (ms)':>10} {'Razão':>7}")
+    for tamanho, fase, tempo_base, tempo_novo, razao, situacao in comparacoes:
+        marca = {'regressão': '❌ regressão', 'melhora': '✅ melhora'}.get(situacao, '')
+        print(f"{tamanho:>7} {fase:<36} {tempo_base * 1000:>10.3f} {tempo_novo * 1000:>10.3f} {razao:>6.2f}x {marca}")
+    regressoes = sum(c[5] == 'regressão' for c in comparacoes)
+    print(f"\n{regressoes} regressões acima de {args.limiar:.0%}")
+    # Código de saída diferente de zero para que a comparação possa falhar uma integração contínua
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
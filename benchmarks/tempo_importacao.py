@@ -0,0 +1,66 @@
+import os
+import re
+import subprocess
+import sys
+
+from benchmarks.comum import RAIZ
+
+# Soma dos tempos próprios de importação (-X importtime) permitida para cada subcomando
+# de análise, já descontado o interpretador vazio; a medição aqui ficou entre 45 e 70 ms, o
+# orçamento deixa alguma folga para máquinas mais lentas
+ORCAMENTO_MS = {'lexico': 80, 'sintaxe': 80, 'semantica': 90}
+
+# Dependências de renderização e relatórios, que as análises não devem carregar
+PROIBIDOS = ('graphviz', 'astpretty', 'fpdf', 'docx', 'pandas', 'pyarrow')
+
+_LINHA = re.compile(r"import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+
+def tempos_importacao(comando):
+    """Executa o comando com -X importtime e retorna {módulo: (próprio_ms, acumulado_ms)}"""
+    processo = subprocess.run([sys.executable, "-X", "importtime", *comando], cwd=RAIZ,
+                              capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=RAIZ))
+    tempos = {}
+    for linha in processo.stderr.splitlines():
+        encontrado = _LINHA.match(linha)
+        if encontrado:
+            proprio, acumulado, _, modulo = encontrado.groups()
+            tempos[modulo] = (int(proprio) / 1000, int(acumulado) / 1000)
+    return tempos
+
+
+def proibidos_importados(tempos):
+    return sorted(m for m in tempos if m.split('.')[0] in PROIBIDOS)
+
+
+def mais_lentos(tempos, quantidade=5):
+    return sorted(tempos.items(), key=lambda item: item[1][0], reverse=True)[:quantidade]
+
+
+if __name__ == "__main__":
+    # Todo o interpretador vazio entra na conta, então ele é medido à parte como referência
+    base = sum(proprio for proprio, _ in tempos_importacao(["-c", "pass"]).values())
+    print(f"Interpretador vazio: {base:.1f} ms\n")
+
+    falhas = []
+    print(f"{'Subcomando':<12} {'Módulos':>8} {'Importação (ms)':>16} {'Orçamento (ms)':>15}  Mais lentos")
+    for subcomando in ('lexico', 'sintaxe', 'semantica'):
+        tempos = tempos_importacao(["cli.py", subcomando, "main.py"])
+        total = sum(proprio for proprio, _ in tempos.values()) - base
+        lentos = ", ".join(f"{modulo} {proprio:.1f}" for modulo, (proprio, _) in mais_lentos(tempos))
+        print(f"{subcomando:<12} {len(tempos):>8} {total:>16.1f} {ORCAMENTO_MS[subcomando]:>15}  {lentos}")
+        if total > ORCAMENTO_MS[subcomando]:
+            falhas.append(f"{subcomando} levou {total:.1f} ms para importar (orçamento {ORCAMENTO_MS[subcomando]} ms)")
+        proibidos = proibidos_importados(tempos)
+        if proibidos:
+            falhas.append(f"{subcomando} importou {', '.join(proibidos)}")
+
+    # grafo e relatorio não têm orçamento: só mostram quanto custam as dependências que carregam
+    for comando in (["-c", "import agendador_renderizacao, syntatic_analysis"], ["-c", "import gerar_tabela_pdf"]):
+        tempos = tempos_importacao(comando)
+        total = sum(proprio for proprio, _ in tempos.values()) - base
+        print(f"{comando[1]:<52} {total:>8.1f} ms")
+
+    if falhas:
+        raise SystemExit("❌ " + "\n❌ ".join(falhas))
+    print("\n✅ Análises dentro do orçamento e sem dependências de renderização ou relatórios")
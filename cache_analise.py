@@ -0,0 +1,148 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import tokenize
+from collections import OrderedDict
+
+from tabela_tokens import analisar_lexico_compacto
+from syntatic_analysis import analisar_sintaxe
+from semantic_analysis import analisar_arvore
+
+# Deve mudar sempre que a saída de alguma análise mudar, para invalidar o que já está em disco
+VERSAO_ANALISADOR = "3"
+
+_EXTENSAO = ".pkl"
+
+
+class CacheAnalise:
+    """
+    Cache em disco dos resultados de análise, endereçado pelo hash do código-fonte
+    e pela versão do analisador. Cada entrada é um arquivo pickle; quando o total passa
+    de limite_bytes, as entradas usadas há mais tempo são removidas (LRU pelo mtime).
+    """
+
+    def __init__(self, diretorio, limite_bytes=256 * 1024 * 1024):
+        self.diretorio = diretorio
+        self.limite_bytes = limite_bytes
+        self.acertos = 0
+        self.falhas = 0
+        self.gravacoes = 0
+        self.remocoes = 0
+        os.makedirs(diretorio, exist_ok=True)
+        self._indice = OrderedDict()
+        self._total_bytes = 0
+        self._carregar_indice()
+
+    @staticmethod
+    def chave(codigo_fonte):
+        conteudo = f"{VERSAO_ANALISADOR}\0{codigo_fonte}".encode('utf-8', 'surrogatepass')
+        return hashlib.sha256(conteudo).hexdigest()
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, chave + _EXTENSAO)
+
+    def _carregar_indice(self):
+        # Do menos para o mais recentemente usado
+        entradas = []
+        for nome in os.listdir(self.diretorio):
+            if nome.endswith(_EXTENSAO):
+                info = os.stat(os.path.join(self.diretorio, nome))
+                entradas.append((info.st_mtime, nome[:-len(_EXTENSAO)], info.st_size))
+        entradas.sort()
+        self._indice.clear()
+        self._total_bytes = 0
+        for _, chave, tamanho in entradas:
+            self._indice[chave] = tamanho
+            self._total_bytes += tamanho
+
+    def obter(self, chave):
+        """Retorna a entrada guardada ou None"""
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, "rb") as f:
+                entrada = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self.falhas += 1
+            return None
+        self.acertos += 1
+        # Marca a entrada como usada agora
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass
+        if chave in self._indice:
+            self._indice.move_to_end(chave)
+        return entrada
+
+    def guardar(self, chave, entrada):
+        try:
+            dados = pickle.dumps(entrada, protocol=pickle.HIGHEST_PROTOCOL)
+        except (RecursionError, pickle.PicklingError):
+            # Árvores profundas demais para o pickle simplesmente não são guardadas
+            return
+        # Grava num temporário e renomeia, para que leitores concorrentes nunca vejam um arquivo pela metade
+        descritor, temporario = tempfile.mkstemp(dir=self.diretorio, suffix=".tmp")
+        with os.fdopen(descritor, "wb") as f:
+            f.write(dados)
+        os.replace(temporario, self._caminho(chave))
+        self.gravacoes += 1
+        self._total_bytes += len(dados) - self._indice.pop(chave, 0)
+        self._indice[chave] = len(dados)
+        self._remover_excedente()
+
+    def _remover_excedente(self):
+        while self._total_bytes > self.limite_bytes and len(self._indice) > 1:
+            chave, tamanho = self._indice.popitem(last=False)
+            self._total_bytes -= tamanho
+            try:
+                os.remove(self._caminho(chave))
+                self.remocoes += 1
+            except OSError:
+                pass
+
+    def compactar(self):
+        """Relê o diretório (que pode ter sido alterado por outros processos) e aplica o limite de tamanho"""
+        self._carregar_indice()
+        self._remover_excedente()
+
+    def estatisticas(self):
+        consultas = self.acertos + self.falhas
+        return {
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+            'gravacoes': self.gravacoes,
+            'remocoes': self.remocoes,
+            'entradas': len(self._indice),
+            'bytes': self._total_bytes,
+        }
+
+
+def analisar_fonte(codigo_fonte, cache=None):
+    """
+    Retorna um dict com 'tokens' (TabelaTokens), 'arvore', 'erro_sintaxe' e 'semantica',
+    consultando o cache antes de tokenizar, analisar a sintaxe e executar as regras.
+    """
+    chave = None
+    if cache is not None:
+        chave = cache.chave(codigo_fonte)
+        entrada = cache.obter(chave)
+        if entrada is not None:
+            return entrada
+
+    try:
+        tokens = analisar_lexico_compacto(codigo_fonte)
+    except (tokenize.TokenError, SyntaxError):
+        # O erro é relatado com mais detalhes pela análise sintática logo abaixo
+        tokens = None
+    arvore, erro = analisar_sintaxe(codigo_fonte)
+    entrada = {
+        'tokens': tokens,
+        'arvore': arvore,
+        'erro_sintaxe': erro,
+        'semantica': analisar_arvore(arvore)[0] if arvore is not None else None,
+    }
+    if cache is not None:
+        cache.guardar(chave, entrada)
+    return entrada
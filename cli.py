@@ -0,0 +1,128 @@
+"""
+Ponto de entrada único: python cli.py {lexico,sintaxe,semantica,grafo,relatorio} arquivo.py
+
+Cada subcomando importa só os módulos de que precisa, dentro da própria função: as análises
+não carregam graphviz, fpdf, python-docx nem pyarrow, que ficam para grafo e relatorio.
+"""
+import argparse
+import sys
+
+
+def _lexico(args):
+    from lexical_analysis import abrir_fonte_mapeada, iterar_analise_lexica, iterar_analise_lexica_formatada
+
+    with abrir_fonte_mapeada(args.arquivo) as fonte:
+        if not args.tabela:
+            for linha in iterar_analise_lexica_formatada(fonte):
+                print(linha)
+            return 0
+        print(f"{'Nome':<20} {'Token':<40} {'Tipo':<20} {'Descrição':<40} {'Linha':<5}")
+        print('-' * 125)
+        for t in iterar_analise_lexica(fonte):
+            print(f"{t['Nome']:<20} {t['Token']:<40} {t['Tipo']:<20} {t['Descrição']:<40} {t['Linha']:<5}")
+    return 0
+
+
+def _sintaxe(args):
+    import ast
+    from syntatic_analysis import analisar_sintaxe
+
+    with open(args.arquivo, "r", encoding="utf-8") as f:
+        arvore, erro = analisar_sintaxe(f.read())
+    if erro is not None:
+        print(f"❌ Erro de sintaxe na linha {erro['linha']}, coluna {erro['coluna']}: {erro['texto']}")
+        print(f"Detalhes: {erro['mensagem']}")
+        return 1
+    print("✅ Código sintaticamente correto!")
+    if args.arvore:
+        print(ast.dump(arvore, indent=2))
+    return 0
+
+
+def _semantica(args):
+    from semantic_analysis import analisar_codigo
+
+    analisar_codigo(args.arquivo, exibir_tempos=args.tempos)
+    if args.desempenho:
+        import ast
+        from analise_desempenho import analisar_desempenho, formatar_achados
+
+        with open(args.arquivo, "r", encoding="utf-8") as f:
+            achados = analisar_desempenho(ast.parse(f.read()))
+        print("\nDesempenho:")
+        print(formatar_achados(achados) or "Nenhum problema de desempenho encontrado.")
+    return 0
+
+
+def _grafo(args):
+    import ast
+    from agendador_renderizacao import AgendadorRenderizacao, gerar_diagramas
+
+    with open(args.arquivo, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    with AgendadorRenderizacao(formato=args.formato) as agendador:
+        gerar_diagramas(tree, args.saida, agendador, args.limite_nos)
+    print(f"{agendador.renderizados} diagramas renderizados em {args.saida}, {agendador.pulados} inalterados")
+    return 0
+
+
+def _relatorio(args):
+    import gerar_tabela_pdf
+    from lexical_analysis import abrir_fonte_mapeada, iterar_analise_lexica
+
+    exportadores = {
+        'pdf': gerar_tabela_pdf.gerar_pdf_tabela,
+        'docx': gerar_tabela_pdf.gerar_docx_tabela,
+        'csv': gerar_tabela_pdf.exportar_csv,
+        'jsonl': gerar_tabela_pdf.exportar_jsonl,
+        'parquet': gerar_tabela_pdf.exportar_parquet,
+    }
+    saida = args.saida or f"tabela_tokens.{args.formato}"
+    with abrir_fonte_mapeada(args.arquivo) as fonte:
+        exportadores[args.formato](iterar_analise_lexica(fonte), saida)
+    if args.formato not in ('pdf', 'docx'):
+        # pdf e docx já avisam onde a tabela foi salva
+        print(f"Tabela salva em {saida}")
+    return 0
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description="Analisador de código Python: léxico, sintaxe, semântica, grafos e relatórios")
+    subcomandos = parser.add_subparsers(dest='subcomando', required=True)
+
+    lexico = subcomandos.add_parser('lexico', help="análise léxica")
+    lexico.add_argument('--tabela', action='store_true', help="mostra a tabela de tokens em vez das linhas formatadas")
+    lexico.set_defaults(executar=_lexico)
+
+    sintaxe = subcomandos.add_parser('sintaxe', help="análise sintática")
+    sintaxe.add_argument('--arvore', action='store_true', help="mostra a AST")
+    sintaxe.set_defaults(executar=_sintaxe)
+
+    semantica = subcomandos.add_parser('semantica', help="análise semântica")
+    semantica.add_argument('--tempos', action='store_true', help="mostra o tempo de cada regra")
+    semantica.add_argument('--desempenho', action='store_true', help="também procura problemas de desempenho")
+    semantica.set_defaults(executar=_semantica)
+
+    grafo = subcomandos.add_parser('grafo', help="renderiza os diagramas (AST, árvore semântica, fluxo de controle)")
+    grafo.add_argument('--saida', default="./images/diagramas", help="diretório dos diagramas")
+    grafo.add_argument('--formato', choices=['png', 'svg'], default='png')
+    grafo.add_argument('--limite-nos', type=int, default=2000, help="nós no diagrama da AST antes de resumir o restante")
+    grafo.set_defaults(executar=_grafo)
+
+    relatorio = subcomandos.add_parser('relatorio', help="exporta a tabela de tokens")
+    relatorio.add_argument('--formato', choices=['pdf', 'docx', 'csv', 'jsonl', 'parquet'], default='pdf')
+    relatorio.add_argument('--saida', default=None, help="arquivo de saída (padrão: tabela_tokens.<formato>)")
+    relatorio.set_defaults(executar=_relatorio)
+
+    for subparser in (lexico, sintaxe, semantica, grafo, relatorio):
+        subparser.add_argument('arquivo', nargs='?', default="main.py", help="arquivo analisado (padrão: main.py)")
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    return args.executar(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
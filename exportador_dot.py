@@ -0,0 +1,205 @@
+import ast
+import os
+import subprocess
+import tempfile
+from collections import deque
+
+from instrumentacao import contar, instrumentar
+
+_FUNCOES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+def _citar(texto):
+    """Texto entre aspas no formato DOT (quebras de linha viram \\n)"""
+    texto = str(texto).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return f'"{texto}"'
+
+
+def _atributos(atributos):
+    if not atributos:
+        return ''
+    return ' [' + ' '.join(f'{chave}={_citar(valor)}' for chave, valor in atributos.items()) + ']'
+
+
+class EscritorDot:
+    """
+    Escreve um grafo DOT direto no arquivo, um nó ou aresta por vez, sem montar o grafo na memória.
+    Os identificadores dos nós são inteiros sequenciais.
+    """
+
+    def __init__(self, arquivo, comentario=None, atributos_no=None):
+        self.arquivo = arquivo
+        self._proximo_id = 0
+        if comentario:
+            arquivo.write(f"// {comentario}\n")
+        arquivo.write("digraph {\n")
+        if atributos_no:
+            arquivo.write(f"\tnode{_atributos(atributos_no)}\n")
+
+    def novo_id(self):
+        node_id = str(self._proximo_id)
+        self._proximo_id += 1
+        return node_id
+
+    @property
+    def total_nos(self):
+        return self._proximo_id
+
+    def no(self, rotulo, node_id=None, **atributos):
+        """Escreve um nó e retorna seu identificador"""
+        if node_id is None:
+            node_id = self.novo_id()
+        atributos = {'label': rotulo, **atributos}
+        self.arquivo.write(f"\t{node_id}{_atributos(atributos)}\n")
+        return node_id
+
+    def aresta(self, origem, destino, **atributos):
+        self.arquivo.write(f"\t{origem} -> {destino}{_atributos(atributos)}\n")
+
+    def abrir_subgrafo(self, nome, **atributos):
+        """Abre um cluster: os nós e arestas escritos até fechar_subgrafo() ficam agrupados nele"""
+        self.arquivo.write(f"\tsubgraph {_citar('cluster_' + str(nome))} {{\n")
+        for chave, valor in atributos.items():
+            self.arquivo.write(f"\t\t{chave}={_citar(valor)}\n")
+
+    def fechar_subgrafo(self):
+        self.arquivo.write("\t}\n")
+
+    def fechar(self):
+        self.arquivo.write("}\n")
+
+
+def executar_sem_recursao(gerador):
+    """
+    Executa uma função recursiva escrita como gerador, usando uma pilha explícita.
+    Cada chamada recursiva é feita com `resultado = yield funcao(...)`, e o return
+    do gerador é devolvido a quem fez o yield. A ordem de execução é a mesma da versão recursiva.
+    """
+    pilha = [gerador]
+    valor = None
+    while pilha:
+        try:
+            chamada = pilha[-1].send(valor)
+        except StopIteration as fim:
+            pilha.pop()
+            valor = fim.value
+            continue
+        pilha.append(chamada)
+        valor = None
+    return valor
+
+
+def tamanhos_subarvores(tree):
+    """Número de nós de cada subárvore (chaveado pelo próprio nó), calculado sem recursão"""
+    tamanhos = {}
+    pilha = [(tree, False)]
+    while pilha:
+        node, visitado = pilha.pop()
+        if visitado:
+            tamanhos[node] = 1 + sum(tamanhos[filho] for filho in ast.iter_child_nodes(node))
+        else:
+            pilha.append((node, True))
+            pilha.extend((filho, False) for filho in ast.iter_child_nodes(node))
+    return tamanhos
+
+
+@instrumentar('grafo.ast')
+def exportar_ast_dot(tree, arquivo, profundidade_maxima=None, limite_nos=None, separar_funcoes=False):
+    """
+    Escreve a AST em formato DOT no arquivo, iterativamente (sem limite de recursão).
+    - profundidade_maxima: abaixo dessa profundidade, os descendentes viram um único nó resumo;
+    - limite_nos: depois de escrever esse número de nós, os filhos restantes de cada nó
+      são agrupados em um único nó resumo;
+    - separar_funcoes: funções internas não são expandidas, aparecem como um nó de referência.
+    Retorna a lista das funções não expandidas (para exportá-las em grafos próprios).
+    """
+    resumir = profundidade_maxima is not None or limite_nos is not None
+    tamanhos = tamanhos_subarvores(tree) if resumir else None
+    escritor = EscritorDot(arquivo, atributos_no={'shape': 'box'})
+    separadas = []
+
+    raiz_id = escritor.no(type(tree).__name__)
+    pilha = [(raiz_id, iter(ast.iter_child_nodes(tree)), 1)]
+    while pilha:
+        pai_id, filhos, profundidade = pilha[-1]
+        filho = next(filhos, None)
+        if filho is None:
+            pilha.pop()
+            continue
+
+        if limite_nos is not None and escritor.total_nos >= limite_nos:
+            omitidos = tamanhos[filho] + sum(tamanhos[n] for n in filhos)
+            resumo_id = escritor.no(f"… ({omitidos} nós omitidos)", style='dashed')
+            escritor.aresta(pai_id, resumo_id)
+            pilha.pop()
+            continue
+
+        if separar_funcoes and isinstance(filho, _FUNCOES):
+            separadas.append(filho)
+            node_id = escritor.no(f"{type(filho).__name__}: {filho.name}\n(grafo separado)", style='dashed')
+            escritor.aresta(pai_id, node_id)
+            continue
+
+        node_id = escritor.no(type(filho).__name__)
+        escritor.aresta(pai_id, node_id)
+        if profundidade_maxima is not None and profundidade >= profundidade_maxima:
+            descendentes = tamanhos[filho] - 1
+            if descendentes:
+                resumo_id = escritor.no(f"… ({descendentes} nós)", style='dashed')
+                escritor.aresta(node_id, resumo_id)
+            continue
+        pilha.append((node_id, iter(ast.iter_child_nodes(filho)), profundidade + 1))
+
+    escritor.fechar()
+    contar(nos=escritor.total_nos)
+    return separadas
+
+
+def exportar_ast_por_funcao(tree, diretorio, nome_base='ast_tree', **opcoes):
+    """
+    Divide a AST em um grafo DOT por função: o arquivo do módulo mostra cada função como
+    um nó de referência e cada função (inclusive as aninhadas) ganha seu próprio arquivo.
+    Retorna os caminhos dos arquivos escritos.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    caminhos = []
+    pendentes = deque([(nome_base, tree)])
+    usados = set()
+    while pendentes:
+        nome, node = pendentes.popleft()
+        while nome in usados:
+            nome += '_'
+        usados.add(nome)
+        caminho = os.path.join(diretorio, f"{nome}.dot")
+        with open(caminho, "w", encoding="utf-8") as f:
+            # Cada função é a raiz do próprio grafo; só as funções aninhadas nela são separadas
+            separadas = exportar_ast_dot(node, f, separar_funcoes=True, **opcoes)
+        caminhos.append(caminho)
+        pendentes.extend((f"{nome}.{funcao.name}", funcao) for funcao in separadas)
+    return caminhos
+
+
+@instrumentar('renderizacao.dot')
+def renderizar_dot(caminho_dot, caminho_saida, formato='png'):
+    """Renderiza um arquivo DOT com o executável dot do Graphviz"""
+    subprocess.run(['dot', f'-T{formato}', caminho_dot, '-o', caminho_saida], check=True)
+    return caminho_saida
+
+
+def renderizar_grafo(escrever, caminho_saida, formato='png', agendador=None):
+    """
+    Chama escrever(arquivo) para gravar o DOT em um arquivo temporário, renderiza em
+    caminho_saida e apaga o temporário.
+    Com um AgendadorRenderizacao, a renderização é apenas agendada e o Future é retornado.
+    """
+    if agendador is not None:
+        return agendador.agendar(escrever, caminho_saida, formato)
+    diretorio = os.path.dirname(caminho_saida) or '.'
+    os.makedirs(diretorio, exist_ok=True)
+    descritor, caminho_dot = tempfile.mkstemp(dir=diretorio, suffix='.dot')
+    try:
+        with os.fdopen(descritor, "w", encoding="utf-8") as f:
+            escrever(f)
+        return renderizar_dot(caminho_dot, caminho_saida, formato)
+    finally:
+        os.remove(caminho_dot)
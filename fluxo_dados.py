@@ -0,0 +1,381 @@
+import ast
+
+from grafo_fluxo import LIGAR, DESLIGAR, GrafoFluxo, construir_grafo_fluxo
+from tabela_simbolos import NOMES_EMBUTIDOS
+
+# Eventos de um bloco, em ordem de execução: (tipo, índice, nó)
+#   USO: leitura da variável de índice `índice`
+#   DEF: definição de índice `índice` (cada ponto de definição tem o seu)
+#   APAGAR: a variável de índice `índice` deixa de estar definida (del, fim de um except ... as)
+USO = 0
+DEF = 1
+APAGAR = 2
+
+_FUNCOES = (ast.FunctionDef, ast.AsyncFunctionDef)
+_COMPREENSOES = (ast.ListComp, ast.SetComp, ast.GeneratorExp)
+# Nós cujos filhos não são avaliados na ordem dos campos
+_ORDEM_PROPRIA = frozenset([
+    ast.Assign, ast.AnnAssign, ast.NamedExpr, ast.ListComp, ast.SetComp, ast.GeneratorExp,
+    ast.DictComp, ast.Dict, ast.Lambda, ast.FunctionDef, ast.AsyncFunctionDef,
+])
+
+
+def resolver_para_frente(grafo, gen, kill, inicial):
+    """
+    Análise para a frente com união nas junções, sobre inteiros usados como conjuntos de bits:
+    saida[b] = gen[b] | (entrada[b] & ~kill[b]), com entrada[ENTRADA] = inicial.
+    Usa uma lista de trabalho na pós-ordem inversa; retorna (entrada, saida) por bloco.
+    """
+    ordem = grafo.pos_ordem()
+    ordem.reverse()
+    entrada = [0] * len(grafo)
+    saida = [0] * len(grafo)
+    entrada[GrafoFluxo.ENTRADA] = inicial
+    predecessores = grafo.predecessores
+    sucessores = grafo.sucessores
+    pendentes = set(ordem)
+    fila = list(reversed(ordem))
+    while fila:
+        bloco = fila.pop()
+        pendentes.discard(bloco)
+        valor = inicial if bloco == GrafoFluxo.ENTRADA else 0
+        for predecessor in predecessores[bloco]:
+            valor |= saida[predecessor]
+        entrada[bloco] = valor
+        novo = gen[bloco] | (valor & ~kill[bloco])
+        if novo != saida[bloco]:
+            saida[bloco] = novo
+            for sucessor in sucessores[bloco]:
+                if sucessor not in pendentes:
+                    pendentes.add(sucessor)
+                    fila.append(sucessor)
+    return entrada, saida
+
+
+def resolver_para_tras(grafo, gen, kill, final):
+    """
+    Análise para trás com união nas junções: entrada[b] = gen[b] | (saida[b] & ~kill[b]),
+    com saida[SAIDA] = final, só sobre os blocos alcançáveis. Retorna (entrada, saida) por bloco.
+    """
+    ordem = grafo.pos_ordem()
+    entrada = [0] * len(grafo)
+    saida = [0] * len(grafo)
+    predecessores = grafo.predecessores
+    sucessores = grafo.sucessores
+    pendentes = set(ordem)
+    # Só os blocos alcançáveis interessam; os predecessores inalcançáveis ficam com 0
+    alcancaveis = frozenset(ordem)
+    # Na pós-ordem, os sucessores tendem a ser resolvidos antes dos predecessores
+    fila = list(reversed(ordem))
+    while fila:
+        bloco = fila.pop()
+        pendentes.discard(bloco)
+        valor = final if bloco == GrafoFluxo.SAIDA else 0
+        for sucessor in sucessores[bloco]:
+            valor |= entrada[sucessor]
+        saida[bloco] = valor
+        novo = gen[bloco] | (valor & ~kill[bloco])
+        if novo != entrada[bloco]:
+            entrada[bloco] = novo
+            for predecessor in predecessores[bloco]:
+                if predecessor not in pendentes and predecessor in alcancaveis:
+                    pendentes.add(predecessor)
+                    fila.append(predecessor)
+    return entrada, saida
+
+
+class _Eventos:
+    """
+    Converte os elementos dos blocos em eventos USO/DEF/APAGAR das variáveis analisadas,
+    na ordem em que o Python avalia cada expressão. Corpos de funções e lambdas internas
+    não são percorridos (rodam depois); corpos de classes e compreensões são (rodam na hora).
+    """
+
+    def __init__(self, tabela, variaveis, definicoes, variavel_da_definicao):
+        self.tabela = tabela
+        # Simbolo -> índice da variável
+        self.variaveis = variaveis
+        # nó que define -> índice da definição
+        self.definicoes = definicoes
+        self.variavel_da_definicao = variavel_da_definicao
+        # Definições que vêm de atribuições (as únicas apontadas como atribuição morta)
+        self.atribuicoes = set()
+
+    def do_bloco(self, elementos):
+        eventos = []
+        for tipo, no, _ in elementos:
+            if tipo == LIGAR:
+                definicao = self.definicoes.get(no)
+                if definicao is not None:
+                    eventos.append((DEF, definicao, no))
+            elif tipo == DESLIGAR:
+                definicao = self.definicoes.get(no)
+                if definicao is not None:
+                    eventos.append((APAGAR, definicao, no))
+            else:
+                self._percorrer(no, eventos)
+        return eventos
+
+    def _ordem_filhos(self, no):
+        """Filhos na ordem de avaliação (quando ela difere da ordem dos campos do nó)"""
+        if type(no) not in _ORDEM_PROPRIA:
+            return ast.iter_child_nodes(no)
+        if isinstance(no, ast.Assign):
+            return [no.value, *no.targets]
+        if isinstance(no, ast.AnnAssign):
+            return [no.annotation] + ([no.value, no.target] if no.value is not None else [])
+        if isinstance(no, ast.NamedExpr):
+            return [no.value, no.target]
+        if isinstance(no, _COMPREENSOES):
+            return [*no.generators, no.elt]
+        if isinstance(no, ast.DictComp):
+            return [*no.generators, no.key, no.value]
+        if isinstance(no, ast.Dict):
+            return [filho for par in zip(no.keys, no.values) for filho in par if filho is not None]
+        if isinstance(no, ast.Lambda):
+            return [*no.args.defaults, *(d for d in no.args.kw_defaults if d is not None)]
+        if isinstance(no, _FUNCOES):
+            argumentos = no.args
+            anotacoes = [a.annotation for a in argumentos.posonlyargs + argumentos.args + argumentos.kwonlyargs
+                         + [argumentos.vararg, argumentos.kwarg] if a is not None and a.annotation is not None]
+            return [*no.decorator_list, *argumentos.defaults, *(d for d in argumentos.kw_defaults if d is not None),
+                    *anotacoes, *([no.returns] if no.returns is not None else [])]
+        return list(ast.iter_child_nodes(no))
+
+    def _percorrer(self, raiz, eventos):
+        resolver = self.tabela.resolver
+        variaveis = self.variaveis
+        definicoes = self.definicoes
+        pilha = [raiz]
+        while pilha:
+            no = pilha.pop()
+            if type(no) is tuple:
+                # Marcador: a definição acontece depois dos filhos
+                eventos.append(no)
+                continue
+            if isinstance(no, ast.Name):
+                if isinstance(no.ctx, ast.Load):
+                    variavel = variaveis.get(resolver(no))
+                    if variavel is not None:
+                        eventos.append((USO, variavel, no))
+                else:
+                    definicao = definicoes.get(no)
+                    if definicao is not None:
+                        if isinstance(no.ctx, ast.Del):
+                            eventos.append((USO, self.variavel_da_definicao[definicao], no))
+                            eventos.append((APAGAR, definicao, no))
+                        else:
+                            eventos.append((DEF, definicao, no))
+                continue
+            if isinstance(no, ast.AugAssign):
+                alvo = no.target
+                definicao = definicoes.get(alvo) if isinstance(alvo, ast.Name) else None
+                if definicao is not None:
+                    self.atribuicoes.add(definicao)
+                    # x += v lê x, avalia v e só então escreve x
+                    pilha.append((DEF, definicao, alvo))
+                    pilha.append(no.value)
+                    eventos.append((USO, self.variavel_da_definicao[definicao], alvo))
+                else:
+                    pilha.append(no.value)
+                    pilha.append(alvo)
+                continue
+            if isinstance(no, (ast.Assign, ast.AnnAssign, ast.NamedExpr)):
+                alvos = no.targets if isinstance(no, ast.Assign) else [no.target]
+                for alvo in alvos:
+                    if isinstance(alvo, ast.Name) and alvo in definicoes and getattr(no, 'value', None) is not None:
+                        self.atribuicoes.add(definicoes[alvo])
+            definicao = definicoes.get(no)
+            if definicao is not None:
+                pilha.append((DEF, definicao, no))
+            filhos = list(self._ordem_filhos(no))
+            filhos.reverse()
+            pilha.extend(filhos)
+
+
+class FluxoDeDados:
+    """
+    Liveness e definições que alcançam, sobre o grafo de fluxo de um escopo (módulo ou função),
+    para as variáveis locais daquele escopo. Variáveis lidas ou escritas por escopos internos
+    adiados (funções, lambdas) ficam de fora: podem ser usadas a qualquer momento.
+    """
+
+    def __init__(self, grafo, escopo, tabela):
+        self.grafo = grafo
+        self.escopo = escopo
+        self.tabela = tabela
+        execucao = escopo.funcao_envolvente()
+
+        self.nomes = []
+        variaveis = {}
+        definicoes = {}
+        self.no_da_definicao = []
+        self.variavel_da_definicao = []
+        self.definicoes_da_variavel = []
+        # Uma pseudo-definição por variável representa "ainda não definida" (ou apagada)
+        self.indefinida = []
+        for simbolo in escopo.simbolos.values():
+            nos = simbolo.definicoes + simbolo.usos
+            if any(tabela.escopo_de(n).funcao_envolvente() is not execucao for n in nos):
+                continue
+            indice = len(self.nomes)
+            variaveis[simbolo] = indice
+            self.nomes.append(simbolo.nome)
+            # As definições de uma variável têm índices contíguos, e a máscara sai em uma operação só
+            primeira = len(self.no_da_definicao)
+            self.indefinida.append(primeira)
+            self.no_da_definicao.append(None)
+            for no in simbolo.definicoes:
+                definicoes[no] = len(self.no_da_definicao)
+                self.no_da_definicao.append(no)
+            self.variavel_da_definicao.extend([indice] * (len(self.no_da_definicao) - primeira))
+            self.definicoes_da_variavel.append(((1 << (len(self.no_da_definicao) - primeira)) - 1) << primeira)
+
+        extrator = _Eventos(tabela, variaveis, definicoes, self.variavel_da_definicao)
+        self.eventos = [extrator.do_bloco(elementos) for elementos in grafo.elementos]
+        self.atribuicoes = extrator.atribuicoes
+
+    def vivas(self):
+        """(entrada, saida) de liveness por bloco: bit v ligado = variável v ainda será lida"""
+        usos, mortas = [], []
+        variavel_da_definicao = self.variavel_da_definicao
+        for eventos in self.eventos:
+            uso = morta = 0
+            for tipo, indice, _ in eventos:
+                if tipo == USO:
+                    if not (morta >> indice) & 1:
+                        uso |= 1 << indice
+                else:
+                    morta |= 1 << variavel_da_definicao[indice]
+            usos.append(uso)
+            mortas.append(morta)
+        # No módulo, as variáveis continuam visíveis para quem o importa
+        final = (1 << len(self.nomes)) - 1 if self.escopo.tipo == 'modulo' else 0
+        return resolver_para_tras(self.grafo, usos, mortas, final)
+
+    def definicoes_que_alcancam(self):
+        """(entrada, saida) por bloco: bit d ligado = a definição d pode chegar ali sem ser sobrescrita"""
+        gens, kills = [], []
+        for eventos in self.eventos:
+            gen = kill = 0
+            for tipo, indice, _ in eventos:
+                if tipo == USO:
+                    continue
+                variavel = self.variavel_da_definicao[indice]
+                bits = self.definicoes_da_variavel[variavel]
+                definicao = indice if tipo == DEF else self.indefinida[variavel]
+                gen = (gen & ~bits) | (1 << definicao)
+                kill |= bits
+            gens.append(gen)
+            kills.append(kill)
+        inicial = 0
+        for definicao in self.indefinida:
+            inicial |= 1 << definicao
+        return resolver_para_frente(self.grafo, gens, kills, inicial)
+
+    def atribuicoes_mortas(self):
+        """Definições vindas de atribuições cujo valor nunca é lido em nenhum caminho: [(nome, nó)]"""
+        _, saida = self.vivas()
+        alcancaveis = self.grafo.alcancaveis()
+        # O corpo de um finally aparece uma vez por destino: a atribuição só é morta se for em todas as cópias
+        mortas = {}
+        lidas = set()
+        for bloco in alcancaveis:
+            vivas = saida[bloco]
+            for tipo, indice, no in reversed(self.eventos[bloco]):
+                if tipo == USO:
+                    vivas |= 1 << indice
+                    continue
+                variavel = self.variavel_da_definicao[indice]
+                if tipo == DEF and indice in self.atribuicoes:
+                    if (vivas >> variavel) & 1:
+                        lidas.add(no)
+                    elif self.nomes[variavel] != '_':
+                        mortas[no] = self.nomes[variavel]
+                vivas &= ~(1 << variavel)
+        return [(nome, no) for no, nome in mortas.items() if no not in lidas]
+
+    def usos_antes_da_definicao(self):
+        """Leituras alcançadas pelo estado "não definida": [(nome, nó, sempre)], sempre=True se nenhuma definição chega"""
+        entrada, _ = self.definicoes_que_alcancam()
+        ignorar = set()
+        if self.escopo.tipo == 'modulo':
+            # No módulo, um nome ainda não atribuído cai nos embutidos (ou veio de um import *)
+            if any(isinstance(n, ast.ImportFrom) and any(a.name == '*' for a in n.names) for n in self.escopo.no.body):
+                return []
+            ignorar = {v for v, nome in enumerate(self.nomes) if nome in NOMES_EMBUTIDOS}
+        # Um uso repetido nas cópias de um finally é um achado só, "sempre" se for em todas elas
+        achados = {}
+        definidos = set()
+        for bloco in self.grafo.alcancaveis():
+            alcancam = entrada[bloco]
+            for tipo, indice, no in self.eventos[bloco]:
+                if tipo == USO:
+                    indefinida = self.indefinida[indice]
+                    if (alcancam >> indefinida) & 1 and indice not in ignorar:
+                        sempre = alcancam & self.definicoes_da_variavel[indice] == 1 << indefinida
+                        achado = achados.setdefault(no, [self.nomes[indice], sempre])
+                        achado[1] = achado[1] and sempre
+                    else:
+                        definidos.add(no)
+                    continue
+                variavel = self.variavel_da_definicao[indice]
+                definicao = indice if tipo == DEF else self.indefinida[variavel]
+                alcancam = (alcancam & ~self.definicoes_da_variavel[variavel]) | (1 << definicao)
+        return [(nome, no, sempre and no not in definidos) for no, (nome, sempre) in achados.items()]
+
+
+def _onde(escopo):
+    return "módulo" if escopo.tipo == 'modulo' else f"função '{escopo.nome}'"
+
+
+class AnaliseFluxoDeDados:
+    """Grafos de fluxo e diagnósticos de fluxo de dados de todos os escopos executáveis de um módulo"""
+
+    def __init__(self, tree, tabela):
+        self.grafos = []
+        self.atribuicoes_mortas = []
+        self.usos_antes_da_definicao = []
+        achados_mortos, achados_indefinidos = [], []
+        for escopo in tabela.escopos:
+            if escopo.tipo == 'modulo':
+                grafo = construir_grafo_fluxo(escopo.no)
+            elif escopo.tipo == 'funcao' and isinstance(escopo.no, _FUNCOES):
+                grafo = construir_grafo_fluxo(escopo.no)
+            else:
+                continue
+            self.grafos.append(grafo)
+            fluxo = FluxoDeDados(grafo, escopo, tabela)
+            for nome, no in fluxo.atribuicoes_mortas():
+                achados_mortos.append((no.lineno, no.col_offset, nome, _onde(escopo)))
+            for nome, no, sempre in fluxo.usos_antes_da_definicao():
+                achados_indefinidos.append((no.lineno, no.col_offset, nome, _onde(escopo), sempre))
+
+        for linha, _, nome, onde in sorted(achados_mortos):
+            self.atribuicoes_mortas.append(f"Valor atribuído a '{nome}' nunca é lido ({onde}, linha {linha})")
+        for linha, _, nome, onde, sempre in sorted(achados_indefinidos):
+            if sempre:
+                self.usos_antes_da_definicao.append(f"Variável '{nome}' usada antes de ser definida ({onde}, linha {linha})")
+            else:
+                self.usos_antes_da_definicao.append(f"Variável '{nome}' pode ser usada antes de ser definida ({onde}, linha {linha})")
+
+
+# Exemplo de uso:
+if __name__ == "__main__":
+    from tabela_simbolos import construir_tabela_simbolos
+
+    codigo = '''
+def exemplo(n):
+    total = 0
+    resto = n % 2
+    for i in range(n):
+        total = i
+    if n > 10:
+        limite = n
+    print(limite)
+    resto = 1
+    return total
+'''
+    tree = ast.parse(codigo)
+    analise = AnaliseFluxoDeDados(tree, construir_tabela_simbolos(tree))
+    print("\n".join(analise.atribuicoes_mortas + analise.usos_antes_da_definicao))
@@ -0,0 +1,1915 @@
+import ast
+import heapq
+import struct
+from collections import Counter
+from bisect import bisect_right
+
+from inferencia_tipos import DESCONHECIDO, InferenciaTipos, classe
+from tabela_simbolos import EMBUTIDO, Simbolo, construir_tabela_simbolos
+
+# Tipos dos registradores virtuais; textos (endereços de .asciiz) ficam nos registradores inteiros
+INTEIRO = 'i'
+REAL = 'f'
+TEXTO = 's'
+
+# Registradores alocáveis: os temporários não sobrevivem a um jal, os preservados sim
+# (e a função que os usa salva e restaura). $t8/$t9 e $f30/$f31 ficam para spills e constantes;
+# $v0, $v1, $a0-$a3, $f0-$f3 e $f12-$f15 ficam para syscalls, argumentos e retornos.
+TEMPORARIOS = {
+    INTEIRO: ['$t0', '$t1', '$t2', '$t3', '$t4', '$t5', '$t6', '$t7'],
+    REAL: ['$f4', '$f5', '$f6', '$f7', '$f8', '$f9', '$f10', '$f11', '$f16', '$f17', '$f18', '$f19'],
+}
+PRESERVADOS = {
+    INTEIRO: ['$s0', '$s1', '$s2', '$s3', '$s4', '$s5', '$s6', '$s7'],
+    REAL: ['$f20', '$f21', '$f22', '$f23', '$f24', '$f25', '$f26', '$f27', '$f28', '$f29'],
+}
+AUXILIARES = {INTEIRO: ('$t8', '$t9'), REAL: ('$f30', '$f31')}
+ARGUMENTOS = {INTEIRO: ['$a0', '$a1', '$a2', '$a3'], REAL: ['$f12', '$f13', '$f14', '$f15']}
+RETORNOS = {INTEIRO: ['$v0', '$v1'], REAL: ['$f0', '$f1']}
+
+_OPERADORES = {ast.Add: '+', ast.Sub: '-', ast.Mult: '*', ast.Div: '/', ast.FloorDiv: '//', ast.Mod: '%'}
+_COMPARACOES = {ast.Eq: 'eq', ast.NotEq: 'ne', ast.Lt: 'lt', ast.LtE: 'le', ast.Gt: 'gt', ast.GtE: 'ge'}
+_NEGADA = {'eq': 'ne', 'ne': 'eq', 'lt': 'ge', 'ge': 'lt', 'le': 'gt', 'gt': 'le'}
+_TROCADA = {'eq': 'eq', 'ne': 'ne', 'lt': 'gt', 'gt': 'lt', 'le': 'ge', 'ge': 'le'}
+# Exceções que capturam qualquer raise do subconjunto
+_CAPTURA_TUDO = (None, 'Exception', 'BaseException')
+
+
+class ErroGeracao(Exception):
+    """Construção fora do subconjunto de Python aceito pelo gerador MIPS"""
+
+    def __init__(self, mensagem, no=None):
+        if getattr(no, 'lineno', None) is not None:
+            mensagem = f"{mensagem} (linha {no.lineno})"
+        super().__init__(mensagem)
+
+
+class FuncaoIR:
+    """
+    Uma rotina em código de três endereços. Cada instrução é uma tupla cujo primeiro elemento
+    é a operação; os operandos são registradores virtuais (inteiros), cujo tipo fica em tipos[v]:
+      ('li', d, valor)            ('la', d, texto)          ('mover', d, a)
+      ('cvt', d, a)               ('bin', op, d, a, b)      ('bini', op, d, a, imediato)
+      ('neg', d, a)               ('rotulo', nome)          ('j', nome)
+      ('b', cond, a, b, nome)     ('bz', cond, a, nome)     ('chamar', funcao, args, destinos)
+      ('ret', valores)            ('entrada', parametros)   ('ler', d)
+      ('escrever', a)             ('texto', texto)          ('sair',)
+    Nos desvios entre floats, cond pode vir negada ('!lt': salta se não for a < b, inclusive com NaN).
+    """
+
+    def __init__(self, nome, principal=False):
+        self.nome = nome
+        self.principal = principal
+        self.codigo = []
+        self.tipos = []
+        self.parametros = []
+        # Tipos dos valores retornados (vazio: a função não retorna valor)
+        self.retorno = []
+        # Registradores virtuais definidos só por um 'li' (temporários de constantes)
+        self.constantes = {}
+
+    def novo(self, tipo):
+        self.tipos.append(tipo)
+        return len(self.tipos) - 1
+
+    def emitir(self, *instrucao):
+        self.codigo.append(instrucao)
+
+
+def usos_e_definicoes(instrucao):
+    """(registradores lidos, registradores escritos) por uma instrução do código intermediário"""
+    op = instrucao[0]
+    if op in ('li', 'la', 'ler'):
+        return (), (instrucao[1],)
+    if op in ('mover', 'cvt', 'neg'):
+        return (instrucao[2],), (instrucao[1],)
+    if op == 'bin':
+        return (instrucao[3], instrucao[4]), (instrucao[2],)
+    if op == 'bini':
+        return (instrucao[3],), (instrucao[2],)
+    if op == 'b':
+        return (instrucao[2], instrucao[3]), ()
+    if op == 'bz':
+        return (instrucao[2],), ()
+    if op == 'chamar':
+        return tuple(instrucao[2]), tuple(instrucao[3])
+    if op == 'ret':
+        return tuple(instrucao[1]), ()
+    if op == 'entrada':
+        return (), tuple(instrucao[1])
+    if op == 'escrever':
+        return (instrucao[1],), ()
+    return (), ()
+
+
+def _tipo_do_reticulado(tipo):
+    tipo = classe(tipo)
+    if tipo in (int, bool):
+        return INTEIRO
+    if tipo is float:
+        return REAL
+    if tipo is str:
+        return TEXTO
+    return None
+
+
+# -- AST -> código de três endereços -------------------------------------------------------
+
+def _capturada(nome, capturadas):
+    """Indica se um except com as exceções capturadas (None: except sem tipo) pega um raise de nome"""
+    return capturadas is None or nome in capturadas or any(c in _CAPTURA_TUDO for c in capturadas)
+
+
+def _capturadas_do_tratador(tratador):
+    if tratador.type is None:
+        return None
+    if isinstance(tratador.type, ast.Name):
+        return (tratador.type.id,)
+    if isinstance(tratador.type, ast.Tuple) and all(isinstance(t, ast.Name) for t in tratador.type.elts):
+        return tuple(t.id for t in tratador.type.elts)
+    raise ErroGeracao("Tipo de exceção fora do subconjunto", tratador)
+
+
+def _excecoes_que_escapam(funcoes):
+    """
+    Nome da função -> exceções que um raise nela (ou nas funções do módulo que ela chama) pode
+    levar para fora dela, sem um except da própria função que as capture
+    """
+    # Por função: [(exceção levantada ou None, função chamada ou None, excepts abertos)]
+    pontos = {}
+    for nome, definicao in funcoes.items():
+        lista = pontos[nome] = []
+        pilha = [(no, ()) for no in definicao.body]
+        while pilha:
+            no, abertos = pilha.pop()
+            if isinstance(no, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+                continue
+            if isinstance(no, ast.Try):
+                quadro = tuple(_capturadas_do_tratador(t) for t in no.handlers)
+                pilha.extend((filho, abertos + (quadro,)) for filho in no.body)
+                pilha.extend((filho, abertos) for filho in no.handlers + no.orelse + no.finalbody)
+                continue
+            if isinstance(no, ast.Raise):
+                excecao = no.exc.func if isinstance(no.exc, ast.Call) else no.exc
+                if isinstance(excecao, ast.Name):
+                    lista.append((excecao.id, None, abertos))
+            elif isinstance(no, ast.Call) and isinstance(no.func, ast.Name) and no.func.id in funcoes:
+                lista.append((None, no.func.id, abertos))
+            pilha.extend((filho, abertos) for filho in ast.iter_child_nodes(no))
+
+    def escapa(excecao, abertos):
+        return not any(_capturada(excecao, capturadas) for quadro in abertos for capturadas in quadro)
+
+    escapam = {nome: set() for nome in funcoes}
+    mudou = True
+    while mudou:
+        mudou = False
+        for nome, lista in pontos.items():
+            for excecao, chamada, abertos in lista:
+                novas = {excecao} if chamada is None else escapam[chamada]
+                novas = {e for e in novas if e not in escapam[nome] and escapa(e, abertos)}
+                if novas:
+                    escapam[nome] |= novas
+                    mudou = True
+    return escapam
+
+
+class _Programa:
+    """Estado compartilhado pela tradução de todas as rotinas de um módulo"""
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.tabela = construir_tabela_simbolos(tree)
+        self.tipos = InferenciaTipos(tree, self.tabela)
+        self.funcoes = {}
+        for no in tree.body:
+            if isinstance(no, ast.FunctionDef):
+                self.funcoes[no.name] = no
+        self._rotulos = 0
+        self.assinaturas = {}
+        self._escapam = None
+
+    def escapam(self, nome):
+        """Exceções que podem sair da função do módulo nome sem serem capturadas nela"""
+        if self._escapam is None:
+            self._escapam = _excecoes_que_escapam(self.funcoes)
+        return self._escapam[nome]
+
+    def rotulo(self, prefixo):
+        self._rotulos += 1
+        return f"{prefixo}_{self._rotulos}"
+
+    def assinatura(self, no):
+        """(tipos dos parâmetros, tipos do retorno) de uma função do módulo"""
+        if no.name in self.assinaturas:
+            return self.assinaturas[no.name]
+        argumentos = no.args
+        if argumentos.posonlyargs or argumentos.kwonlyargs or argumentos.vararg or argumentos.kwarg \
+                or argumentos.defaults or no.decorator_list:
+            raise ErroGeracao(f"Assinatura de '{no.name}' fora do subconjunto (só parâmetros posicionais simples)", no)
+        parametros = []
+        for parametro in argumentos.args:
+            tipo = self.tipo_do_nome(parametro.arg, parametro)
+            if tipo is None or tipo == TEXTO:
+                raise ErroGeracao(f"Tipo do parâmetro '{parametro.arg}' de '{no.name}' não inferido", no)
+            parametros.append(tipo)
+        retorno = self.tipos.retorno(no)
+        if retorno == DESCONHECIDO and not any(isinstance(n, ast.Return) and n.value is not None
+                                               for n in ast.walk(no)):
+            tipos_retorno = []
+        elif isinstance(retorno, tuple):
+            tipos_retorno = [_tipo_do_reticulado(t) for t in retorno]
+        else:
+            tipos_retorno = [_tipo_do_reticulado(retorno)]
+        if None in tipos_retorno or TEXTO in tipos_retorno:
+            raise ErroGeracao(f"Tipo de retorno de '{no.name}' não inferido", no)
+        for tipo in (INTEIRO, REAL):
+            if parametros.count(tipo) > len(ARGUMENTOS[tipo]) or tipos_retorno.count(tipo) > len(RETORNOS[tipo]):
+                raise ErroGeracao(f"'{no.name}' tem parâmetros ou valores de retorno demais", no)
+        self.assinaturas[no.name] = (parametros, tipos_retorno)
+        return parametros, tipos_retorno
+
+    def tipo_do_nome(self, nome, no):
+        simbolo = self.tabela.resolver_nome(nome, no)
+        if not isinstance(simbolo, Simbolo):
+            return None
+        if simbolo.definicoes and all(isinstance(d, ast.ExceptHandler) for d in simbolo.definicoes):
+            # except ... as e: e guarda a mensagem do raise
+            return TEXTO
+        return _tipo_do_reticulado(self.tipos.tipo_do_simbolo(simbolo))
+
+
+class _Tradutor:
+    """Traduz o corpo de uma função (ou o nível superior do módulo) para uma FuncaoIR"""
+
+    def __init__(self, programa, funcao, no=None):
+        self.programa = programa
+        self.funcao = funcao
+        self.no = no
+        self.variaveis = {}
+        # (rótulo do continue, rótulo do break) dos laços abertos
+        self.lacos = []
+        # Um quadro por try aberto: [(nomes capturados ou None, rótulo, registrador do "as")]
+        self.tratadores = []
+        self.chamadas = []
+
+    def traduzir(self):
+        funcao = self.funcao
+        if self.no is not None:
+            tipos, funcao.retorno = self.programa.assinatura(self.no)
+            for parametro, tipo in zip(self.no.args.args, tipos):
+                registrador = funcao.novo(tipo)
+                self.variaveis[parametro.arg] = registrador
+                funcao.parametros.append(registrador)
+            funcao.emitir('entrada', list(funcao.parametros))
+            corpo = self.no.body
+        else:
+            corpo = [n for n in self.programa.tree.body if not isinstance(n, ast.FunctionDef)]
+        self._bloco(corpo)
+        funcao.emitir('ret', []) if self.no is not None else funcao.emitir('sair')
+        return funcao
+
+    # -- auxiliares ---------------------------------------------------------------------
+
+    def _variavel(self, nome, no):
+        if nome in self.variaveis:
+            return self.variaveis[nome]
+        if nome in self.programa.funcoes:
+            raise ErroGeracao(f"Função '{nome}' usada como valor", no)
+        simbolo = self.programa.tabela.resolver_nome(nome, no)
+        if self.no is not None and isinstance(simbolo, Simbolo) and simbolo.escopo.tipo == 'modulo':
+            raise ErroGeracao(f"Variável global '{nome}' dentro de função não é suportada", no)
+        tipo = self.programa.tipo_do_nome(nome, no)
+        if tipo is None:
+            raise ErroGeracao(f"Tipo de '{nome}' não inferido", no)
+        registrador = self.variaveis[nome] = self.funcao.novo(tipo)
+        return registrador
+
+    def _constante(self, valor, tipo):
+        registrador = self.funcao.novo(tipo)
+        self.funcao.emitir('la' if tipo == TEXTO else 'li', registrador, valor)
+        self.funcao.constantes[registrador] = valor
+        return registrador
+
+    def _converter(self, registrador, tipo, no):
+        """Registrador com o valor convertido para tipo (int <-> float)"""
+        atual = self.funcao.tipos[registrador]
+        if atual == tipo:
+            return registrador
+        if TEXTO in (atual, tipo):
+            raise ErroGeracao("Texto em operação numérica", no)
+        if registrador in self.funcao.constantes:
+            valor = self.funcao.constantes[registrador]
+            return self._constante(float(valor) if tipo == REAL else int(valor), tipo)
+        convertido = self.funcao.novo(tipo)
+        self.funcao.emitir('cvt', convertido, registrador)
+        return convertido
+
+    def _para(self, registrador, destino, no):
+        """Leva o valor para destino (se houver), convertendo o tipo; retorna onde o valor ficou"""
+        if destino is None:
+            return registrador
+        registrador = self._converter(registrador, self.funcao.tipos[destino], no)
+        if registrador != destino:
+            self.funcao.emitir('mover', destino, registrador)
+        return destino
+
+    # -- instruções ---------------------------------------------------------------------
+
+    def _bloco(self, instrucoes):
+        for instrucao in instrucoes:
+            self._instrucao(instrucao)
+
+    def _instrucao(self, no):
+        funcao = self.funcao
+        if isinstance(no, ast.Expr):
+            if isinstance(no.value, ast.Constant):
+                return
+            if isinstance(no.value, ast.Call) and self._embutido(no.value.func, 'print'):
+                return self._print(no.value)
+            if isinstance(no.value, ast.Call):
+                return self._chamada(no.value, destinos=None)
+            raise ErroGeracao("Expressão sem efeito fora do subconjunto", no)
+        if isinstance(no, (ast.Assign, ast.AnnAssign)):
+            alvos = no.targets if isinstance(no, ast.Assign) else [no.target]
+            if no.value is None:
+                return
+            return self._atribuir(alvos, no.value, no)
+        if isinstance(no, ast.AugAssign):
+            if not isinstance(no.target, ast.Name):
+                raise ErroGeracao("Atribuição composta só para variáveis", no)
+            destino = self._variavel(no.target.id, no)
+            resultado = self._binaria(no.op, ast.Name(no.target.id, ast.Load()), no.value, no, destino)
+            return self._para(resultado, destino, no)
+        if isinstance(no, ast.If):
+            senao = self.programa.rotulo('senao')
+            fim = self.programa.rotulo('fimse') if no.orelse else senao
+            self._desviar(no.test, senao, False)
+            self._bloco(no.body)
+            if no.orelse:
+                funcao.emitir('j', fim)
+                funcao.emitir('rotulo', senao)
+                self._bloco(no.orelse)
+            funcao.emitir('rotulo', fim)
+            return
+        if isinstance(no, ast.While):
+            inicio = self.programa.rotulo('laco')
+            saida = self.programa.rotulo('fimlaco')
+            senao = self.programa.rotulo('senaolaco') if no.orelse else saida
+            infinito = isinstance(no.test, ast.Constant) and no.test.value
+            # Teste no fim do laço (depois de uma guarda na entrada): um desvio por iteração
+            teste = inicio if infinito else self.programa.rotulo('testelaco')
+            if not infinito:
+                self._desviar(no.test, senao, False)
+            funcao.emitir('rotulo', inicio)
+            self.lacos.append((teste, saida))
+            self._bloco(no.body)
+            self.lacos.pop()
+            if infinito:
+                funcao.emitir('j', inicio)
+            else:
+                funcao.emitir('rotulo', teste)
+                self._desviar(no.test, inicio, True)
+            if no.orelse:
+                funcao.emitir('rotulo', senao)
+                self._bloco(no.orelse)
+            funcao.emitir('rotulo', saida)
+            return
+        if isinstance(no, ast.For):
+            return self._for(no)
+        if isinstance(no, (ast.Break, ast.Continue)):
+            if not self.lacos:
+                raise ErroGeracao("break/continue fora de laço", no)
+            funcao.emitir('j', self.lacos[-1][1 if isinstance(no, ast.Break) else 0])
+            return
+        if isinstance(no, ast.Return):
+            if self.no is None:
+                raise ErroGeracao("return fora de função", no)
+            return self._return(no)
+        if isinstance(no, ast.Raise):
+            return self._raise(no)
+        if isinstance(no, ast.Try):
+            return self._try(no)
+        if isinstance(no, ast.Pass):
+            return
+        if isinstance(no, ast.FunctionDef):
+            raise ErroGeracao("Funções aninhadas não são suportadas", no)
+        raise ErroGeracao(f"Instrução {type(no).__name__} não suportada", no)
+
+    def _atribuir(self, alvos, valor, no):
+        if len(alvos) == 1 and isinstance(alvos[0], ast.Name):
+            destino = self._variavel(alvos[0].id, no)
+            self._para(self._expressao(valor, destino), destino, no)
+            return
+        if len(alvos) == 1 and isinstance(alvos[0], ast.Tuple):
+            nomes = alvos[0].elts
+            if not all(isinstance(n, ast.Name) for n in nomes):
+                raise ErroGeracao("Desempacotamento só para variáveis simples", no)
+            if isinstance(valor, ast.Call):
+                # a, b = f(...): cada valor retornado vai direto para sua variável
+                destinos = [self._variavel(n.id, no) for n in nomes]
+                self._chamada(valor, destinos)
+                return
+            if isinstance(valor, ast.Tuple) and len(valor.elts) == len(nomes):
+                # a, b = b, a: todos os valores são calculados antes das atribuições
+                valores = [self._expressao(e) for e in valor.elts]
+                temporarios = [self._para(v, self.funcao.novo(self.funcao.tipos[v]), no) for v in valores]
+                for n, temporario in zip(nomes, temporarios):
+                    destino = self._variavel(n.id, no)
+                    self._para(temporario, destino, no)
+                return
+            raise ErroGeracao("Desempacotamento fora do subconjunto", no)
+        if all(isinstance(alvo, ast.Name) for alvo in alvos):
+            primeiro = self._variavel(alvos[0].id, no)
+            self._para(self._expressao(valor, primeiro), primeiro, no)
+            for alvo in alvos[1:]:
+                self._para(primeiro, self._variavel(alvo.id, no), no)
+            return
+        raise ErroGeracao("Alvo de atribuição não suportado", no)
+
+    def _for(self, no):
+        chamada = no.iter
+        if not (isinstance(no.target, ast.Name) and isinstance(chamada, ast.Call)
+                and self._embutido(chamada.func, 'range') and 1 <= len(chamada.args) <= 3 and not no.orelse):
+            raise ErroGeracao("Só laços for sobre range(...) são suportados", no)
+        argumentos = chamada.args
+        passo = 1
+        if len(argumentos) == 3:
+            try:
+                passo = ast.literal_eval(argumentos[2])
+            except ValueError:
+                passo = None
+            if type(passo) is not int or not passo:
+                raise ErroGeracao("O passo do range deve ser uma constante inteira diferente de zero", no)
+        variavel = self._variavel(no.target.id, no)
+        if self.funcao.tipos[variavel] != INTEIRO:
+            raise ErroGeracao("A variável do for deve ser inteira", no)
+        inicio_valor = argumentos[0] if len(argumentos) > 1 else ast.Constant(0)
+        fim_valor = argumentos[1] if len(argumentos) > 1 else argumentos[0]
+        contador = self.funcao.novo(INTEIRO)
+        self._para(self._expressao(inicio_valor), contador, no)
+        limite = self._converter(self._expressao(fim_valor), INTEIRO, no)
+        corpo = self.programa.rotulo('para')
+        continuar = self.programa.rotulo('proximo')
+        saida = self.programa.rotulo('fimpara')
+        # Guarda na entrada e teste no fim, como no while
+        self.funcao.emitir('b', 'ge' if passo > 0 else 'le', contador, limite, saida)
+        self.funcao.emitir('rotulo', corpo)
+        self.funcao.emitir('mover', variavel, contador)
+        self.lacos.append((continuar, saida))
+        self._bloco(no.body)
+        self.lacos.pop()
+        self.funcao.emitir('rotulo', continuar)
+        self.funcao.emitir('bin', '+', contador, contador, self._constante(passo, INTEIRO))
+        self.funcao.emitir('b', 'lt' if passo > 0 else 'gt', contador, limite, corpo)
+        self.funcao.emitir('rotulo', saida)
+
+    def _return(self, no):
+        tipos = self.funcao.retorno
+        if no.value is None:
+            valores = []
+        elif isinstance(no.value, ast.Tuple):
+            valores = no.value.elts
+        else:
+            valores = [no.value]
+        if len(valores) != len(tipos):
+            raise ErroGeracao("Todos os return de uma função devem devolver o mesmo número de valores", no)
+        registradores = [self._converter(self._expressao(v), t, no) for v, t in zip(valores, tipos)]
+        self.funcao.emitir('ret', registradores)
+
+    def _raise(self, no):
+        excecao = no.exc
+        mensagem = ''
+        if isinstance(excecao, ast.Call) and isinstance(excecao.func, ast.Name) and len(excecao.args) <= 1 \
+                and not excecao.keywords:
+            nome = excecao.func.id
+            if excecao.args:
+                if not (isinstance(excecao.args[0], ast.Constant) and isinstance(excecao.args[0].value, str)):
+                    raise ErroGeracao("A mensagem da exceção deve ser um texto literal", no)
+                mensagem = excecao.args[0].value
+        elif isinstance(excecao, ast.Name):
+            nome = excecao.id
+        else:
+            raise ErroGeracao("raise fora do subconjunto", no)
+
+        # O raise é resolvido na tradução: vira um salto para o except que o captura
+        for quadro in reversed(self.tratadores):
+            for capturadas, rotulo, registrador in quadro:
+                if _capturada(nome, capturadas):
+                    if registrador is not None:
+                        self.funcao.emitir('la', registrador, mensagem)
+                    self.funcao.emitir('j', rotulo)
+                    return
+        # Sem except que capture: escreve a exceção e encerra o programa
+        self.funcao.emitir('texto', f"{nome}: {mensagem}\n" if mensagem else f"{nome}\n")
+        self.funcao.emitir('sair')
+
+    def _try(self, no):
+        if no.finalbody:
+            raise ErroGeracao("try com finally não é suportado", no)
+        funcao = self.funcao
+        fim = self.programa.rotulo('fimtry')
+        quadro = []
+        for tratador in no.handlers:
+            capturadas = _capturadas_do_tratador(tratador)
+            registrador = self._variavel(tratador.name, tratador) if tratador.name else None
+            quadro.append((capturadas, self.programa.rotulo('except'), registrador))
+
+        # Um raise dentro dos próprios except não é capturado por este try
+        self.tratadores.append(quadro)
+        self._bloco(no.body)
+        self.tratadores.pop()
+        self._bloco(no.orelse)
+        funcao.emitir('j', fim)
+        for tratador, (_, rotulo, _) in zip(no.handlers, quadro):
+            funcao.emitir('rotulo', rotulo)
+            self._bloco(tratador.body)
+            funcao.emitir('j', fim)
+        funcao.emitir('rotulo', fim)
+
+    def _print(self, chamada):
+        separador, final = ' ', '\n'
+        for palavra in chamada.keywords:
+            if palavra.arg not in ('sep', 'end') or not (isinstance(palavra.value, ast.Constant)
+                                                          and isinstance(palavra.value.value, str)):
+                raise ErroGeracao("print só aceita sep e end literais", chamada)
+            if palavra.arg == 'sep':
+                separador = palavra.value.value
+            else:
+                final = palavra.value.value
+        for i, argumento in enumerate(chamada.args):
+            if i and separador:
+                self.funcao.emitir('texto', separador)
+            if isinstance(argumento, ast.JoinedStr):
+                # Especificações de formato (:.2f) são ignoradas: a syscall 2 escreve o float inteiro
+                for parte in argumento.values:
+                    if isinstance(parte, ast.Constant):
+                        self.funcao.emitir('texto', parte.value)
+                    else:
+                        self._escrever(parte.value)
+            elif isinstance(argumento, ast.Constant) and isinstance(argumento.value, str):
+                self.funcao.emitir('texto', argumento.value)
+            else:
+                self._escrever(argumento)
+        if final:
+            self.funcao.emitir('texto', final)
+
+    def _escrever(self, no):
+        registrador = self._expressao(no)
+        if classe(self.programa.tipos.tipo_de(no)) is not bool:
+            self.funcao.emitir('escrever', registrador)
+            return
+        # bool fica em um registrador inteiro (0/1), mas print escreve True/False
+        falso = self.programa.rotulo('falso')
+        fim = self.programa.rotulo('fimescrita')
+        self.funcao.emitir('bz', 'eq', registrador, falso)
+        self.funcao.emitir('texto', 'True')
+        self.funcao.emitir('j', fim)
+        self.funcao.emitir('rotulo', falso)
+        self.funcao.emitir('texto', 'False')
+        self.funcao.emitir('rotulo', fim)
+
+    # -- expressões ---------------------------------------------------------------------
+
+    def _embutido(self, no, nome):
+        return (isinstance(no, ast.Name) and no.id == nome
+                and self.programa.tabela.resolver_nome(nome, no) == EMBUTIDO)
+
+    def _expressao(self, no, destino=None):
+        """Registrador com o valor da expressão; quando possível, o resultado é escrito em destino"""
+        funcao = self.funcao
+        if isinstance(no, ast.Constant):
+            valor = no.value
+            if type(valor) in (int, bool):
+                return self._constante(int(valor), INTEIRO)
+            if type(valor) is float:
+                return self._constante(valor, REAL)
+            if type(valor) is str:
+                return self._constante(valor, TEXTO)
+            raise ErroGeracao(f"Constante {valor!r} fora do subconjunto", no)
+        if isinstance(no, ast.Name):
+            return self._variavel(no.id, no)
+        if isinstance(no, ast.BinOp):
+            return self._binaria(no.op, no.left, no.right, no, destino)
+        if isinstance(no, ast.UnaryOp):
+            if isinstance(no.op, ast.UAdd):
+                return self._expressao(no.operand, destino)
+            if isinstance(no.op, ast.USub):
+                operando = self._expressao(no.operand)
+                if operando in funcao.constantes:
+                    return self._constante(-funcao.constantes[operando], funcao.tipos[operando])
+                resultado = self._resultado(destino, funcao.tipos[operando])
+                funcao.emitir('neg', resultado, operando)
+                return resultado
+        if isinstance(no, (ast.Compare, ast.BoolOp)) or (isinstance(no, ast.UnaryOp) and isinstance(no.op, ast.Not)):
+            # Valor lógico materializado como 0/1 (em um registrador novo: a condição pode ler o destino)
+            resultado = funcao.novo(INTEIRO)
+            fim = self.programa.rotulo('logico')
+            funcao.emitir('li', resultado, 1)
+            self._desviar(no, fim, True)
+            funcao.emitir('li', resultado, 0)
+            funcao.emitir('rotulo', fim)
+            return resultado
+        if isinstance(no, ast.IfExp):
+            tipo = _tipo_do_reticulado(self.programa.tipos.tipo_de(no))
+            if tipo is None or tipo == TEXTO:
+                raise ErroGeracao("Tipo da expressão condicional não inferido", no)
+            resultado = self._resultado(destino, tipo)
+            senao = self.programa.rotulo('senao')
+            fim = self.programa.rotulo('fimse')
+            self._desviar(no.test, senao, False)
+            self._para(self._expressao(no.body, resultado), resultado, no)
+            funcao.emitir('j', fim)
+            funcao.emitir('rotulo', senao)
+            self._para(self._expressao(no.orelse, resultado), resultado, no)
+            funcao.emitir('rotulo', fim)
+            return resultado
+        if isinstance(no, ast.Call):
+            return self._expressao_chamada(no, destino)
+        raise ErroGeracao(f"Expressão {type(no).__name__} não suportada", no)
+
+    def _resultado(self, destino, tipo):
+        if destino is not None and self.funcao.tipos[destino] == tipo:
+            return destino
+        return self.funcao.novo(tipo)
+
+    def _binaria(self, op, esquerda, direita, no, destino=None):
+        funcao = self.funcao
+        if isinstance(op, ast.Pow):
+            return self._potencia(esquerda, direita, no, destino)
+        simbolo = _OPERADORES.get(type(op))
+        if simbolo is None:
+            raise ErroGeracao(f"Operador {type(op).__name__} não suportado", no)
+        a = self._expressao(esquerda)
+        b = self._expressao(direita)
+        if TEXTO in (funcao.tipos[a], funcao.tipos[b]):
+            raise ErroGeracao("Operações com textos não são suportadas", no)
+        if simbolo == '/' or REAL in (funcao.tipos[a], funcao.tipos[b]):
+            tipo = REAL
+        else:
+            tipo = INTEIRO
+        if tipo == REAL and simbolo in ('//', '%'):
+            raise ErroGeracao(f"Operador {simbolo} entre floats não é suportado", no)
+        a, b = self._converter(a, tipo, no), self._converter(b, tipo, no)
+        if a in funcao.constantes and b in funcao.constantes:
+            valor = _dobrar(simbolo, funcao.constantes[a], funcao.constantes[b])
+            if valor is not None:
+                return self._constante(valor, tipo)
+        resultado = self._resultado(destino, tipo)
+        funcao.emitir('bin', simbolo, resultado, a, b)
+        return resultado
+
+    def _potencia(self, base_no, expoente_no, no, destino):
+        """base ** n com n inteiro: multiplicações sucessivas (desenroladas se n for uma constante pequena)"""
+        funcao = self.funcao
+        base = self._expressao(base_no)
+        expoente = self._expressao(expoente_no)
+        if funcao.tipos[expoente] != INTEIRO or funcao.tipos[base] == TEXTO:
+            raise ErroGeracao("Só potências com expoente inteiro são suportadas", no)
+        tipo = funcao.tipos[base]
+        if expoente in funcao.constantes and 0 <= funcao.constantes[expoente] <= 4:
+            n = funcao.constantes[expoente]
+            if n == 0:
+                return self._constante(1.0 if tipo == REAL else 1, tipo)
+            resultado = base
+            for i in range(n - 1):
+                proximo = self._resultado(destino, tipo) if i == n - 2 else funcao.novo(tipo)
+                funcao.emitir('bin', '*', proximo, resultado, base)
+                resultado = proximo
+            return resultado
+
+        # resultado = 1; n = expoente; (se n < 0 e base float: fator = 1/base, n = -n); repete n vezes
+        resultado = funcao.novo(tipo)
+        contador = funcao.novo(INTEIRO)
+        funcao.emitir('li', resultado, 1.0 if tipo == REAL else 1)
+        funcao.emitir('mover', contador, expoente)
+        fator = base
+        if tipo == REAL:
+            fator = funcao.novo(REAL)
+            positivo = self.programa.rotulo('expoente')
+            funcao.emitir('mover', fator, base)
+            funcao.emitir('bz', 'ge', contador, positivo)
+            funcao.emitir('bin', '/', fator, self._constante(1.0, REAL), base)
+            funcao.emitir('neg', contador, contador)
+            funcao.emitir('rotulo', positivo)
+        # Laço com o teste no fim: um desvio por iteração
+        laco = self.programa.rotulo('potencia')
+        fim = self.programa.rotulo('fimpotencia')
+        funcao.emitir('bz', 'le', contador, fim)
+        funcao.emitir('rotulo', laco)
+        funcao.emitir('bin', '*', resultado, resultado, fator)
+        funcao.emitir('bin', '-', contador, contador, self._constante(1, INTEIRO))
+        funcao.emitir('bz', 'gt', contador, laco)
+        funcao.emitir('rotulo', fim)
+        return resultado
+
+    def _expressao_chamada(self, no, destino):
+        funcao = self.funcao
+        if isinstance(no.func, ast.Name) and no.func.id in ('int', 'float') and self._embutido(no.func, no.func.id):
+            tipo = INTEIRO if no.func.id == 'int' else REAL
+            if len(no.args) != 1 or no.keywords:
+                raise ErroGeracao(f"{no.func.id}() com um argumento", no)
+            argumento = no.args[0]
+            if isinstance(argumento, ast.Call) and self._embutido(argumento.func, 'input'):
+                # int(input(p)) / float(input(p)): escreve o prompt e lê com a syscall 5 / 6
+                if len(argumento.args) > 1 or argumento.keywords:
+                    raise ErroGeracao("input() com no máximo um argumento", no)
+                if argumento.args:
+                    prompt = argumento.args[0]
+                    if not (isinstance(prompt, ast.Constant) and isinstance(prompt.value, str)):
+                        raise ErroGeracao("O prompt de input() deve ser um texto literal", no)
+                    funcao.emitir('texto', prompt.value)
+                resultado = self._resultado(destino, tipo)
+                funcao.emitir('ler', resultado)
+                return resultado
+            return self._converter(self._expressao(argumento), tipo, no)
+        if self._embutido(no.func, 'abs') and len(no.args) == 1:
+            valor = self._expressao(no.args[0])
+            tipo = funcao.tipos[valor]
+            resultado = self._resultado(destino, tipo)
+            positivo = self.programa.rotulo('abs')
+            funcao.emitir('mover', resultado, valor)
+            if tipo == REAL:
+                funcao.emitir('b', 'ge', resultado, self._constante(0.0, REAL), positivo)
+            else:
+                funcao.emitir('bz', 'ge', resultado, positivo)
+            funcao.emitir('neg', resultado, resultado)
+            funcao.emitir('rotulo', positivo)
+            return resultado
+        return self._chamada(no, [destino], expressao=True)[0]
+
+    def _chamada(self, no, destinos, expressao=False):
+        """Chamada de função do módulo; destinos recebem os valores retornados (None: descartados)"""
+        if not (isinstance(no.func, ast.Name) and no.func.id in self.programa.funcoes
+                and isinstance(self.programa.tabela.resolver_nome(no.func.id, no.func), Simbolo)):
+            raise ErroGeracao("Só chamadas a funções do próprio módulo (e print, input, int, float, abs)", no)
+        if no.keywords or any(isinstance(a, ast.Starred) for a in no.args):
+            raise ErroGeracao("Chamadas só com argumentos posicionais", no)
+        # O raise só salta para um except da mesma rotina: não há como desviar para o de quem chamou
+        for excecao in sorted(self.programa.escapam(no.func.id)):
+            if any(_capturada(excecao, capturadas) for quadro in self.tratadores for capturadas, _, _ in quadro):
+                raise ErroGeracao(f"'{no.func.id}' pode levantar {excecao}, que seria capturada por um try "
+                                  "em quem chama: exceções não atravessam chamadas", no)
+        definicao = self.programa.funcoes[no.func.id]
+        parametros, retorno = self.programa.assinatura(definicao)
+        if len(no.args) != len(parametros):
+            raise ErroGeracao(f"'{no.func.id}' espera {len(parametros)} argumentos", no)
+        argumentos = [self._converter(self._expressao(a), t, no) for a, t in zip(no.args, parametros)]
+        if destinos is None:
+            recebidos = [self.funcao.novo(t) for t in retorno]
+        elif expressao:
+            if len(retorno) != 1:
+                raise ErroGeracao(f"'{no.func.id}' não retorna exatamente um valor", no)
+            recebidos = [self._resultado(destinos[0], retorno[0])]
+        else:
+            if len(destinos) != len(retorno):
+                raise ErroGeracao(f"'{no.func.id}' retorna {len(retorno)} valores", no)
+            recebidos = [d if self.funcao.tipos[d] == t else self.funcao.novo(t) for d, t in zip(destinos, retorno)]
+        self.funcao.emitir('chamar', no.func.id, argumentos, recebidos)
+        self.chamadas.append(no.func.id)
+        if destinos is not None and not expressao:
+            for recebido, destino in zip(recebidos, destinos):
+                self._para(recebido, destino, no)
+        return recebidos
+
+    # -- condições ----------------------------------------------------------------------
+
+    def _desviar(self, no, rotulo, quando):
+        """Salta para rotulo se o valor lógico da expressão for igual a quando (com curto-circuito)"""
+        funcao = self.funcao
+        if isinstance(no, ast.UnaryOp) and isinstance(no.op, ast.Not):
+            return self._desviar(no.operand, rotulo, not quando)
+        if isinstance(no, ast.BoolOp):
+            # and com quando=False (ou or com quando=True): qualquer operando decide sozinho
+            if isinstance(no.op, ast.And) != quando:
+                for valor in no.values:
+                    self._desviar(valor, rotulo, quando)
+                return
+            continua = self.programa.rotulo('cc')
+            for valor in no.values[:-1]:
+                self._desviar(valor, continua, not quando)
+            self._desviar(no.values[-1], rotulo, quando)
+            funcao.emitir('rotulo', continua)
+            return
+        if isinstance(no, ast.Compare):
+            if len(no.ops) == 1:
+                return self._comparar(no.left, no.ops[0], no.comparators[0], rotulo, quando, no)
+            # a < b < c: cada par é um and, sem reavaliar os operandos do meio
+            partes = []
+            esquerda = no.left
+            for op, direita in zip(no.ops, no.comparators):
+                partes.append(ast.Compare(esquerda, [op], [direita]))
+                esquerda = direita
+            return self._desviar(ast.BoolOp(ast.And(), partes), rotulo, quando)
+        if isinstance(no, ast.Constant):
+            if bool(no.value) == quando:
+                funcao.emitir('j', rotulo)
+            return
+        valor = self._expressao(no)
+        if funcao.tipos[valor] == REAL:
+            funcao.emitir('b', 'ne' if quando else 'eq', valor, self._constante(0.0, REAL), rotulo)
+        elif funcao.tipos[valor] == INTEIRO:
+            funcao.emitir('bz', 'ne' if quando else 'eq', valor, rotulo)
+        else:
+            raise ErroGeracao("Condição sobre texto não é suportada", no)
+
+    def _comparar(self, esquerda, op, direita, rotulo, quando, no):
+        funcao = self.funcao
+        if isinstance(op, (ast.In, ast.NotIn)):
+            # x in [a, b, c] com lista ou tupla literal: x == a or x == b or x == c
+            if not isinstance(direita, (ast.List, ast.Tuple, ast.Set)):
+                raise ErroGeracao("in/not in só com listas literais", no)
+            quando = quando if isinstance(op, ast.In) else not quando
+            valor = self._expressao(esquerda)
+            return self._desviar_igualdades(valor, direita.elts, rotulo, quando, no)
+        condicao = _COMPARACOES.get(type(op))
+        if condicao is None:
+            raise ErroGeracao(f"Comparação {type(op).__name__} não suportada", no)
+        a = self._expressao(esquerda)
+        b = self._expressao(direita)
+        if TEXTO in (funcao.tipos[a], funcao.tipos[b]):
+            raise ErroGeracao("Comparações entre textos não são suportadas", no)
+        tipo = REAL if REAL in (funcao.tipos[a], funcao.tipos[b]) else INTEIRO
+        a, b = self._converter(a, tipo, no), self._converter(b, tipo, no)
+        if not quando:
+            condicao = _NEGADA[condicao] if tipo == INTEIRO else condicao
+        if tipo == REAL and not quando:
+            # Com floats, "não a < b" não é "a >= b" (NaN): o desvio é feito pelo falso
+            funcao.emitir('b', '!' + condicao, a, b, rotulo)
+            return
+        funcao.emitir('b', condicao, a, b, rotulo)
+
+    def _desviar_igualdades(self, valor, elementos, rotulo, quando, no):
+        funcao = self.funcao
+        if quando:
+            for elemento in elementos:
+                self._desviar_igual(valor, elemento, rotulo, no)
+            return
+        continua = self.programa.rotulo('cc')
+        for elemento in elementos:
+            self._desviar_igual(valor, elemento, continua, no)
+        funcao.emitir('j', rotulo)
+        funcao.emitir('rotulo', continua)
+
+    def _desviar_igual(self, valor, elemento, rotulo, no):
+        funcao = self.funcao
+        outro = self._expressao(elemento)
+        tipo = REAL if REAL in (funcao.tipos[valor], funcao.tipos[outro]) else INTEIRO
+        funcao.emitir('b', 'eq', self._converter(valor, tipo, no), self._converter(outro, tipo, no), rotulo)
+
+
+def _dobrar(simbolo, a, b):
+    """Resultado de uma operação entre constantes, ou None se ela não puder ser feita agora"""
+    try:
+        if simbolo == '+':
+            return a + b
+        if simbolo == '-':
+            return a - b
+        if simbolo == '*':
+            return a * b
+        if simbolo == '/':
+            return a / b
+        if simbolo == '//':
+            return a // b
+        if simbolo == '%':
+            return a % b
+    except ZeroDivisionError:
+        return None
+    return None
+
+
+# -- otimizações no código intermediário ---------------------------------------------------
+
+def _juntar_textos(funcao):
+    """Textos escritos em sequência viram um só: uma syscall em vez de várias"""
+    codigo = []
+    for instrucao in funcao.codigo:
+        if instrucao[0] == 'texto':
+            if not instrucao[1]:
+                continue
+            if codigo and codigo[-1][0] == 'texto':
+                codigo[-1] = ('texto', codigo[-1][1] + instrucao[1])
+                continue
+        codigo.append(instrucao)
+    funcao.codigo = codigo
+
+
+def _imediatos(funcao):
+    """Constantes inteiras pequenas viram operandos imediatos (addiu, sll e desvios contra $zero)"""
+    constantes, tipos = funcao.constantes, funcao.tipos
+
+    def imediato(v, sinal=1):
+        return v in constantes and tipos[v] == INTEIRO and -32768 <= sinal * constantes[v] <= 32767
+
+    codigo = []
+    for instrucao in funcao.codigo:
+        op = instrucao[0]
+        if op == 'bin' and tipos[instrucao[2]] == INTEIRO:
+            simbolo, d, a, b = instrucao[1:]
+            if simbolo == '+' and imediato(b):
+                instrucao = ('bini', '+', d, a, constantes[b])
+            elif simbolo == '+' and imediato(a):
+                instrucao = ('bini', '+', d, b, constantes[a])
+            elif simbolo == '-' and imediato(b, -1):
+                instrucao = ('bini', '+', d, a, -constantes[b])
+            elif simbolo in ('*', '//', '%') and b in constantes and 0 < constantes[b] <= 0x8000 \
+                    and constantes[b] & (constantes[b] - 1) == 0:
+                expoente = constantes[b].bit_length() - 1
+                instrucao = {'*': ('bini', '<<', d, a, expoente), '//': ('bini', '>>', d, a, expoente),
+                             '%': ('bini', '&', d, a, constantes[b] - 1)}[simbolo]
+        elif op == 'b' and not instrucao[1].startswith('!') and tipos[instrucao[2]] == INTEIRO:
+            condicao, a, b, rotulo = instrucao[1:]
+            if constantes.get(b, 1) == 0:
+                instrucao = ('bz', condicao, a, rotulo)
+            elif constantes.get(a, 1) == 0:
+                instrucao = ('bz', _TROCADA[condicao], b, rotulo)
+        codigo.append(instrucao)
+    funcao.codigo = codigo
+
+
+_SEM_EFEITOS = ('li', 'la', 'mover', 'cvt', 'bin', 'bini', 'neg')
+
+
+def _remover_mortas(funcao):
+    """Instruções sem efeito colateral cujo resultado ninguém lê (até não sobrar nenhuma)"""
+    while True:
+        usados = set()
+        for instrucao in funcao.codigo:
+            usados.update(usos_e_definicoes(instrucao)[0])
+        codigo = [i for i in funcao.codigo if i[0] not in _SEM_EFEITOS or usos_e_definicoes(i)[1][0] in usados]
+        if len(codigo) == len(funcao.codigo):
+            return
+        funcao.codigo = codigo
+
+
+def _renomear(instrucao, mapa):
+    """A mesma instrução com os registradores virtuais trocados segundo mapa"""
+    op = instrucao[0]
+    trocar = lambda v: mapa.get(v, v)
+    if op in ('li', 'la', 'ler', 'escrever'):
+        return (op, trocar(instrucao[1])) + instrucao[2:]
+    if op in ('mover', 'cvt', 'neg'):
+        return (op, trocar(instrucao[1]), trocar(instrucao[2]))
+    if op == 'bin':
+        return (op, instrucao[1], trocar(instrucao[2]), trocar(instrucao[3]), trocar(instrucao[4]))
+    if op == 'bini':
+        return (op, instrucao[1], trocar(instrucao[2]), trocar(instrucao[3]), instrucao[4])
+    if op == 'b':
+        return (op, instrucao[1], trocar(instrucao[2]), trocar(instrucao[3]), instrucao[4])
+    if op == 'bz':
+        return (op, instrucao[1], trocar(instrucao[2]), instrucao[3])
+    if op == 'chamar':
+        return (op, instrucao[1], [trocar(v) for v in instrucao[2]], [trocar(v) for v in instrucao[3]])
+    if op in ('ret', 'entrada'):
+        return (op, [trocar(v) for v in instrucao[1]])
+    return instrucao
+
+
+def _expandir_chamadas(funcoes):
+    """
+    Funções chamadas de um único lugar têm o corpo copiado no ponto da chamada: somem o jal,
+    o jr, as cópias de argumentos e retornos e o quadro. Retorna as rotinas que ainda existem.
+    """
+    por_nome = {funcao.nome: funcao for funcao in funcoes if not funcao.principal}
+    chamadas = Counter(i[1] for funcao in funcoes for i in funcao.codigo if i[0] == 'chamar')
+    expandidas = set()
+    for funcao in funcoes:
+        if funcao.nome in expandidas:
+            continue
+        pendentes = funcao.codigo[::-1]
+        codigo = []
+        while pendentes:
+            instrucao = pendentes.pop()
+            nome = instrucao[0] == 'chamar' and instrucao[1]
+            if not nome or chamadas[nome] != 1 or nome == funcao.nome or nome in expandidas:
+                codigo.append(instrucao)
+                continue
+            expandidas.add(nome)
+            chamada = por_nome[nome]
+            mapa = {v: funcao.novo(tipo) for v, tipo in enumerate(chamada.tipos)}
+            for v, valor in chamada.constantes.items():
+                funcao.constantes[mapa[v]] = valor
+            retorno = f"retorno_{nome}"
+            corpo = []
+            for copia in chamada.codigo:
+                copia = _renomear(copia, mapa)
+                if copia[0] == 'entrada':
+                    corpo.extend(('mover', p, a) for p, a in zip(copia[1], instrucao[2]))
+                elif copia[0] == 'ret':
+                    corpo.extend(('mover', d, v) for d, v in zip(instrucao[3], copia[1]))
+                    corpo.append(('j', retorno))
+                else:
+                    corpo.append(copia)
+            corpo.append(('rotulo', retorno))
+            # O corpo copiado pode ter chamadas que também serão expandidas
+            pendentes.extend(reversed(corpo))
+        funcao.codigo = codigo
+    return [funcao for funcao in funcoes if funcao.nome not in expandidas]
+
+
+def _chave(instrucao, tipos):
+    # repr distingue 0.0 de -0.0 e 1 de True
+    return tipos[instrucao[1]], repr(instrucao[2])
+
+
+def _constantes_na_entrada(funcao, limites, sucessores, unicas):
+    """
+    Análise para frente, com interseção sobre os predecessores (blocos ainda não visitados não
+    restringem): em cada início de bloco, quais constantes escritas uma única vez certamente já
+    foram calculadas (conjunto de bits) e que texto cada registrador de texto certamente tem.
+    """
+    entrada = [None] * len(limites)
+    entrada[0] = (0, {})
+    pendentes = [0]
+    na_fila = {0}
+    while pendentes:
+        b = heapq.heappop(pendentes)
+        na_fila.discard(b)
+        calculadas, textos = entrada[b]
+        textos = dict(textos)
+        inicio, fim = limites[b]
+        for instrucao in funcao.codigo[inicio:fim]:
+            for d in usos_e_definicoes(instrucao)[1]:
+                textos.pop(d, None)
+            if instrucao[0] in ('li', 'la'):
+                if instrucao[1] in unicas:
+                    calculadas |= 1 << instrucao[1]
+                if instrucao[0] == 'la':
+                    textos[instrucao[1]] = instrucao[2]
+        for sucessor in sucessores[b]:
+            novo = (calculadas, textos)
+            if entrada[sucessor] is not None:
+                anteriores, textos_anteriores = entrada[sucessor]
+                novo = (calculadas & anteriores,
+                        {v: t for v, t in textos.items() if v in textos_anteriores and textos_anteriores[v] == t})
+            if entrada[sucessor] != novo:
+                entrada[sucessor] = novo
+                if sucessor not in na_fila:
+                    na_fila.add(sucessor)
+                    heapq.heappush(pendentes, sucessor)
+    return entrada
+
+
+def _propagar_constantes(funcao):
+    """
+    Constantes conhecidas pela análise de fluxo: um li/la de um valor que outro registrador
+    (escrito uma única vez) certamente já tem é trocado por ele, e print de um texto conhecido
+    (a mensagem de um raise no except) vira parte do texto fixo.
+    Depois disso, funcao.constantes são os registradores escritos só por um li/la.
+    """
+    definicoes = Counter(d for instrucao in funcao.codigo for d in usos_e_definicoes(instrucao)[1])
+    unicas = {i[1] for i in funcao.codigo if i[0] in ('li', 'la') and definicoes[i[1]] == 1}
+    mesmo_valor = {}
+    for instrucao in funcao.codigo:
+        if instrucao[0] in ('li', 'la') and instrucao[1] in unicas:
+            mesmo_valor.setdefault(_chave(instrucao, funcao.tipos), []).append(instrucao[1])
+    limites, sucessores = _blocos(funcao.codigo)
+    entradas = _constantes_na_entrada(funcao, limites, sucessores, unicas)
+
+    mapa = {}
+    codigo = []
+    for (inicio, fim), entrada in zip(limites, entradas):
+        calculadas, textos = entrada or (0, {})
+        textos = dict(textos)
+        for instrucao in funcao.codigo[inicio:fim]:
+            op = instrucao[0]
+            if op in ('li', 'la') and instrucao[1] in unicas:
+                v = instrucao[1]
+                igual = next((w for w in mesmo_valor[_chave(instrucao, funcao.tipos)]
+                              if w != v and (calculadas >> w) & 1), None)
+                calculadas |= 1 << v
+                if igual is not None:
+                    mapa[v] = igual
+                    continue
+            elif op == 'escrever' and instrucao[1] in textos:
+                instrucao = ('texto', textos[instrucao[1]])
+            for d in usos_e_definicoes(instrucao)[1]:
+                textos.pop(d, None)
+            if op == 'la':
+                textos[instrucao[1]] = instrucao[2]
+            codigo.append(instrucao)
+
+    # A escolhida para substituir uma constante pode ter sido substituída também
+    def raiz(v):
+        while v in mapa:
+            v = mapa[v]
+        return v
+
+    mapa = {v: raiz(v) for v in mapa}
+    funcao.codigo = [_renomear(instrucao, mapa) for instrucao in codigo]
+    funcao.constantes = {i[1]: i[2] for i in funcao.codigo if i[0] in ('li', 'la') and i[1] in unicas}
+
+
+def _propagar_copias(funcao):
+    """
+    Elimina cópias: a de um valor que nunca muda (os dois registradores escritos uma única vez)
+    vira o próprio valor, e 'x = temporário' faz a instrução que calculou o temporário
+    escrever direto em x, quando isso acontece no mesmo bloco e sem uso de x no meio.
+    """
+    usos, definicoes = Counter(), Counter()
+    for instrucao in funcao.codigo:
+        lidos, escritos = usos_e_definicoes(instrucao)
+        usos.update(lidos)
+        definicoes.update(escritos)
+    tipos = funcao.tipos
+
+    mapa = {}
+    for instrucao in funcao.codigo:
+        if instrucao[0] == 'mover' and definicoes[instrucao[1]] == 1 and definicoes[instrucao[2]] == 1:
+            mapa[instrucao[1]] = instrucao[2]
+
+    def raiz(v):
+        while v in mapa:
+            v = mapa[v]
+        return v
+
+    mapa = {v: raiz(v) for v in mapa}
+    renomeado = [_renomear(instrucao, mapa) for instrucao in funcao.codigo
+                 if not (instrucao[0] == 'mover' and instrucao[1] in mapa)]
+    # Os usos são contados de novo depois da troca: o valor que substituiu uma cópia passa
+    # a ser lido também onde a cópia era, e não pode mais ser tratado como lido uma vez só
+    usos, definicoes = Counter(), Counter()
+    for instrucao in renomeado:
+        lidos, escritos = usos_e_definicoes(instrucao)
+        usos.update(lidos)
+        definicoes.update(escritos)
+
+    codigo = []
+    # Temporários escritos uma vez e lidos uma vez: posição da instrução que os escreve
+    calculados = {}
+    tocados = {}
+    for instrucao in renomeado:
+        op = instrucao[0]
+        if op == 'mover':
+            d, v = instrucao[1], instrucao[2]
+            j = calculados.get(v)
+            if j is not None and tocados.get(d, -1) < j and tipos[d] == tipos[v]:
+                codigo[j] = _renomear(codigo[j], {v: d})
+                tocados[d] = j
+                del calculados[v]
+                continue
+        if op == 'rotulo' or op in _TERMINAM_BLOCO:
+            calculados.clear()
+            tocados.clear()
+        lidos, escritos = usos_e_definicoes(instrucao)
+        for v in lidos + escritos:
+            tocados[v] = len(codigo)
+        if op in ('li', 'la', 'cvt', 'bin', 'bini', 'neg', 'ler') and usos[escritos[0]] == 1 \
+                and definicoes[escritos[0]] == 1:
+            calculados[escritos[0]] = len(codigo)
+        codigo.append(instrucao)
+    funcao.codigo = codigo
+
+
+# -- alocação de registradores -------------------------------------------------------------
+
+_TERMINAM_BLOCO = ('j', 'b', 'bz', 'ret', 'sair')
+
+
+def _blocos(codigo):
+    """Limites [início, fim) dos blocos básicos do código intermediário e os sucessores de cada um"""
+    inicios = {0}
+    posicao_rotulo = {}
+    for i, instrucao in enumerate(codigo):
+        if instrucao[0] == 'rotulo':
+            inicios.add(i)
+            posicao_rotulo[instrucao[1]] = i
+        elif instrucao[0] in _TERMINAM_BLOCO:
+            inicios.add(i + 1)
+    inicios = sorted(i for i in inicios if i < len(codigo))
+    limites = list(zip(inicios, inicios[1:] + [len(codigo)]))
+    bloco_em = {inicio: b for b, (inicio, _) in enumerate(limites)}
+    sucessores = []
+    for b, (_, fim) in enumerate(limites):
+        ultima = codigo[fim - 1]
+        lista = []
+        if ultima[0] in ('j', 'b', 'bz'):
+            lista.append(bloco_em[posicao_rotulo[ultima[-1]]])
+        if ultima[0] not in ('j', 'ret', 'sair') and fim < len(codigo):
+            lista.append(b + 1)
+        sucessores.append(lista)
+    return limites, sucessores
+
+
+def _bits(conjunto):
+    while conjunto:
+        menor = conjunto & -conjunto
+        yield menor.bit_length() - 1
+        conjunto ^= menor
+
+
+def intervalos_de_vida(funcao):
+    """
+    Intervalo [início, fim] de cada registrador virtual, a partir da análise de vivacidade
+    (conjuntos de bits) sobre os blocos básicos. A instrução i lê na posição 2i e escreve em 2i+1,
+    então um valor lido pela última vez em i e outro escrito em i podem dividir o registrador.
+    """
+    codigo = funcao.codigo
+    limites, sucessores = _blocos(codigo)
+    gera, mata = [], []
+    for inicio, fim in limites:
+        usados = definidos = 0
+        for instrucao in codigo[inicio:fim]:
+            usos, definicoes = usos_e_definicoes(instrucao)
+            for v in usos:
+                if not (definidos >> v) & 1:
+                    usados |= 1 << v
+            for v in definicoes:
+                definidos |= 1 << v
+        gera.append(usados)
+        mata.append(definidos)
+
+    entrada = [0] * len(limites)
+    saida = [0] * len(limites)
+    mudou = True
+    while mudou:
+        mudou = False
+        for b in range(len(limites) - 1, -1, -1):
+            vivas = 0
+            for sucessor in sucessores[b]:
+                vivas |= entrada[sucessor]
+            novo = gera[b] | (vivas & ~mata[b])
+            if vivas != saida[b] or novo != entrada[b]:
+                saida[b], entrada[b] = vivas, novo
+                mudou = True
+
+    inicios = [None] * len(funcao.tipos)
+    fins = [None] * len(funcao.tipos)
+
+    def tocar(v, posicao):
+        if inicios[v] is None or posicao < inicios[v]:
+            inicios[v] = posicao
+        if fins[v] is None or posicao > fins[v]:
+            fins[v] = posicao
+
+    for b, (inicio, fim) in enumerate(limites):
+        for v in _bits(entrada[b]):
+            tocar(v, 2 * inicio)
+        for v in _bits(saida[b]):
+            tocar(v, 2 * fim)
+        for i in range(inicio, fim):
+            usos, definicoes = usos_e_definicoes(codigo[i])
+            for v in usos:
+                tocar(v, 2 * i)
+            for v in definicoes:
+                tocar(v, 2 * i + 1)
+    return inicios, fins
+
+
+def _classe_registrador(tipo):
+    return REAL if tipo == REAL else INTEIRO
+
+
+def alocar_registradores(funcao, limite=None):
+    """
+    Alocação por varredura linear (Poletto e Sarkar): os intervalos são visitados em ordem de
+    início; sem registrador livre, vai para a memória o intervalo ativo que termina mais tarde.
+    Intervalos que atravessam um jal só recebem registradores preservados.
+    limite restringe cada grupo de registradores aos primeiros `limite` (para exercitar os spills).
+    Retorna (registrador de cada virtual, posição na pilha de cada virtual em memória).
+    """
+    inicios, fins = intervalos_de_vida(funcao)
+    chamadas = [2 * i for i, instrucao in enumerate(funcao.codigo) if instrucao[0] == 'chamar']
+    livres = {}
+    for classe_reg in (INTEIRO, REAL):
+        livres[(classe_reg, False)] = list(TEMPORARIOS[classe_reg][:limite])
+        livres[(classe_reg, True)] = list(PRESERVADOS[classe_reg][:limite])
+    preservado = {r for registradores in PRESERVADOS.values() for r in registradores}
+
+    # Cópias: o destino tenta herdar o registrador da origem, e o move some no peephole
+    origem_da_copia = {}
+    for instrucao in funcao.codigo:
+        if instrucao[0] == 'mover':
+            origem_da_copia.setdefault(instrucao[1], instrucao[2])
+
+    alocacao = {}
+    memoria = {}
+    ativos = []
+    ordem = sorted((v for v in range(len(funcao.tipos)) if inicios[v] is not None), key=lambda v: inicios[v])
+    for v in ordem:
+        inicio = inicios[v]
+        for ativo in [a for a in ativos if fins[a] < inicio]:
+            ativos.remove(ativo)
+            registrador = alocacao[ativo]
+            livres[(_classe_registrador(funcao.tipos[ativo]), registrador in preservado)].append(registrador)
+
+        classe_reg = _classe_registrador(funcao.tipos[v])
+        proxima = bisect_right(chamadas, inicio)
+        atravessa = proxima < len(chamadas) and chamadas[proxima] + 1 < fins[v]
+        grupos = (True,) if atravessa else (False, True)
+        registrador = None
+        preferido = alocacao.get(origem_da_copia.get(v))
+        for grupo in grupos:
+            if preferido in livres[(classe_reg, grupo)]:
+                livres[(classe_reg, grupo)].remove(preferido)
+                registrador = preferido
+                break
+        for grupo in grupos if registrador is None else ():
+            if livres[(classe_reg, grupo)]:
+                registrador = livres[(classe_reg, grupo)].pop(0)
+                break
+        if registrador is None:
+            candidatos = [a for a in ativos if _classe_registrador(funcao.tipos[a]) == classe_reg
+                          and (alocacao[a] in preservado) in grupos]
+            vitima = max(candidatos, key=lambda a: fins[a], default=None)
+            if vitima is None or fins[vitima] <= fins[v]:
+                memoria[v] = len(memoria)
+                continue
+            registrador = alocacao.pop(vitima)
+            ativos.remove(vitima)
+            memoria[vitima] = len(memoria)
+        alocacao[v] = registrador
+        ativos.append(v)
+    return alocacao, memoria
+
+
+# -- emissão de MIPS -----------------------------------------------------------------------
+
+_DESVIO_INTEIRO = {'eq': 'beq', 'ne': 'bne', 'lt': 'blt', 'le': 'ble', 'gt': 'bgt', 'ge': 'bge'}
+_DESVIO_ZERO = {'eq': 'beq', 'ne': 'bne', 'lt': 'bltz', 'le': 'blez', 'gt': 'bgtz', 'ge': 'bgez'}
+# cond -> (comparação, troca os operandos, desvia quando verdadeira)
+_DESVIO_REAL = {
+    'eq': ('c.eq.s', False, True), 'ne': ('c.eq.s', False, False), 'lt': ('c.lt.s', False, True),
+    'le': ('c.le.s', False, True), 'gt': ('c.lt.s', True, True), 'ge': ('c.le.s', True, True),
+}
+_OPERACAO_INTEIRA = {'+': 'addu', '-': 'subu', '*': 'mul'}
+# Com potência de 2, // e % viram deslocamento aritmético e máscara (que já arredondam para baixo)
+_OPERACAO_IMEDIATA = {'+': 'addiu', '<<': 'sll', '>>': 'sra', '&': 'andi'}
+_OPERACAO_REAL = {'+': 'add.s', '-': 'sub.s', '*': 'mul.s', '/': 'div.s'}
+ROTULO = '.rotulo'
+
+
+def _rotulo_funcao(funcao):
+    # Prefixo evita colisão com mnemônicos (uma função chamada "add" ou "j")
+    return 'main' if funcao.principal else f"f_{funcao.nome}"
+
+
+def _bits_float(valor):
+    return struct.unpack('<I', struct.pack('<f', valor))[0]
+
+
+class _Emissor:
+    """Gera as instruções MIPS de uma FuncaoIR já alocada, como tuplas (mnemônico, operandos...)"""
+
+    def __init__(self, funcao, alocacao, memoria, textos):
+        self.funcao = funcao
+        self.alocacao = alocacao
+        self.memoria = memoria
+        self.textos = textos
+        self.linhas = []
+        preservados = {r for registradores in PRESERVADOS.values() for r in registradores}
+        self.salvos = [] if funcao.principal else sorted(set(alocacao.values()) & preservados,
+                                                         key=lambda r: (r[1], int(r[2:])))
+        self.chama = any(i[0] == 'chamar' for i in funcao.codigo)
+        palavras = len(memoria) + len(self.salvos) + (1 if self.chama and not funcao.principal else 0)
+        self.quadro = (palavras * 4 + 7) // 8 * 8
+        self.rotulo = _rotulo_funcao(funcao)
+        self.rotulos = 0
+        self.fim = f"{self.rotulo}_fim"
+
+    def _e(self, *linha):
+        self.linhas.append(linha)
+
+    def _endereco(self, v):
+        return f"{4 * self.memoria[v]}($sp)"
+
+    def _ler(self, v, auxiliar=0):
+        """Registrador com o valor de v (carregado da pilha para um auxiliar, se v estiver em memória)"""
+        if v in self.alocacao:
+            return self.alocacao[v]
+        classe_reg = _classe_registrador(self.funcao.tipos[v])
+        registrador = AUXILIARES[classe_reg][auxiliar]
+        self._e('l.s' if classe_reg == REAL else 'lw', registrador, self._endereco(v))
+        return registrador
+
+    def _ler_em(self, v, registrador):
+        """Copia v para um registrador fixo ($a0, $f12...)"""
+        real = _classe_registrador(self.funcao.tipos[v]) == REAL
+        if v in self.alocacao:
+            self._e('mov.s' if real else 'move', registrador, self.alocacao[v])
+        else:
+            self._e('l.s' if real else 'lw', registrador, self._endereco(v))
+
+    def _escrever_de(self, v, registrador):
+        """Copia um registrador fixo ($v0, $f0...) para v"""
+        real = _classe_registrador(self.funcao.tipos[v]) == REAL
+        if v in self.alocacao:
+            self._e('mov.s' if real else 'move', self.alocacao[v], registrador)
+        elif v in self.memoria:
+            self._e('s.s' if real else 'sw', registrador, self._endereco(v))
+
+    def _destino(self, v):
+        if v in self.alocacao:
+            return self.alocacao[v]
+        return AUXILIARES[_classe_registrador(self.funcao.tipos[v])][0]
+
+    def _guardar(self, v):
+        """Depois de escrever em _destino(v): grava na pilha se v estiver em memória"""
+        if v not in self.alocacao and v in self.memoria:
+            real = _classe_registrador(self.funcao.tipos[v]) == REAL
+            self._e('s.s' if real else 'sw', AUXILIARES[REAL if real else INTEIRO][0], self._endereco(v))
+
+    def _novo_rotulo(self):
+        self.rotulos += 1
+        return f"{self.rotulo}_{self.rotulos}"
+
+    def _rotulo_texto(self, texto):
+        if texto not in self.textos:
+            self.textos[texto] = f"str_{len(self.textos) + 1}"
+        return self.textos[texto]
+
+    def emitir(self):
+        funcao = self.funcao
+        self._e(ROTULO, self.rotulo)
+        if self.quadro:
+            self._e('addiu', '$sp', '$sp', str(-self.quadro))
+        deslocamento = 4 * len(self.memoria)
+        if self.chama and not funcao.principal:
+            self._e('sw', '$ra', f"{self.quadro - 4}($sp)")
+        for registrador in self.salvos:
+            self._e('s.s' if registrador.startswith('$f') else 'sw', registrador, f"{deslocamento}($sp)")
+            deslocamento += 4
+
+        for instrucao in funcao.codigo:
+            getattr(self, '_op_' + instrucao[0])(*instrucao[1:])
+
+        if not funcao.principal:
+            self._e(ROTULO, self.fim)
+            deslocamento = 4 * len(self.memoria)
+            for registrador in self.salvos:
+                self._e('l.s' if registrador.startswith('$f') else 'lw', registrador, f"{deslocamento}($sp)")
+                deslocamento += 4
+            if self.chama:
+                self._e('lw', '$ra', f"{self.quadro - 4}($sp)")
+            if self.quadro:
+                self._e('addiu', '$sp', '$sp', str(self.quadro))
+            self._e('jr', '$ra')
+        return self.linhas
+
+    # Uma função por operação do código intermediário
+
+    def _op_li(self, d, valor):
+        registrador = self._destino(d)
+        tipo = self.funcao.tipos[d]
+        if tipo == REAL:
+            bits = _bits_float(valor)
+            if bits == 0:
+                self._e('mtc1', '$zero', registrador)
+            else:
+                auxiliar = AUXILIARES[INTEIRO][1]
+                if bits & 0xFFFF == 0:
+                    self._e('lui', auxiliar, hex(bits >> 16))
+                else:
+                    self._e('li', auxiliar, hex(bits))
+                self._e('mtc1', auxiliar, registrador)
+        else:
+            self._e('li', registrador, str(int(valor)))
+        self._guardar(d)
+
+    def _op_la(self, d, texto):
+        self._e('la', self._destino(d), self._rotulo_texto(texto))
+        self._guardar(d)
+
+    def _op_mover(self, d, a):
+        origem = self._ler(a)
+        destino = self._destino(d)
+        self._e('mov.s' if self.funcao.tipos[d] == REAL else 'move', destino, origem)
+        self._guardar(d)
+
+    def _op_cvt(self, d, a):
+        origem = self._ler(a)
+        destino = self._destino(d)
+        if self.funcao.tipos[d] == REAL:
+            self._e('mtc1', origem, destino)
+            self._e('cvt.s.w', destino, destino)
+        else:
+            # int() trunca em direção ao zero
+            self._e('trunc.w.s', AUXILIARES[REAL][1], origem)
+            self._e('mfc1', destino, AUXILIARES[REAL][1])
+        self._guardar(d)
+
+    def _op_bin(self, simbolo, d, a, b):
+        esquerda, direita = self._ler(a, 0), self._ler(b, 1)
+        destino = self._destino(d)
+        if self.funcao.tipos[d] == REAL:
+            self._e(_OPERACAO_REAL[simbolo], destino, esquerda, direita)
+        elif simbolo in ('//', '%'):
+            # O div do MIPS trunca; o Python arredonda para baixo: se o resto não for zero e tiver
+            # sinal diferente do divisor, o quociente diminui 1 e o resto ganha o divisor
+            # ($v1 só é usado em chamadas e retornos, então serve de rascunho aqui)
+            exato = self._novo_rotulo()
+            resto, quociente = AUXILIARES[INTEIRO][0], '$v1'
+            self._e('div', esquerda, direita)
+            self._e('mfhi', resto)
+            if simbolo == '//':
+                self._e('mflo', quociente)
+            self._e('beq', resto, '$zero', exato)
+            if simbolo == '//':
+                self._e('xor', resto, resto, direita)
+                self._e('bgez', resto, exato)
+                self._e('addiu', quociente, quociente, '-1')
+            else:
+                self._e('xor', '$v1', resto, direita)
+                self._e('bgez', '$v1', exato)
+                self._e('addu', resto, resto, direita)
+            self._e(ROTULO, exato)
+            self._e('move', destino, quociente if simbolo == '//' else resto)
+        else:
+            self._e(_OPERACAO_INTEIRA[simbolo], destino, esquerda, direita)
+        self._guardar(d)
+
+    def _op_bini(self, simbolo, d, a, imediato):
+        origem = self._ler(a)
+        self._e(_OPERACAO_IMEDIATA[simbolo], self._destino(d), origem, str(imediato))
+        self._guardar(d)
+
+    def _op_neg(self, d, a):
+        origem = self._ler(a)
+        if self.funcao.tipos[d] == REAL:
+            self._e('neg.s', self._destino(d), origem)
+        else:
+            self._e('subu', self._destino(d), '$zero', origem)
+        self._guardar(d)
+
+    def _op_rotulo(self, nome):
+        self._e(ROTULO, nome)
+
+    def _op_j(self, nome):
+        self._e('j', nome)
+
+    def _op_b(self, condicao, a, b, rotulo):
+        esquerda, direita = self._ler(a, 0), self._ler(b, 1)
+        if self.funcao.tipos[a] != REAL:
+            self._e(_DESVIO_INTEIRO[condicao], esquerda, direita, rotulo)
+            return
+        negada = condicao.startswith('!')
+        comparacao, trocar, verdadeira = _DESVIO_REAL[condicao.lstrip('!')]
+        if trocar:
+            esquerda, direita = direita, esquerda
+        self._e(comparacao, esquerda, direita)
+        self._e('bc1t' if verdadeira != negada else 'bc1f', rotulo)
+
+    def _op_bz(self, condicao, a, rotulo):
+        origem = self._ler(a)
+        if condicao in ('eq', 'ne'):
+            self._e(_DESVIO_ZERO[condicao], origem, '$zero', rotulo)
+        else:
+            self._e(_DESVIO_ZERO[condicao], origem, rotulo)
+
+    def _fixos(self, registradores, tabela):
+        """Registrador fixo (argumento ou retorno) de cada valor, na ordem, por classe"""
+        usados = {INTEIRO: 0, REAL: 0}
+        fixos = []
+        for v in registradores:
+            classe_reg = _classe_registrador(self.funcao.tipos[v])
+            fixos.append(tabela[classe_reg][usados[classe_reg]])
+            usados[classe_reg] += 1
+        return fixos
+
+    def _op_chamar(self, nome, argumentos, destinos):
+        for v, registrador in zip(argumentos, self._fixos(argumentos, ARGUMENTOS)):
+            self._ler_em(v, registrador)
+        self._e('jal', f"f_{nome}")
+        for v, registrador in zip(destinos, self._fixos(destinos, RETORNOS)):
+            self._escrever_de(v, registrador)
+
+    def _op_ret(self, valores):
+        for v, registrador in zip(valores, self._fixos(valores, RETORNOS)):
+            self._ler_em(v, registrador)
+        self._e('j', self.fim)
+
+    def _op_entrada(self, parametros):
+        for v, registrador in zip(parametros, self._fixos(parametros, ARGUMENTOS)):
+            self._escrever_de(v, registrador)
+
+    def _op_ler(self, d):
+        if self.funcao.tipos[d] == REAL:
+            self._e('li', '$v0', '6')
+            self._e('syscall')
+            self._escrever_de(d, '$f0')
+        else:
+            self._e('li', '$v0', '5')
+            self._e('syscall')
+            self._escrever_de(d, '$v0')
+
+    def _op_escrever(self, a):
+        tipo = self.funcao.tipos[a]
+        if tipo == REAL:
+            self._e('li', '$v0', '2')
+            self._ler_em(a, '$f12')
+        else:
+            self._e('li', '$v0', '1' if tipo == INTEIRO else '4')
+            self._ler_em(a, '$a0')
+        self._e('syscall')
+
+    def _op_texto(self, texto):
+        if len(texto) == 1 and ord(texto) < 128:
+            self._e('li', '$v0', '11')
+            self._e('li', '$a0', str(ord(texto)))
+        else:
+            self._e('li', '$v0', '4')
+            self._e('la', '$a0', self._rotulo_texto(texto))
+        self._e('syscall')
+
+    def _op_sair(self):
+        self._e('li', '$v0', '10')
+        self._e('syscall')
+
+
+# -- otimização peephole -------------------------------------------------------------------
+
+_INVERSO = {
+    'beq': 'bne', 'bne': 'beq', 'blt': 'bge', 'bge': 'blt', 'bgt': 'ble', 'ble': 'bgt',
+    'bltz': 'bgez', 'bgez': 'bltz', 'blez': 'bgtz', 'bgtz': 'blez', 'bc1t': 'bc1f', 'bc1f': 'bc1t',
+}
+_SALTOS = set(_INVERSO) | {'j', 'jal'}
+# Instruções cujo primeiro operando não é escrito
+_NAO_ESCREVEM = set(_SALTOS) | {'sw', 's.s', 'jr', 'div', 'mtc1', 'c.eq.s', 'c.lt.s', 'c.le.s', 'syscall'}
+
+
+def _simplificar(linhas):
+    """Movimentos inúteis e recargas de um valor que acabou de ser gravado na pilha"""
+    saida = []
+    for linha in linhas:
+        op = linha[0]
+        if op in ('move', 'mov.s') and linha[1] == linha[2]:
+            continue
+        if op in ('lw', 'l.s') and saida and saida[-1][0] == ('sw' if op == 'lw' else 's.s') \
+                and saida[-1][2] == linha[2]:
+            if saida[-1][1] != linha[1]:
+                saida.append(('move' if op == 'lw' else 'mov.s', linha[1], saida[-1][1]))
+            continue
+        saida.append(linha)
+    return saida
+
+
+def _remover_inalcancavel(linhas):
+    saida = []
+    morto = False
+    for linha in linhas:
+        if linha[0] == ROTULO:
+            morto = False
+        if not morto:
+            saida.append(linha)
+        if linha[0] in ('j', 'jr'):
+            morto = True
+    return saida
+
+
+def _encurtar_saltos(linhas):
+    """Salto para um salto vai direto ao destino final"""
+    destino = {}
+    for i, linha in enumerate(linhas):
+        if linha[0] != ROTULO:
+            continue
+        j = i
+        while j < len(linhas) and linhas[j][0] == ROTULO:
+            j += 1
+        if j < len(linhas) and linhas[j][0] == 'j':
+            destino[linha[1]] = linhas[j][1]
+
+    def final(rotulo):
+        vistos = set()
+        while rotulo in destino and rotulo not in vistos:
+            vistos.add(rotulo)
+            rotulo = destino[rotulo]
+        return rotulo
+
+    return [linha[:-1] + (final(linha[-1]),) if linha[0] in _SALTOS and linha[0] != 'jal' else linha
+            for linha in linhas]
+
+
+def _rotulos_seguintes(linhas, i):
+    """Rótulos colados na posição i (para onde a execução cai ao passar por i - 1)"""
+    rotulos = set()
+    while i < len(linhas) and linhas[i][0] == ROTULO:
+        rotulos.add(linhas[i][1])
+        i += 1
+    return rotulos
+
+
+def _desvios_redundantes(linhas):
+    """Remove 'j' para a linha seguinte e troca 'desvio sobre um j' pelo desvio invertido"""
+    saida = []
+    i = 0
+    while i < len(linhas):
+        linha = linhas[i]
+        if linha[0] == 'j' and linha[1] in _rotulos_seguintes(linhas, i + 1):
+            i += 1
+            continue
+        if linha[0] in _INVERSO and i + 1 < len(linhas) and linhas[i + 1][0] == 'j' \
+                and linha[-1] in _rotulos_seguintes(linhas, i + 2):
+            saida.append((_INVERSO[linha[0]],) + linha[1:-1] + (linhas[i + 1][1],))
+            i += 2
+            continue
+        saida.append(linha)
+        i += 1
+    return saida
+
+
+def _remover_rotulos(linhas, protegidos):
+    usados = {linha[-1] for linha in linhas if linha[0] in _SALTOS} | protegidos
+    return [linha for linha in linhas if linha[0] != ROTULO or linha[1] in usados]
+
+
+def _constantes_repetidas(linhas):
+    """
+    Não recarrega uma constante que o registrador já tem (o código da syscall em $v0, que as
+    syscalls de escrita preservam, ou a metade alta de um float em $t9). Vale dentro do bloco.
+    """
+    saida = []
+    conhecidos = {}
+    for linha in linhas:
+        op = linha[0]
+        if op == ROTULO or op == 'jal':
+            conhecidos.clear()
+        elif op in ('li', 'lui'):
+            if conhecidos.get(linha[1]) == (op, linha[2]):
+                continue
+            conhecidos[linha[1]] = (op, linha[2])
+        elif op == 'syscall':
+            if conhecidos.get('$v0') == ('li', '5'):
+                del conhecidos['$v0']
+        elif op not in _NAO_ESCREVEM and len(linha) > 1:
+            conhecidos.pop(linha[1], None)
+        saida.append(linha)
+    return saida
+
+
+def _unir_final(linhas, novo_rotulo):
+    """
+    Cross-jumping: dois trechos que terminam com as mesmas instruções e saltam para o mesmo
+    lugar ficam um só; o primeiro passa a saltar para o início do final comum do segundo.
+    Retorna as linhas com uma junção feita, ou None se não houver nenhuma.
+    """
+    saltos = {}
+    for i, linha in enumerate(linhas):
+        if linha[0] == 'j':
+            saltos.setdefault(linha[1], []).append(i)
+    for posicoes in saltos.values():
+        for x, a in enumerate(posicoes):
+            for b in posicoes[x + 1:]:
+                comum = 0
+                while a - comum - 1 >= 0 and b - comum - 1 > a and linhas[a - comum - 1][0] != ROTULO \
+                        and linhas[a - comum - 1] == linhas[b - comum - 1]:
+                    comum += 1
+                # Um final de uma instrução só trocaria uma instrução por um salto
+                if comum >= 2:
+                    rotulo = novo_rotulo()
+                    return (linhas[:a - comum] + [('j', rotulo)] + linhas[a + 1:b - comum]
+                            + [(ROTULO, rotulo)] + linhas[b - comum:])
+    return None
+
+
+def _unir_finais(linhas, novo_rotulo):
+    while True:
+        unidas = _unir_final(linhas, novo_rotulo)
+        if unidas is None:
+            return linhas
+        linhas = unidas
+
+
+def otimizar_peephole(linhas, protegidos=frozenset()):
+    """Aplica as regras até nada mais mudar; protegidos são rótulos que não podem sumir"""
+    criados = 0
+
+    def novo_rotulo():
+        nonlocal criados
+        criados += 1
+        return f"comum_{criados}"
+
+    while True:
+        novas = _simplificar(linhas)
+        novas = _unir_finais(novas, novo_rotulo)
+        novas = _encurtar_saltos(novas)
+        novas = _remover_inalcancavel(novas)
+        novas = _desvios_redundantes(novas)
+        novas = _remover_rotulos(novas, protegidos)
+        novas = _constantes_repetidas(novas)
+        if novas == linhas:
+            return novas
+        linhas = novas
+
+
+# -- API -----------------------------------------------------------------------------------
+
+def gerar_codigo_intermediario(tree):
+    """FuncaoIR do nível superior do módulo ('main') e das funções alcançáveis a partir dele"""
+    programa = _Programa(tree)
+    tradutor = _Tradutor(programa, FuncaoIR('main', principal=True))
+    funcoes = [tradutor.traduzir()]
+    pendentes = list(tradutor.chamadas)
+    traduzidas = set()
+    while pendentes:
+        nome = pendentes.pop(0)
+        if nome in traduzidas:
+            continue
+        traduzidas.add(nome)
+        tradutor = _Tradutor(programa, FuncaoIR(nome), programa.funcoes[nome])
+        funcoes.append(tradutor.traduzir())
+        pendentes.extend(tradutor.chamadas)
+    return funcoes
+
+
+def _escapar(texto):
+    return texto.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\t', '\\t')
+
+
+def _formatar(linhas, textos):
+    usados = {linha[2] for linha in linhas if linha[0] == 'la'}
+    saida = []
+    dados = [(rotulo, texto) for texto, rotulo in textos.items() if rotulo in usados]
+    if dados:
+        saida.append('.data')
+        saida.extend(f'{rotulo}: .asciiz "{_escapar(texto)}"' for rotulo, texto in dados)
+        saida.append('')
+    saida.extend(['.text', '.globl main'])
+    for linha in linhas:
+        if linha[0] == ROTULO:
+            saida.append(f"{linha[1]}:")
+        elif len(linha) == 1:
+            saida.append(f"    {linha[0]}")
+        else:
+            saida.append(f"    {linha[0]} {', '.join(linha[1:])}")
+    return '\n'.join(saida) + '\n'
+
+
+def gerar_mips(codigo_fonte, otimizar=True, limite_registradores=None):
+    """
+    Assembly MIPS (MARS/SPIM) para um programa no subconjunto aceito: funções de nível superior
+    com parâmetros posicionais, int/float/bool, while/if/for em range, break/continue,
+    try/except com raise no próprio corpo, print e int/float(input(...)).
+    Divisão inteira e resto arredondam para baixo, como no Python (divisão por zero não é verificada).
+    Recebe o código-fonte ou a AST; levanta ErroGeracao fora do subconjunto.
+    """
+    tree = ast.parse(codigo_fonte) if isinstance(codigo_fonte, str) else codigo_fonte
+    textos = {}
+    linhas = []
+    funcoes = gerar_codigo_intermediario(tree)
+    if otimizar:
+        funcoes = _expandir_chamadas(funcoes)
+    for funcao in funcoes:
+        if otimizar:
+            _propagar_constantes(funcao)
+            _propagar_copias(funcao)
+            _juntar_textos(funcao)
+            _imediatos(funcao)
+            _remover_mortas(funcao)
+        alocacao, memoria = alocar_registradores(funcao, limite_registradores)
+        linhas.extend(_Emissor(funcao, alocacao, memoria, textos).emitir())
+    if otimizar:
+        linhas = otimizar_peephole(linhas, {'main'})
+    return _formatar(linhas, textos)
+
+
+# Pseudo-instruções e quantas instruções reais o montador gera para cada uma
+_PSEUDO = {'la': 2, 'blt': 2, 'ble': 2, 'bgt': 2, 'bge': 2, 'li.s': 2, 'abs': 3}
+_ACESSOS_MEMORIA = {'lw', 'sw', 'l.s', 's.s', 'lwc1', 'swc1', 'lb', 'sb'}
+
+
+def _instrucoes_reais(mnemonico, operandos):
+    if mnemonico == 'li':
+        try:
+            valor = int(operandos[-1], 0)
+        except ValueError:
+            return 2
+        return 1 if -32768 <= valor <= 65535 else 2
+    return _PSEUDO.get(mnemonico, 1)
+
+
+def estatisticas_asm(texto):
+    """Contagem estática de um assembly MIPS: instruções (e instruções reais depois do montador),
+    acessos à memória, os que usam a pilha, desvios e syscalls"""
+    por_mnemonico = Counter()
+    reais = pilha = 0
+    for linha in texto.splitlines():
+        linha = linha.strip()
+        if ':' in linha and not linha.startswith('#'):
+            rotulo, _, resto = linha.partition(':')
+            if rotulo.replace('_', '').isalnum():
+                linha = resto.strip()
+        linha = linha.split('#', 1)[0].strip()
+        if not linha or linha.startswith('.'):
+            continue
+        mnemonico, _, resto = linha.partition(' ')
+        operandos = [o.strip() for o in resto.split(',')] if resto.strip() else []
+        por_mnemonico[mnemonico] += 1
+        reais += _instrucoes_reais(mnemonico, operandos)
+        if mnemonico in _ACESSOS_MEMORIA and '($sp)' in resto:
+            pilha += 1
+    return {
+        'instrucoes': sum(por_mnemonico.values()),
+        'reais': reais,
+        'memoria': sum(n for m, n in por_mnemonico.items() if m in _ACESSOS_MEMORIA),
+        'pilha': pilha,
+        'desvios': sum(n for m, n in por_mnemonico.items() if m in _SALTOS or m == 'jr'),
+        'syscalls': por_mnemonico['syscall'],
+        'por_mnemonico': por_mnemonico,
+    }
+
+
+if __name__ == "__main__":
+    with open('main.py', 'r') as f:
+        codigo = f.read()
+
+    print(gerar_mips(codigo))
@@ -1,60 +1,154 @@
-import pandas as pd
-from fpdf import FPDF
-from docx import Document
-from lexical_analysis import analisar_lexico
+import csv
+import json
+import re
+from itertools import islice
+from xml.sax.saxutils import escape
 
-def gerar_pdf_tabela(tokens, nome_arquivo_pdf="tabela_tokens.pdf"):
-    # Cria DataFrame
-    df = pd.DataFrame(tokens, columns=["Nome", "Token", "Tipo", "Descrição", "Linha"])
+from lexical_analysis import abrir_fonte_mapeada, iterar_analise_lexica
+
+COLUNAS = ["Nome", "Token", "Tipo", "Descrição", "Linha"]
+LARGURAS_PDF = [30, 60, 30, 60, 15]
+# Linhas da tabela DOCX montadas e convertidas em XML por vez
+LOTE_DOCX = 2000
+LOTE_PARQUET = 65536
+
+_SEPARADORES_RUN = re.compile(r'([\t\r\n])')
+# Caracteres de controle que não podem aparecer em XML
+_INVALIDOS_XML = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def linhas_tokens(tokens):
+    """
+    Converte tokens (dicts de analisar_lexico, uma TabelaTokens ou o gerador de iterar_analise_lexica)
+    em tuplas na ordem de COLUNAS, uma de cada vez.
+    """
+    for t in tokens:
+        yield t["Nome"], t["Token"], t["Tipo"], t["Descrição"], t["Linha"]
+
+
+_PdfTabela = None
 
-    # Cria PDF
-    pdf = FPDF()
+
+def _classe_pdf():
+    """Subclasse de FPDF criada no primeiro uso, para que importar este módulo não carregue o fpdf"""
+    global _PdfTabela
+    if _PdfTabela is None:
+        from fpdf import FPDF
+
+        class _PdfTabela(FPDF):
+            # O FPDF chama header() em cada página nova, então o cabeçalho da tabela se repete sozinho
+            def header(self):
+                self.set_font("Arial", size=10)
+                for largura, coluna in zip(LARGURAS_PDF, COLUNAS):
+                    self.cell(largura, 10, coluna, border=1)
+                self.ln()
+    return _PdfTabela
+
+
+def gerar_pdf_tabela(tokens, nome_arquivo_pdf="tabela_tokens.pdf"):
+    pdf = _classe_pdf()()
     pdf.add_page()
-    pdf.set_font("Arial", size=10)
-    col_widths = [30, 60, 30, 60, 15]
-
-    # Cabeçalho
-    headers = ["Nome", "Token", "Tipo", "Descrição", "Linha"]
-    for i, header in enumerate(headers):
-        pdf.cell(col_widths[i], 10, header, border=1)
-    pdf.ln()
-
-    # Linhas da tabela
-    for _, row in df.iterrows():
-        pdf.cell(col_widths[0], 10, str(row["Nome"]), border=1)
-        pdf.cell(col_widths[1], 10, str(row["Token"])[:30], border=1)  # Limita tamanho
-        pdf.cell(col_widths[2], 10, str(row["Tipo"]), border=1)
-        pdf.cell(col_widths[3], 10, str(row["Descrição"])[:30], border=1)
-        pdf.cell(col_widths[4], 10, str(row["Linha"]), border=1)
+    l_nome, l_token, l_tipo, l_descricao, l_linha = LARGURAS_PDF
+
+    # As páginas são quebradas automaticamente à medida que as linhas são escritas
+    for nome, token, tipo, descricao, linha in linhas_tokens(tokens):
+        pdf.cell(l_nome, 10, nome, border=1)
+        pdf.cell(l_token, 10, token[:30], border=1)  # Limita tamanho
+        pdf.cell(l_tipo, 10, tipo, border=1)
+        pdf.cell(l_descricao, 10, descricao[:30], border=1)
+        pdf.cell(l_linha, 10, str(linha), border=1)
         pdf.ln()
 
     pdf.output(nome_arquivo_pdf)
     print(f"Tabela salva em {nome_arquivo_pdf}")
 
+
+def _xml_run(texto):
+    # Mesmo conteúdo que o python-docx gera para cell.text: tabulações e quebras de linha viram elementos
+    partes = []
+    for pedaco in _SEPARADORES_RUN.split(_INVALIDOS_XML.sub('', texto)):
+        if pedaco == '\t':
+            partes.append('<w:tab/>')
+        elif pedaco in ('\r', '\n'):
+            partes.append('<w:br/>')
+        elif pedaco:
+            espaco = ' xml:space="preserve"' if pedaco.strip() != pedaco else ''
+            partes.append(f'<w:t{espaco}>{escape(pedaco)}</w:t>')
+    return ''.join(partes)
+
+
+def _xml_linhas(linhas, larguras):
+    celulas = [
+        f'<w:tc><w:tcPr><w:tcW w:w="{largura}" w:type="dxa"/></w:tcPr><w:p><w:r>{{}}</w:r></w:p></w:tc>'
+        for largura in larguras
+    ]
+    modelo = '<w:tr>' + ''.join(celulas) + '</w:tr>'
+    return ''.join(modelo.format(*(_xml_run(str(valor)) for valor in linha)) for linha in linhas)
+
+
 def gerar_docx_tabela(tokens, nome_arquivo_docx="tabela_tokens.docx"):
-    # Cria DataFrame
-    df = pd.DataFrame(tokens, columns=["Nome", "Token", "Tipo", "Descrição", "Linha"])
+    from docx import Document
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import nsdecls
 
-    # Cria documento Word
     doc = Document()
     doc.add_heading('Tabela de Tokens', 0)
-    table = doc.add_table(rows=1, cols=len(df.columns))
+    table = doc.add_table(rows=1, cols=len(COLUNAS))
     hdr_cells = table.rows[0].cells
-    for i, col in enumerate(df.columns):
+    for i, col in enumerate(COLUNAS):
         hdr_cells[i].text = col
 
-    # Adiciona linhas à tabela
-    for _, row in df.iterrows():
-        row_cells = table.add_row().cells
-        for i, item in enumerate(row):
-            row_cells[i].text = str(item)
+    # As linhas são geradas como XML e anexadas em lotes, em vez de uma chamada add_row() por linha
+    tbl = table._tbl
+    larguras = [coluna.w.twips for coluna in tbl.tblGrid.gridCol_lst]
+    linhas = linhas_tokens(tokens)
+    while True:
+        lote = list(islice(linhas, LOTE_DOCX))
+        if not lote:
+            break
+        fragmento = parse_xml(f'<w:tbl {nsdecls("w")}>{_xml_linhas(lote, larguras)}</w:tbl>')
+        tbl.extend(list(fragmento))
 
     doc.save(nome_arquivo_docx)
     print(f"Tabela salva em {nome_arquivo_docx}")
 
+
+def exportar_csv(tokens, caminho="tabela_tokens.csv"):
+    with open(caminho, "w", encoding="utf-8", newline="") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(COLUNAS)
+        escritor.writerows(linhas_tokens(tokens))
+    return caminho
+
+
+def exportar_jsonl(tokens, caminho="tabela_tokens.jsonl"):
+    with open(caminho, "w", encoding="utf-8") as f:
+        for linha in linhas_tokens(tokens):
+            f.write(json.dumps(dict(zip(COLUNAS, linha)), ensure_ascii=False))
+            f.write("\n")
+    return caminho
+
+
+def exportar_parquet(tokens, caminho="tabela_tokens.parquet"):
+    """Grava em lotes de LOTE_PARQUET linhas; requer pyarrow, importado só aqui"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    esquema = pa.schema([(coluna, pa.string()) for coluna in COLUNAS[:-1]] + [("Linha", pa.int64())])
+    linhas = linhas_tokens(tokens)
+    with pq.ParquetWriter(caminho, esquema) as escritor:
+        while True:
+            lote = list(islice(linhas, LOTE_PARQUET))
+            if not lote:
+                break
+            colunas = [list(valores) for valores in zip(*lote)]
+            escritor.write_batch(pa.record_batch(colunas, schema=esquema))
+    return caminho
+
+
 if __name__ == "__main__":
-    with open("main.py", "r", encoding="utf-8") as f:
-        codigo = f.read()
-    tokens = analisar_lexico(codigo)
-    gerar_pdf_tabela(tokens, './images/tabela_tokens.pdf')
-    gerar_docx_tabela(tokens, './images/tabela_tokens.docx')
\ No newline at end of file
+    # Os tokens vão do analisador léxico direto para cada relatório, sem montar a tabela inteira na memória
+    with abrir_fonte_mapeada("main.py") as fonte:
+        gerar_pdf_tabela(iterar_analise_lexica(fonte), './images/tabela_tokens.pdf')
+    with abrir_fonte_mapeada("main.py") as fonte:
+        gerar_docx_tabela(iterar_analise_lexica(fonte), './images/tabela_tokens.docx')
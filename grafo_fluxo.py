@@ -0,0 +1,401 @@
+import ast
+
+_FUNCOES = (ast.FunctionDef, ast.AsyncFunctionDef)
+_TRY = (ast.Try, ast.TryStar) if hasattr(ast, 'TryStar') else (ast.Try,)
+
+# Tipos de elemento de um bloco básico: (tipo, nó, papel)
+#   INSTRUCAO: instrução simples inteira (atribuição, chamada, return, def...)
+#   EXPRESSAO: expressão avaliada pelo cabeçalho de uma instrução composta (teste do if, iterável do for...)
+#   LIGAR / DESLIGAR: o nome de um except ... as nome passa a existir / é apagado no fim do handler
+INSTRUCAO = 'instrucao'
+EXPRESSAO = 'expressao'
+LIGAR = 'ligar'
+DESLIGAR = 'desligar'
+
+
+class GrafoFluxo:
+    """
+    Grafo de fluxo de controle de uma função (ou do corpo do módulo) em blocos básicos.
+    Os blocos são índices inteiros; os dados de cada bloco ficam em listas paralelas:
+    elementos[b] (o que o bloco executa, em ordem), rotulos[b], sucessores[b] e predecessores[b].
+    O bloco 0 é a entrada e o bloco 1 é a saída.
+    """
+    ENTRADA = 0
+    SAIDA = 1
+
+    def __init__(self, nome, no):
+        self.nome = nome
+        self.no = no
+        self.elementos = []
+        self.rotulos = []
+        self.sucessores = []
+        self.predecessores = []
+        # (origem, destino) -> rótulo, só para as arestas que têm um ('V', 'F', 'exceção', 'break'...)
+        self.rotulos_arestas = {}
+        self.novo_bloco('entrada')
+        self.novo_bloco('saída')
+
+    def __len__(self):
+        return len(self.elementos)
+
+    def novo_bloco(self, rotulo=''):
+        self.elementos.append([])
+        self.rotulos.append(rotulo)
+        self.sucessores.append([])
+        self.predecessores.append([])
+        return len(self.elementos) - 1
+
+    def ligar(self, origem, destino, rotulo=None):
+        if destino in self.sucessores[origem]:
+            return
+        self.sucessores[origem].append(destino)
+        self.predecessores[destino].append(origem)
+        if rotulo:
+            self.rotulos_arestas[(origem, destino)] = rotulo
+
+    def alcancaveis(self):
+        """Conjunto dos blocos alcançáveis a partir da entrada"""
+        vistos = {self.ENTRADA}
+        pilha = [self.ENTRADA]
+        while pilha:
+            for sucessor in self.sucessores[pilha.pop()]:
+                if sucessor not in vistos:
+                    vistos.add(sucessor)
+                    pilha.append(sucessor)
+        return vistos
+
+    def pos_ordem(self):
+        """Blocos alcançáveis em pós-ordem (iterativa); a inversa é a ordem natural das análises para a frente"""
+        ordem = []
+        vistos = {self.ENTRADA}
+        pilha = [(self.ENTRADA, iter(self.sucessores[self.ENTRADA]))]
+        while pilha:
+            bloco, sucessores = pilha[-1]
+            for sucessor in sucessores:
+                if sucessor not in vistos:
+                    vistos.add(sucessor)
+                    pilha.append((sucessor, iter(self.sucessores[sucessor])))
+                    break
+            else:
+                pilha.pop()
+                ordem.append(bloco)
+        return ordem
+
+
+class _Finally:
+    """
+    Um finally em construção. O corpo é montado uma vez para cada destino (o que vem depois do
+    try, o tratador de fora, o alvo de um return, break ou continue), e cada cópia sai só para
+    o seu destino: um return dentro do try não continua no código depois do try
+    """
+    __slots__ = ('grafo', 'entradas', 'excecao_externa', 'profundidade_lacos')
+
+    def __init__(self, grafo, excecao_externa, profundidade_lacos):
+        self.grafo = grafo
+        # (destino, rótulo da saída) -> bloco de entrada da cópia
+        self.entradas = {}
+        # Para onde vão as exceções levantadas no próprio finally
+        self.excecao_externa = excecao_externa
+        self.profundidade_lacos = profundidade_lacos
+
+    def entrada(self, destino, rotulo):
+        """Bloco por onde entra o caminho que, ao fim do finally, segue para destino"""
+        bloco = self.entradas.get((destino, rotulo))
+        if bloco is None:
+            bloco = self.entradas[(destino, rotulo)] = self.grafo.novo_bloco('finally')
+            if self.excecao_externa is not None:
+                self.grafo.ligar(bloco, self.excecao_externa, 'exceção')
+        return bloco
+
+
+def _sempre_verdadeiro(teste):
+    return isinstance(teste, ast.Constant) and bool(teste.value)
+
+
+def _padrao_irrefutavel(caso):
+    padrao = caso.pattern
+    while isinstance(padrao, ast.MatchAs) and padrao.pattern is not None:
+        padrao = padrao.pattern
+    return caso.guard is None and isinstance(padrao, ast.MatchAs)
+
+
+class _Construtor:
+    """
+    Monta o GrafoFluxo de um corpo de instruções.
+
+    Dentro de um try, cada instrução simples fica em um bloco próprio, e todo bloco criado
+    ali ganha uma aresta para o despacho dos except (o estado ao fim de cada instrução é o
+    estado em que a próxima pode levantar a exceção). O corpo de um finally é montado uma vez
+    para cada destino dos caminhos que passam por ele (normal, exceção, return, break, continue),
+    então os mesmos nós podem aparecer em mais de um bloco.
+    """
+
+    def __init__(self, grafo):
+        self.grafo = grafo
+        # (cabeçalho, saída) dos laços abertos
+        self.lacos = []
+        # Para onde vai uma exceção levantada no ponto atual (despacho dos except ou finally)
+        self.excecoes = []
+        self.finais = []
+
+    def _bloco(self, rotulo=''):
+        bloco = self.grafo.novo_bloco(rotulo)
+        if self.excecoes:
+            self.grafo.ligar(bloco, self.excecoes[-1], 'exceção')
+        return bloco
+
+    def _alvo_excecao(self):
+        return self.excecoes[-1] if self.excecoes else GrafoFluxo.SAIDA
+
+    def _para_instrucao(self, atual):
+        """Bloco onde a próxima instrução simples deve entrar"""
+        if atual is None:
+            # Código depois de return/break/raise: vai para um bloco sem predecessores
+            return self.grafo.novo_bloco('inalcançável')
+        if self.excecoes and self.grafo.elementos[atual]:
+            novo = self._bloco()
+            self.grafo.ligar(atual, novo)
+            return novo
+        return atual
+
+    def _saltar(self, atual, destino, profundidade_lacos, rotulo):
+        """Liga atual a destino passando pelos finally abertos dentro do alvo do salto"""
+        # Do finally mais externo para o mais interno: cada um sai para a cópia do seguinte
+        alvo = destino
+        for final in self.finais:
+            if final.profundidade_lacos > profundidade_lacos:
+                alvo = final.entrada(alvo, rotulo)
+        self.grafo.ligar(atual, alvo, rotulo)
+
+    def construir(self, corpo, parametros=()):
+        grafo = self.grafo
+        for parametro in parametros:
+            grafo.elementos[GrafoFluxo.ENTRADA].append((LIGAR, parametro, 'parâmetro'))
+        inicio = grafo.novo_bloco()
+        grafo.ligar(GrafoFluxo.ENTRADA, inicio)
+        fim = self._sequencia(corpo, inicio)
+        if fim is not None:
+            grafo.ligar(fim, GrafoFluxo.SAIDA)
+        return grafo
+
+    def _sequencia(self, instrucoes, atual):
+        for instrucao in instrucoes:
+            atual = self._instrucao(instrucao, atual)
+        return atual
+
+    def _instrucao(self, no, atual):
+        grafo = self.grafo
+        if isinstance(no, ast.If):
+            atual = self._para_instrucao(atual)
+            grafo.elementos[atual].append((EXPRESSAO, no.test, 'if'))
+            depois = self._bloco()
+            entao = self._bloco()
+            grafo.ligar(atual, entao, 'V')
+            fim = self._sequencia(no.body, entao)
+            if fim is not None:
+                grafo.ligar(fim, depois)
+            if no.orelse:
+                senao = self._bloco()
+                grafo.ligar(atual, senao, 'F')
+                fim = self._sequencia(no.orelse, senao)
+                if fim is not None:
+                    grafo.ligar(fim, depois)
+            else:
+                grafo.ligar(atual, depois, 'F')
+            return depois if grafo.predecessores[depois] else None
+
+        if isinstance(no, ast.While):
+            cabecalho = self._bloco('while')
+            if atual is not None:
+                grafo.ligar(atual, cabecalho)
+            grafo.elementos[cabecalho].append((EXPRESSAO, no.test, 'while'))
+            return self._laco(no, cabecalho, infinito=_sempre_verdadeiro(no.test))
+
+        if isinstance(no, (ast.For, ast.AsyncFor)):
+            atual = self._para_instrucao(atual)
+            grafo.elementos[atual].append((EXPRESSAO, no.iter, 'for ... in'))
+            cabecalho = self._bloco('for')
+            grafo.ligar(atual, cabecalho)
+            return self._laco(no, cabecalho, alvo=no.target)
+
+        if isinstance(no, _TRY):
+            return self._try(no, atual)
+
+        if isinstance(no, (ast.With, ast.AsyncWith)):
+            atual = self._para_instrucao(atual)
+            for item in no.items:
+                grafo.elementos[atual].append((EXPRESSAO, item.context_expr, 'with'))
+                if item.optional_vars is not None:
+                    grafo.elementos[atual].append((EXPRESSAO, item.optional_vars, 'as'))
+            return self._sequencia(no.body, atual)
+
+        if isinstance(no, ast.Match):
+            atual = self._para_instrucao(atual)
+            grafo.elementos[atual].append((EXPRESSAO, no.subject, 'match'))
+            depois = self._bloco()
+            for caso in no.cases:
+                bloco = self._bloco('case')
+                grafo.ligar(atual, bloco)
+                grafo.elementos[bloco].append((EXPRESSAO, caso.pattern, 'case'))
+                if caso.guard is not None:
+                    grafo.elementos[bloco].append((EXPRESSAO, caso.guard, 'if'))
+                fim = self._sequencia(caso.body, bloco)
+                if fim is not None:
+                    grafo.ligar(fim, depois)
+            if not no.cases or not _padrao_irrefutavel(no.cases[-1]):
+                grafo.ligar(atual, depois)
+            return depois if grafo.predecessores[depois] else None
+
+        # Instruções simples
+        atual = self._para_instrucao(atual)
+        grafo.elementos[atual].append((INSTRUCAO, no, None))
+        if isinstance(no, ast.Return):
+            self._saltar(atual, GrafoFluxo.SAIDA, -1, 'return')
+            return None
+        if isinstance(no, ast.Raise):
+            grafo.ligar(atual, self._alvo_excecao(), 'exceção')
+            return None
+        if isinstance(no, ast.Break):
+            if self.lacos:
+                self._saltar(atual, self.lacos[-1][1], len(self.lacos) - 1, 'break')
+            return None
+        if isinstance(no, ast.Continue):
+            if self.lacos:
+                self._saltar(atual, self.lacos[-1][0], len(self.lacos) - 1, 'continue')
+            return None
+        return atual
+
+    def _laco(self, no, cabecalho, infinito=False, alvo=None):
+        grafo = self.grafo
+        depois = self._bloco()
+        corpo = self._bloco()
+        grafo.ligar(cabecalho, corpo, 'V')
+        if alvo is not None:
+            # O alvo do for só é atribuído quando há um próximo item
+            grafo.elementos[corpo].append((EXPRESSAO, alvo, 'for'))
+        self.lacos.append((cabecalho, depois))
+        fim = self._sequencia(no.body, corpo)
+        self.lacos.pop()
+        if fim is not None:
+            grafo.ligar(fim, cabecalho)
+        if not infinito:
+            if no.orelse:
+                senao = self._bloco()
+                grafo.ligar(cabecalho, senao, 'F')
+                fim = self._sequencia(no.orelse, senao)
+                if fim is not None:
+                    grafo.ligar(fim, depois)
+            else:
+                grafo.ligar(cabecalho, depois, 'F')
+        return depois if grafo.predecessores[depois] else None
+
+    def _try(self, no, atual):
+        grafo = self.grafo
+        final = None
+        if no.finalbody:
+            # Exceções no finally vão para o tratador externo
+            final = _Finally(grafo, self.excecoes[-1] if self.excecoes else None, len(self.lacos))
+            entrada_excecao = final.entrada(self._alvo_excecao(), 'exceção')
+            self.finais.append(final)
+            self.excecoes.append(entrada_excecao)
+
+        despacho = None
+        if no.handlers:
+            despacho = grafo.novo_bloco('except')
+            pegam_tudo = any(h.type is None or (isinstance(h.type, ast.Name) and h.type.id == 'BaseException')
+                             for h in no.handlers)
+            if not pegam_tudo:
+                grafo.ligar(despacho, self._alvo_excecao(), 'exceção')
+
+        self.excecoes.append(despacho if despacho is not None else entrada_excecao)
+        # O bloco try fica vazio: sua aresta de exceção leva o estado de antes do try, em que a
+        # primeira instrução do corpo pode levantar
+        entrada = self._bloco('try')
+        if atual is not None:
+            grafo.ligar(atual, entrada)
+        corpo = self._bloco()
+        grafo.ligar(entrada, corpo)
+        fim = self._sequencia(no.body, corpo)
+        self.excecoes.pop()
+
+        saidas = []
+        if no.orelse and fim is not None:
+            senao = self._bloco()
+            grafo.ligar(fim, senao)
+            fim = self._sequencia(no.orelse, senao)
+        if fim is not None:
+            saidas.append(fim)
+
+        for handler in no.handlers:
+            bloco = self._bloco('except')
+            grafo.ligar(despacho, bloco)
+            if handler.type is not None:
+                grafo.elementos[bloco].append((EXPRESSAO, handler.type, 'except'))
+            if handler.name:
+                grafo.elementos[bloco].append((LIGAR, handler, 'as'))
+            fim = self._sequencia(handler.body, bloco)
+            if fim is not None:
+                if handler.name:
+                    # O Python apaga o nome da exceção ao sair do except
+                    fim = self._para_instrucao(fim)
+                    grafo.elementos[fim].append((DESLIGAR, handler, None))
+                saidas.append(fim)
+
+        if final is None:
+            if not saidas:
+                return None
+            depois = self._bloco()
+            for saida in saidas:
+                grafo.ligar(saida, depois)
+            return depois
+
+        self.excecoes.pop()
+        self.finais.pop()
+        depois = None
+        if saidas:
+            depois = self._bloco()
+            normal = final.entrada(depois, None)
+            for saida in saidas:
+                grafo.ligar(saida, normal)
+        for (destino, rotulo), copia in final.entradas.items():
+            fim = self._sequencia(no.finalbody, copia)
+            if fim is not None:
+                grafo.ligar(fim, destino, rotulo)
+        return depois
+
+
+def construir_grafo_fluxo(no, nome=None):
+    """
+    Grafo de fluxo de controle do corpo de uma função (FunctionDef/AsyncFunctionDef) ou de um módulo.
+    Funções e classes internas aparecem só como a instrução que as define.
+    """
+    if isinstance(no, _FUNCOES):
+        argumentos = no.args
+        parametros = [a for a in argumentos.posonlyargs + argumentos.args + argumentos.kwonlyargs
+                      + [argumentos.vararg, argumentos.kwarg] if a is not None]
+        grafo = GrafoFluxo(nome or no.name, no)
+        return _Construtor(grafo).construir(no.body, parametros)
+    return _Construtor(GrafoFluxo(nome or '<módulo>', no)).construir(no.body)
+
+
+def construir_grafos_fluxo(tree):
+    """Grafos do módulo e de cada função (inclusive aninhadas e métodos), na ordem do código"""
+    grafos = [construir_grafo_fluxo(tree)]
+    pilha = list(reversed(tree.body)) if isinstance(tree, ast.Module) else [tree]
+    while pilha:
+        node = pilha.pop()
+        if isinstance(node, _FUNCOES):
+            grafos.append(construir_grafo_fluxo(node))
+        filhos = [filho for filho in ast.iter_child_nodes(node) if isinstance(filho, (ast.stmt, ast.excepthandler, ast.match_case))]
+        pilha.extend(reversed(filhos))
+    return grafos
+
+
+# Exemplo de uso:
+if __name__ == "__main__":
+    with open("main.py", "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+
+    for grafo in construir_grafos_fluxo(tree):
+        arestas = sum(len(s) for s in grafo.sucessores)
+        print(f"{grafo.nome}: {len(grafo)} blocos, {arestas} arestas, {len(grafo.alcancaveis())} alcançáveis")
@@ -0,0 +1,418 @@
+import argparse
+import ast
+import hashlib
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from analise_projeto import coletar_arquivos
+from tabela_simbolos import Simbolo, construir_tabela_simbolos
+
+# Deve mudar sempre que o esquema ou o que é extraído de cada arquivo mudar; um banco de outra
+# versão é recriado do zero
+VERSAO_INDICE = 1
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS arquivos (
+    id INTEGER PRIMARY KEY,
+    caminho TEXT NOT NULL UNIQUE,
+    modulo TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    tamanho INTEGER NOT NULL,
+    erro TEXT
+);
+CREATE TABLE IF NOT EXISTS simbolos (
+    arquivo INTEGER NOT NULL,
+    nome TEXT NOT NULL,
+    qualificado TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    linha INTEGER NOT NULL,
+    coluna INTEGER NOT NULL,
+    decorado INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS referencias (
+    arquivo INTEGER NOT NULL,
+    alvo TEXT,
+    nome TEXT NOT NULL,
+    origem TEXT NOT NULL,
+    linha INTEGER NOT NULL,
+    coluna INTEGER NOT NULL,
+    chamada INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reexportacoes (
+    arquivo INTEGER NOT NULL,
+    qualificado TEXT NOT NULL,
+    alvo TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS simbolos_arquivo ON simbolos (arquivo);
+CREATE INDEX IF NOT EXISTS simbolos_qualificado ON simbolos (qualificado);
+CREATE INDEX IF NOT EXISTS simbolos_nome ON simbolos (nome);
+CREATE INDEX IF NOT EXISTS referencias_arquivo ON referencias (arquivo);
+CREATE INDEX IF NOT EXISTS referencias_alvo ON referencias (alvo);
+CREATE INDEX IF NOT EXISTS referencias_origem ON referencias (origem);
+CREATE INDEX IF NOT EXISTS referencias_atributo ON referencias (nome) WHERE alvo IS NULL;
+CREATE INDEX IF NOT EXISTS reexportacoes_arquivo ON reexportacoes (arquivo);
+CREATE INDEX IF NOT EXISTS reexportacoes_alvo ON reexportacoes (alvo);
+CREATE INDEX IF NOT EXISTS reexportacoes_qualificado ON reexportacoes (qualificado);
+"""
+
+# Referência ao símbolo pelo nome dele ou por um nome que o reexporta (from .util import f em __init__.py)
+_REFERE_A = "r.alvo = {0} OR r.alvo IN (SELECT e.qualificado FROM reexportacoes e WHERE e.alvo = {0})"
+# Liga cada referência à definição, seguindo uma reexportação se houver
+_DEFINICAO = ("LEFT JOIN reexportacoes e ON e.qualificado = r.alvo "
+              "JOIN simbolos s ON s.qualificado = COALESCE(e.alvo, r.alvo)")
+_DEFINICOES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def modulo_de(caminho, raiz):
+    """Nome do módulo de um arquivo relativo à raiz do projeto (pacote/__init__.py vira 'pacote')"""
+    relativo = os.path.splitext(os.path.relpath(os.path.abspath(caminho), raiz))[0]
+    partes = [p for p in relativo.split(os.sep) if p not in ('', '.')]
+    if partes and partes[-1] == '__init__':
+        partes.pop()
+    return '.'.join(partes) or '__init__'
+
+
+def _alvo_import(alias, importacao, modulo, pacote):
+    """Nome completo ao qual o nome ligado por um import se refere"""
+    if isinstance(importacao, ast.Import):
+        return alias.name if alias.asname else alias.name.split('.')[0]
+    base = importacao.module or ''
+    if importacao.level:
+        partes = pacote.split('.') if pacote else []
+        partes = partes[:len(partes) - importacao.level + 1] if importacao.level > 1 else partes
+        base = '.'.join(partes + ([base] if base else []))
+    return f"{base}.{alias.name}" if base else alias.name
+
+
+def extrair(codigo_fonte, modulo, pacote=None):
+    """
+    Definições, referências e reexportações de um módulo. Retorna (simbolos, referencias, reexportacoes):
+    simbolos: (nome, qualificado, tipo, linha, coluna, decorado), com tipo 'funcao', 'metodo',
+    'classe' ou 'variavel' (variáveis do nível do módulo) e qualificado = módulo + __qualname__.
+    referencias: (alvo, nome, origem, linha, coluna, chamada), com alvo = nome completo do que foi
+    referenciado (funções e classes do próprio módulo, nomes importados e atributos deles, como
+    modulo.funcao ou Classe.metodo) e origem = função, classe ou módulo em que a referência está.
+    Atributos que não dá para resolver (obj.metodo) entram com alvo None e só o nome.
+    reexportacoes: (qualificado, alvo) para cada nome importado no nível do módulo, para que
+    'from pacote import f' encontre a f que pacote/__init__.py importou de outro módulo.
+    """
+    if pacote is None:
+        pacote = modulo.rpartition('.')[0]
+    tree = ast.parse(codigo_fonte)
+    tabela = construir_tabela_simbolos(tree)
+
+    # Nomes qualificados das definições, como __qualname__
+    qualificados = {}
+    simbolos = []
+    pilha = [(tree, '', False)]
+    while pilha:
+        no, prefixo, em_classe = pilha.pop()
+        for filho in ast.iter_child_nodes(no):
+            if isinstance(filho, _DEFINICOES):
+                qualificado = prefixo + filho.name
+                qualificados[filho] = f"{modulo}.{qualificado}"
+                if isinstance(filho, ast.ClassDef):
+                    tipo, interno = 'classe', (qualificado + '.', True)
+                else:
+                    tipo, interno = 'metodo' if em_classe else 'funcao', (qualificado + '.<locals>.', False)
+                simbolos.append((filho.name, qualificados[filho], tipo, filho.lineno, filho.col_offset,
+                                 int(bool(filho.decorator_list))))
+                pilha.append((filho, *interno))
+            else:
+                pilha.append((filho, prefixo, em_classe and not isinstance(filho, ast.Lambda)))
+
+    importados = {}
+    pais_atributo = {}
+    funcs_chamadas = set()
+    for no in ast.walk(tree):
+        if isinstance(no, (ast.Import, ast.ImportFrom)):
+            for alias in no.names:
+                if alias.name != '*':
+                    importados[alias] = _alvo_import(alias, no, modulo, pacote)
+        elif isinstance(no, ast.Attribute):
+            pais_atributo[no.value] = no
+        elif isinstance(no, ast.Call):
+            funcs_chamadas.add(no.func)
+
+    reexportacoes = []
+    for nome, simbolo in tabela.modulo.simbolos.items():
+        definicoes = simbolo.definicoes
+        if definicoes and all(isinstance(d, ast.Name) for d in definicoes):
+            primeira = definicoes[0]
+            simbolos.append((nome, f"{modulo}.{nome}", 'variavel', primeira.lineno, primeira.col_offset, 0))
+        reexportacoes.extend((f"{modulo}.{nome}", importados[d]) for d in set(definicoes) if d in importados)
+
+    def origem(escopo):
+        while escopo is not None and not isinstance(escopo.no, _DEFINICOES):
+            escopo = escopo.pai
+        return modulo if escopo is None else qualificados[escopo.no]
+
+    def alvo_do_simbolo(simbolo):
+        """(nome completo, se os atributos dele também têm nome completo)"""
+        for definicao in reversed(simbolo.definicoes):
+            if definicao in qualificados:
+                return qualificados[definicao], True
+            if definicao in importados:
+                return importados[definicao], True
+        if simbolo.escopo is tabela.modulo:
+            return f"{modulo}.{simbolo.nome}", False
+        return None, False
+
+    referencias = []
+    for no, escopo in tabela.leituras:
+        simbolo = tabela.resolver(no)
+        alvo, com_atributos = alvo_do_simbolo(simbolo) if isinstance(simbolo, Simbolo) else (None, False)
+        if alvo is None:
+            continue
+        de = origem(escopo)
+        # Cada nível de uma cadeia a partir de uma definição ou import (modulo.Classe.metodo) é uma referência
+        atual = no
+        while True:
+            referencias.append((alvo, alvo.rpartition('.')[2], de, atual.lineno, atual.col_offset,
+                                int(atual in funcs_chamadas)))
+            atual = pais_atributo.get(atual)
+            if not com_atributos or atual is None or not isinstance(atual.ctx, ast.Load):
+                break
+            alvo = f"{alvo}.{atual.attr}"
+
+    # Todo atributo lido também entra só pelo nome, para os métodos chamados em objetos
+    for no in pais_atributo.values():
+        if isinstance(no.ctx, ast.Load):
+            referencias.append((None, no.attr, origem(tabela.escopo_de(no)), no.lineno, no.col_offset,
+                                int(no in funcs_chamadas)))
+    return simbolos, referencias, reexportacoes
+
+
+def _ler_e_extrair(caminho, modulo):
+    """Lê, calcula o hash e extrai um arquivo; roda nos processos do pool"""
+    with open(caminho, "rb") as f:
+        conteudo = f.read()
+    resumo = hashlib.sha256(conteudo).hexdigest()
+    pacote = modulo if os.path.basename(caminho) == '__init__.py' else None
+    try:
+        simbolos, referencias, reexportacoes = extrair(conteudo.decode('utf-8'), modulo, pacote)
+    except (SyntaxError, UnicodeDecodeError, ValueError) as e:
+        return resumo, [], [], [], f"{type(e).__name__}: {e}"
+    return resumo, simbolos, referencias, reexportacoes, None
+
+
+class IndiceProjeto:
+    """
+    Índice persistente (SQLite) das definições e referências de todos os módulos de um projeto.
+    As referências guardam o nome completo do alvo e são ligadas às definições na consulta, então
+    reindexar um arquivo só troca as linhas dele. atualizar() só relê arquivos com mtime ou tamanho
+    diferentes e só reindexa os que mudaram de conteúdo (hash).
+    """
+
+    def __init__(self, caminho_banco, raiz='.'):
+        self.caminho_banco = caminho_banco
+        self.raiz = os.path.abspath(raiz)
+        self.conexao = sqlite3.connect(caminho_banco)
+        self.conexao.execute("PRAGMA journal_mode = WAL")
+        self.conexao.execute("PRAGMA synchronous = NORMAL")
+        versao = self.conexao.execute("PRAGMA user_version").fetchone()[0]
+        if versao != VERSAO_INDICE:
+            with self.conexao:
+                for tabela in ('arquivos', 'simbolos', 'referencias', 'reexportacoes'):
+                    self.conexao.execute(f"DROP TABLE IF EXISTS {tabela}")
+                self.conexao.executescript(ESQUEMA)
+                self.conexao.execute(f"PRAGMA user_version = {VERSAO_INDICE}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def fechar(self):
+        self.conexao.close()
+
+    # -- atualização ---------------------------------------------------------------
+
+    def atualizar(self, padroes, trabalhadores=1):
+        """
+        Sincroniza o índice com os arquivos encontrados pelos padrões (como em analisar_projeto):
+        indexa os novos e os alterados e remove os que deixaram de existir.
+        Retorna as contagens {'indexados', 'inalterados', 'removidos', 'erros'}.
+        """
+        arquivos = [os.path.abspath(caminho) for caminho in coletar_arquivos(padroes)]
+        conhecidos = {caminho: (id_, hash_, mtime_ns, tamanho) for id_, caminho, hash_, mtime_ns, tamanho
+                      in self.conexao.execute("SELECT id, caminho, hash, mtime_ns, tamanho FROM arquivos")}
+        contagens = {'indexados': 0, 'inalterados': 0, 'removidos': 0, 'erros': 0}
+        pendentes = []
+        for caminho in arquivos:
+            info = os.stat(caminho)
+            anterior = conhecidos.get(caminho)
+            if anterior is not None and anterior[2:] == (info.st_mtime_ns, info.st_size):
+                contagens['inalterados'] += 1
+            else:
+                pendentes.append((caminho, info))
+
+        modulos = [modulo_de(caminho, self.raiz) for caminho, _ in pendentes]
+        caminhos = [caminho for caminho, _ in pendentes]
+        if trabalhadores == 1 or len(pendentes) < 2:
+            extraidos = map(_ler_e_extrair, caminhos, modulos)
+        else:
+            executor = ProcessPoolExecutor(max_workers=trabalhadores)
+            extraidos = executor.map(_ler_e_extrair, caminhos, modulos, chunksize=16)
+
+        with self.conexao:
+            for (caminho, info), modulo, extraido in zip(pendentes, modulos, extraidos):
+                anterior = conhecidos.get(caminho)
+                if anterior is not None and anterior[1] == extraido[0]:
+                    # Só o mtime mudou (arquivo salvo sem alterações)
+                    self.conexao.execute("UPDATE arquivos SET mtime_ns = ?, tamanho = ? WHERE id = ?",
+                                         (info.st_mtime_ns, info.st_size, anterior[0]))
+                    contagens['inalterados'] += 1
+                    continue
+                self._gravar(caminho, modulo, info, extraido, None if anterior is None else anterior[0])
+                contagens['indexados'] += 1
+                contagens['erros'] += extraido[-1] is not None
+            presentes = set(arquivos)
+            for caminho, (id_, *_) in conhecidos.items():
+                if caminho not in presentes and not os.path.exists(caminho):
+                    self._remover(id_)
+                    contagens['removidos'] += 1
+        if trabalhadores != 1 and len(pendentes) >= 2:
+            executor.shutdown()
+        return contagens
+
+    def atualizar_arquivo(self, caminho):
+        """Reindexa um único arquivo (por exemplo ao salvar no editor); retorna True se ele mudou"""
+        caminho = os.path.abspath(caminho)
+        anterior = self.conexao.execute("SELECT id, hash FROM arquivos WHERE caminho = ?", (caminho,)).fetchone()
+        if not os.path.exists(caminho):
+            if anterior is not None:
+                with self.conexao:
+                    self._remover(anterior[0])
+            return anterior is not None
+        info = os.stat(caminho)
+        modulo = modulo_de(caminho, self.raiz)
+        extraido = _ler_e_extrair(caminho, modulo)
+        with self.conexao:
+            if anterior is not None and anterior[1] == extraido[0]:
+                self.conexao.execute("UPDATE arquivos SET mtime_ns = ?, tamanho = ? WHERE id = ?",
+                                     (info.st_mtime_ns, info.st_size, anterior[0]))
+                return False
+            self._gravar(caminho, modulo, info, extraido, None if anterior is None else anterior[0])
+        return True
+
+    def _gravar(self, caminho, modulo, info, extraido, id_anterior):
+        resumo, simbolos, referencias, reexportacoes, erro = extraido
+        conexao = self.conexao
+        if id_anterior is not None:
+            self._remover(id_anterior)
+        cursor = conexao.execute(
+            "INSERT INTO arquivos (caminho, modulo, hash, mtime_ns, tamanho, erro) VALUES (?, ?, ?, ?, ?, ?)",
+            (caminho, modulo, resumo, info.st_mtime_ns, info.st_size, erro))
+        id_ = cursor.lastrowid
+        conexao.executemany("INSERT INTO simbolos VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            [(id_, *simbolo) for simbolo in simbolos])
+        conexao.executemany("INSERT INTO referencias VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            [(id_, *referencia) for referencia in referencias])
+        conexao.executemany("INSERT INTO reexportacoes VALUES (?, ?, ?)",
+                            [(id_, *reexportacao) for reexportacao in reexportacoes])
+
+    def _remover(self, id_):
+        for tabela in ('simbolos', 'referencias', 'reexportacoes'):
+            self.conexao.execute(f"DELETE FROM {tabela} WHERE arquivo = ?", (id_,))
+        self.conexao.execute("DELETE FROM arquivos WHERE id = ?", (id_,))
+
+    # -- consultas -----------------------------------------------------------------
+
+    def definicoes(self, nome):
+        """Definições com esse nome simples ou qualificado: (qualificado, tipo, caminho, linha)"""
+        return self.conexao.execute(
+            "SELECT s.qualificado, s.tipo, a.caminho, s.linha FROM simbolos s JOIN arquivos a ON a.id = s.arquivo "
+            "WHERE s.qualificado = ?1 OR s.nome = ?1 ORDER BY a.caminho, s.linha", (nome,)).fetchall()
+
+    def referencias(self, qualificado):
+        """Onde o símbolo é usado, também pelos nomes que o reexportam: (caminho, linha, coluna, origem, chamada)"""
+        return self.conexao.execute(
+            "SELECT a.caminho, r.linha, r.coluna, r.origem, r.chamada FROM referencias r "
+            f"JOIN arquivos a ON a.id = r.arquivo WHERE {_REFERE_A.format('?1')} "
+            "ORDER BY a.caminho, r.linha, r.coluna", (qualificado,)).fetchall()
+
+    def funcoes_nao_utilizadas(self):
+        """
+        Funções e métodos sem nenhuma referência no projeto (chamadas recursivas não contam):
+        (qualificado, caminho, linha). Métodos contam como usados se algum atributo com o mesmo
+        nome for acessado (obj.metodo não dá para resolver estaticamente). Funções decoradas e
+        métodos especiais (__init__...) ficam de fora, porque são chamados de forma implícita.
+        Chamadas por getattr com nome montado em tempo de execução não são vistas.
+        """
+        return self.conexao.execute(f"""
+            SELECT s.qualificado, a.caminho, s.linha FROM simbolos s JOIN arquivos a ON a.id = s.arquivo
+            WHERE s.tipo IN ('funcao', 'metodo') AND NOT s.decorado
+              AND NOT (s.nome LIKE '\\_\\_%\\_\\_' ESCAPE '\\')
+              AND NOT EXISTS (SELECT 1 FROM referencias r WHERE ({_REFERE_A.format('s.qualificado')})
+                                                            AND r.origem != s.qualificado)
+              AND (s.tipo = 'funcao' OR NOT EXISTS (SELECT 1 FROM referencias r WHERE r.alvo IS NULL AND r.nome = s.nome))
+            ORDER BY a.caminho, s.linha
+        """).fetchall()
+
+    def chamadores(self, qualificado):
+        """Funções, classes ou módulos que chamam o símbolo"""
+        return sorted(o for (o,) in self.conexao.execute(
+            f"SELECT DISTINCT r.origem FROM referencias r WHERE ({_REFERE_A.format('?1')}) AND r.chamada",
+            (qualificado,)))
+
+    def chamados(self, qualificado):
+        """Símbolos do projeto chamados de dentro da função, classe ou módulo"""
+        return sorted(a for (a,) in self.conexao.execute(
+            f"SELECT DISTINCT s.qualificado FROM referencias r {_DEFINICAO} WHERE r.origem = ? AND r.chamada",
+            (qualificado,)))
+
+    def grafo_chamadas(self):
+        """Grafo de chamadas do projeto: origem -> conjunto de símbolos do projeto chamados"""
+        grafo = {}
+        for origem, alvo in self.conexao.execute(
+                f"SELECT DISTINCT r.origem, s.qualificado FROM referencias r {_DEFINICAO} WHERE r.chamada"):
+            grafo.setdefault(origem, set()).add(alvo)
+        return grafo
+
+    def estatisticas(self):
+        contar = lambda tabela: self.conexao.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+        return {
+            'arquivos': contar('arquivos'),
+            'simbolos': contar('simbolos'),
+            'referencias': contar('referencias'),
+            'bytes': os.path.getsize(self.caminho_banco),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Índice persistente de definições, referências e chamadas de um projeto")
+    parser.add_argument('caminhos', nargs='+', help="arquivos, diretórios ou padrões glob")
+    parser.add_argument('--banco', default='.indice_projeto.sqlite3', help="arquivo SQLite do índice")
+    parser.add_argument('--raiz', default='.', help="raiz do projeto, para os nomes dos módulos")
+    parser.add_argument('-j', '--trabalhadores', type=int, default=1, help="processos usados para indexar")
+    parser.add_argument('--nao-utilizadas', action='store_true', help="lista as funções sem referências")
+    parser.add_argument('--referencias', metavar='NOME', help="lista os usos de um símbolo")
+    parser.add_argument('--chamadores', metavar='NOME', help="lista quem chama um símbolo")
+    args = parser.parse_args(argv)
+
+    with IndiceProjeto(args.banco, args.raiz) as indice:
+        inicio = time.perf_counter()
+        contagens = indice.atualizar(args.caminhos, args.trabalhadores)
+        print(f"{contagens['indexados']} indexados, {contagens['inalterados']} inalterados, "
+              f"{contagens['removidos']} removidos, {contagens['erros']} com erro "
+              f"({time.perf_counter() - inicio:.2f}s)")
+        if args.nao_utilizadas:
+            for qualificado, caminho, linha in indice.funcoes_nao_utilizadas():
+                print(f"{os.path.relpath(caminho)}:{linha}: {qualificado} não é usada")
+        for nome, consulta in ((args.referencias, indice.referencias), (args.chamadores, indice.chamadores)):
+            if nome is None:
+                continue
+            qualificados = [d[0] for d in indice.definicoes(nome)] or [nome]
+            for qualificado in qualificados:
+                print(f"{qualificado}:")
+                for linha in consulta(qualificado):
+                    print(f"  {linha if isinstance(linha, str) else ':'.join(map(str, linha[:3]))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,522 @@
+import ast
+
+from exportador_dot import executar_sem_recursao
+from tabela_simbolos import EMBUTIDO, Simbolo
+
+# Reticulado de tipos: int, float, str, bool, list e tuple (as próprias classes do Python),
+# uma tupla do Python com o tipo de cada elemento (ex.: (float, float) para "return juros, montante")
+# e DESCONHECIDO no topo. None é o fundo: "ainda sem informação" durante o ponto fixo.
+DESCONHECIDO = 'desconhecido'
+
+_NUMERICOS = (bool, int, float)
+# Tuplas dentro de tuplas só guardam os elementos até essa profundidade (garante o ponto fixo)
+_PROFUNDIDADE_TUPLAS = 2
+
+_CONSTANTES = {bool: bool, int: int, float: float, str: str}
+# Embutidos com tipo de retorno conhecido
+_RETORNO_EMBUTIDOS = {
+    'int': int, 'float': float, 'bool': bool, 'str': str, 'input': str, 'repr': str, 'chr': str,
+    'format': str, 'ascii': str, 'hex': str, 'oct': str, 'bin': str, 'len': int, 'ord': int,
+    'hash': int, 'id': int, 'list': list, 'sorted': list, 'tuple': tuple,
+    'isinstance': bool, 'issubclass': bool, 'callable': bool, 'any': bool, 'all': bool,
+}
+# Métodos de str e o que retornam
+_METODOS_STR = {
+    'upper': str, 'lower': str, 'strip': str, 'lstrip': str, 'rstrip': str, 'title': str,
+    'capitalize': str, 'casefold': str, 'replace': str, 'format': str, 'join': str, 'center': str,
+    'ljust': str, 'rjust': str, 'zfill': str, 'swapcase': str, 'split': list, 'rsplit': list,
+    'splitlines': list, 'count': int, 'find': int, 'rfind': int, 'index': int, 'rindex': int,
+    'startswith': bool, 'endswith': bool, 'isdigit': bool, 'isnumeric': bool, 'isalpha': bool,
+    'isalnum': bool, 'isspace': bool, 'isupper': bool, 'islower': bool,
+}
+_FUNCOES = (ast.FunctionDef, ast.AsyncFunctionDef)
+_ESCOPOS_INTERNOS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+
+
+def classe(tipo):
+    """Classe do Python correspondente a um tipo do reticulado (tuplas de elementos viram tuple)"""
+    if isinstance(tipo, tuple):
+        return tuple
+    return tipo
+
+
+def juntar(a, b):
+    """Menor tipo que cobre a e b (int e float se juntam em float, bool e int em int)"""
+    if a is None:
+        return b
+    if b is None or a == b:
+        return a
+    if a in _NUMERICOS and b in _NUMERICOS:
+        return float if float in (a, b) else int
+    if isinstance(a, tuple) and isinstance(b, tuple):
+        if len(a) == len(b):
+            return tuple(juntar(x, y) for x, y in zip(a, b))
+        return tuple
+    if classe(a) is tuple and classe(b) is tuple:
+        return tuple
+    return DESCONHECIDO
+
+
+def _limitar(tipo, profundidade=0):
+    if not isinstance(tipo, tuple):
+        return tipo
+    if profundidade >= _PROFUNDIDADE_TUPLAS:
+        return tuple
+    return tuple(_limitar(t, profundidade + 1) for t in tipo)
+
+
+def _natural_constante(no):
+    return isinstance(no, ast.Constant) and isinstance(no.value, int) and no.value >= 0
+
+
+def tipo_operacao(op, esquerda, direita, expressao_direita=None):
+    """
+    Tipo do resultado de esquerda <op> direita, None se algum lado ainda não tem informação
+    e DESCONHECIDO quando o tipo não dá para saber (ou a operação não é válida).
+    expressao_direita é o nó do lado direito: int ** int só é int com um expoente constante
+    não negativo (2 ** -1 é 0.5)
+    """
+    if esquerda is None or direita is None:
+        return None
+    if esquerda == DESCONHECIDO or direita == DESCONHECIDO:
+        return DESCONHECIDO
+    esquerda, direita = classe(esquerda), classe(direita)
+    if esquerda in _NUMERICOS and direita in _NUMERICOS:
+        if isinstance(op, ast.Div) or float in (esquerda, direita):
+            return float
+        if isinstance(op, (ast.BitAnd, ast.BitOr, ast.BitXor)) and esquerda is bool and direita is bool:
+            return bool
+        if isinstance(op, ast.Pow) and not _natural_constante(expressao_direita):
+            return DESCONHECIDO
+        return int
+    if isinstance(op, ast.Add) and esquerda is direita and esquerda in (str, list, tuple):
+        return esquerda
+    if isinstance(op, ast.Mult):
+        if esquerda in (str, list, tuple) and direita in (int, bool):
+            return esquerda
+        if direita in (str, list, tuple) and esquerda in (int, bool):
+            return direita
+    if isinstance(op, ast.Mod) and esquerda is str:
+        return str
+    return DESCONHECIDO
+
+
+def operacao_valida(op, esquerda, direita):
+    """Indica se a operação entre dois tipos conhecidos é aceita pelo Python"""
+    esquerda, direita = classe(esquerda), classe(direita)
+    if esquerda in _NUMERICOS and direita in _NUMERICOS:
+        return True
+    return tipo_operacao(op, esquerda, direita) != DESCONHECIDO
+
+
+def _tipo_anotacao(anotacao):
+    if isinstance(anotacao, ast.Name) and anotacao.id in ('int', 'float', 'str', 'bool', 'list', 'tuple'):
+        return _RETORNO_EMBUTIDOS[anotacao.id]
+    return DESCONHECIDO
+
+
+def _projetar(tipo, caminho):
+    """Tipo da parte de um valor desempacotado por um alvo como "a, (b, c) = ..." """
+    for passo in caminho:
+        if tipo is None or tipo == DESCONHECIDO:
+            return tipo
+        if passo == '*':
+            return list
+        if isinstance(tipo, tuple):
+            tipo = tipo[passo] if passo < len(tipo) else DESCONHECIDO
+        elif tipo is str:
+            tipo = str
+        else:
+            tipo = DESCONHECIDO
+    return tipo
+
+
+def _elemento(tipo):
+    """Tipo dos itens obtidos ao iterar sobre um valor do tipo dado"""
+    if tipo is None:
+        return None
+    if tipo is str:
+        return str
+    if isinstance(tipo, tuple):
+        resultado = None
+        for t in tipo:
+            resultado = juntar(resultado, t)
+        return resultado if resultado is not None else DESCONHECIDO
+    return DESCONHECIDO
+
+
+class InferenciaTipos:
+    """
+    Inferência de tipos insensível ao fluxo sobre o reticulado acima.
+
+    Cada símbolo tem um único tipo, a junção dos tipos de todas as suas definições. Os tipos
+    partem de literais e de embutidos conhecidos (int(), float(), input()...) e se propagam por
+    atribuições (inclusive desempacotamento de tuplas), pelos argumentos das chamadas para os
+    parâmetros e pelos return para o resumo de cada função. O ponto fixo usa uma lista de
+    trabalho: quando o tipo de um símbolo ou o retorno de uma função muda, só as equações que o
+    leram são reavaliadas. Depois dele, o tipo de cada nó é calculado uma vez e memorizado.
+    """
+
+    def __init__(self, tree, tabela):
+        self.tree = tree
+        self.tabela = tabela
+        # Símbolo -> tipo e função (nó) -> tipo de retorno; ausência = None (fundo)
+        self.tipos = {}
+        self.retornos = {}
+        # Nome (Store) -> (expressão, caminho no desempacotamento, modo)
+        self._origens = {}
+        self._equacoes = []
+        self._dependentes = {}
+        self._lidas = None
+        self._memo = None
+        self._coletar()
+        self._resolver()
+        self._memo = {}
+
+    # -- consulta -----------------------------------------------------------------
+
+    def tipo_de(self, no):
+        """Tipo inferido de uma expressão (DESCONHECIDO se não houver informação)"""
+        tipo = executar_sem_recursao(self._avaliar(no))
+        return DESCONHECIDO if tipo is None else tipo
+
+    def tipo_do_simbolo(self, simbolo):
+        tipo = self.tipos.get(simbolo)
+        return DESCONHECIDO if tipo is None else tipo
+
+    def retorno(self, funcao):
+        """Resumo de uma função: tipo de retorno (junção de todos os return)"""
+        tipo = self.retornos.get(funcao)
+        return DESCONHECIDO if tipo is None else tipo
+
+    # -- equações -----------------------------------------------------------------
+
+    def _coletar(self):
+        """Monta as equações: (destino, função que calcula uma contribuição para o destino)"""
+        origens = self._origens
+        chamadas = {}
+        funcoes = []
+        for no in ast.walk(self.tree):
+            if isinstance(no, ast.Assign):
+                for alvo in no.targets:
+                    self._alvos(alvo, no.value, 'valor')
+            elif isinstance(no, ast.AnnAssign) and isinstance(no.target, ast.Name):
+                anotado = _tipo_anotacao(no.annotation)
+                if anotado != DESCONHECIDO or no.value is None:
+                    origens[no.target] = (no.annotation, (), 'anotacao')
+                else:
+                    origens[no.target] = (no.value, (), 'valor')
+            elif isinstance(no, ast.AugAssign) and isinstance(no.target, ast.Name):
+                origens[no.target] = (no, (), 'incremento')
+            elif isinstance(no, (ast.For, ast.AsyncFor, ast.comprehension)):
+                self._alvos(no.target, no.iter, 'iteracao')
+            elif isinstance(no, ast.NamedExpr):
+                origens[no.target] = (no.value, (), 'valor')
+            elif isinstance(no, _FUNCOES):
+                funcoes.append(no)
+            elif isinstance(no, ast.Call) and isinstance(no.func, ast.Name):
+                chamadas.setdefault(no.func, []).append(no)
+
+        for escopo in self.tabela.escopos:
+            for simbolo in escopo.simbolos.values():
+                for definicao in simbolo.definicoes:
+                    if isinstance(definicao, ast.arg):
+                        # Parâmetros recebem os tipos dos argumentos (ver _parametros)
+                        continue
+                    self._equacoes.append((simbolo, lambda d=definicao: self._tipo_definicao(d)))
+
+        for funcao in funcoes:
+            self._parametros(funcao, chamadas)
+            for retorno in _returns(funcao):
+                if retorno.value is None:
+                    self._equacoes.append((funcao, lambda: DESCONHECIDO))
+                else:
+                    self._equacoes.append((funcao, lambda r=retorno: (yield self._avaliar(r.value))))
+            if _gerador(funcao):
+                self._equacoes.append((funcao, lambda: DESCONHECIDO))
+
+    def _alvos(self, alvo, expressao, modo):
+        pilha = [(alvo, ())]
+        while pilha:
+            alvo, caminho = pilha.pop()
+            if isinstance(alvo, ast.Name):
+                self._origens[alvo] = (expressao, caminho, modo)
+            elif isinstance(alvo, (ast.Tuple, ast.List)):
+                estrela = any(isinstance(e, ast.Starred) for e in alvo.elts)
+                for i, elemento in enumerate(alvo.elts):
+                    if isinstance(elemento, ast.Starred):
+                        pilha.append((elemento.value, caminho + ('*',)))
+                    elif estrela:
+                        # Com *resto, as posições dos outros elementos dependem do tamanho
+                        self._origens.update((n, (None, (), 'desconhecido')) for n in ast.walk(elemento)
+                                             if isinstance(n, ast.Name))
+                    else:
+                        pilha.append((elemento, caminho + (i,)))
+
+    def _parametros(self, funcao, chamadas):
+        """Equações dos parâmetros: os argumentos de todas as chamadas diretas, quando só há chamadas diretas"""
+        argumentos = funcao.args
+        posicionais = argumentos.posonlyargs + argumentos.args
+        todos = posicionais + argumentos.kwonlyargs
+        escopo = self.tabela.escopo_de(funcao)
+        simbolo = None if escopo is None else self.tabela.resolver_nome(funcao.name, funcao)
+
+        chamadas_diretas = []
+        analisavel = (isinstance(simbolo, Simbolo) and escopo.tipo != 'classe' and not funcao.decorator_list
+                      and all(isinstance(d, _FUNCOES) for d in simbolo.definicoes))
+        if analisavel:
+            for uso in simbolo.usos:
+                lista = chamadas.get(uso)
+                if lista is None or any(a for c in lista for a in c.args if isinstance(a, ast.Starred)) \
+                        or any(k.arg is None for c in lista for k in c.keywords):
+                    analisavel = False
+                    break
+                chamadas_diretas.extend(lista)
+            analisavel = analisavel and bool(chamadas_diretas)
+
+        for parametro in todos:
+            destino = self._simbolo_do_parametro(parametro)
+            if destino is None:
+                continue
+            if parametro.annotation is not None and _tipo_anotacao(parametro.annotation) != DESCONHECIDO:
+                tipo = _tipo_anotacao(parametro.annotation)
+                self._equacoes.append((destino, lambda t=tipo: t))
+            elif not analisavel:
+                self._equacoes.append((destino, lambda: DESCONHECIDO))
+        for especial, tipo in ((argumentos.vararg, tuple), (argumentos.kwarg, DESCONHECIDO)):
+            destino = None if especial is None else self._simbolo_do_parametro(especial)
+            if destino is not None:
+                self._equacoes.append((destino, lambda t=tipo: t))
+        if not analisavel:
+            return
+
+        # Valores padrão valem quando o argumento não é passado
+        padroes = dict(zip(reversed(posicionais), reversed(argumentos.defaults)))
+        padroes.update((p, d) for p, d in zip(argumentos.kwonlyargs, argumentos.kw_defaults) if d is not None)
+        por_nome = {p.arg: p for p in todos}
+        for chamada in chamadas_diretas:
+            passados = set()
+            for parametro, argumento in zip(posicionais, chamada.args):
+                passados.add(parametro)
+                self._contribuir_argumento(parametro, argumento)
+            for palavra in chamada.keywords:
+                parametro = por_nome.get(palavra.arg)
+                if parametro is not None:
+                    passados.add(parametro)
+                    self._contribuir_argumento(parametro, palavra.value)
+            for parametro, padrao in padroes.items():
+                if parametro not in passados:
+                    self._contribuir_argumento(parametro, padrao)
+
+    def _simbolo_do_parametro(self, parametro):
+        escopo = self.tabela.escopo_de(parametro)
+        simbolo = None if escopo is None else escopo.simbolos.get(parametro.arg)
+        return simbolo if simbolo is not None and parametro in simbolo.definicoes else None
+
+    def _contribuir_argumento(self, parametro, argumento):
+        destino = self._simbolo_do_parametro(parametro)
+        if destino is not None and (parametro.annotation is None
+                                    or _tipo_anotacao(parametro.annotation) == DESCONHECIDO):
+            self._equacoes.append((destino, lambda: (yield self._avaliar(argumento))))
+
+    def _tipo_definicao(self, definicao):
+        origem = self._origens.get(definicao)
+        if origem is None:
+            # def, class, import, except ... as, with ... as, padrões do match...
+            return DESCONHECIDO
+        expressao, caminho, modo = origem
+        if modo == 'desconhecido':
+            return DESCONHECIDO
+        if modo == 'anotacao':
+            return _tipo_anotacao(expressao)
+        if modo == 'incremento':
+            simbolo = self.tabela.resolver_nome(definicao.id, definicao)
+            atual = self._ler(simbolo) if isinstance(simbolo, Simbolo) else DESCONHECIDO
+            valor = yield self._avaliar(expressao.value)
+            return tipo_operacao(expressao.op, atual, valor, expressao.value)
+        if modo == 'iteracao':
+            if _chamada_embutida(self.tabela, expressao, ('range',)):
+                return _projetar(int, caminho)
+            tipo = yield self._avaliar(expressao)
+            return _projetar(_elemento(tipo), caminho)
+        tipo = yield self._avaliar(expressao)
+        return _projetar(tipo, caminho)
+
+    def _resolver(self):
+        """Ponto fixo por lista de trabalho sobre as equações"""
+        equacoes = self._equacoes
+        pendentes = list(range(len(equacoes) - 1, -1, -1))
+        na_fila = set(pendentes)
+        while pendentes:
+            indice = pendentes.pop()
+            na_fila.discard(indice)
+            destino, calcular = equacoes[indice]
+            self._lidas = set()
+            resultado = calcular()
+            if hasattr(resultado, 'send'):
+                resultado = executar_sem_recursao(resultado)
+            for lida in self._lidas:
+                self._dependentes.setdefault(lida, set()).add(indice)
+            self._lidas = None
+
+            valores = self.retornos if isinstance(destino, _FUNCOES) else self.tipos
+            antigo = valores.get(destino)
+            novo = _limitar(juntar(antigo, resultado))
+            if novo != antigo:
+                valores[destino] = novo
+                for dependente in self._dependentes.get(destino, ()):
+                    if dependente not in na_fila:
+                        na_fila.add(dependente)
+                        pendentes.append(dependente)
+
+    def _ler(self, chave):
+        if self._lidas is not None:
+            self._lidas.add(chave)
+        if isinstance(chave, _FUNCOES):
+            return self.retornos.get(chave)
+        return self.tipos.get(chave)
+
+    # -- expressões ---------------------------------------------------------------
+
+    def _avaliar(self, no):
+        """Tipo de uma expressão com os tipos atuais; escrita como gerador (ver executar_sem_recursao)"""
+        memo = self._memo
+        if memo is not None and no in memo:
+            return memo[no]
+        tipo = DESCONHECIDO
+
+        if isinstance(no, ast.Constant):
+            tipo = _CONSTANTES.get(type(no.value), DESCONHECIDO)
+        elif isinstance(no, ast.JoinedStr):
+            tipo = str
+        elif isinstance(no, (ast.List, ast.ListComp)):
+            tipo = list
+        elif isinstance(no, ast.Tuple):
+            if any(isinstance(e, ast.Starred) for e in no.elts):
+                tipo = tuple
+            else:
+                elementos = []
+                for elemento in no.elts:
+                    elementos.append((yield self._avaliar(elemento)))
+                tipo = None if None in elementos else tuple(elementos)
+        elif isinstance(no, ast.Name):
+            resolvido = self.tabela.resolver(no) if isinstance(no.ctx, ast.Load) else None
+            if isinstance(resolvido, Simbolo):
+                tipo = self._ler(resolvido)
+        elif isinstance(no, ast.BinOp):
+            esquerda = yield self._avaliar(no.left)
+            direita = yield self._avaliar(no.right)
+            tipo = tipo_operacao(no.op, esquerda, direita, no.right)
+        elif isinstance(no, ast.UnaryOp):
+            operando = yield self._avaliar(no.operand)
+            if isinstance(no.op, ast.Not):
+                tipo = bool
+            elif operando is None or operando in (int, float):
+                tipo = operando
+            elif operando is bool:
+                tipo = int
+        elif isinstance(no, ast.Compare):
+            tipo = bool
+        elif isinstance(no, (ast.BoolOp, ast.IfExp)):
+            tipo = None
+            for valor in (no.values if isinstance(no, ast.BoolOp) else (no.body, no.orelse)):
+                tipo = juntar(tipo, (yield self._avaliar(valor)))
+        elif isinstance(no, ast.NamedExpr):
+            tipo = yield self._avaliar(no.value)
+        elif isinstance(no, ast.Subscript):
+            valor = yield self._avaliar(no.value)
+            if valor is None:
+                tipo = None
+            elif isinstance(no.slice, ast.Slice):
+                tipo = classe(valor) if classe(valor) in (str, list, tuple) else DESCONHECIDO
+            elif valor is str:
+                tipo = str
+            elif (isinstance(valor, tuple) and isinstance(no.slice, ast.Constant)
+                  and type(no.slice.value) is int and -len(valor) <= no.slice.value < len(valor)):
+                tipo = valor[no.slice.value]
+        elif isinstance(no, ast.Call):
+            tipo = yield self._avaliar_chamada(no)
+
+        if memo is not None:
+            memo[no] = tipo
+        return tipo
+
+    def _avaliar_chamada(self, no):
+        funcao = no.func
+        if isinstance(funcao, ast.Name):
+            resolvido = self.tabela.resolver(funcao)
+            if resolvido == EMBUTIDO:
+                if funcao.id in _RETORNO_EMBUTIDOS:
+                    return _RETORNO_EMBUTIDOS[funcao.id]
+                if funcao.id == 'abs' and len(no.args) == 1:
+                    tipo = yield self._avaliar(no.args[0])
+                    return int if tipo is bool else tipo
+                if funcao.id in ('min', 'max') and len(no.args) > 1:
+                    tipo = None
+                    for argumento in no.args:
+                        tipo = juntar(tipo, (yield self._avaliar(argumento)))
+                    return tipo
+                if funcao.id == 'round':
+                    return int if len(no.args) == 1 else DESCONHECIDO
+                return DESCONHECIDO
+            if isinstance(resolvido, Simbolo) and resolvido.definicoes \
+                    and all(isinstance(d, _FUNCOES) for d in resolvido.definicoes):
+                tipo = None
+                for definicao in resolvido.definicoes:
+                    tipo = juntar(tipo, DESCONHECIDO if definicao.decorator_list else self._ler(definicao))
+                return tipo
+            return DESCONHECIDO
+        if isinstance(funcao, ast.Attribute):
+            dono = yield self._avaliar(funcao.value)
+            if dono is str:
+                return _METODOS_STR.get(funcao.attr, DESCONHECIDO)
+            return None if dono is None else DESCONHECIDO
+        return DESCONHECIDO
+
+
+def _chamada_embutida(tabela, no, nomes):
+    return (isinstance(no, ast.Call) and isinstance(no.func, ast.Name) and no.func.id in nomes
+            and tabela.resolver(no.func) == EMBUTIDO)
+
+
+def _corpo_proprio(funcao):
+    """Nós do corpo da função, sem entrar em funções, classes e lambdas internas"""
+    pilha = list(funcao.body)
+    while pilha:
+        no = pilha.pop()
+        yield no
+        if not isinstance(no, _ESCOPOS_INTERNOS):
+            pilha.extend(ast.iter_child_nodes(no))
+
+
+def _returns(funcao):
+    return [no for no in _corpo_proprio(funcao) if isinstance(no, ast.Return)]
+
+
+def _gerador(funcao):
+    return any(isinstance(no, (ast.Yield, ast.YieldFrom)) for no in _corpo_proprio(funcao))
+
+
+def nome_tipo(tipo):
+    """Nome legível de um tipo do reticulado"""
+    if isinstance(tipo, tuple):
+        return f"tuple[{', '.join(nome_tipo(t) for t in tipo)}]"
+    if tipo == DESCONHECIDO or tipo is None:
+        return '?'
+    return tipo.__name__
+
+
+# Exemplo de uso:
+if __name__ == "__main__":
+    from tabela_simbolos import construir_tabela_simbolos
+
+    with open("main.py", "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    tabela = construir_tabela_simbolos(tree)
+    tipos = InferenciaTipos(tree, tabela)
+
+    for escopo in tabela.escopos:
+        nomes = ", ".join(f"{nome}: {nome_tipo(tipos.tipo_do_simbolo(s))}" for nome, s in escopo.simbolos.items())
+        print(f"{escopo.tipo} {escopo.nome}: {nomes}")
+        if escopo.tipo == 'funcao':
+            print(f"  retorna {nome_tipo(tipos.retorno(escopo.no))}")
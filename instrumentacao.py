@@ -0,0 +1,352 @@
+import functools
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# cProfile, pstats e json só são importados quando usados: este módulo é importado por todas as
+# fases da análise, mesmo com a instrumentação desligada
+
+# Instrumentação ativa no processo; None (o padrão) desliga toda a coleta
+_ativa = None
+
+
+class RegistroFase:
+    """Medições de uma execução de uma fase (tempos em segundos, memória em bytes)"""
+    __slots__ = ('nome', 'inicio', 'duracao', 'cpu', 'contagens', 'detalhes', 'memoria_pico',
+                 'perfil', 'thread', 'profundidade', '_pico_filhos')
+
+    def __init__(self, nome, inicio, thread, profundidade, contagens):
+        self.nome = nome
+        self.inicio = inicio
+        self.duracao = None
+        self.cpu = None
+        self.contagens = contagens
+        self.detalhes = {}
+        self.memoria_pico = None
+        self.perfil = None
+        self.thread = thread
+        self.profundidade = profundidade
+        self._pico_filhos = 0
+
+    def como_dict(self, linhas_perfil=15):
+        dados = {
+            'nome': self.nome,
+            'inicio': self.inicio,
+            'duracao': self.duracao,
+            'cpu': self.cpu,
+            'contagens': self.contagens,
+            'detalhes': self.detalhes,
+            'memoria_pico': self.memoria_pico,
+            'thread': self.thread,
+            'profundidade': self.profundidade,
+        }
+        if self.perfil is not None:
+            dados['perfil'] = resumo_perfil(self.perfil, linhas_perfil)
+        return dados
+
+    def __repr__(self):
+        return f"RegistroFase({self.nome!r}, duracao={self.duracao!r}, contagens={self.contagens!r})"
+
+
+class _Fase:
+    """Gerenciador de contexto de uma fase; o registro fica disponível no 'as' para receber contagens"""
+    __slots__ = ('_instrumentacao', '_registro', '_perfil', '_cpu', '_pico_pai', '_memoria_inicial')
+
+    def __init__(self, instrumentacao, nome, contagens):
+        pilha = instrumentacao._pilha()
+        self._instrumentacao = instrumentacao
+        self._registro = RegistroFase(nome, 0.0, threading.get_ident(), len(pilha), contagens)
+        self._perfil = None
+
+    def __enter__(self):
+        instrumentacao = self._instrumentacao
+        registro = self._registro
+        pilha = instrumentacao._pilha()
+        if instrumentacao.memoria:
+            atual, pico = tracemalloc.get_traced_memory()
+            # O pico é zerado para medir só esta fase; o da fase externa é guardado para ser restaurado
+            self._pico_pai = pico
+            self._memoria_inicial = atual
+            tracemalloc.reset_peak()
+        # Só um cProfile pode estar ativo por vez: fases aninhadas em uma fase perfilada não são perfiladas
+        if instrumentacao._deve_perfilar(registro.nome):
+            import cProfile
+            self._perfil = cProfile.Profile()
+        pilha.append(registro)
+        self._cpu = time.thread_time()
+        registro.inicio = time.perf_counter() - instrumentacao.origem
+        if self._perfil is not None:
+            instrumentacao._perfilando = True
+            self._perfil.enable()
+        return registro
+
+    def __exit__(self, tipo, valor, rastreamento):
+        fim = time.perf_counter() - self._instrumentacao.origem
+        cpu = time.thread_time()
+        instrumentacao = self._instrumentacao
+        registro = self._registro
+        if self._perfil is not None:
+            self._perfil.disable()
+            instrumentacao._perfilando = False
+            registro.perfil = self._perfil
+        registro.duracao = fim - registro.inicio
+        registro.cpu = cpu - self._cpu
+        pilha = instrumentacao._pilha()
+        pilha.pop()
+        if instrumentacao.memoria:
+            pico = max(tracemalloc.get_traced_memory()[1], registro._pico_filhos)
+            registro.memoria_pico = pico - self._memoria_inicial
+            if pilha:
+                pai = pilha[-1]
+                pai._pico_filhos = max(pai._pico_filhos, self._pico_pai, pico)
+        if tipo is not None:
+            registro.detalhes['erro'] = tipo.__name__
+        instrumentacao.registros.append(registro)
+        return False
+
+
+class _FaseNula:
+    """Usada quando a instrumentação está desligada: não mede nada"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, tipo, valor, rastreamento):
+        return False
+
+
+_FASE_NULA = _FaseNula()
+
+
+class Instrumentacao:
+    """
+    Coleta tempo de parede, tempo de CPU (da thread), contagens e, opcionalmente, o pico de memória
+    (tracemalloc) e um perfil cProfile de cada fase executada enquanto está ativa.
+    perfil pode ser True (todas as fases) ou um conjunto de nomes de fases a perfilar.
+    O pico de memória vem do tracemalloc e por isso inclui o que outras threads alocarem durante a fase.
+    """
+
+    def __init__(self, memoria=False, perfil=False):
+        self.memoria = memoria
+        self.perfil = perfil
+        self.registros = []
+        self.origem = time.perf_counter()
+        self._local = threading.local()
+        self._perfilando = False
+        self._iniciou_tracemalloc = False
+
+    def _pilha(self):
+        pilha = getattr(self._local, 'pilha', None)
+        if pilha is None:
+            pilha = self._local.pilha = []
+        return pilha
+
+    def _deve_perfilar(self, nome):
+        if not self.perfil or self._perfilando:
+            return False
+        return self.perfil is True or nome in self.perfil
+
+    def iniciar(self):
+        if self.memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._iniciou_tracemalloc = True
+        self.origem = time.perf_counter()
+
+    def parar(self):
+        if self._iniciou_tracemalloc:
+            tracemalloc.stop()
+            self._iniciou_tracemalloc = False
+
+    def fase(self, nome, **contagens):
+        return _Fase(self, nome, contagens)
+
+    def resumo(self):
+        """Totais por nome de fase: execuções, tempo de parede, CPU, maior pico de memória e contagens somadas"""
+        totais = {}
+        for r in self.registros:
+            total = totais.get(r.nome)
+            if total is None:
+                total = totais[r.nome] = {'execucoes': 0, 'duracao': 0.0, 'cpu': 0.0,
+                                          'memoria_pico': None, 'contagens': {}}
+            total['execucoes'] += 1
+            total['duracao'] += r.duracao
+            total['cpu'] += r.cpu
+            if r.memoria_pico is not None:
+                total['memoria_pico'] = max(total['memoria_pico'] or 0, r.memoria_pico)
+            for chave, valor in r.contagens.items():
+                if isinstance(valor, (int, float)):
+                    total['contagens'][chave] = total['contagens'].get(chave, 0) + valor
+        return totais
+
+    def como_dict(self):
+        return {
+            'pid': os.getpid(),
+            'fases': [r.como_dict() for r in self.registros],
+            'resumo': self.resumo(),
+        }
+
+    def exportar_json(self, caminho):
+        import json
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(self.como_dict(), f, ensure_ascii=False, indent=2, default=str)
+        return caminho
+
+    def eventos_chrome(self):
+        """Eventos completos ('ph': 'X') no formato de rastreamento do Chrome (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        eventos = []
+        for r in sorted(self.registros, key=lambda r: r.inicio):
+            argumentos = dict(r.contagens)
+            argumentos.update(r.detalhes)
+            argumentos['cpu_ms'] = r.cpu * 1000
+            if r.memoria_pico is not None:
+                argumentos['memoria_pico'] = r.memoria_pico
+            eventos.append({
+                'name': r.nome,
+                'cat': r.nome.split('.')[0],
+                'ph': 'X',
+                'ts': r.inicio * 1e6,
+                'dur': r.duracao * 1e6,
+                'pid': pid,
+                'tid': r.thread,
+                'args': argumentos,
+            })
+        return eventos
+
+    def exportar_chrome_trace(self, caminho):
+        import json
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump({'traceEvents': self.eventos_chrome(), 'displayTimeUnit': 'ms'},
+                      f, ensure_ascii=False, default=str)
+        return caminho
+
+    def formatar_resumo(self):
+        linhas = [f"{'Fase':<36} {'Execuções':>9} {'Parede (ms)':>12} {'CPU (ms)':>10} {'Pico (KB)':>10}  Contagens"]
+        for nome, total in sorted(self.resumo().items(), key=lambda item: item[1]['duracao'], reverse=True):
+            pico = f"{total['memoria_pico'] / 1024:>10.1f}" if total['memoria_pico'] is not None else f"{'-':>10}"
+            contagens = ', '.join(f"{chave}={valor}" for chave, valor in total['contagens'].items())
+            linhas.append(f"{nome:<36} {total['execucoes']:>9} {total['duracao'] * 1000:>12.3f} "
+                          f"{total['cpu'] * 1000:>10.3f} {pico}  {contagens}")
+        return '\n'.join(linhas)
+
+
+def resumo_perfil(perfil, linhas=15):
+    """As funções com maior tempo acumulado em um cProfile.Profile, como lista de dicts"""
+    import pstats
+    estatisticas = pstats.Stats(perfil)
+    funcoes = sorted(estatisticas.stats.items(), key=lambda item: item[1][3], reverse=True)
+    return [
+        {
+            'funcao': f"{arquivo}:{linha}({nome})",
+            'chamadas': chamadas,
+            'tempo_proprio': tempo_proprio,
+            'tempo_acumulado': tempo_acumulado,
+        }
+        for (arquivo, linha, nome), (_, chamadas, tempo_proprio, tempo_acumulado, _) in funcoes[:linhas]
+    ]
+
+
+def ativa():
+    """A instrumentação ativa, ou None"""
+    return _ativa
+
+
+def ativar(memoria=False, perfil=False):
+    global _ativa
+    instrumentacao = Instrumentacao(memoria, perfil)
+    instrumentacao.iniciar()
+    _ativa = instrumentacao
+    return instrumentacao
+
+
+def desativar():
+    global _ativa
+    instrumentacao, _ativa = _ativa, None
+    if instrumentacao is not None:
+        instrumentacao.parar()
+    return instrumentacao
+
+
+@contextmanager
+def instrumentar_execucao(memoria=False, perfil=False):
+    """Ativa a instrumentação dentro de um bloco with e devolve o objeto Instrumentacao"""
+    instrumentacao = ativar(memoria, perfil)
+    try:
+        yield instrumentacao
+    finally:
+        desativar()
+
+
+def fase(nome, **contagens):
+    """Contexto que mede uma fase se a instrumentação estiver ativa; caso contrário não faz nada"""
+    if _ativa is None:
+        return _FASE_NULA
+    return _ativa.fase(nome, **contagens)
+
+
+def contar(**contagens):
+    """Soma contagens à fase em andamento nesta thread (não faz nada com a instrumentação desligada)"""
+    if _ativa is None:
+        return
+    pilha = _ativa._pilha()
+    if pilha:
+        registro = pilha[-1].contagens
+        for chave, valor in contagens.items():
+            registro[chave] = registro.get(chave, 0) + valor
+
+
+def instrumentar(nome, contar=None):
+    """
+    Decorador que mede cada chamada da função como a fase nome.
+    contar(resultado) retorna um dict de contagens (ex.: {'tokens': len(resultado)}) e só é chamado
+    com a instrumentação ativa. Desligada, o custo é um teste de None por chamada.
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            instrumentacao = _ativa
+            if instrumentacao is None:
+                return funcao(*args, **kwargs)
+            with instrumentacao.fase(nome) as registro:
+                resultado = funcao(*args, **kwargs)
+            if contar is not None:
+                registro.contagens.update(contar(resultado))
+            return resultado
+        return envolvida
+    return decorador
+
+
+# Exemplo de uso:
+if __name__ == "__main__":
+    import sys
+
+    from lexical_analysis import analisar_lexico, retorno_analise_lexica_formatado
+    from syntatic_analysis import analisar_sintaxe
+    from semantic_analysis import analisar_arvore, escrever_grafo_arvore_semantica, escrever_grafo_fluxo_de_controle
+    from exportador_dot import exportar_ast_dot
+    # Executado como script, este arquivo é o módulo __main__; os analisadores consultam o módulo
+    # instrumentacao importado por eles, então é ele que precisa ser ativado
+    import instrumentacao as modulo_instrumentacao
+
+    caminho = sys.argv[1] if len(sys.argv) > 1 else "main.py"
+    with open(caminho, "r", encoding="utf-8") as f:
+        codigo = f.read()
+
+    with modulo_instrumentacao.instrumentar_execucao(memoria=True) as instrumentacao:
+        analisar_lexico(codigo)
+        retorno_analise_lexica_formatado(codigo)
+        tree, _ = analisar_sintaxe(codigo)
+        analisar_arvore(tree)
+        with open(os.devnull, "w", encoding="utf-8") as f:
+            exportar_ast_dot(tree, f)
+            escrever_grafo_arvore_semantica(tree, f)
+            escrever_grafo_fluxo_de_controle(tree, f)
+
+    print(instrumentacao.formatar_resumo())
+    if len(sys.argv) > 2:
+        instrumentacao.exportar_json(sys.argv[2] + ".json")
+        instrumentacao.exportar_chrome_trace(sys.argv[2] + ".trace.json")
+        print(f"\nMedições salvas em {sys.argv[2]}.json e {sys.argv[2]}.trace.json")
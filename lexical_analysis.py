@@ -1,8 +1,12 @@
 import tokenize
-from io import BytesIO
+from io import BytesIO, TextIOBase
+from contextlib import contextmanager
+import mmap
 import token
 import re
 
+from instrumentacao import instrumentar
+
 TOKENS = [
     # F-strings e strings comuns
     ('FSTRING', r'f"(?:[^"\\]|\\.)*"|f\'(?:[^\'\\]|\\.)*\''),
@@ -54,36 +58,120 @@ TOKENS = [
     ('COMMENT',     r'\#.*'),
 ]
 
-def analisar_lexico(codigo_fonte):
-    tokens_resultantes = []
+def _classificar_sequencial(lexema):
+    """Classificação de referência: primeiro padrão de TOKENS que casa com o lexema inteiro"""
+    for nome, padrao in TOKENS:
+        if re.fullmatch(padrao, lexema):
+            return nome
+    return None
+
+
+def _literal_do_padrao(padrao):
+    """Retorna o texto literal descrito por um padrão simples (palavra-chave ou operador), ou None"""
+    corpo = padrao.replace(r'\b', '')
+    # Só são aceitos escapes de símbolos (\+, \*, \[...); \d, \s, \n e afins não são literais
+    if re.search(r'[][()?*+|{}^$.]|\\\w', re.sub(r'\\\W', '', corpo)):
+        return None
+    return re.sub(r'\\(\W)', r'\1', corpo)
+
+
+def _montar_tabela_literais():
+    # Só entra na tabela o literal cuja classificação sequencial aponta para o próprio padrão
+    tabela = {}
+    for nome, padrao in TOKENS:
+        literal = _literal_do_padrao(padrao)
+        if literal and _classificar_sequencial(literal) == nome:
+            tabela[literal] = nome
+    return tabela
+
+
+def _montar_padrao_reserva(literais):
+    # Padrões restantes (NUMBER, STRING, IDENT, FSTRING...) numa única regex com grupos nomeados,
+    # na mesma ordem de TOKENS, para preservar a prioridade da busca sequencial
+    nomes_literais = set(literais.values())
+    alternativas = [
+        f'(?P<{nome}>{padrao})'
+        for nome, padrao in TOKENS
+        if nome not in nomes_literais
+    ]
+    return re.compile('|'.join(alternativas))
+
+
+# Tabelas pré-computadas para a classificação dos lexemas
+NOMES_POR_LEXEMA = _montar_tabela_literais()
+_PADRAO_RESERVA = _montar_padrao_reserva(NOMES_POR_LEXEMA)
+TIPOS_IGNORADOS = frozenset(['ENCODING', 'NL', 'NEWLINE', 'INDENT', 'DEDENT', 'ENDMARKER'])
+
+
+def classificar_lexema(lexema):
+    """Retorna o nome do token em TOKENS correspondente ao lexema, ou None"""
+    nome = NOMES_POR_LEXEMA.get(lexema)
+    if nome is not None:
+        return nome
+    casamento = _PADRAO_RESERVA.fullmatch(lexema)
+    if casamento is None:
+        return None
+    return casamento.lastgroup
+
+
+def iterar_tokens(fonte):
+    """
+    Gera os tokens do tokenize lendo a fonte linha a linha.
+    A fonte pode ser um arquivo aberto (texto ou binário) ou um mmap.
+    """
+    if isinstance(fonte, TextIOBase):
+        return tokenize.generate_tokens(fonte.readline)
+    return tokenize.tokenize(fonte.readline)
+
+
+@contextmanager
+def abrir_fonte_mapeada(caminho):
+    """Abre o arquivo como mmap somente leitura (arquivos vazios viram um BytesIO vazio)"""
+    with open(caminho, "rb") as f:
+        try:
+            mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # mmap não aceita arquivos de tamanho zero
+            yield BytesIO(b"")
+            return
+        try:
+            yield mapa
+        finally:
+            mapa.close()
+
+
+def iterar_analise_lexica(fonte):
+    """Gera, um a um, os registros de token no formato de analisar_lexico"""
+    return registros_de_tokens(iterar_tokens(fonte))
 
-    # Transformar o código-fonte em bytes para o tokenize funcionar
-    bytes_code = BytesIO(codigo_fonte.encode('utf-8'))
 
-    for tok in tokenize.tokenize(bytes_code.readline):
+def registros_de_tokens(tokens):
+    """Converte tokens do tokenize (TokenInfo) nos registros de analisar_lexico"""
+    for tok in tokens:
         tipo = token.tok_name.get(tok.type)
-        linha = tok.start[0]
-        lexema = tok.string
-        # Tenta encontrar o nome do token definido em TOKENS com base no lexema
-        token_nome = None
-        for nome, padrao in TOKENS:
-            if re.fullmatch(padrao, lexema):
-                token_nome = nome
-                break
 
         # Ignorar tokens de espaço em branco, indentação e comentários
-        if tipo in ['ENCODING', 'NL', 'NEWLINE', 'INDENT', 'DEDENT', 'ENDMARKER']:
+        if tipo in TIPOS_IGNORADOS:
             continue
 
-        tokens_resultantes.append({
+        lexema = tok.string
+        # Tenta encontrar o nome do token definido em TOKENS com base no lexema
+        token_nome = classificar_lexema(lexema)
+
+        yield {
             'Token': lexema,
             'Tipo': tipo,
             'Descrição': descrever_token(tipo, lexema),
-            'Linha': linha,
+            'Linha': tok.start[0],
             'Nome': token_nome if token_nome else '-'
-        })
+        }
 
-    return tokens_resultantes
+
+@instrumentar('lexico.analisar_lexico', contar=lambda tokens: {'tokens': len(tokens)})
+def analisar_lexico(codigo_fonte):
+    # Transformar o código-fonte em bytes para o tokenize funcionar
+    bytes_code = BytesIO(codigo_fonte.encode('utf-8'))
+    return list(iterar_analise_lexica(bytes_code))
 
 
 def descrever_token(tipo, lexema):
@@ -106,24 +194,22 @@ def descrever_token(tipo, lexema):
     else:
         return 'Outro'
 
-def retorno_analise_lexica_formatado(codigo_fonte):
+def iterar_analise_lexica_formatada(fonte):
     """
-    Retorna a análise léxica no formato de tokens agrupados por linha:
+    Gera, uma a uma, as linhas da análise léxica formatada:
     (TOKEN)(VALOR)
     """
-    resultado = []
-    bytes_code = BytesIO(codigo_fonte.encode('utf-8'))
-    tokens = list(tokenize.tokenize(bytes_code.readline))
-
-    linha_atual = 1
+    # O token ENCODING (só presente em fontes binárias) termina na linha 0;
+    # começar daí deixa fontes de texto e binárias com a mesma saída
+    linha_atual = 0
     linha_tokens = []
 
-    for tok in tokens:
+    for tok in iterar_tokens(fonte):
         tipo = token.tok_name.get(tok.type)
         lexema = tok.string
-        if tipo in ['ENCODING', 'NL', 'NEWLINE', 'INDENT', 'DEDENT', 'ENDMARKER']:
+        if tipo in TIPOS_IGNORADOS:
             if linha_tokens:
-                resultado.append(''.join(linha_tokens))
+                yield ''.join(linha_tokens)
                 linha_tokens = []
             linha_atual = tok.end[0]
             continue
@@ -145,14 +231,22 @@ def retorno_analise_lexica_formatado(codigo_fonte):
         # Quebra de linha se o token está em uma nova linha
         if tok.end[0] != linha_atual:
             if linha_tokens:
-                resultado.append(''.join(linha_tokens))
+                yield ''.join(linha_tokens)
                 linha_tokens = []
             linha_atual = tok.end[0]
 
     if linha_tokens:
-        resultado.append(''.join(linha_tokens))
+        yield ''.join(linha_tokens)
+
 
-    return '\n'.join(resultado)
+@instrumentar('lexico.formatado', contar=lambda texto: {'linhas': texto.count('\n') + 1 if texto else 0})
+def retorno_analise_lexica_formatado(codigo_fonte):
+    """
+    Retorna a análise léxica no formato de tokens agrupados por linha:
+    (TOKEN)(VALOR)
+    """
+    bytes_code = BytesIO(codigo_fonte.encode('utf-8'))
+    return '\n'.join(iterar_analise_lexica_formatada(bytes_code))
 
 # Exemplo de uso:
 if __name__ == "__main__":
@@ -162,9 +256,9 @@ if __name__ == "__main__":
     print("=== Análise Léxica Formatada ===")
     print(retorno_analise_lexica_formatado(codigo))
     print("\n=== Tabela de Tokens ===")
-    tokens = analisar_lexico(codigo)
     print(f"{'Nome':<20} {'Token':<40} {'Tipo':<20} {'Descrição':<40} {'Linha':<5}")
     print('-' * 125)
-    for t in tokens:
-        print(f"{t['Nome']:<20} {t['Token']:<40} {t['Tipo']:<20} {t['Descrição']:<40} {t['Linha']:<5}")
+    with abrir_fonte_mapeada("main.py") as fonte:
+        for t in iterar_analise_lexica(fonte):
+            print(f"{t['Nome']:<20} {t['Token']:<40} {t['Tipo']:<20} {t['Descrição']:<40} {t['Linha']:<5}")
 
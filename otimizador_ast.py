@@ -0,0 +1,760 @@
+import ast
+import dis
+import math
+import time
+
+from exportador_dot import executar_sem_recursao
+from inferencia_tipos import DESCONHECIDO, classe
+from semantic_analysis import ContextoAnalise
+from tabela_simbolos import Simbolo
+import instrumentacao
+
+# Limites do dobramento de constantes (os mesmos do otimizador do CPython): resultados maiores
+# que isso ficam para o tempo de execução, em vez de inchar o código compilado
+_MAXIMO_BITS = 128
+_MAXIMO_TEXTO = 4096
+
+_FUNCOES = (ast.FunctionDef, ast.AsyncFunctionDef)
+_ESCOPOS_INTERNOS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda,
+                     ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+_LACOS = (ast.For, ast.AsyncFor, ast.While)
+_TERMINAM_BLOCO = (ast.Return, ast.Raise, ast.Break, ast.Continue)
+_NUMERICOS = (int, float)
+
+_OPERACOES_BINARIAS = {
+    ast.Add: lambda a, b: a + b, ast.Sub: lambda a, b: a - b, ast.Mult: lambda a, b: a * b,
+    ast.Div: lambda a, b: a / b, ast.FloorDiv: lambda a, b: a // b, ast.Mod: lambda a, b: a % b,
+    ast.Pow: lambda a, b: a ** b, ast.LShift: lambda a, b: a << b, ast.RShift: lambda a, b: a >> b,
+    ast.BitAnd: lambda a, b: a & b, ast.BitOr: lambda a, b: a | b, ast.BitXor: lambda a, b: a ^ b,
+}
+_OPERACOES_UNARIAS = {
+    ast.USub: lambda a: -a, ast.UAdd: lambda a: +a, ast.Not: lambda a: not a, ast.Invert: lambda a: ~a,
+}
+# "is" entre constantes depende da implementação e não é dobrado
+_COMPARACOES = {
+    ast.Eq: lambda a, b: a == b, ast.NotEq: lambda a, b: a != b, ast.Lt: lambda a, b: a < b,
+    ast.LtE: lambda a, b: a <= b, ast.Gt: lambda a, b: a > b, ast.GtE: lambda a, b: a >= b,
+    ast.In: lambda a, b: a in b, ast.NotIn: lambda a, b: a not in b,
+}
+_TIPOS_CONSTANTES = (int, float, complex, str, bytes, bool, type(None))
+# Funções que enxergam as variáveis locais pelo nome
+_INTROSPECCAO = frozenset(['locals', 'vars', 'dir', 'eval', 'exec'])
+
+
+def _transformar(raiz, visitar):
+    """
+    Percorre a árvore em pós-ordem sem recursão, como o generic_visit do ast.NodeTransformer:
+    visitar(no) retorna o que fica no lugar do nó (o próprio nó, outro nó, uma lista de comandos
+    ou None para removê-lo). Listas de comandos que ficam vazias recebem um pass.
+    """
+    def percorrer(no):
+        for campo, antigo in ast.iter_fields(no):
+            if isinstance(antigo, list):
+                novos = []
+                for item in antigo:
+                    if isinstance(item, ast.AST):
+                        item = yield percorrer(item)
+                        if item is None:
+                            continue
+                        if isinstance(item, list):
+                            novos.extend(item)
+                            continue
+                    novos.append(item)
+                if antigo and not novos and campo in ('body', 'finalbody'):
+                    novos.append(ast.copy_location(ast.Pass(), antigo[0]))
+                antigo[:] = novos
+            elif isinstance(antigo, ast.AST):
+                novo = yield percorrer(antigo)
+                setattr(no, campo, novo)
+        return visitar(no)
+    return executar_sem_recursao(percorrer(raiz))
+
+
+def _comandos_filhos(no):
+    """Listas de comandos diretamente dentro de um comando composto"""
+    for campo in ('body', 'orelse', 'finalbody'):
+        comandos = getattr(no, campo, None)
+        if isinstance(comandos, list):
+            yield comandos
+    for filho in getattr(no, 'handlers', ()):
+        yield filho.body
+    for caso in getattr(no, 'cases', ()):
+        yield caso.body
+
+
+def _constante(valor, origem):
+    return ast.copy_location(ast.Constant(valor), origem)
+
+
+def _cabe(valor):
+    if not isinstance(valor, _TIPOS_CONSTANTES):
+        return False
+    if isinstance(valor, int):
+        return valor.bit_length() <= _MAXIMO_BITS
+    if isinstance(valor, (str, bytes)):
+        return len(valor) <= _MAXIMO_TEXTO
+    return True
+
+
+def _nunca_bool(no):
+    """
+    Indica se a expressão certamente não produz um bool. A inferência junta bool e int em int
+    (f(True) e f(2) dão um parâmetro int), então x * 1 -> x trocaria 1 por True: os elementos
+    neutros só são eliminados quando o operando é uma constante ou o resultado de uma conta
+    """
+    if isinstance(no, ast.Constant):
+        return not isinstance(no.value, bool)
+    if isinstance(no, ast.BinOp):
+        return not isinstance(no.op, (ast.BitAnd, ast.BitOr, ast.BitXor))
+    return isinstance(no, ast.UnaryOp) and not isinstance(no.op, ast.Not)
+
+
+def _tipo_certo(no):
+    """
+    int ou float quando o tipo da expressão se vê no próprio código (constantes e contas entre
+    elas), None caso contrário. A inferência junta int e float em float e não garante que um
+    parâmetro seja int, então as identidades que só valem para um dos dois dependem disto
+    """
+    if isinstance(no, ast.Constant):
+        return type(no.value) if type(no.value) in _NUMERICOS else None
+    if isinstance(no, ast.UnaryOp):
+        tipo = _tipo_certo(no.operand)
+        if isinstance(no.op, (ast.USub, ast.UAdd)) or isinstance(no.op, ast.Invert) and tipo is int:
+            return tipo
+        return None
+    if not isinstance(no, ast.BinOp):
+        return None
+    esquerda, direita = _tipo_certo(no.left), _tipo_certo(no.right)
+    if esquerda is None or direita is None:
+        return None
+    if isinstance(no.op, ast.Div):
+        return float
+    if isinstance(no.op, ast.Pow):
+        # Expoente negativo dá float e base negativa com expoente float pode dar complex
+        if esquerda is int:
+            return int if isinstance(no.right, ast.Constant) and no.right.value >= 0 else None
+        return float if direita is int else None
+    if isinstance(no.op, (ast.BitAnd, ast.BitOr, ast.BitXor, ast.LShift, ast.RShift)):
+        return int if esquerda is int and direita is int else None
+    if isinstance(no.op, ast.MatMult):
+        return None
+    return float if float in (esquerda, direita) else int
+
+
+def _elemento_neutro(op, constante, operando, constante_a_direita):
+    """
+    Indica se operando <op> constante (ou constante <op> operando) é sempre o próprio operando.
+    x * 1, x - 0 e x ** 1 valem para qualquer número que não seja bool; com uma constante float
+    ou uma divisão o resultado é float, e x + 0, x // 1, x | 0, x << 0... só valem para inteiros
+    (-0.0 + 0 é 0.0), então nesses casos o tipo do operando precisa ser certo
+    """
+    certo = _tipo_certo(operando)
+    if (isinstance(constante, float) or isinstance(op, ast.Div)) and certo is not float:
+        return False
+    if not constante_a_direita:
+        if isinstance(op, ast.Mult) and constante == 1:
+            return _nunca_bool(operando)
+        return isinstance(op, ast.Add) and constante == 0 and certo is int
+    if isinstance(op, ast.Sub) and constante == 0 or isinstance(op, (ast.Mult, ast.Div, ast.Pow)) and constante == 1:
+        return _nunca_bool(operando)
+    if (isinstance(op, (ast.Add, ast.BitOr, ast.BitXor, ast.LShift, ast.RShift)) and constante == 0
+            or isinstance(op, ast.FloorDiv) and constante == 1):
+        return certo is int
+    return False
+
+
+def _operacao_barata(op, a, b):
+    """Recusa, antes de calcular, as operações cujo resultado seria grande demais"""
+    if isinstance(op, ast.Pow) and isinstance(a, int) and isinstance(b, int) and b > 0:
+        return a.bit_length() * b <= _MAXIMO_BITS
+    if isinstance(op, ast.LShift) and isinstance(a, int) and isinstance(b, int) and b > 0:
+        return a.bit_length() + b <= _MAXIMO_BITS
+    if isinstance(op, ast.Mult):
+        for texto, vezes in ((a, b), (b, a)):
+            if isinstance(texto, (str, bytes)) and isinstance(vezes, int):
+                return len(texto) * vezes <= _MAXIMO_TEXTO
+    # % em textos é formatação, e o tamanho do resultado não dá para prever
+    return not (isinstance(op, ast.Mod) and isinstance(a, (str, bytes)))
+
+
+def contar_instrucoes(codigo):
+    """Número de instruções de bytecode de um code object, somando as funções e classes aninhadas"""
+    total = 0
+    pendentes = [codigo]
+    while pendentes:
+        atual = pendentes.pop()
+        total += sum(1 for _ in dis.get_instructions(atual))
+        pendentes.extend(c for c in atual.co_consts if hasattr(c, 'co_code'))
+    return total
+
+
+def instrucoes_por_funcao(codigo):
+    """Instruções de bytecode de cada função do módulo, pelo nome qualificado"""
+    contagens = {}
+    pendentes = [codigo]
+    while pendentes:
+        atual = pendentes.pop()
+        if atual is not codigo:
+            contagens[atual.co_qualname] = sum(1 for _ in dis.get_instructions(atual))
+        pendentes.extend(c for c in atual.co_consts if hasattr(c, 'co_code'))
+    return contagens
+
+
+class PassoOtimizacao:
+    """
+    Base dos passos do otimizador. Cada método visitar_<TipoDoNó> é chamado em pós-ordem e
+    retorna o que fica no lugar do nó; passos que precisam de outra travessia sobrescrevem
+    transformar. A tabela de símbolos e os tipos vêm de um ContextoAnalise novo a cada
+    aplicação, já que os passos anteriores mudaram a árvore.
+    """
+    nome = None
+
+    def __init__(self, matematica_rapida=False):
+        self.matematica_rapida = matematica_rapida
+        self.alteracoes = 0
+
+    def aplicar(self, tree):
+        """Transforma a árvore no lugar e retorna o número de alterações feitas"""
+        self.alteracoes = 0
+        self.contexto = ContextoAnalise(tree)
+        self.transformar(tree)
+        ast.fix_missing_locations(tree)
+        return self.alteracoes
+
+    def transformar(self, tree):
+        manipuladores = {}
+
+        def visitar(no):
+            tipo = type(no)
+            metodo = manipuladores.get(tipo)
+            if metodo is None:
+                metodo = manipuladores[tipo] = getattr(self, 'visitar_' + tipo.__name__, False)
+            return metodo(no) if metodo else no
+
+        _transformar(tree, visitar)
+
+
+class DobrarConstantes(PassoOtimizacao):
+    """
+    Dobramento e propagação de constantes. Operações entre constantes viram o resultado; uma
+    variável local atribuída uma única vez, com uma constante, no nível de cima do corpo da
+    função é trocada pela constante nas leituras dos comandos seguintes. Repete até o ponto
+    fixo, porque cada propagação pode abrir novos dobramentos.
+    """
+    nome = 'constantes'
+    MAXIMO_RODADAS = 10
+
+    def aplicar(self, tree):
+        total = 0
+        for _ in range(self.MAXIMO_RODADAS):
+            alteracoes = super().aplicar(tree)
+            total += alteracoes
+            if not alteracoes:
+                break
+        self.alteracoes = total
+        return total
+
+    def transformar(self, tree):
+        self._substituicoes, self._removidas = self._propagaveis()
+        super().transformar(tree)
+
+    def _propagaveis(self):
+        """
+        Leitura (nó Name) -> valor constante que ela sempre vê, e as atribuições que ficam sem
+        nenhuma leitura depois da troca (a não ser que a função consulte as variáveis locais)
+        """
+        tabela = self.contexto.tabela_simbolos
+        substituicoes = {}
+        removidas = set()
+        for escopo in tabela.escopos:
+            if escopo.tipo != 'funcao' or not isinstance(escopo.no, _FUNCOES):
+                continue
+            atribuicoes = {}
+            for i, comando in enumerate(escopo.no.body):
+                if (isinstance(comando, ast.Assign) and len(comando.targets) == 1
+                        and isinstance(comando.value, ast.Constant)):
+                    atribuicoes[comando.targets[0]] = (i, comando.value.value)
+            if not atribuicoes:
+                continue
+            # Posição (comando do nível de cima) de cada nó do corpo
+            posicao = {}
+            for i, comando in enumerate(escopo.no.body):
+                for no in ast.walk(comando):
+                    posicao[no] = i
+            introspeccao = any(isinstance(no, ast.Name) and no.id in _INTROSPECCAO for no in posicao)
+            for nome, simbolo in escopo.simbolos.items():
+                # Alvos de atribuições simples aparecem duas vezes nas definições
+                definicoes = set(simbolo.definicoes)
+                if nome in escopo.globais or nome in escopo.nao_locais or len(definicoes) != 1:
+                    continue
+                definicao = atribuicoes.get(definicoes.pop())
+                if definicao is None:
+                    continue
+                indice, valor = definicao
+                trocados = 0
+                for uso in simbolo.usos:
+                    if tabela.escopo_de(uso) is escopo and posicao.get(uso, -1) > indice:
+                        substituicoes[uso] = valor
+                        trocados += 1
+                if trocados == len(simbolo.usos) and not introspeccao:
+                    removidas.add(escopo.no.body[indice])
+        return substituicoes, removidas
+
+    def visitar_Assign(self, no):
+        if no in self._removidas:
+            self.alteracoes += 1
+            return None
+        return no
+
+    def visitar_Name(self, no):
+        if no in self._substituicoes:
+            self.alteracoes += 1
+            return _constante(self._substituicoes[no], no)
+        return no
+
+    def visitar_BinOp(self, no):
+        if not (isinstance(no.left, ast.Constant) and isinstance(no.right, ast.Constant)):
+            return no
+        a, b = no.left.value, no.right.value
+        if not _operacao_barata(no.op, a, b):
+            return no
+        try:
+            valor = _OPERACOES_BINARIAS[type(no.op)](a, b)
+        except Exception:
+            # A exceção (divisão por zero, tipos incompatíveis) fica para o tempo de execução
+            return no
+        return self._dobrado(no, valor)
+
+    def visitar_UnaryOp(self, no):
+        operando = no.operand
+        if not isinstance(operando, ast.Constant):
+            return no
+        if isinstance(no.op, ast.Invert) and isinstance(operando.value, bool):
+            return no
+        try:
+            valor = _OPERACOES_UNARIAS[type(no.op)](operando.value)
+        except Exception:
+            return no
+        return self._dobrado(no, valor)
+
+    def visitar_Compare(self, no):
+        operandos = [no.left] + no.comparators
+        if not all(isinstance(o, ast.Constant) for o in operandos):
+            return no
+        if not all(type(op) in _COMPARACOES for op in no.ops):
+            return no
+        try:
+            valor = all(_COMPARACOES[type(op)](a.value, b.value)
+                        for op, a, b in zip(no.ops, operandos, operandos[1:]))
+        except Exception:
+            return no
+        return self._dobrado(no, valor)
+
+    def visitar_BoolOp(self, no):
+        valores = list(no.values)
+        # "a and b" vale a se a for falso e b caso contrário; "or" ao contrário
+        curto_circuito = isinstance(no.op, ast.Or)
+        while len(valores) > 1 and isinstance(valores[0], ast.Constant):
+            if bool(valores[0].value) == curto_circuito:
+                valores = valores[:1]
+                break
+            valores.pop(0)
+        if len(valores) == len(no.values):
+            return no
+        self.alteracoes += 1
+        if len(valores) == 1:
+            return valores[0]
+        no.values = valores
+        return no
+
+    def visitar_IfExp(self, no):
+        if not isinstance(no.test, ast.Constant):
+            return no
+        self.alteracoes += 1
+        return no.body if no.test.value else no.orelse
+
+    def _dobrado(self, no, valor):
+        if not _cabe(valor):
+            return no
+        self.alteracoes += 1
+        return _constante(valor, no)
+
+
+class SimplificarAlgebra(PassoOtimizacao):
+    """
+    Simplificações algébricas guiadas pelos tipos inferidos, só quando o resultado é idêntico:
+    elementos neutros (x * 1, x - 0, x + 0 em inteiros..., ver _elemento_neutro), x ** 2 -> x * x
+    em inteiros e divisão por potência de dois -> multiplicação pelo inverso exato. Com
+    matematica_rapida, qualquer divisão por constante vira multiplicação pelo inverso (ex.:
+    taxa / 100 -> taxa * 0.01) e x ** 2 -> x * x vale também para floats; o resultado pode
+    mudar no último dígito.
+    """
+    nome = 'algebra'
+
+    def transformar(self, tree):
+        # Tipos dos nós criados por este passo (a inferência só conhece os nós originais)
+        self._novos = {}
+        super().transformar(tree)
+
+    def _tipo(self, no):
+        if isinstance(no, ast.Constant):
+            return type(no.value)
+        tipo = self._novos.get(no)
+        if tipo is not None:
+            return tipo
+        try:
+            return classe(self.contexto.tipos.tipo_de(no))
+        except KeyError:
+            return DESCONHECIDO
+
+    def _novo(self, no, tipo):
+        self._novos[no] = tipo
+        self.alteracoes += 1
+        return no
+
+    def visitar_BinOp(self, no):
+        esquerda, direita, op = no.left, no.right, no.op
+        tipo_esquerda, tipo_direita = self._tipo(esquerda), self._tipo(direita)
+        if tipo_esquerda not in _NUMERICOS or tipo_direita not in _NUMERICOS:
+            return no
+        if isinstance(op, ast.Div) or float in (tipo_esquerda, tipo_direita):
+            tipo = float
+        else:
+            tipo = int
+
+        if isinstance(direita, ast.Constant) and tipo is tipo_esquerda and _elemento_neutro(op, direita.value, esquerda, True):
+            self.alteracoes += 1
+            return esquerda
+        if isinstance(esquerda, ast.Constant) and tipo is tipo_direita and _elemento_neutro(op, esquerda.value, direita, False):
+            self.alteracoes += 1
+            return direita
+
+        if isinstance(op, ast.Div) and isinstance(direita, ast.Constant):
+            inverso = self._inverso(direita.value, tipo_esquerda)
+            if inverso is not None:
+                return self._novo(ast.copy_location(ast.BinOp(esquerda, ast.Mult(), _constante(inverso, direita)), no), float)
+        if (isinstance(op, ast.Pow) and isinstance(esquerda, ast.Name) and isinstance(direita, ast.Constant)
+                and direita.value == 2 and type(direita.value) is int
+                and (tipo is int or self.matematica_rapida)):
+            copia = ast.copy_location(ast.Name(esquerda.id, ast.Load()), esquerda)
+            return self._novo(ast.copy_location(ast.BinOp(esquerda, ast.Mult(), copia), no), tipo)
+        return no
+
+    def _inverso(self, divisor, tipo_dividendo):
+        """Constante que multiplicada substitui a divisão, ou None"""
+        if isinstance(divisor, bool) or not isinstance(divisor, _NUMERICOS) or divisor == 0:
+            return None
+        try:
+            inverso = 1.0 / divisor
+        except OverflowError:
+            return None
+        if not math.isfinite(divisor) or inverso == 0 or math.isinf(inverso):
+            return None
+        if self.matematica_rapida:
+            return inverso
+        # Potência de dois: o inverso é exato e x * inverso arredonda igual a x / divisor.
+        # Inteiros grandes demais para float dariam OverflowError na multiplicação, e não na divisão
+        exato = abs(math.frexp(divisor)[0]) == 0.5 and 1.0 / inverso == divisor
+        return inverso if exato and tipo_dividendo is float else None
+
+    def visitar_UnaryOp(self, no):
+        operando = no.operand
+        if self._tipo(operando) not in _NUMERICOS:
+            return no
+        if isinstance(no.op, ast.UAdd) and _nunca_bool(operando):
+            self.alteracoes += 1
+            return operando
+        if (isinstance(no.op, ast.USub) and isinstance(operando, ast.UnaryOp) and isinstance(operando.op, ast.USub)
+                and _nunca_bool(operando.operand)):
+            self.alteracoes += 1
+            return operando.operand
+        return no
+
+
+class RemoverCodigoMorto(PassoOtimizacao):
+    """
+    Remove os comandos depois de return, raise, break e continue, os ramos de if com condição
+    constante e os laços while com condição falsa. A remoção é desfeita quando mudaria o
+    significado do resto da função: um yield (a função deixaria de ser geradora), um global ou
+    nonlocal, ou a única ligação de um nome local (as leituras passariam a ser globais).
+    """
+    nome = 'codigo_morto'
+
+    def transformar(self, tree):
+        tabela = self.contexto.tabela_simbolos
+        self._definicoes = {}
+        for escopo in tabela.escopos:
+            for simbolo in escopo.simbolos.values():
+                for definicao in simbolo.definicoes:
+                    self._definicoes[definicao] = simbolo
+        super().transformar(tree)
+
+    def _remover(self, comandos):
+        """Confirma que os comandos podem sumir e tira as suas ligações da tabela"""
+        nos = set()
+        for comando in comandos:
+            nos.update(ast.walk(comando))
+        tabela = self.contexto.tabela_simbolos
+        afetados = set()
+        for no in nos:
+            if isinstance(no, (ast.Yield, ast.YieldFrom, ast.Global, ast.Nonlocal)):
+                escopo = tabela.escopo_de(no)
+                if escopo is not None and escopo.no not in nos:
+                    return False
+            simbolo = self._definicoes.get(no)
+            if simbolo is not None and simbolo.escopo.no not in nos:
+                afetados.add(simbolo)
+        for simbolo in afetados:
+            if simbolo.escopo.tipo == 'funcao' and all(d in nos for d in simbolo.definicoes):
+                return False
+        for simbolo in afetados:
+            simbolo.definicoes = [d for d in simbolo.definicoes if d not in nos]
+        self.alteracoes += len(comandos)
+        return True
+
+    def visitar_If(self, no):
+        self._truncar(no)
+        if not isinstance(no.test, ast.Constant):
+            return no
+        mantidos, removidos = (no.body, no.orelse) if no.test.value else (no.orelse, no.body)
+        if not self._remover(removidos):
+            return no
+        self.alteracoes += 1
+        return mantidos
+
+    def visitar_While(self, no):
+        if not isinstance(no.test, ast.Constant) or no.test.value or not self._remover(no.body):
+            return self._truncar(no)
+        self.alteracoes += 1
+        return no.orelse
+
+    def _truncar(self, no):
+        for comandos in _comandos_filhos(no):
+            for i, comando in enumerate(comandos):
+                if isinstance(comando, _TERMINAM_BLOCO):
+                    if i + 1 < len(comandos) and self._remover(comandos[i + 1:]):
+                        del comandos[i + 1:]
+                    break
+        return no
+
+    def visitar_Module(self, no):
+        return self._truncar(no)
+
+    visitar_FunctionDef = visitar_AsyncFunctionDef = visitar_ClassDef = visitar_Module
+    visitar_For = visitar_AsyncFor = visitar_With = visitar_AsyncWith = visitar_Module
+    visitar_Try = visitar_ExceptHandler = visitar_match_case = visitar_Module
+
+
+class MoverInvariantes(PassoOtimizacao):
+    """
+    Tira dos laços as expressões invariantes: aritmética sobre variáveis locais numéricas que o
+    laço não modifica e que já estão definidas na entrada dele. Só são movidas operações que não
+    podem levantar exceção (+, - e * entre int ou entre float, divisões por constante diferente de
+    zero), porque passam a ser calculadas mesmo quando o laço não executa nenhuma vez. Os laços
+    são tratados de fora para dentro, então cada expressão vai para antes do laço mais externo
+    em que ela é invariante.
+    """
+    nome = 'invariantes'
+
+    def transformar(self, tree):
+        tabela = self.contexto.tabela_simbolos
+        for escopo in tabela.escopos:
+            if escopo.tipo == 'funcao' and isinstance(escopo.no, _FUNCOES):
+                self._funcao(escopo)
+
+    def _funcao(self, escopo):
+        funcao = escopo.no
+        self._escopo = escopo
+        self._usados = {n.id for n in ast.walk(funcao) if isinstance(n, ast.Name)}
+        self._usados.update(a.arg for a in ast.walk(funcao.args) if isinstance(a, ast.arg))
+        self._temporarios = 0
+        # Nomes com certeza definidos antes de cada comando do nível de cima: parâmetros e
+        # atribuições simples feitas em comandos anteriores (menos o que um del ou um
+        # "except ... as" desfaz)
+        parametros = funcao.args.posonlyargs + funcao.args.args + funcao.args.kwonlyargs
+        definidos = {a.arg for a in parametros}
+        novos = []
+        for comando in funcao.body:
+            novos.extend(self._comandos([comando], frozenset(definidos)))
+            if isinstance(comando, ast.Assign):
+                definidos.update(alvo.id for alvo in comando.targets if isinstance(alvo, ast.Name))
+            for no in ast.walk(comando):
+                if isinstance(no, ast.Name) and isinstance(no.ctx, ast.Del):
+                    definidos.discard(no.id)
+                elif isinstance(no, ast.ExceptHandler) and no.name:
+                    definidos.discard(no.name)
+        funcao.body[:] = novos
+
+    def _comandos(self, comandos, definidos):
+        """Trata os laços da lista e das listas aninhadas; cada laço antes dos que estão dentro dele"""
+        pendentes = [comandos]
+        while pendentes:
+            lista = pendentes.pop()
+            novos = []
+            for comando in lista:
+                if isinstance(comando, _LACOS):
+                    novos.extend(self._laco(comando, definidos))
+                else:
+                    novos.append(comando)
+                if not isinstance(comando, (ast.ClassDef,) + _FUNCOES):
+                    pendentes.extend(_comandos_filhos(comando))
+            lista[:] = novos
+        return comandos
+
+    def _laco(self, laco, definidos):
+        modificados = set()
+        for no in ast.walk(laco):
+            if isinstance(no, ast.Name) and not isinstance(no.ctx, ast.Load):
+                modificados.add(no.id)
+            elif isinstance(no, (ast.Import, ast.ImportFrom)):
+                modificados.update((a.asname or a.name).split('.')[0] for a in no.names)
+            elif isinstance(no, (ast.ExceptHandler, ast.MatchAs, ast.MatchStar)) and no.name:
+                modificados.add(no.name)
+            elif isinstance(no, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                modificados.add(no.name)
+        self._modificados = modificados
+        self._definidos = definidos
+
+        # O iterável do for e o else são avaliados uma vez só; o teste do while, a cada volta
+        if isinstance(laco, ast.While):
+            raizes = [(laco, 'test'), (laco, 'body')]
+        else:
+            raizes = [(laco, 'body')]
+        atribuicoes = []
+        expressoes = {}
+        for no, campo in raizes:
+            for pai, nome_campo, indice, expressao in self._maximas(getattr(no, campo), no, campo):
+                chave = ast.dump(expressao)
+                temporario = expressoes.get(chave)
+                if temporario is None:
+                    temporario = expressoes[chave] = self._novo_temporario()
+                    alvo = ast.Name(temporario, ast.Store())
+                    atribuicoes.append(ast.copy_location(ast.Assign([alvo], expressao), laco))
+                leitura = ast.copy_location(ast.Name(temporario, ast.Load()), expressao)
+                if indice is None:
+                    setattr(pai, nome_campo, leitura)
+                else:
+                    getattr(pai, nome_campo)[indice] = leitura
+                self.alteracoes += 1
+        return atribuicoes + [laco]
+
+    def _novo_temporario(self):
+        while True:
+            self._temporarios += 1
+            nome = f"_invariante_{self._temporarios}"
+            if nome not in self._usados:
+                self._usados.add(nome)
+                return nome
+
+    def _maximas(self, raiz, pai, campo):
+        """Expressões invariantes máximas (pai, campo, índice na lista ou None, expressão)"""
+        encontradas = []
+        pilha = [(raiz, pai, campo, None)]
+        while pilha:
+            no, pai, campo, indice = pilha.pop()
+            if isinstance(no, list):
+                pilha.extend((item, pai, campo, i) for i, item in enumerate(no))
+                continue
+            if not isinstance(no, ast.AST) or isinstance(no, _ESCOPOS_INTERNOS):
+                continue
+            if isinstance(no, (ast.BinOp, ast.UnaryOp)) and self._invariante(no) is not None:
+                encontradas.append((pai, campo, indice, no))
+                continue
+            for nome_campo, valor in ast.iter_fields(no):
+                pilha.append((valor, no, nome_campo, None))
+        return encontradas
+
+    def _invariante(self, expressao):
+        """Tipo (int ou float) da expressão se ela pode sair do laço; None caso contrário"""
+        def avaliar(no):
+            if isinstance(no, ast.Constant):
+                valor = no.value
+                return type(valor) if type(valor) in _NUMERICOS else None
+            if isinstance(no, ast.Name):
+                return self._nome_invariante(no)
+            if isinstance(no, ast.UnaryOp) and isinstance(no.op, (ast.USub, ast.UAdd)):
+                return (yield avaliar(no.operand))
+            if not isinstance(no, ast.BinOp):
+                return None
+            esquerda = yield avaliar(no.left)
+            direita = yield avaliar(no.right)
+            if esquerda is None or direita is None:
+                return None
+            divisor = no.right.value if isinstance(no.right, ast.Constant) else 0
+            divisao = isinstance(no.op, (ast.Div, ast.FloorDiv, ast.Mod))
+            if not isinstance(no.op, (ast.Add, ast.Sub, ast.Mult)) and not (divisao and divisor != 0):
+                return None
+            if esquerda is direita:
+                # int / int pode não caber em um float
+                return None if isinstance(no.op, ast.Div) and esquerda is int else esquerda
+            # int e float misturados convertem o int, o que só é seguro para constantes pequenas
+            inteiro = no.left if esquerda is int else no.right
+            return float if isinstance(inteiro, ast.Constant) and _cabe(inteiro.value) else None
+
+        tipo = executar_sem_recursao(avaliar(expressao))
+        # Uma expressão só com constantes é assunto do dobramento, não do laço
+        if tipo is None or not any(isinstance(n, ast.Name) for n in ast.walk(expressao)):
+            return None
+        return tipo
+
+    def _nome_invariante(self, no):
+        if no.id in self._modificados or no.id not in self._definidos:
+            return None
+        tabela = self.contexto.tabela_simbolos
+        try:
+            simbolo = tabela.resolver(no)
+        except KeyError:
+            return None
+        if not isinstance(simbolo, Simbolo) or simbolo.escopo is not self._escopo:
+            return None
+        # Ligações feitas por funções aninhadas (nonlocal) podem mudar o valor a qualquer chamada
+        if any(tabela.escopo_de(d) is not self._escopo for d in simbolo.definicoes):
+            return None
+        tipo = classe(self.contexto.tipos.tipo_do_simbolo(simbolo))
+        return tipo if tipo in _NUMERICOS else None
+
+
+PASSOS = {
+    passo.nome: passo for passo in (DobrarConstantes, SimplificarAlgebra, RemoverCodigoMorto, MoverInvariantes)
+}
+ORDEM_PADRAO = ('constantes', 'algebra', 'codigo_morto', 'invariantes')
+
+
+def otimizar(codigo_fonte, passos=ORDEM_PADRAO, matematica_rapida=False, nome_arquivo='<otimizado>'):
+    """
+    Aplica os passos de otimização em ordem sobre a AST (por exemplo a de gerar_ast) ou sobre o
+    código-fonte. A árvore recebida é modificada. Retorna um dict com a árvore, o código-fonte
+    otimizado, o code object compilado e o relatório de cada passo: alterações feitas, tempo e
+    instruções de bytecode do módulo antes e depois.
+    """
+    tree = ast.parse(codigo_fonte) if isinstance(codigo_fonte, str) else codigo_fonte
+    codigo = compile(tree, nome_arquivo, 'exec')
+    relatorio = []
+    for nome in passos:
+        passo = PASSOS[nome](matematica_rapida)
+        antes = contar_instrucoes(codigo)
+        with instrumentacao.fase(f'otimizacao.{nome}'):
+            inicio = time.perf_counter()
+            alteracoes = passo.aplicar(tree)
+            tempo = time.perf_counter() - inicio
+        codigo = compile(tree, nome_arquivo, 'exec')
+        relatorio.append({
+            'passo': nome,
+            'alteracoes': alteracoes,
+            'tempo': tempo,
+            'instrucoes_antes': antes,
+            'instrucoes_depois': contar_instrucoes(codigo),
+        })
+    return {'arvore': tree, 'fonte': ast.unparse(tree), 'codigo': codigo, 'relatorio': relatorio}
+
+
+# Exemplo de uso:
+if __name__ == "__main__":
+    with open("main.py", "r", encoding="utf-8") as f:
+        resultado = otimizar(f.read(), matematica_rapida=True)
+
+    for passo in resultado['relatorio']:
+        print(f"{passo['passo']:<14} {passo['alteracoes']:>3} alterações, "
+              f"{passo['instrucoes_antes']} -> {passo['instrucoes_depois']} instruções de bytecode")
+    print()
+    print(resultado['fonte'])
@@ -0,0 +1,323 @@
+import argparse
+import queue
+import threading
+import time
+import tokenize
+
+from agendador_renderizacao import escrever_diagramas
+from analise_projeto import _resultados_serializaveis, coletar_arquivos, contar_diagnosticos, pasta_diagramas
+from semantic_analysis import analisar_arvore
+from syntatic_analysis import analisar_sintaxe
+from tabela_tokens import analisar_lexico_compacto
+
+# Marca o fim da entrada; cada estágio repassa uma por trabalhador do estágio seguinte
+_FIM = object()
+# Intervalo com que as esperas nas filas verificam se o pipeline foi interrompido
+_INTERVALO = 0.05
+
+
+class Estagio:
+    """
+    Um estágio do pipeline: funcao(item) altera o item (um dict) no lugar. Itens com status
+    diferente de 'ok' passam direto pelos estágios seguintes; uma exceção marca o item com
+    status 'erro'. capacidade é o tamanho da fila de entrada do estágio (padrão: o do pipeline).
+    """
+
+    def __init__(self, nome, funcao, trabalhadores=1, capacidade=None):
+        self.nome = nome
+        self.funcao = funcao
+        self.trabalhadores = trabalhadores
+        self.capacidade = capacidade
+        self._zerar()
+
+    def _zerar(self):
+        self.processados = 0
+        self.erros = 0
+        self.tempo_ocupado = 0.0
+        self.espera_entrada = 0.0
+        self.espera_saida = 0.0
+        self.soma_fila = 0
+        self.fila_maxima = 0
+
+
+def _colocar(fila, item, parar):
+    """put bloqueante que desiste se o pipeline for interrompido; retorna False nesse caso"""
+    while True:
+        try:
+            fila.put(item, timeout=_INTERVALO)
+            return True
+        except queue.Full:
+            if parar.is_set():
+                return False
+
+
+def _obter(fila, parar):
+    while True:
+        try:
+            return fila.get(timeout=_INTERVALO)
+        except queue.Empty:
+            if parar.is_set():
+                return _FIM
+
+
+class PipelineEstagios:
+    """
+    Estágios ligados por filas limitadas, cada um com seus próprios trabalhadores (threads).
+    Quando um estágio é mais lento que o anterior, a fila dele enche e o anterior fica bloqueado
+    até haver espaço (contrapressão), até a leitura da entrada; por isso a memória depende só das
+    capacidades das filas e do número de trabalhadores, não do tamanho da entrada.
+    Os trabalhadores são threads: estágios que esperam E/S (leitura, escrita dos diagramas) rodam
+    de fato em paralelo, enquanto os que só usam CPU se revezam no interpretador.
+    """
+
+    def __init__(self, estagios, capacidade=8):
+        self.estagios = estagios
+        self.capacidade = capacidade
+        self.duracao = 0.0
+        self._filas = []
+
+    def executar(self, entradas):
+        """
+        Gera os itens que saíram do último estágio, na ordem em que terminaram ('indice' guarda a
+        posição na entrada). entradas pode ser um gerador: ela só é lida conforme há espaço na
+        primeira fila. Interromper a iteração encerra os trabalhadores.
+        """
+        estagios = self.estagios
+        for estagio in estagios:
+            estagio._zerar()
+        filas = [queue.Queue(maxsize=estagio.capacidade or self.capacidade) for estagio in estagios]
+        filas.append(queue.Queue(maxsize=self.capacidade))
+        self._filas = filas
+        parar = threading.Event()
+        trava = threading.Lock()
+        ativos = [estagio.trabalhadores for estagio in estagios]
+        erro_entrada = []
+
+        def alimentar():
+            try:
+                for indice, item in enumerate(entradas):
+                    item.setdefault('status', 'ok')
+                    item['indice'] = indice
+                    if not _colocar(filas[0], item, parar):
+                        return
+            except Exception as e:
+                erro_entrada.append(e)
+            for _ in range(estagios[0].trabalhadores):
+                _colocar(filas[0], _FIM, parar)
+
+        def trabalhar(posicao):
+            estagio = estagios[posicao]
+            entrada, saida = filas[posicao], filas[posicao + 1]
+            while True:
+                inicio = time.perf_counter()
+                item = _obter(entrada, parar)
+                obtido = time.perf_counter()
+                if item is _FIM:
+                    break
+                profundidade = entrada.qsize() + 1
+                erro = False
+                if item['status'] == 'ok':
+                    try:
+                        estagio.funcao(item)
+                    except Exception as e:
+                        item['status'] = 'erro'
+                        item['mensagem'] = f"{estagio.nome}: {type(e).__name__}: {e}"
+                        erro = True
+                processado = time.perf_counter()
+                colocado = _colocar(saida, item, parar)
+                fim = time.perf_counter()
+                with trava:
+                    estagio.processados += 1
+                    estagio.erros += erro
+                    estagio.espera_entrada += obtido - inicio
+                    estagio.tempo_ocupado += processado - obtido
+                    estagio.espera_saida += fim - processado
+                    estagio.soma_fila += profundidade
+                    estagio.fila_maxima = max(estagio.fila_maxima, profundidade)
+                if not colocado:
+                    break
+            with trava:
+                ativos[posicao] -= 1
+                ultimo = ativos[posicao] == 0
+            if ultimo:
+                seguintes = estagios[posicao + 1].trabalhadores if posicao + 1 < len(estagios) else 1
+                for _ in range(seguintes):
+                    _colocar(saida, _FIM, parar)
+
+        threads = [threading.Thread(target=alimentar, name="pipeline-entrada", daemon=True)]
+        for posicao, estagio in enumerate(estagios):
+            threads.extend(
+                threading.Thread(target=trabalhar, args=(posicao,), name=f"pipeline-{estagio.nome}-{i}", daemon=True)
+                for i in range(estagio.trabalhadores)
+            )
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                item = filas[-1].get()
+                if item is _FIM:
+                    break
+                yield item
+        finally:
+            parar.set()
+            for thread in threads:
+                thread.join()
+            self.duracao = time.perf_counter() - inicio
+        if erro_entrada:
+            raise erro_entrada[0]
+
+    def profundidades(self):
+        """Ocupação atual da fila de entrada de cada estágio, para acompanhar a execução"""
+        return {estagio.nome: fila.qsize() for estagio, fila in zip(self.estagios, self._filas)}
+
+    def metricas(self):
+        """
+        Métricas de cada estágio na última execução. ocupacao é a fração do tempo em que os
+        trabalhadores estiveram processando; espera_saida é o tempo bloqueado pela contrapressão
+        do estágio seguinte.
+        """
+        duracao = self.duracao or float("inf")
+        return [
+            {
+                'estagio': estagio.nome,
+                'trabalhadores': estagio.trabalhadores,
+                'processados': estagio.processados,
+                'erros': estagio.erros,
+                'vazao': estagio.processados / duracao,
+                'ocupacao': estagio.tempo_ocupado / (estagio.trabalhadores * duracao),
+                'fila_media': estagio.soma_fila / estagio.processados if estagio.processados else 0.0,
+                'fila_maxima': estagio.fila_maxima,
+                'capacidade': estagio.capacidade or self.capacidade,
+                'espera_entrada': estagio.espera_entrada,
+                'espera_saida': estagio.espera_saida,
+            }
+            for estagio in self.estagios
+        ]
+
+    def gargalo(self):
+        """Estágio com a maior ocupação dos trabalhadores"""
+        return max(self.metricas(), key=lambda m: m['ocupacao'])['estagio']
+
+    def formatar_metricas(self):
+        linhas = [f"{'Estágio':<12}{'Trab.':>6}{'Itens':>8}{'Itens/s':>10}{'Ocupação':>10}"
+                  f"{'Fila méd.':>11}{'Fila máx.':>11}{'Bloqueado (s)':>15}"]
+        for m in self.metricas():
+            linhas.append(f"{m['estagio']:<12}{m['trabalhadores']:>6}{m['processados']:>8}{m['vazao']:>10.1f}"
+                          f"{m['ocupacao']:>9.0%} {m['fila_media']:>10.1f}{m['fila_maxima']:>6}/{m['capacidade']:<4}"
+                          f"{m['espera_saida']:>15.2f}")
+        linhas.append(f"Gargalo: {self.gargalo()} ({self.duracao:.2f}s no total)")
+        return "\n".join(linhas)
+
+
+# -- estágios da análise -----------------------------------------------------------
+
+def _ler(item):
+    if 'codigo' not in item:
+        with open(item['arquivo'], "r", encoding="utf-8") as f:
+            item['codigo'] = f.read()
+
+
+def _lexico(item):
+    # Só a contagem segue adiante; a tabela de tokens é liberada aqui
+    try:
+        item['tokens'] = len(analisar_lexico_compacto(item['codigo']))
+    except (tokenize.TokenError, SyntaxError):
+        item['tokens'] = None
+
+
+def _sintaxe(item):
+    arvore, erro = analisar_sintaxe(item.pop('codigo'))
+    if erro is not None:
+        item['status'] = 'erro_sintaxe'
+        item['erro_sintaxe'] = erro
+    else:
+        item['arvore'] = arvore
+
+
+def _semantica(item):
+    item['semantica'] = _resultados_serializaveis(analisar_arvore(item['arvore'])[0])
+
+
+def _saida(diretorio_diagramas, limite_nos):
+    def saida(item):
+        arvore = item.pop('arvore')
+        if diretorio_diagramas:
+            item['diagramas'] = escrever_diagramas(
+                arvore, pasta_diagramas(diretorio_diagramas, item['arquivo']), limite_nos
+            )
+    return saida
+
+
+TRABALHADORES_PADRAO = {'leitura': 2, 'lexico': 1, 'sintaxe': 1, 'semantica': 1, 'saida': 2}
+
+
+def pipeline_analise(diretorio_diagramas=None, limite_nos_diagramas=None, trabalhadores=None, capacidade=8):
+    """Pipeline leitura -> léxico -> sintaxe -> semântica -> saída (diagramas DOT), com os resultados de analisar_arquivo"""
+    trabalhadores = {**TRABALHADORES_PADRAO, **(trabalhadores or {})}
+    funcoes = {
+        'leitura': _ler,
+        'lexico': _lexico,
+        'sintaxe': _sintaxe,
+        'semantica': _semantica,
+        'saida': _saida(diretorio_diagramas, limite_nos_diagramas),
+    }
+    return PipelineEstagios([Estagio(nome, funcao, trabalhadores[nome]) for nome, funcao in funcoes.items()],
+                            capacidade)
+
+
+def _item(arquivo, codigo=None):
+    item = {
+        'arquivo': arquivo,
+        'status': 'ok',
+        'tokens': 0,
+        'erro_sintaxe': None,
+        'semantica': None,
+        'mensagem': None,
+        'diagramas': [],
+    }
+    if codigo is not None:
+        item['codigo'] = codigo
+    return item
+
+
+def analisar_em_estagios(pipeline, fontes):
+    """
+    Passa as fontes pelo pipeline e gera um resultado por fonte, no formato de analisar_arquivo.
+    fontes: caminhos de arquivos ou pares (nome, código) já em memória; pode ser um gerador.
+    """
+    entradas = (_item(fonte) if isinstance(fonte, str) else _item(*fonte) for fonte in fontes)
+    for item in pipeline.executar(entradas):
+        # Um item que falhou no meio do caminho ainda pode carregar o código ou a árvore
+        item.pop('codigo', None)
+        item.pop('arvore', None)
+        yield item
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Análise de um projeto em estágios com filas limitadas")
+    parser.add_argument('caminhos', nargs='+', help="arquivos, diretórios ou padrões glob")
+    parser.add_argument('--capacidade', type=int, default=8, help="itens em cada fila entre estágios")
+    parser.add_argument('--diagramas', default=None, help="diretório onde escrever os diagramas DOT de cada arquivo")
+    parser.add_argument('--limite-nos', type=int, default=2000, help="nós no diagrama da AST antes de resumir o restante")
+    for nome, padrao in TRABALHADORES_PADRAO.items():
+        parser.add_argument(f'--trabalhadores-{nome}', type=int, default=padrao, help=f"threads do estágio {nome}")
+    args = parser.parse_args(argv)
+
+    trabalhadores = {nome: getattr(args, f'trabalhadores_{nome}') for nome in TRABALHADORES_PADRAO}
+    pipeline = pipeline_analise(args.diagramas, args.limite_nos, trabalhadores, args.capacidade)
+    for resultado in analisar_em_estagios(pipeline, coletar_arquivos(args.caminhos)):
+        if resultado['status'] == 'ok':
+            print(f"✅ {resultado['arquivo']}: {resultado['tokens']} tokens, "
+                  f"{contar_diagnosticos(resultado)} diagnósticos")
+        elif resultado['status'] == 'erro_sintaxe':
+            erro = resultado['erro_sintaxe']
+            print(f"❌ {resultado['arquivo']}: erro de sintaxe na linha {erro['linha']}: {erro['mensagem']}")
+        else:
+            print(f"⚠️ {resultado['arquivo']}: {resultado['mensagem']}")
+    print()
+    print(pipeline.formatar_metricas())
+
+
+if __name__ == "__main__":
+    main()
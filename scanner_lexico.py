@@ -0,0 +1,186 @@
+import re
+import tokenize
+from collections import namedtuple
+
+from lexical_analysis import (
+    TOKENS, NOMES_POR_LEXEMA, TIPOS_IGNORADOS, classificar_lexema, descrever_token
+)
+
+# O autômato é compilado a partir de TOKENS: os operadores literais da tabela viram uma única
+# alternância (do mais longo para o mais curto) e as palavras-chave se juntam ao grupo NAME,
+# já que para o tokenize elas também são nomes (o 'Nome' continua vindo de classificar_lexema).
+# As construções do Python que TOKENS não descreve por completo (prefixos e aspas triplas em
+# strings, números com expoente/base, operadores compostos e nomes Unicode) ficam na tabela
+# complementar abaixo. NOTINLIST fica de fora porque o tokenize separa "not" e "in".
+_PREFIXO_STRING = r'(?:[rR][bBfF]?|[bBfF][rR]?|[uU])?'
+_DIGITOS = r'\d(?:_?\d)*'
+_EXPOENTE = rf'[eE][+-]?{_DIGITOS}'
+
+OPERADORES_COMPLEMENTARES = [
+    '**=', '//=', '>>=', '<<=', '...', '%=', '&=', '*=', '+=', '-=', '->', '//', '/=', ':=',
+    '<<', '>>', '@=', '^=', '|=', '%', '&', '.', ';', '@', '^', '{', '|', '}', '~',
+]
+
+TOKENS_COMPLEMENTARES = [
+    ('STRING_LONGA', rf"{_PREFIXO_STRING}(?:'''(?:[^\\]|\\[\s\S])*?'''|\"\"\"(?:[^\\]|\\[\s\S])*?\"\"\")"),
+    ('STRING_ABERTA', rf"{_PREFIXO_STRING}(?:'''|\"\"\")"),
+    ('STRING_CURTA', rf"{_PREFIXO_STRING}(?:'(?:[^'\\\r\n]|\\[\s\S])*'|\"(?:[^\"\\\r\n]|\\[\s\S])*\")"),
+    ('NAME', r'[^\W\d]\w*'),
+    ('NUMBER', (
+        r'0[xX](?:_?[0-9a-fA-F])+|0[bB](?:_?[01])+|0[oO](?:_?[0-7])+'
+        rf'|(?:{_DIGITOS}\.(?:{_DIGITOS})?|\.{_DIGITOS})(?:{_EXPOENTE})?[jJ]?'
+        rf'|{_DIGITOS}(?:{_EXPOENTE})?[jJ]?'
+    )),
+    ('CONTINUACAO', r'\\\r?\n'),
+    ('RETORNO', r'\r\n?'),
+]
+
+_ABRE = frozenset('([{')
+_FECHA = frozenset(')]}')
+
+TokenEscaneado = namedtuple('TokenEscaneado', ['tipo', 'lexema', 'linha', 'coluna'])
+
+
+def _montar_automato():
+    padroes = dict(TOKENS)
+    operadores = [
+        lexema for lexema, nome in NOMES_POR_LEXEMA.items()
+        if not re.fullmatch(padroes['IDENT'], lexema)
+    ] + OPERADORES_COMPLEMENTARES
+    operadores.sort(key=len, reverse=True)
+    especificacao = TOKENS_COMPLEMENTARES[:5] + [
+        ('OP', '|'.join(re.escape(op) for op in operadores)),
+        ('COMMENT', padroes['COMMENT']),
+        ('NEWLINE', padroes['NEWLINE']),
+        ('SKIP', padroes['SKIP']),
+    ] + TOKENS_COMPLEMENTARES[5:] + [
+        ('ERRORTOKEN', r'.'),
+    ]
+    return re.compile('|'.join(f'(?P<{nome}>{padrao})' for nome, padrao in especificacao))
+
+
+# Autômato mestre: uma única alternância com grupos nomeados
+AUTOMATO = _montar_automato()
+_GRUPOS_STRING = {'STRING_LONGA': 'STRING', 'STRING_CURTA': 'STRING'}
+
+
+def _largura_indentacao(prefixo):
+    # Mesma regra do tokenize: tab avança até o próximo múltiplo de 8, form feed zera a coluna
+    coluna = 0
+    for c in prefixo:
+        if c == ' ':
+            coluna += 1
+        elif c == '\t':
+            coluna = (coluna // 8 + 1) * 8
+        elif c == '\f':
+            coluna = 0
+    return coluna
+
+
+def escanear(codigo_fonte):
+    """
+    Varre o código-fonte em uma única passada da esquerda para a direita e gera
+    TokenEscaneado(tipo, lexema, linha, coluna), incluindo NEWLINE, NL, INDENT, DEDENT e ENDMARKER.
+    Os tipos seguem os nomes do módulo tokenize.
+    """
+    linha = 1
+    inicio_linha = 0
+    profundidade = 0
+    pilha_indentacao = [0]
+    linha_logica_vazia = True
+    continuacao = False
+
+    for casamento in AUTOMATO.finditer(codigo_fonte):
+        tipo = casamento.lastgroup
+        if tipo == 'SKIP':
+            continue
+        inicio = casamento.start()
+        lexema = casamento.group()
+
+        if tipo == 'NEWLINE' or tipo == 'RETORNO':
+            if profundidade or linha_logica_vazia:
+                yield TokenEscaneado('NL', lexema, linha, inicio - inicio_linha)
+            else:
+                yield TokenEscaneado('NEWLINE', lexema, linha, inicio - inicio_linha)
+                linha_logica_vazia = True
+            linha += 1
+            inicio_linha = casamento.end()
+            continuacao = False
+            continue
+        if tipo == 'CONTINUACAO':
+            linha += 1
+            inicio_linha = casamento.end()
+            continuacao = True
+            continue
+        if tipo == 'STRING_ABERTA':
+            raise tokenize.TokenError('EOF in multi-line string', (linha, inicio - inicio_linha))
+
+        coluna = inicio - inicio_linha
+        if linha_logica_vazia and tipo != 'COMMENT':
+            if not profundidade and not continuacao:
+                largura = _largura_indentacao(codigo_fonte[inicio_linha:inicio])
+                if largura > pilha_indentacao[-1]:
+                    pilha_indentacao.append(largura)
+                    yield TokenEscaneado('INDENT', codigo_fonte[inicio_linha:inicio], linha, 0)
+                while largura < pilha_indentacao[-1]:
+                    pilha_indentacao.pop()
+                    if largura > pilha_indentacao[-1]:
+                        texto_linha = codigo_fonte[inicio_linha:codigo_fonte.find('\n', inicio) + 1 or None]
+                        raise IndentationError(
+                            "unindent does not match any outer indentation level",
+                            ("<tokenize>", linha, coluna, texto_linha)
+                        )
+                    yield TokenEscaneado('DEDENT', '', linha, coluna)
+            linha_logica_vazia = False
+
+        if tipo == 'OP':
+            if lexema in _ABRE:
+                profundidade += 1
+            elif lexema in _FECHA and profundidade:
+                profundidade -= 1
+        elif tipo in _GRUPOS_STRING:
+            yield TokenEscaneado('STRING', lexema, linha, coluna)
+            # Strings de várias linhas avançam o contador de linhas
+            quebras = lexema.count('\n')
+            if quebras:
+                linha += quebras
+                inicio_linha = inicio + lexema.rfind('\n') + 1
+            continue
+
+        yield TokenEscaneado(tipo, lexema, linha, coluna)
+
+    if profundidade:
+        raise tokenize.TokenError('EOF in multi-line statement', (linha, 0))
+    coluna = len(codigo_fonte) - inicio_linha
+    if not linha_logica_vazia:
+        yield TokenEscaneado('NEWLINE', '', linha, coluna)
+        linha, coluna = linha + 1, 0
+    for _ in pilha_indentacao[1:]:
+        yield TokenEscaneado('DEDENT', '', linha, coluna)
+    yield TokenEscaneado('ENDMARKER', '', linha, coluna)
+
+
+def analisar_lexico_dfa(codigo_fonte):
+    """Mesma saída de analisar_lexico, produzida pelo scanner próprio em vez do tokenize"""
+    tokens_resultantes = []
+    for tok in escanear(codigo_fonte):
+        if tok.tipo in TIPOS_IGNORADOS:
+            continue
+        token_nome = classificar_lexema(tok.lexema)
+        tokens_resultantes.append({
+            'Token': tok.lexema,
+            'Tipo': tok.tipo,
+            'Descrição': descrever_token(tok.tipo, tok.lexema),
+            'Linha': tok.linha,
+            'Nome': token_nome if token_nome else '-'
+        })
+    return tokens_resultantes
+
+
+# Exemplo de uso:
+if __name__ == "__main__":
+    with open("main.py", "r", encoding="utf-8") as f:
+        codigo = f.read()
+
+    for tok in escanear(codigo):
+        print(f"{tok.tipo:<12} {tok.linha:>4}:{tok.coluna:<4} {tok.lexema!r}")
@@ -1,119 +1,346 @@
 import ast
-from graphviz import Digraph
+import time
+from tabela_simbolos import construir_tabela_simbolos
+from exportador_dot import EscritorDot, executar_sem_recursao, renderizar_grafo
+from grafo_fluxo import LIGAR, DESLIGAR, GrafoFluxo, construir_grafos_fluxo
+from fluxo_dados import AnaliseFluxoDeDados
+from inferencia_tipos import DESCONHECIDO, InferenciaTipos, classe, operacao_valida
+import instrumentacao
+
+
+class ContextoAnalise:
+    """
+    Dados compartilhados pelas regras de uma execução; a tabela de símbolos, a análise de
+    fluxo de dados e a inferência de tipos são montadas uma vez, sob demanda
+    """
+
+    def __init__(self, tree, tabela_simbolos=None):
+        self.tree = tree
+        self._tabela_simbolos = tabela_simbolos
+        self._fluxo_de_dados = None
+        self._tipos = None
+
+    @property
+    def tabela_simbolos(self):
+        if self._tabela_simbolos is None:
+            self._tabela_simbolos = construir_tabela_simbolos(self.tree)
+        return self._tabela_simbolos
+
+    @property
+    def fluxo_de_dados(self):
+        if self._fluxo_de_dados is None:
+            tabela = self.tabela_simbolos
+            with instrumentacao.fase('semantica.fluxo_de_dados'):
+                self._fluxo_de_dados = AnaliseFluxoDeDados(self.tree, tabela)
+        return self._fluxo_de_dados
+
+    @property
+    def tipos(self):
+        if self._tipos is None:
+            tabela = self.tabela_simbolos
+            with instrumentacao.fase('semantica.inferencia_tipos'):
+                self._tipos = InferenciaTipos(self.tree, tabela)
+        return self._tipos
+
+
+class RegraSemantica:
+    """
+    Base das regras executadas pelo MotorSemantico.
+    Cada método visitar_<TipoDoNó> inscreve a regra naquele tipo de nó da AST.
+    """
+    nome = None
+    usa_tabela_simbolos = False
+
+    def iniciar(self, contexto):
+        self.contexto = contexto
+
+    def resultado(self):
+        raise NotImplementedError
+
+    def manipuladores(self):
+        tabela = {}
+        for atributo in dir(self):
+            if atributo.startswith('visitar_'):
+                tabela[getattr(ast, atributo[len('visitar_'):])] = getattr(self, atributo)
+        return tabela
+
+
+class RegraVariaveisNaoUtilizadas(RegraSemantica):
+    nome = 'variaveis_nao_utilizadas'
+    usa_tabela_simbolos = True
+
+    def resultado(self):
+        # Variáveis atribuídas (x = ...) cujo símbolo não recebe nenhuma leitura
+        nao_usadas = set()
+        for escopo in self.contexto.tabela_simbolos.escopos:
+            for simbolo in escopo.simbolos.values():
+                if simbolo.atribuicoes and not simbolo.usos:
+                    nao_usadas.add(simbolo.nome)
+        return nao_usadas
+
+
+class RegraFuncoesNaoChamadas(RegraSemantica):
+    nome = 'funcoes_nao_chamadas'
+
+    def iniciar(self, contexto):
+        super().iniciar(contexto)
+        self.definidas = set()
+        self.chamadas = set()
+
+    def visitar_FunctionDef(self, node):
+        self.definidas.add(node.name)
+
+    def visitar_Call(self, node):
+        if isinstance(node.func, ast.Name):
+            self.chamadas.add(node.func.id)
+
+    def resultado(self):
+        return self.definidas - self.chamadas
+
+
+class RegraTiposEOperacoes(RegraSemantica):
+    nome = 'tipos_e_operacoes'
+    usa_tabela_simbolos = True
+
+    def iniciar(self, contexto):
+        super().iniciar(contexto)
+        # Os tipos só ficam prontos depois da travessia; os nós são verificados em resultado()
+        self.nos = []
+
+    def visitar_BinOp(self, node):
+        if isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow)):
+            self.nos.append(node)
+
+    def visitar_Compare(self, node):
+        self.nos.append(node)
+
+    def resultado(self):
+        tipos = self.contexto.tipos
+        erros = []
+        for node in self.nos:
+            if isinstance(node, ast.BinOp):
+                # Verifica se operações são feitas entre tipos compatíveis
+                esquerda, direita = tipos.tipo_de(node.left), tipos.tipo_de(node.right)
+                if DESCONHECIDO not in (esquerda, direita) and not operacao_valida(node.op, esquerda, direita):
+                    erros.append(f"Operação aritmética entre tipos incompatíveis: {classe(esquerda)} e {classe(direita)} na linha {node.lineno}")
+                continue
+            # Verifica se comparações são feitas entre tipos compatíveis (in, not in, is e is not ficam de fora)
+            operandos = [node.left] + node.comparators
+            for op, left, comparator in zip(node.ops, operandos, operandos[1:]):
+                if isinstance(op, (ast.In, ast.NotIn, ast.Is, ast.IsNot)):
+                    continue
+                esquerda, direita = classe(tipos.tipo_de(left)), classe(tipos.tipo_de(comparator))
+                if DESCONHECIDO in (esquerda, direita) or esquerda == direita:
+                    continue
+                if esquerda in (bool, int, float) and direita in (bool, int, float):
+                    continue
+                erros.append(f"Comparação entre tipos diferentes: {esquerda} e {direita} na linha {node.lineno}")
+        return erros
+
+
+class RegraEscopo(RegraSemantica):
+    nome = 'escopo'
+    usa_tabela_simbolos = True
+
+    def resultado(self):
+        # Nomes lidos dentro de funções que não resolvem para nenhum escopo visível nem embutido
+        erros = []
+        for n, escopo in self.contexto.tabela_simbolos.nao_resolvidos():
+            funcao = escopo.funcao_envolvente()
+            if funcao is not None:
+                erros.append(f"Variável '{n.id}' usada fora do escopo na função '{funcao.nome}' (linha {n.lineno})")
+        return erros
+
+
+class RegraFluxoDeControle(RegraSemantica):
+    nome = 'fluxo_de_controle'
+
+    def iniciar(self, contexto):
+        super().iniciar(contexto)
+        self.avisos = []
+
+    def visitar_If(self, node):
+        # Verifica se há bloco if vazio
+        if not node.body:
+            self.avisos.append(f"Bloco if vazio na linha {node.lineno}")
+
+    def visitar_While(self, node):
+        if not node.body:
+            self.avisos.append(f"Bloco while vazio na linha {node.lineno}")
+
+    def visitar_For(self, node):
+        if not node.body:
+            self.avisos.append(f"Bloco for vazio na linha {node.lineno}")
+
+    def resultado(self):
+        return self.avisos
+
+
+class RegraAtribuicoesMortas(RegraSemantica):
+    nome = 'atribuicoes_mortas'
+    usa_tabela_simbolos = True
+
+    def resultado(self):
+        # Atribuições cujo valor é sobrescrito ou descartado em todos os caminhos antes de ser lido
+        return self.contexto.fluxo_de_dados.atribuicoes_mortas
+
+
+class RegraUsoAntesDaDefinicao(RegraSemantica):
+    nome = 'uso_antes_da_definicao'
+    usa_tabela_simbolos = True
+
+    def resultado(self):
+        # Leituras que algum caminho do grafo de fluxo alcança sem passar por uma definição
+        return self.contexto.fluxo_de_dados.usos_antes_da_definicao
+
+
+# Regras executadas por analisar_codigo, na ordem em que os resultados são exibidos
+REGRAS_PADRAO = [
+    RegraVariaveisNaoUtilizadas,
+    RegraFuncoesNaoChamadas,
+    RegraTiposEOperacoes,
+    RegraEscopo,
+    RegraFluxoDeControle,
+    RegraAtribuicoesMortas,
+    RegraUsoAntesDaDefinicao,
+]
+
+
+class MotorSemantico:
+    """
+    Executa várias regras em uma única travessia da AST (pré-ordem, mesma ordem do NodeVisitor).
+    O despacho usa uma tabela tipo de nó -> manipuladores montada na criação do motor.
+    Com medir_tempo=True, o tempo gasto em cada regra fica em self.tempos.
+    """
+
+    def __init__(self, regras, medir_tempo=False):
+        self.regras = list(regras)
+        self.medir_tempo = medir_tempo
+        self.tempos = {}
+        self._despacho = {}
+        for regra in self.regras:
+            for tipo_no, manipulador in regra.manipuladores().items():
+                self._despacho.setdefault(tipo_no, []).append((regra.nome, manipulador))
+
+    def executar(self, tree, contexto=None):
+        """Retorna um dict nome da regra -> resultado"""
+        instrumentacao_ativa = instrumentacao.ativa()
+        if instrumentacao_ativa is None:
+            return self._executar(tree, contexto, self.medir_tempo)
+        # Com a instrumentação ligada, o tempo de cada regra vai para os detalhes da fase
+        with instrumentacao_ativa.fase('semantica.motor', regras=len(self.regras)) as registro:
+            resultados = self._executar(tree, contexto, True)
+        registro.detalhes['tempo_por_regra'] = dict(self.tempos)
+        return resultados
+
+    def _executar(self, tree, contexto, medir_tempo):
+        if contexto is None:
+            contexto = ContextoAnalise(tree)
+        for regra in self.regras:
+            regra.iniciar(contexto)
+        self.tempos = dict.fromkeys((regra.nome for regra in self.regras), 0.0)
+
+        inicio = time.perf_counter()
+        if medir_tempo:
+            self._percorrer_medindo(tree)
+        else:
+            self._percorrer(tree)
+
+        # A tabela de símbolos é montada uma vez e compartilhada pelas regras que a consultam
+        if any(regra.usa_tabela_simbolos for regra in self.regras):
+            antes = time.perf_counter()
+            with instrumentacao.fase('semantica.tabela_simbolos'):
+                contexto.tabela_simbolos
+            self.tempos['(tabela de símbolos)'] = time.perf_counter() - antes
+
+        resultados = {}
+        for regra in self.regras:
+            antes = time.perf_counter()
+            resultados[regra.nome] = regra.resultado()
+            self.tempos[regra.nome] += time.perf_counter() - antes
+        if medir_tempo:
+            self.tempos['(travessia)'] = time.perf_counter() - inicio - sum(self.tempos.values())
+        return resultados
+
+    def _percorrer(self, tree):
+        despacho = self._despacho
+        pilha = [tree]
+        while pilha:
+            node = pilha.pop()
+            manipuladores = despacho.get(type(node))
+            if manipuladores:
+                for _, manipulador in manipuladores:
+                    manipulador(node)
+            filhos = list(ast.iter_child_nodes(node))
+            filhos.reverse()
+            pilha.extend(filhos)
+
+    def _percorrer_medindo(self, tree):
+        despacho = self._despacho
+        tempos = self.tempos
+        relogio = time.perf_counter
+        pilha = [tree]
+        while pilha:
+            node = pilha.pop()
+            manipuladores = despacho.get(type(node))
+            if manipuladores:
+                for nome, manipulador in manipuladores:
+                    antes = relogio()
+                    manipulador(node)
+                    tempos[nome] += relogio() - antes
+            filhos = list(ast.iter_child_nodes(node))
+            filhos.reverse()
+            pilha.extend(filhos)
+
+
+def _executar_regra(tree, regra):
+    with instrumentacao.fase(f'semantica.{regra.nome}'):
+        return MotorSemantico([regra]).executar(tree)[regra.nome]
+
 
 def analisar_variaveis_nao_utilizadas(tree):
-    atribuicoes = set()
-    usos = set()
-
-    class VarVisitor(ast.NodeVisitor):
-        def visit_Assign(self, node):
-            for target in node.targets:
-                if isinstance(target, ast.Name):
-                    atribuicoes.add(target.id)
-            self.generic_visit(node)
-        def visit_Name(self, node):
-            if isinstance(node.ctx, ast.Load):
-                usos.add(node.id)
-            self.generic_visit(node)
-
-    VarVisitor().visit(tree)
-    return atribuicoes - usos
+    return _executar_regra(tree, RegraVariaveisNaoUtilizadas())
 
 def analisar_funcoes_nao_chamadas(tree):
-    definidas = set()
-    chamadas = set()
-
-    class FuncVisitor(ast.NodeVisitor):
-        def visit_FunctionDef(self, node):
-            definidas.add(node.name)
-            self.generic_visit(node)
-        def visit_Call(self, node):
-            if isinstance(node.func, ast.Name):
-                chamadas.add(node.func.id)
-            self.generic_visit(node)
-
-    FuncVisitor().visit(tree)
-    return definidas - chamadas
+    return _executar_regra(tree, RegraFuncoesNaoChamadas())
 
 def analisar_tipos_e_operacoes(tree):
-    erros = []
-
-    class TypeVisitor(ast.NodeVisitor):
-        def visit_BinOp(self, node):
-            # Verifica se operações são feitas entre tipos compatíveis
-            if isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow)):
-                left = node.left
-                right = node.right
-                # Apenas verifica se são literais numéricos
-                if isinstance(left, ast.Constant) and isinstance(right, ast.Constant):
-                    if not (isinstance(left.value, (int, float)) and isinstance(right.value, (int, float))):
-                        erros.append(f"Operação aritmética entre tipos incompatíveis: {type(left.value)} e {type(right.value)} na linha {node.lineno}")
-            self.generic_visit(node)
-        def visit_Compare(self, node):
-            # Verifica se comparações são feitas entre tipos compatíveis
-            left = node.left
-            for comparator in node.comparators:
-                if isinstance(left, ast.Constant) and isinstance(comparator, ast.Constant):
-                    if type(left.value) != type(comparator.value):
-                        erros.append(f"Comparação entre tipos diferentes: {type(left.value)} e {type(comparator.value)} na linha {node.lineno}")
-            self.generic_visit(node)
-
-    TypeVisitor().visit(tree)
-    return erros
+    return _executar_regra(tree, RegraTiposEOperacoes())
 
 def analisar_escopo(tree):
-    erros = []
-
-    class EscopoVisitor(ast.NodeVisitor):
-        def __init__(self):
-            self.escopo = set()
-        def visit_FunctionDef(self, node):
-            # Adiciona argumentos ao escopo local
-            local_escopo = set(arg.arg for arg in node.args.args)
-            for n in ast.walk(node):
-                if isinstance(n, ast.Assign):
-                    for target in n.targets:
-                        if isinstance(target, ast.Name):
-                            local_escopo.add(target.id)
-                if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Load):
-                    if n.id not in local_escopo and n.id not in dir(__builtins__):
-                        erros.append(f"Variável '{n.id}' usada fora do escopo na função '{node.name}' (linha {n.lineno})")
-            self.generic_visit(node)
-
-    EscopoVisitor().visit(tree)
-    return erros
+    return _executar_regra(tree, RegraEscopo())
 
 def analisar_fluxo_de_controle(tree):
-    avisos = []
-
-    class FluxoVisitor(ast.NodeVisitor):
-        def visit_If(self, node):
-            # Verifica se há bloco if vazio
-            if not node.body:
-                avisos.append(f"Bloco if vazio na linha {node.lineno}")
-            self.generic_visit(node)
-        def visit_While(self, node):
-            if not node.body:
-                avisos.append(f"Bloco while vazio na linha {node.lineno}")
-            self.generic_visit(node)
-        def visit_For(self, node):
-            if not node.body:
-                avisos.append(f"Bloco for vazio na linha {node.lineno}")
-            self.generic_visit(node)
-
-    FluxoVisitor().visit(tree)
-    return avisos
-
-def analisar_codigo(filepath):
+    return _executar_regra(tree, RegraFluxoDeControle())
+
+def analisar_atribuicoes_mortas(tree):
+    return _executar_regra(tree, RegraAtribuicoesMortas())
+
+def analisar_uso_antes_da_definicao(tree):
+    return _executar_regra(tree, RegraUsoAntesDaDefinicao())
+
+def analisar_arvore(tree, medir_tempo=False, tabela_simbolos=None):
+    """
+    Executa todas as regras de REGRAS_PADRAO em uma única travessia.
+    Retorna (resultados, tempos), com os tempos por regra em segundos.
+    """
+    motor = MotorSemantico([regra() for regra in REGRAS_PADRAO], medir_tempo=medir_tempo)
+    resultados = motor.executar(tree, ContextoAnalise(tree, tabela_simbolos))
+    return resultados, motor.tempos
+
+def analisar_codigo(filepath, exibir_tempos=False):
     with open(filepath, "r", encoding="utf-8") as f:
         source = f.read()
     tree = ast.parse(source)
 
-    variaveis_nao_usadas = analisar_variaveis_nao_utilizadas(tree)
-    funcoes_nao_chamadas = analisar_funcoes_nao_chamadas(tree)
-    erros_tipos = analisar_tipos_e_operacoes(tree)
-    erros_escopo = analisar_escopo(tree)
-    avisos_fluxo = analisar_fluxo_de_controle(tree)
+    resultados, tempos = analisar_arvore(tree, medir_tempo=exibir_tempos)
+    variaveis_nao_usadas = resultados['variaveis_nao_utilizadas']
+    funcoes_nao_chamadas = resultados['funcoes_nao_chamadas']
+    erros_tipos = resultados['tipos_e_operacoes']
+    erros_escopo = resultados['escopo']
+    avisos_fluxo = resultados['fluxo_de_controle']
+    atribuicoes_mortas = resultados['atribuicoes_mortas']
+    usos_indefinidos = resultados['uso_antes_da_definicao']
 
     print("Análise semântica de", filepath)
     if variaveis_nao_usadas:
@@ -141,6 +368,21 @@ def analisar_codigo(filepath):
     else:
         print("Nenhum problema de fluxo de controle encontrado.")
 
+    if atribuicoes_mortas:
+        print("Atribuições cujo valor nunca é lido:", atribuicoes_mortas)
+    else:
+        print("Nenhuma atribuição morta encontrada.")
+
+    if usos_indefinidos:
+        print("Variáveis usadas antes de serem definidas:", usos_indefinidos)
+    else:
+        print("Nenhuma variável usada antes de ser definida.")
+
+    if exibir_tempos:
+        print("\nTempo por regra:")
+        for nome, tempo in sorted(tempos.items(), key=lambda item: item[1], reverse=True):
+            print(f"  {nome:<28} {tempo * 1000:>9.3f} ms")
+
 def exibir_arvore_semantica(tree, nivel=0):
     """
     Exibe uma árvore semântica simplificada do código Python analisado.
@@ -175,14 +417,12 @@ def exibir_arvore_semantica(tree, nivel=0):
         else:
             exibir_arvore_semantica(node, nivel)
 
-def gerar_grafo_arvore_semantica(tree):
-    dot = Digraph(comment='Árvore Semântica')
-    contador = {'id': 0}
+@instrumentacao.instrumentar('grafo.arvore_semantica', contar=lambda nos: {'nos': nos})
+def escrever_grafo_arvore_semantica(tree, arquivo):
+    """Escreve no arquivo, em formato DOT, o grafo da árvore semântica e retorna o número de nós"""
+    dot = EscritorDot(arquivo, comentario='Árvore Semântica')
 
     def adicionar_no(node, parent_id=None):
-        node_id = str(contador['id'])
-        contador['id'] += 1
-
         if isinstance(node, ast.FunctionDef):
             label = f"Função: {node.name}\n(linha {node.lineno})"
         elif isinstance(node, ast.Assign):
@@ -199,106 +439,119 @@ def gerar_grafo_arvore_semantica(tree):
         else:
             label = type(node).__name__
 
-        dot.node(node_id, label)
+        node_id = dot.no(label)
 
         if parent_id is not None:
-            dot.edge(parent_id, node_id)
+            dot.aresta(parent_id, node_id)
 
-        # Recursivamente adiciona filhos relevantes
+        # Filhos relevantes (cada yield é uma "chamada recursiva" executada sem recursão)
         if isinstance(node, ast.If):
             for n in node.body:
-                adicionar_no(n, node_id)
+                yield adicionar_no(n, node_id)
             if node.orelse:
-                else_id = str(contador['id'])
-                dot.node(else_id, "else")
-                dot.edge(node_id, else_id)
-                contador['id'] += 1
+                else_id = dot.no("else")
+                dot.aresta(node_id, else_id)
                 for n in node.orelse:
-                    adicionar_no(n, else_id)
+                    yield adicionar_no(n, else_id)
         elif hasattr(node, 'body') and isinstance(node.body, list): # type: ignore
             for n in node.body: # type: ignore
-                adicionar_no(n, node_id)
-        elif isinstance(node, ast.Module):
-            for n in node.body:
-                adicionar_no(n, node_id)
-        elif isinstance(node, ast.FunctionDef):
-            for n in node.body:
-                adicionar_no(n, node_id)
-
-    adicionar_no(tree)
-    dot.render('./images/arvore_semantica.png', cleanup=True, format='png')
-
-def gerar_grafo_fluxo_de_controle(tree):
+                yield adicionar_no(n, node_id)
+
+    executar_sem_recursao(adicionar_no(tree))
+    dot.fechar()
+    return dot.total_nos
+
+def gerar_grafo_arvore_semantica(tree, caminho_saida='./images/arvore_semantica.png.png', formato='png', agendador=None):
+    return renderizar_grafo(lambda f: escrever_grafo_arvore_semantica(tree, f), caminho_saida, formato, agendador)
+
+# Tamanho máximo do rótulo de um bloco básico no grafo de fluxo de controle
+_LINHAS_POR_BLOCO = 6
+_CARACTERES_POR_LINHA = 50
+_ESTILO_ARESTAS = {
+    'V': {'color': 'darkgreen'},
+    'F': {'color': 'red3'},
+    'exceção': {'style': 'dashed', 'color': 'gray40'},
+    'break': {'color': 'blue'},
+    'continue': {'color': 'blue'},
+    'return': {'color': 'purple'},
+}
+
+
+def _texto_elemento(tipo, no, papel):
+    """Uma linha de código para um elemento de bloco básico (ver grafo_fluxo)"""
+    if tipo == LIGAR:
+        texto = f"except ... as {no.name}"
+    elif tipo == DESLIGAR:
+        texto = f"del {no.name}"
+    elif isinstance(no, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        texto = f"def {no.name}(...)"
+    elif isinstance(no, ast.ClassDef):
+        texto = f"class {no.name}"
+    elif papel == 'for':
+        texto = f"{ast.unparse(no)} = próximo item"
+    elif papel is not None:
+        texto = f"{papel} {ast.unparse(no)}"
+    else:
+        texto = ast.unparse(no)
+    texto = texto.split('\n', 1)[0]
+    if len(texto) > _CARACTERES_POR_LINHA:
+        texto = texto[:_CARACTERES_POR_LINHA - 1] + '…'
+    return texto
+
+
+def _rotulo_bloco(grafo, bloco):
+    linhas = [_texto_elemento(*elemento) for elemento in grafo.elementos[bloco][:_LINHAS_POR_BLOCO]]
+    restantes = len(grafo.elementos[bloco]) - _LINHAS_POR_BLOCO
+    if restantes > 0:
+        linhas[-1] = f"… (+{restantes + 1} instruções)"
+    linha = grafo.elementos[bloco][0][1] if grafo.elementos[bloco] else None
+    if getattr(linha, 'lineno', None) is not None:
+        linhas.insert(0, f"[linha {linha.lineno}]")
+    return '\n'.join(linhas)
+
+
+@instrumentacao.instrumentar('grafo.fluxo_de_controle', contar=lambda nos: {'nos': nos})
+def escrever_grafo_fluxo_de_controle(tree, arquivo):
     """
-    Gera um grafo de fluxo de controle simplificado do código Python analisado.
+    Escreve no arquivo, em formato DOT, o grafo de fluxo de controle em blocos básicos de cada
+    função (e do corpo do módulo), um cluster por grafo, e retorna o número de nós.
+    Blocos inalcançáveis que executam algo aparecem tracejados; os vazios são omitidos.
     """
-    dot = Digraph(comment='Fluxo de Controle')
-    contador = {'id': 0}
-
-    def adicionar_bloco(node, parent_id=None):
-        node_id = str(contador['id'])
-        contador['id'] += 1
-
-        if isinstance(node, ast.If):
-            label = f"If (linha {node.lineno})"
-        elif isinstance(node, ast.For):
-            label = f"For (linha {node.lineno})"
-        elif isinstance(node, ast.While):
-            label = f"While (linha {node.lineno})"
-        elif isinstance(node, ast.FunctionDef):
-            label = f"Função: {node.name} (linha {node.lineno})"
-        elif isinstance(node, ast.Return):
-            label = f"Return (linha {node.lineno})"
-        elif isinstance(node, ast.Break):
-            label = f"Break (linha {node.lineno})"
-        elif isinstance(node, ast.Continue):
-            label = f"Continue (linha {node.lineno})"
-        else:
-            label = type(node).__name__
-
-        dot.node(node_id, label)
-        if parent_id is not None:
-            dot.edge(parent_id, node_id)
-
-        # Fluxo para blocos de controle
-        if isinstance(node, ast.If):
-            # Corpo do if
-            last_id = node_id
-            for n in node.body:
-                last_id = adicionar_bloco(n, last_id)
-            # Else
-            if node.orelse:
-                else_id = str(contador['id'])
-                dot.node(else_id, "else")
-                dot.edge(node_id, else_id)
-                contador['id'] += 1
-                last_else_id = else_id
-                for n in node.orelse:
-                    last_else_id = adicionar_bloco(n, last_else_id)
-            return node_id
-        elif isinstance(node, (ast.For, ast.While)):
-            last_id = node_id
-            for n in node.body:
-                last_id = adicionar_bloco(n, last_id)
-            # Orelse do for/while
-            if hasattr(node, 'orelse') and node.orelse:
-                orelse_id = str(contador['id'])
-                dot.node(orelse_id, "orelse")
-                dot.edge(node_id, orelse_id)
-                contador['id'] += 1
-                last_orelse_id = orelse_id
-                for n in node.orelse:
-                    last_orelse_id = adicionar_bloco(n, last_orelse_id)
-            return node_id
-        elif hasattr(node, 'body') and isinstance(node.body, list):
-            last_id = node_id
-            for n in node.body:
-                last_id = adicionar_bloco(n, last_id)
-            return last_id
-        return node_id
-
-    adicionar_bloco(tree)
-    dot.render('./images/fluxo_de_controle.png', cleanup=True, format='png')
+    dot = EscritorDot(arquivo, comentario='Fluxo de Controle',
+                      atributos_no={'shape': 'box', 'fontname': 'monospace'})
+    for numero, grafo in enumerate(construir_grafos_fluxo(tree)):
+        dot.abrir_subgrafo(numero, label=grafo.nome)
+        alcancaveis = grafo.alcancaveis()
+        ids = {}
+        for bloco in range(len(grafo)):
+            if bloco in (GrafoFluxo.ENTRADA, GrafoFluxo.SAIDA):
+                ids[bloco] = dot.no(grafo.rotulos[bloco], shape='oval')
+            elif grafo.elementos[bloco]:
+                atributos = {} if bloco in alcancaveis else {'style': 'dashed', 'color': 'gray50'}
+                ids[bloco] = dot.no(_rotulo_bloco(grafo, bloco), **atributos)
+            elif bloco in alcancaveis:
+                # Blocos vazios (junções) viram um ponto
+                ids[bloco] = dot.no('', shape='point')
+        for origem, sucessores in enumerate(grafo.sucessores):
+            if origem not in ids:
+                continue
+            for destino in sucessores:
+                if destino not in ids:
+                    continue
+                rotulo = grafo.rotulos_arestas.get((origem, destino))
+                if rotulo:
+                    dot.aresta(ids[origem], ids[destino], label=rotulo, **_ESTILO_ARESTAS.get(rotulo, {}))
+                else:
+                    dot.aresta(ids[origem], ids[destino])
+        dot.fechar_subgrafo()
+    dot.fechar()
+    return dot.total_nos
+
+def gerar_grafo_fluxo_de_controle(tree, caminho_saida='./images/fluxo_de_controle.png.png', formato='png', agendador=None):
+    """
+    Gera o grafo de fluxo de controle (blocos básicos) do código Python analisado.
+    """
+    return renderizar_grafo(lambda f: escrever_grafo_fluxo_de_controle(tree, f), caminho_saida, formato, agendador)
 
 # No bloco principal, adicione:
 if __name__ == "__main__":
@@ -308,7 +561,10 @@ if __name__ == "__main__":
         source = f.read()
     tree = ast.parse(source)
     exibir_arvore_semantica(tree)
-    print("\nGerando gráfico da árvore semântica...")
-    gerar_grafo_arvore_semantica(tree)
-    print("\nGerando gráfico do fluxo de controle...")
-    gerar_grafo_fluxo_de_controle(tree)
\ No newline at end of file
+    from agendador_renderizacao import AgendadorRenderizacao
+    # Os dois gráficos são renderizados ao mesmo tempo (e pulados se não mudaram desde a última execução)
+    with AgendadorRenderizacao() as agendador:
+        print("\nGerando gráfico da árvore semântica...")
+        gerar_grafo_arvore_semantica(tree, agendador=agendador)
+        print("\nGerando gráfico do fluxo de controle...")
+        gerar_grafo_fluxo_de_controle(tree, agendador=agendador)
\ No newline at end of file
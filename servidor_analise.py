@@ -0,0 +1,414 @@
+import argparse
+import ast
+import io
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+import tokenize
+from collections import OrderedDict
+
+from tabela_tokens import analisar_lexico_compacto
+from syntatic_analysis import analisar_sintaxe
+from semantic_analysis import (
+    ContextoAnalise, analisar_arvore, escrever_grafo_arvore_semantica, escrever_grafo_fluxo_de_controle,
+)
+from exportador_dot import exportar_ast_dot
+
+# Códigos de erro do JSON-RPC 2.0
+ERRO_LEITURA = -32700
+REQUISICAO_INVALIDA = -32600
+METODO_NAO_ENCONTRADO = -32601
+PARAMETROS_INVALIDOS = -32602
+ERRO_INTERNO = -32603
+DOCUMENTO_INDISPONIVEL = -32001
+
+# Estimativa de memória por nó da AST, incluindo sua parte da tabela de símbolos e dos resultados
+BYTES_POR_NO = 400
+
+
+class ErroRPC(Exception):
+    def __init__(self, codigo, mensagem):
+        super().__init__(mensagem)
+        self.codigo = codigo
+        self.mensagem = mensagem
+
+
+class Documento:
+    """
+    Texto de um arquivo e os resultados derivados dele (tokens, AST, tabela de símbolos, diagnósticos),
+    calculados na primeira requisição que precisar de cada um e descartados quando o texto muda.
+    """
+
+    def __init__(self, caminho, texto, aberto, mtime=None):
+        self.caminho = caminho
+        self.texto = texto
+        # Documentos abertos têm o texto mantido pelo cliente; os demais são relidos do disco se mudarem
+        self.aberto = aberto
+        self.mtime = mtime
+        self.versao = 0
+        self.descartar_derivados()
+
+    def descartar_derivados(self):
+        self._tokens = None
+        self._erro_lexico = None
+        self._sintaxe = None
+        self._contexto = None
+        self._semantica = None
+        self._nos = None
+
+    def alterar(self, texto):
+        self.texto = texto
+        self.versao += 1
+        self.descartar_derivados()
+
+    @property
+    def tokens(self):
+        if self._tokens is None and self._erro_lexico is None:
+            try:
+                self._tokens = analisar_lexico_compacto(self.texto)
+            except (tokenize.TokenError, SyntaxError) as e:
+                self._erro_lexico = f"{type(e).__name__}: {e}"
+        return self._tokens
+
+    @property
+    def erro_lexico(self):
+        self.tokens
+        return self._erro_lexico
+
+    @property
+    def sintaxe(self):
+        """(arvore, erro) de analisar_sintaxe"""
+        if self._sintaxe is None:
+            self._sintaxe = analisar_sintaxe(self.texto)
+        return self._sintaxe
+
+    @property
+    def arvore(self):
+        arvore, erro = self.sintaxe
+        if arvore is None:
+            raise ErroRPC(DOCUMENTO_INDISPONIVEL, f"{self.caminho} tem erro de sintaxe na linha {erro['linha']}: {erro['mensagem']}")
+        return arvore
+
+    @property
+    def contexto(self):
+        # A tabela de símbolos fica no contexto e é montada uma vez por versão do texto
+        if self._contexto is None:
+            self._contexto = ContextoAnalise(self.arvore)
+        return self._contexto
+
+    @property
+    def semantica(self):
+        if self._semantica is None:
+            resultados, _ = analisar_arvore(self.arvore, tabela_simbolos=self.contexto.tabela_simbolos)
+            self._semantica = {
+                nome: sorted(valor) if isinstance(valor, set) else valor
+                for nome, valor in resultados.items()
+            }
+        return self._semantica
+
+    def tamanho_estimado(self):
+        """Bytes aproximados ocupados pelo texto e pelos resultados já calculados"""
+        total = len(self.texto) * 2
+        if self._tokens is not None:
+            c = self._tokens._colunas
+            total += sum(coluna.buffer_info()[1] * coluna.itemsize
+                         for coluna in (c.lexemas, c.tipos, c.nomes, c.descricoes, c.linhas))
+            total += sum(len(texto) for texto in c.textos_lexema.textos) * 2
+        if self._sintaxe is not None and self._sintaxe[0] is not None:
+            if self._nos is None:
+                self._nos = sum(1 for _ in ast.walk(self._sintaxe[0]))
+            total += self._nos * BYTES_POR_NO
+        return total
+
+
+class Espaco:
+    """
+    Documentos mantidos pelo servidor, em ordem de uso (LRU). Quando a estimativa de memória passa
+    de limite_bytes, os menos usados são descartados: documentos lidos do disco saem inteiros, e os
+    abertos pelo cliente perdem só os resultados derivados (o texto é preservado).
+    """
+
+    def __init__(self, limite_bytes=512 * 1024 * 1024):
+        self.limite_bytes = limite_bytes
+        self.documentos = OrderedDict()
+        self.descartes = 0
+
+    def abrir(self, caminho, texto=None):
+        caminho = os.path.abspath(caminho)
+        if texto is None:
+            documento = self._ler_do_disco(caminho)
+            documento.aberto = True
+        else:
+            documento = self.documentos.get(caminho)
+            if documento is None:
+                documento = self.documentos[caminho] = Documento(caminho, texto, aberto=True)
+            else:
+                documento.aberto = True
+                if documento.texto != texto:
+                    documento.alterar(texto)
+        self._usar(caminho)
+        return documento
+
+    def alterar(self, caminho, texto):
+        caminho = os.path.abspath(caminho)
+        documento = self.documentos.get(caminho)
+        if documento is None:
+            return self.abrir(caminho, texto)
+        documento.aberto = True
+        documento.alterar(texto)
+        self._usar(caminho)
+        return documento
+
+    def fechar(self, caminho):
+        return self.documentos.pop(os.path.abspath(caminho), None) is not None
+
+    def obter(self, caminho):
+        """Documento do caminho; se não foi aberto pelo cliente, é lido (ou relido, se mudou) do disco"""
+        caminho = os.path.abspath(caminho)
+        documento = self.documentos.get(caminho)
+        if documento is None or not documento.aberto:
+            documento = self._ler_do_disco(caminho)
+        self._usar(caminho)
+        return documento
+
+    def _ler_do_disco(self, caminho):
+        try:
+            mtime = os.stat(caminho).st_mtime_ns
+            documento = self.documentos.get(caminho)
+            if documento is not None and documento.mtime == mtime:
+                return documento
+            with open(caminho, "r", encoding="utf-8") as f:
+                texto = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            raise ErroRPC(DOCUMENTO_INDISPONIVEL, f"não foi possível ler {caminho}: {e}")
+        documento = self.documentos[caminho] = Documento(caminho, texto, aberto=False, mtime=mtime)
+        return documento
+
+    def _usar(self, caminho):
+        self.documentos.move_to_end(caminho)
+
+    def aplicar_limite(self):
+        """Chamado depois de cada requisição, quando os resultados novos já estão calculados"""
+        tamanhos = {caminho: d.tamanho_estimado() for caminho, d in self.documentos.items()}
+        total = sum(tamanhos.values())
+        # O documento mais recente (o da requisição atual) nunca é descartado
+        for caminho in list(self.documentos)[:-1]:
+            if total <= self.limite_bytes:
+                break
+            documento = self.documentos[caminho]
+            if documento.aberto:
+                documento.descartar_derivados()
+                liberado = tamanhos[caminho] - documento.tamanho_estimado()
+                if not liberado:
+                    continue
+            else:
+                del self.documentos[caminho]
+                liberado = tamanhos[caminho]
+            total -= liberado
+            self.descartes += 1
+        return total
+
+    def estatisticas(self):
+        return {
+            'documentos': len(self.documentos),
+            'abertos': sum(d.aberto for d in self.documentos.values()),
+            'bytes_estimados': sum(d.tamanho_estimado() for d in self.documentos.values()),
+            'limite_bytes': self.limite_bytes,
+            'descartes': self.descartes,
+        }
+
+
+def _parametro(params, nome, tipo=str, obrigatorio=True, padrao=None):
+    valor = params.get(nome, padrao)
+    if valor is None:
+        if obrigatorio:
+            raise ErroRPC(PARAMETROS_INVALIDOS, f"parâmetro obrigatório ausente: {nome}")
+        return None
+    if not isinstance(valor, tipo):
+        raise ErroRPC(PARAMETROS_INVALIDOS, f"parâmetro {nome} com tipo inválido")
+    return valor
+
+
+class ServidorAnalise:
+    """Despacha requisições JSON-RPC para os métodos metodo_<nome>; o estado é protegido por uma trava"""
+
+    def __init__(self, limite_bytes=512 * 1024 * 1024):
+        self.espaco = Espaco(limite_bytes)
+        self.trava = threading.Lock()
+        self.encerrar = threading.Event()
+        self.requisicoes = 0
+        self.inicio = time.time()
+
+    def metodo_abrir(self, params):
+        documento = self.espaco.abrir(_parametro(params, 'caminho'), _parametro(params, 'texto', obrigatorio=False))
+        return {'caminho': documento.caminho, 'versao': documento.versao}
+
+    def metodo_alterar(self, params):
+        documento = self.espaco.alterar(_parametro(params, 'caminho'), _parametro(params, 'texto'))
+        return {'caminho': documento.caminho, 'versao': documento.versao}
+
+    def metodo_fechar(self, params):
+        return {'fechado': self.espaco.fechar(_parametro(params, 'caminho'))}
+
+    def metodo_lexico(self, params):
+        documento = self.espaco.obter(_parametro(params, 'caminho'))
+        tokens = documento.tokens
+        if tokens is None:
+            return {'erro': documento.erro_lexico, 'tokens': []}
+        primeira = _parametro(params, 'primeira_linha', int, obrigatorio=False)
+        ultima = _parametro(params, 'ultima_linha', int, obrigatorio=False)
+        if primeira is not None or ultima is not None:
+            tokens = tokens.fatiar_linhas(primeira or 1, ultima if ultima is not None else sys.maxsize)
+        return {'erro': None, 'total': len(documento.tokens), 'tokens': tokens.como_dicts()}
+
+    def metodo_sintaxe(self, params):
+        documento = self.espaco.obter(_parametro(params, 'caminho'))
+        arvore, erro = documento.sintaxe
+        resposta = {'erro': erro}
+        if arvore is not None:
+            resposta['funcoes'] = [
+                {'nome': n.name, 'linha': n.lineno}
+                for n in arvore.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))
+            ]
+            if params.get('ast'):
+                resposta['ast'] = ast.dump(arvore, indent=2)
+        return resposta
+
+    def metodo_diagnosticos(self, params):
+        documento = self.espaco.obter(_parametro(params, 'caminho'))
+        arvore, erro = documento.sintaxe
+        if arvore is None:
+            return {'erro_sintaxe': erro, 'semantica': None}
+        return {'erro_sintaxe': None, 'semantica': documento.semantica}
+
+    def metodo_grafo(self, params):
+        documento = self.espaco.obter(_parametro(params, 'caminho'))
+        tipo = _parametro(params, 'tipo', padrao='ast')
+        arvore = documento.arvore
+        saida = io.StringIO()
+        if tipo == 'ast':
+            exportar_ast_dot(
+                arvore, saida,
+                profundidade_maxima=_parametro(params, 'profundidade_maxima', int, obrigatorio=False),
+                limite_nos=_parametro(params, 'limite_nos', int, obrigatorio=False),
+            )
+        elif tipo == 'arvore_semantica':
+            escrever_grafo_arvore_semantica(arvore, saida)
+        elif tipo == 'fluxo_de_controle':
+            escrever_grafo_fluxo_de_controle(arvore, saida)
+        else:
+            raise ErroRPC(PARAMETROS_INVALIDOS, f"tipo de grafo desconhecido: {tipo}")
+        return {'dot': saida.getvalue()}
+
+    def metodo_estatisticas(self, params):
+        estatisticas = self.espaco.estatisticas()
+        estatisticas['requisicoes'] = self.requisicoes
+        estatisticas['segundos_ativo'] = time.time() - self.inicio
+        return estatisticas
+
+    def metodo_desligar(self, params):
+        self.encerrar.set()
+        return None
+
+    def processar(self, requisicao):
+        """Processa uma requisição já decodificada; retorna a resposta ou None para notificações"""
+        if not isinstance(requisicao, dict) or requisicao.get('jsonrpc') != '2.0' or 'method' not in requisicao:
+            return _erro(None, REQUISICAO_INVALIDA, "requisição JSON-RPC 2.0 inválida")
+        identificador = requisicao.get('id')
+        notificacao = 'id' not in requisicao
+        metodo = getattr(self, f"metodo_{requisicao['method']}", None)
+        params = requisicao.get('params') or {}
+        try:
+            if metodo is None:
+                raise ErroRPC(METODO_NAO_ENCONTRADO, f"método desconhecido: {requisicao['method']}")
+            if not isinstance(params, dict):
+                raise ErroRPC(PARAMETROS_INVALIDOS, "params deve ser um objeto")
+            with self.trava:
+                self.requisicoes += 1
+                resultado = metodo(params)
+                self.espaco.aplicar_limite()
+        except ErroRPC as e:
+            resposta = _erro(identificador, e.codigo, e.mensagem)
+        except Exception as e:
+            resposta = _erro(identificador, ERRO_INTERNO, f"{type(e).__name__}: {e}")
+        else:
+            resposta = {'jsonrpc': '2.0', 'id': identificador, 'result': resultado}
+        return None if notificacao else resposta
+
+    def processar_linha(self, linha):
+        """Uma linha do protocolo (uma requisição ou um lote) -> linha de resposta, ou None"""
+        try:
+            requisicao = json.loads(linha)
+        except ValueError:
+            return json.dumps(_erro(None, ERRO_LEITURA, "JSON inválido"), ensure_ascii=False)
+        if requisicao == []:
+            # Lote vazio: a especificação pede uma resposta só, e não um lote com o erro
+            return json.dumps(_erro(None, REQUISICAO_INVALIDA, "lote vazio"), ensure_ascii=False)
+        if isinstance(requisicao, list):
+            respostas = [r for r in map(self.processar, requisicao) if r is not None]
+            return json.dumps(respostas, ensure_ascii=False) if respostas else None
+        resposta = self.processar(requisicao)
+        return json.dumps(resposta, ensure_ascii=False) if resposta is not None else None
+
+    def atender(self, entrada, saida):
+        """Lê requisições delimitadas por nova linha de entrada e escreve as respostas em saida"""
+        for linha in entrada:
+            if not linha.strip():
+                continue
+            resposta = self.processar_linha(linha)
+            if resposta is not None:
+                saida.write(resposta + "\n")
+                saida.flush()
+            if self.encerrar.is_set():
+                break
+
+
+def _erro(identificador, codigo, mensagem):
+    return {'jsonrpc': '2.0', 'id': identificador, 'error': {'code': codigo, 'message': mensagem}}
+
+
+class _ConexaoUnix(socketserver.StreamRequestHandler):
+    def handle(self):
+        entrada = io.TextIOWrapper(self.rfile, encoding="utf-8")
+        saida = io.TextIOWrapper(self.wfile, encoding="utf-8", write_through=True)
+        self.server.servidor_analise.atender(entrada, saida)
+        if self.server.servidor_analise.encerrar.is_set():
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+
+class _ServidorUnix(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def servir_socket(servidor, caminho_socket):
+    """Atende várias conexões ao mesmo tempo em um socket Unix (uma thread por conexão)"""
+    if os.path.exists(caminho_socket):
+        os.remove(caminho_socket)
+    with _ServidorUnix(caminho_socket, _ConexaoUnix) as servidor_socket:
+        servidor_socket.servidor_analise = servidor
+        try:
+            servidor_socket.serve_forever()
+        finally:
+            os.remove(caminho_socket)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de análise JSON-RPC (stdio ou socket Unix)")
+    parser.add_argument('--socket', default=None, help="caminho do socket Unix (padrão: stdin/stdout)")
+    parser.add_argument('--memoria', type=float, default=512, help="limite estimado dos caches, em MB")
+    args = parser.parse_args(argv)
+
+    servidor = ServidorAnalise(int(args.memoria * 1024 * 1024))
+    if args.socket:
+        servir_socket(servidor, args.socket)
+    else:
+        entrada = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
+        saida = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", write_through=True)
+        servidor.atender(entrada, saida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,911 @@
+import math
+import re
+import struct
+from array import array
+from collections import Counter
+
+# Mapa de memória do MARS
+INICIO_TEXTO = 0x00400000
+INICIO_DADOS = 0x10010000
+TOPO_PILHA = 0x7FFFEFFC
+FIM_PILHA = 0x7FFFF000
+TAMANHO_PILHA = 1 << 20
+INICIO_PILHA = FIM_PILHA - TAMANHO_PILHA
+# Espaço livre depois dos dados declarados (para sw em rótulos de .space, por exemplo)
+FOLGA_DADOS = 1 << 16
+
+NOMES_REGISTRADORES = [
+    'zero', 'at', 'v0', 'v1', 'a0', 'a1', 'a2', 'a3',
+    't0', 't1', 't2', 't3', 't4', 't5', 't6', 't7',
+    's0', 's1', 's2', 's3', 's4', 's5', 's6', 's7',
+    't8', 't9', 'k0', 'k1', 'gp', 'sp', 'fp', 'ra',
+]
+_NUMERO_REGISTRADOR = {nome: i for i, nome in enumerate(NOMES_REGISTRADORES)}
+# Escritas em $zero vão para um registrador a mais, que ninguém lê
+_DESCARTE = 32
+V0, A0, A1, GP, SP, RA = 2, 4, 5, 28, 29, 31
+
+# Classe de cada instrução, para as contagens dinâmicas
+CLASSES = {}
+for _classe, _mnemonicos in {
+    'alu': 'add addu addi addiu sub subu and andi or ori xor xori nor slt sltu slti sltiu sll srl sra '
+           'sllv srlv srav lui li la move neg negu not abs nop',
+    'mul': 'mul mult multu mflo mfhi mtlo mthi',
+    'div': 'div divu rem remu',
+    'fpu': 'add.s sub.s mul.s neg.s abs.s mov.s c.eq.s c.lt.s c.le.s cvt.s.w cvt.w.s trunc.w.s '
+           'round.w.s floor.w.s ceil.w.s mtc1 mfc1 li.s',
+    'fpu_div': 'div.s sqrt.s',
+    'load': 'lw lh lhu lb lbu l.s lwc1',
+    'store': 'sw sh sb s.s swc1',
+    'desvio': 'beq bne blt ble bgt bge bltu bgeu bltz blez bgtz bgez beqz bnez bc1t bc1f',
+    'salto': 'j b jal jr jalr',
+    'syscall': 'syscall',
+}.items():
+    for _mnemonico in _mnemonicos.split():
+        CLASSES[_mnemonico] = _classe
+
+# Estimativa de ciclos por instrução real num pipeline simples em ordem: load paga o ciclo
+# de uso logo em seguida, mult/div esperam hi/lo, saltos e desvios tomados perdem a busca seguinte
+CICLOS = {
+    'alu': 1, 'mul': 4, 'div': 32, 'fpu': 2, 'fpu_div': 12, 'load': 2, 'store': 1,
+    'desvio': 1, 'salto': 2, 'syscall': 1,
+}
+PENALIDADE_DESVIO_TOMADO = 1
+
+_TERMINAM_BLOCO = {m for m, c in CLASSES.items() if c in ('desvio', 'salto', 'syscall')}
+_ROTULO = re.compile(r'\s*([A-Za-z_.$][\w.$]*)\s*:(.*)$')
+_ENDERECO = re.compile(r'^([^()]*)\(\s*(\$\w+)\s*\)$')
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '0': '\0', '\\': '\\', '"': '"', "'": "'"}
+
+
+class ErroSimulacao(Exception):
+    """Programa inválido ou erro durante a execução (acesso fora da memória, entrada esgotada...)"""
+
+
+def _inteiro32(valor):
+    return ((valor + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+
+
+def formatar_float(valor):
+    """Float de 32 bits escrito como o Float.toString do Java, que é o que o MARS imprime"""
+    if math.isnan(valor):
+        return 'NaN'
+    if math.isinf(valor):
+        return 'Infinity' if valor > 0 else '-Infinity'
+    if valor == 0:
+        return '-0.0' if math.copysign(1, valor) < 0 else '0.0'
+    # Menos dígitos que ainda voltam ao mesmo float de 32 bits
+    alvo = struct.pack('<f', valor)
+    for digitos in range(9):
+        texto = f"{valor:.{digitos}e}"
+        if struct.pack('<f', float(texto)) == alvo:
+            break
+    mantissa, expoente = texto.split('e')
+    expoente = int(expoente)
+    sinal = '-' if valor < 0 else ''
+    algarismos = mantissa.lstrip('-').replace('.', '').rstrip('0') or '0'
+    if 1e-3 <= abs(valor) < 1e7:
+        if expoente >= 0:
+            inteira = algarismos[:expoente + 1].ljust(expoente + 1, '0')
+            fracao = algarismos[expoente + 1:] or '0'
+        else:
+            inteira = '0'
+            fracao = '0' * (-expoente - 1) + algarismos
+        return f"{sinal}{inteira}.{fracao}"
+    return f"{sinal}{algarismos[0]}.{algarismos[1:] or '0'}E{expoente}"
+
+
+def _percorrer_aspas(linha):
+    """Gera (posição, caractere, dentro de aspas) respeitando escapes"""
+    aspas = None
+    escapado = False
+    for i, caractere in enumerate(linha):
+        if aspas:
+            yield i, caractere, True
+            if escapado:
+                escapado = False
+            elif caractere == '\\':
+                escapado = True
+            elif caractere == aspas:
+                aspas = None
+        else:
+            if caractere in '"\'':
+                aspas = caractere
+            yield i, caractere, aspas is not None
+
+
+def _sem_comentario(linha):
+    for i, caractere, em_aspas in _percorrer_aspas(linha):
+        if caractere == '#' and not em_aspas:
+            return linha[:i]
+    return linha
+
+
+def _separar_operandos(texto):
+    operandos = []
+    inicio = 0
+    for i, caractere, em_aspas in _percorrer_aspas(texto):
+        if caractere == ',' and not em_aspas:
+            operandos.append(texto[inicio:i].strip())
+            inicio = i + 1
+    if texto[inicio:].strip():
+        operandos.append(texto[inicio:].strip())
+    return operandos
+
+
+def _literal(texto):
+    """Conteúdo de um literal entre aspas, com os escapes do montador, em UTF-8"""
+    corpo = texto.strip()[1:-1]
+    partes = []
+    i = 0
+    while i < len(corpo):
+        if corpo[i] == '\\' and i + 1 < len(corpo):
+            partes.append(_ESCAPES.get(corpo[i + 1], corpo[i + 1]))
+            i += 2
+        else:
+            partes.append(corpo[i])
+            i += 1
+    return ''.join(partes).encode('utf-8')
+
+
+def _imediato(texto):
+    texto = texto.strip()
+    if len(texto) >= 3 and texto[0] == texto[-1] == "'":
+        return _literal(texto)[0]
+    return int(texto, 0)
+
+
+class Programa:
+    """
+    Assembly MIPS montado: o segmento de dados (com os rótulos) e as instruções do segmento de
+    texto como (mnemônico, operandos, linha), com os rótulos apontando para o índice da instrução.
+    Diretivas aceitas: .data, .text, .globl, .asciiz, .ascii, .word, .half, .byte, .float, .space, .align.
+    """
+
+    def __init__(self, texto):
+        self.dados = bytearray()
+        self.rotulos_dados = {}
+        self.instrucoes = []
+        self.rotulos_texto = {}
+        # Rótulos de dados esperando a próxima diretiva (que pode alinhar o endereço)
+        self._pendentes = []
+        self._montar(texto)
+
+    def _montar(self, texto):
+        segmento = 'texto'
+        for numero, linha in enumerate(texto.splitlines(), 1):
+            linha = _sem_comentario(linha).strip()
+            encontrado = _ROTULO.match(linha)
+            while encontrado:
+                if segmento == 'dados':
+                    self._pendentes.append(encontrado.group(1))
+                else:
+                    self.rotulos_texto[encontrado.group(1)] = len(self.instrucoes)
+                linha = encontrado.group(2).strip()
+                encontrado = _ROTULO.match(linha)
+            if not linha:
+                continue
+            nome, _, resto = linha.partition(' ')
+            if '\t' in nome:
+                nome, _, mais = nome.partition('\t')
+                resto = mais + ' ' + resto
+            if nome == '.data':
+                segmento = 'dados'
+            elif nome == '.text':
+                segmento = 'texto'
+            elif nome in ('.globl', '.extern', '.ent', '.end'):
+                continue
+            elif nome.startswith('.'):
+                if segmento != 'dados':
+                    raise ErroSimulacao(f"Diretiva {nome} fora de .data (linha {numero})")
+                self._diretiva(nome, resto.strip(), numero)
+            elif segmento == 'dados':
+                raise ErroSimulacao(f"Instrução no segmento de dados (linha {numero})")
+            else:
+                self.instrucoes.append((nome.lower(), _separar_operandos(resto), numero))
+        self._definir_pendentes()
+
+    def _definir_pendentes(self):
+        for rotulo in self._pendentes:
+            self.rotulos_dados[rotulo] = INICIO_DADOS + len(self.dados)
+        self._pendentes = []
+
+    def _diretiva(self, nome, argumentos, numero):
+        tamanho = {'.word': 4, '.float': 4, '.half': 2}.get(nome)
+        if tamanho:
+            self.dados += bytes(-len(self.dados) % tamanho)
+        elif nome == '.align':
+            self.dados += bytes(-len(self.dados) % (1 << int(argumentos, 0)))
+        self._definir_pendentes()
+
+        if nome in ('.asciiz', '.ascii'):
+            for literal in _separar_operandos(argumentos):
+                self.dados += _literal(literal)
+                if nome == '.asciiz':
+                    self.dados.append(0)
+        elif nome == '.float':
+            for valor in _separar_operandos(argumentos):
+                self.dados += struct.pack('<f', float(valor))
+        elif nome in ('.word', '.half', '.byte'):
+            bits = {'.word': 32, '.half': 16, '.byte': 8}[nome]
+            for valor in _separar_operandos(argumentos):
+                self.dados += (_imediato(valor) & ((1 << bits) - 1)).to_bytes(bits // 8, 'little')
+        elif nome == '.space':
+            self.dados += bytes(int(argumentos, 0))
+        elif nome != '.align':
+            raise ErroSimulacao(f"Diretiva desconhecida {nome} (linha {numero})")
+
+    def reais(self, indice):
+        """Quantas instruções de máquina o montador gera para a instrução (pseudo-instruções viram várias)"""
+        nome, operandos, _ = self.instrucoes[indice]
+        if nome == 'li':
+            try:
+                return 1 if -32768 <= _imediato(operandos[1]) <= 65535 else 2
+            except ValueError:
+                return 2
+        if nome in ('la', 'li.s'):
+            return 2 if nome == 'la' else 3
+        if nome in _DESVIOS_PSEUDO:
+            return 2 if operandos[1].startswith('$') else 3
+        if nome == 'abs':
+            return 3
+        if nome in ('div', 'divu', 'rem', 'remu') and len(operandos) == 3:
+            return 2
+        if nome in ('lw', 'sw', 'l.s', 's.s', 'lb', 'lbu', 'sb') and not _ENDERECO.match(operandos[-1]):
+            return 2
+        return 1
+
+
+_DESVIOS_PSEUDO = {'blt', 'ble', 'bgt', 'bge', 'bltu', 'bgeu'}
+# Variantes (com imediato, sem sinal) que fazem a mesma conta em 32 bits
+_OPERACAO_BASE = {
+    'addu': 'add', 'addi': 'add', 'addiu': 'add', 'subu': 'sub', 'andi': 'and', 'ori': 'or',
+    'xori': 'xor', 'slti': 'slt', 'sltiu': 'sltu',
+}
+
+
+class Simulador:
+    """
+    Interpretador MIPS para o subconjunto do projeto. As instruções são decodificadas uma vez,
+    antes da execução, em blocos básicos: cada bloco é uma tupla de funções que já sabem os
+    registradores e imediatos e uma função de saída que devolve o próximo bloco. As contagens
+    dinâmicas saem de quantas vezes cada bloco rodou.
+    Syscalls (como no MARS/SPIM): 1 escreve int, 2 float, 4 texto, 11 caractere; 5 lê int,
+    6 float, 8 texto, 12 caractere; 10 e 17 encerram. A 43 calcula $f0 = $f12 ** $f13, que é como
+    o assembly.asm do projeto a usa (no MARS ela sorteia um float).
+    A entrada vem do texto `entrada`, uma linha por leitura.
+    """
+
+    def __init__(self, programa, entrada='', limite_instrucoes=100_000_000):
+        if isinstance(programa, str):
+            programa = Programa(programa)
+        self.programa = programa
+        self.limite_instrucoes = limite_instrucoes
+        self.linhas_entrada = entrada.splitlines() if isinstance(entrada, str) else list(entrada)
+        self.saida = []
+        self.codigo_saida = 0
+
+        self.r = [0] * 33
+        self.r[SP] = TOPO_PILHA
+        self.r[GP] = 0x10008000
+        self.f = array('f', bytes(4 * 32))
+        # Os mesmos 32 registradores vistos como inteiros de 32 bits (mtc1, mfc1 e conversões)
+        self.f_bits = memoryview(self.f).cast('B').cast('i')
+        self.hi_lo = [0, 0]
+        self.condicao = [False]
+        self.dados = bytearray(programa.dados) + bytearray(FOLGA_DADOS)
+        self.pilha = bytearray(TAMANHO_PILHA)
+
+        self._decodificar()
+
+    # -- memória -----------------------------------------------------------------------
+
+    def _posicao(self, endereco, tamanho):
+        """(buffer, deslocamento) de um endereço da pilha ou do segmento de dados"""
+        if endereco % tamanho:
+            raise ErroSimulacao(f"Endereço desalinhado 0x{endereco & 0xFFFFFFFF:08x}")
+        if INICIO_PILHA <= endereco <= FIM_PILHA - tamanho:
+            return self.pilha, endereco - INICIO_PILHA
+        if INICIO_DADOS <= endereco <= INICIO_DADOS + len(self.dados) - tamanho:
+            return self.dados, endereco - INICIO_DADOS
+        raise ErroSimulacao(f"Acesso fora da memória em 0x{endereco & 0xFFFFFFFF:08x}")
+
+    def _texto_em(self, endereco):
+        buffer, inicio = self._posicao(endereco, 1)
+        fim = buffer.find(0, inicio)
+        return bytes(buffer[inicio:fim if fim >= 0 else len(buffer)]).decode('utf-8', 'replace')
+
+    def _ler_linha(self):
+        if not self.linhas_entrada:
+            raise ErroSimulacao("A entrada acabou")
+        return self.linhas_entrada.pop(0)
+
+    # -- decodificação -----------------------------------------------------------------
+
+    def _registrador(self, texto, escrita=False):
+        nome = texto.strip().lstrip('$')
+        if nome.isdigit():
+            numero = int(nome)
+        elif nome in _NUMERO_REGISTRADOR:
+            numero = _NUMERO_REGISTRADOR[nome]
+        else:
+            raise ErroSimulacao(f"Registrador inteiro inválido: {texto}")
+        return _DESCARTE if escrita and numero == 0 else numero
+
+    @staticmethod
+    def _registrador_float(texto):
+        nome = texto.strip()
+        if not nome.startswith('$f') or not nome[2:].isdigit() or int(nome[2:]) > 31:
+            raise ErroSimulacao(f"Registrador de ponto flutuante inválido: {texto}")
+        return int(nome[2:])
+
+    def _endereco(self, texto):
+        """Operando de memória: (registrador base, deslocamento); aceita rótulo, rótulo+n e n($r)"""
+        encontrado = _ENDERECO.match(texto.strip())
+        base, deslocamento = 0, texto.strip()
+        if encontrado:
+            base = self._registrador(encontrado.group(2))
+            deslocamento = encontrado.group(1).strip()
+        if not deslocamento:
+            return base, 0
+        rotulo, sinal, numero = re.match(r'^([A-Za-z_.$][\w.$]*)?\s*([+-]?)\s*(\w*)$', deslocamento).groups()
+        valor = self._valor_rotulo(rotulo) if rotulo else 0
+        if numero:
+            valor += -_imediato(numero) if sinal == '-' else _imediato(numero)
+        return base, valor
+
+    def _valor_rotulo(self, rotulo):
+        programa = self.programa
+        if rotulo in programa.rotulos_dados:
+            return programa.rotulos_dados[rotulo]
+        if rotulo in programa.rotulos_texto:
+            return INICIO_TEXTO + 4 * programa.rotulos_texto[rotulo]
+        raise ErroSimulacao(f"Rótulo indefinido: {rotulo}")
+
+    def _decodificar(self):
+        programa = self.programa
+        total = len(programa.instrucoes)
+        inicios = {0} | set(programa.rotulos_texto.values())
+        for i, (nome, _, _) in enumerate(programa.instrucoes):
+            if nome in _TERMINAM_BLOCO:
+                inicios.add(i + 1)
+        inicios = sorted(i for i in inicios if i < total)
+        self._bloco_em = {inicio: b for b, inicio in enumerate(inicios)}
+        self._limites = list(zip(inicios, inicios[1:] + [total]))
+        self._tomados = Counter()
+
+        self._blocos = []
+        for b, (inicio, fim) in enumerate(self._limites):
+            corpo = []
+            saida = None
+            for i in range(inicio, fim):
+                nome, operandos, linha = programa.instrucoes[i]
+                try:
+                    if nome in _TERMINAM_BLOCO:
+                        saida = self._decodificar_saida(nome, operandos, i)
+                    else:
+                        corpo.append(self._decodificar_instrucao(nome, operandos))
+                except ErroSimulacao as erro:
+                    raise ErroSimulacao(f"{erro} (linha {linha})") from None
+                except (IndexError, ValueError, AttributeError):
+                    raise ErroSimulacao(f"Operandos inválidos para {nome} (linha {linha})") from None
+            if saida is None:
+                seguinte = self._bloco_em.get(fim, -1)
+                saida = lambda seguinte=seguinte: seguinte
+            self._blocos.append((tuple(corpo), saida, fim - inicio))
+        self._contagem = [0] * len(self._blocos)
+        inicio = programa.rotulos_texto.get('main', 0)
+        self._bloco_inicial = self._bloco_em.get(inicio, -1) if total else -1
+
+    def _alvo(self, rotulo):
+        if rotulo not in self.programa.rotulos_texto:
+            raise ErroSimulacao(f"Rótulo indefinido: {rotulo}")
+        return self._bloco_em.get(self.programa.rotulos_texto[rotulo], -1)
+
+    def _bloco_do_endereco(self, endereco):
+        indice, resto = divmod(endereco - INICIO_TEXTO, 4)
+        if resto or indice not in self._bloco_em:
+            if indice == len(self.programa.instrucoes):
+                return -1
+            raise ErroSimulacao(f"Salto para endereço inválido 0x{endereco & 0xFFFFFFFF:08x}")
+        return self._bloco_em[indice]
+
+    def _decodificar_instrucao(self, nome, operandos):
+        r, f, bits, hi_lo = self.r, self.f, self.f_bits, self.hi_lo
+        registrador, registrador_float = self._registrador, self._registrador_float
+
+        if nome in ('add', 'addu', 'sub', 'subu', 'addi', 'addiu', 'and', 'andi', 'or', 'ori',
+                    'xor', 'xori', 'nor', 'slt', 'sltu', 'slti', 'sltiu', 'mul'):
+            d, s = registrador(operandos[0], True), registrador(operandos[1])
+            operacao = _OPERACAO_BASE.get(nome, nome)
+            if operandos[2].strip().startswith('$'):
+                return _OPERACOES_REGISTRADOR[operacao](r, d, s, registrador(operandos[2]))
+            imediato = _imediato(operandos[2])
+            if nome in ('andi', 'ori', 'xori'):
+                imediato &= 0xFFFF
+            return _OPERACOES_IMEDIATO[operacao](r, d, s, imediato)
+        if nome in ('sll', 'srl', 'sra', 'sllv', 'srlv', 'srav'):
+            d, t = registrador(operandos[0], True), registrador(operandos[1])
+            if nome.endswith('v'):
+                s = registrador(operandos[2])
+                return _DESLOCAMENTOS[nome[:3]](r, d, t, lambda: r[s] & 31)
+            quantidade = _imediato(operandos[2]) & 31
+            return _DESLOCAMENTOS[nome](r, d, t, lambda: quantidade)
+        if nome in ('li', 'lui'):
+            d = registrador(operandos[0], True)
+            valor = _inteiro32(_imediato(operandos[1]) << (16 if nome == 'lui' else 0))
+            def op():
+                r[d] = valor
+            return op
+        if nome == 'la':
+            d = registrador(operandos[0], True)
+            base, deslocamento = self._endereco(operandos[1])
+            def op():
+                r[d] = _inteiro32(r[base] + deslocamento)
+            return op
+        if nome in ('move', 'neg', 'negu', 'not', 'abs'):
+            d, s = registrador(operandos[0], True), registrador(operandos[1])
+            return _UNARIAS[nome](r, d, s)
+        if nome in ('mult', 'multu'):
+            s, t = registrador(operandos[0]), registrador(operandos[1])
+            sem_sinal = nome == 'multu'
+            def op():
+                a, b = r[s], r[t]
+                if sem_sinal:
+                    a, b = a & 0xFFFFFFFF, b & 0xFFFFFFFF
+                produto = a * b
+                hi_lo[0] = _inteiro32(produto >> 32)
+                hi_lo[1] = _inteiro32(produto)
+            return op
+        if nome in ('div', 'divu', 'rem', 'remu'):
+            if len(operandos) == 3:
+                d, s, t = registrador(operandos[0], True), registrador(operandos[1]), registrador(operandos[2])
+            else:
+                d, s, t = None, registrador(operandos[0]), registrador(operandos[1])
+            sem_sinal = nome.endswith('u')
+            resto = nome.startswith('rem')
+            def op():
+                a, b = r[s], r[t]
+                if sem_sinal:
+                    a, b = a & 0xFFFFFFFF, b & 0xFFFFFFFF
+                if b == 0:
+                    # Resultado indefinido no MIPS; o MARS mantém hi e lo
+                    return
+                quociente = abs(a) // abs(b) * (1 if (a < 0) == (b < 0) else -1)
+                hi_lo[0] = _inteiro32(a - b * quociente)
+                hi_lo[1] = _inteiro32(quociente)
+                if d is not None:
+                    r[d] = hi_lo[0] if resto else hi_lo[1]
+            return op
+        if nome in ('mfhi', 'mflo', 'mthi', 'mtlo'):
+            indice = 0 if nome.endswith('hi') else 1
+            if nome.startswith('mf'):
+                d = registrador(operandos[0], True)
+                def op():
+                    r[d] = hi_lo[indice]
+            else:
+                s = registrador(operandos[0])
+                def op():
+                    hi_lo[indice] = r[s]
+            return op
+        if nome in ('lw', 'lh', 'lhu', 'lb', 'lbu', 'sw', 'sh', 'sb'):
+            registro = registrador(operandos[0], nome.startswith('l'))
+            base, deslocamento = self._endereco(operandos[1])
+            formato, tamanho = _FORMATOS[nome[1:]]
+            posicao = self._posicao
+            if nome.startswith('l'):
+                def op():
+                    buffer, i = posicao(r[base] + deslocamento, tamanho)
+                    r[registro] = struct.unpack_from(formato, buffer, i)[0]
+            else:
+                mascara = (1 << 8 * tamanho) - 1
+                def op():
+                    buffer, i = posicao(r[base] + deslocamento, tamanho)
+                    struct.pack_into(formato.upper() if tamanho < 4 else formato, buffer, i,
+                                     r[registro] & mascara if tamanho < 4 else r[registro])
+            return op
+        if nome in ('l.s', 'lwc1', 's.s', 'swc1'):
+            registro = registrador_float(operandos[0])
+            base, deslocamento = self._endereco(operandos[1])
+            posicao = self._posicao
+            if nome in ('l.s', 'lwc1'):
+                def op():
+                    buffer, i = posicao(r[base] + deslocamento, 4)
+                    bits[registro] = struct.unpack_from('<i', buffer, i)[0]
+            else:
+                def op():
+                    buffer, i = posicao(r[base] + deslocamento, 4)
+                    struct.pack_into('<i', buffer, i, bits[registro])
+            return op
+
+        # Ponto flutuante (precisão simples: array('f') arredonda cada resultado para 32 bits)
+        if nome in ('add.s', 'sub.s', 'mul.s', 'div.s'):
+            d, s, t = (registrador_float(o) for o in operandos)
+            return _OPERACOES_FLOAT[nome](f, d, s, t)
+        if nome in ('mov.s', 'neg.s', 'abs.s', 'sqrt.s'):
+            d, s = registrador_float(operandos[0]), registrador_float(operandos[1])
+            return _UNARIAS_FLOAT[nome](f, d, s)
+        if nome in ('c.eq.s', 'c.lt.s', 'c.le.s'):
+            if len(operandos) == 3:
+                operandos = operandos[1:]
+            s, t = registrador_float(operandos[0]), registrador_float(operandos[1])
+            condicao = self.condicao
+            comparar = _COMPARACOES_FLOAT[nome]
+            def op():
+                condicao[0] = comparar(f[s], f[t])
+            return op
+        if nome == 'mtc1':
+            s, d = registrador(operandos[0]), registrador_float(operandos[1])
+            def op():
+                bits[d] = r[s]
+            return op
+        if nome == 'mfc1':
+            d, s = registrador(operandos[0], True), registrador_float(operandos[1])
+            def op():
+                r[d] = bits[s]
+            return op
+        if nome == 'cvt.s.w':
+            d, s = registrador_float(operandos[0]), registrador_float(operandos[1])
+            def op():
+                f[d] = float(bits[s])
+            return op
+        if nome in ('cvt.w.s', 'trunc.w.s', 'round.w.s', 'floor.w.s', 'ceil.w.s'):
+            d, s = registrador_float(operandos[0]), registrador_float(operandos[1])
+            arredondar = _ARREDONDAMENTOS[nome]
+            def op():
+                valor = f[s]
+                if math.isnan(valor) or math.isinf(valor) or abs(valor) >= 2 ** 31:
+                    # Como no MARS: valor fora do intervalo vira o maior inteiro
+                    bits[d] = 2 ** 31 - 1
+                else:
+                    bits[d] = arredondar(valor)
+            return op
+        if nome == 'li.s':
+            d = registrador_float(operandos[0])
+            valor = float(operandos[1])
+            def op():
+                f[d] = valor
+            return op
+        if nome == 'nop':
+            return lambda: None
+        raise ErroSimulacao(f"Instrução não suportada: {nome}")
+
+    def _decodificar_saida(self, nome, operandos, indice):
+        """Função que executa o fim do bloco e devolve o índice do próximo (-1 encerra)"""
+        r = self.r
+        seguinte = self._bloco_em.get(indice + 1, -1)
+        tomados = self._tomados
+        if nome in ('j', 'b'):
+            alvo = self._alvo(operandos[0])
+            return lambda: alvo
+        if nome == 'jal':
+            alvo = self._alvo(operandos[0])
+            retorno = INICIO_TEXTO + 4 * (indice + 1)
+            def saida():
+                r[RA] = retorno
+                return alvo
+            return saida
+        if nome in ('jr', 'jalr'):
+            s = self._registrador(operandos[0])
+            retorno = INICIO_TEXTO + 4 * (indice + 1)
+            bloco_do_endereco = self._bloco_do_endereco
+            def saida():
+                destino = r[s]
+                if nome == 'jalr':
+                    r[RA] = retorno
+                return bloco_do_endereco(destino)
+            return saida
+        if nome in ('bc1t', 'bc1f'):
+            alvo = self._alvo(operandos[-1])
+            condicao = self.condicao
+            esperado = nome == 'bc1t'
+            def saida():
+                if condicao[0] == esperado:
+                    tomados[indice] += 1
+                    return alvo
+                return seguinte
+            return saida
+        if nome == 'syscall':
+            return self._decodificar_syscall(seguinte)
+
+        # Desvios condicionais inteiros: comparam um registrador com outro, com um imediato ou com zero
+        alvo = self._alvo(operandos[-1])
+        s = self._registrador(operandos[0])
+        if nome in ('bltz', 'blez', 'bgtz', 'bgez', 'beqz', 'bnez'):
+            comparar = _DESVIOS[{'bltz': 'blt', 'blez': 'ble', 'bgtz': 'bgt', 'bgez': 'bge',
+                                 'beqz': 'beq', 'bnez': 'bne'}[nome]]
+            constante = 0
+            def saida():
+                if comparar(r[s], constante):
+                    tomados[indice] += 1
+                    return alvo
+                return seguinte
+            return saida
+        comparar = _DESVIOS[nome]
+        if operandos[1].strip().startswith('$'):
+            t = self._registrador(operandos[1])
+            def saida():
+                if comparar(r[s], r[t]):
+                    tomados[indice] += 1
+                    return alvo
+                return seguinte
+        else:
+            constante = _imediato(operandos[1])
+            def saida():
+                if comparar(r[s], constante):
+                    tomados[indice] += 1
+                    return alvo
+                return seguinte
+        return saida
+
+    def _decodificar_syscall(self, seguinte):
+        r, f, saida_texto = self.r, self.f, self.saida
+
+        def saida():
+            codigo = r[V0]
+            if codigo == 1:
+                saida_texto.append(str(r[A0]))
+            elif codigo == 2:
+                saida_texto.append(formatar_float(f[12]))
+            elif codigo == 4:
+                saida_texto.append(self._texto_em(r[A0]))
+            elif codigo == 11:
+                saida_texto.append(chr(r[A0] & 0xFF))
+            elif codigo == 5:
+                linha = self._ler_linha()
+                try:
+                    r[V0] = _inteiro32(int(linha.strip()))
+                except ValueError:
+                    raise ErroSimulacao(f"Entrada inválida para um inteiro: {linha!r}") from None
+            elif codigo == 6:
+                linha = self._ler_linha()
+                try:
+                    f[0] = float(linha.strip())
+                except ValueError:
+                    raise ErroSimulacao(f"Entrada inválida para um float: {linha!r}") from None
+            elif codigo == 8:
+                dados = (self._ler_linha() + '\n').encode('utf-8')[:max(r[A1] - 1, 0)] + b'\0'
+                buffer, i = self._posicao(r[A0], 1)
+                buffer[i:i + len(dados)] = dados
+            elif codigo == 12:
+                linha = self._ler_linha()
+                r[V0] = ord(linha[0]) if linha else 10
+            elif codigo in (10, 17):
+                self.codigo_saida = r[A0] if codigo == 17 else 0
+                return -1
+            elif codigo == 43:
+                try:
+                    f[0] = math.pow(f[12], f[13])
+                except (OverflowError, ValueError):
+                    f[0] = math.nan
+            else:
+                raise ErroSimulacao(f"Syscall não suportada: {codigo}")
+            return seguinte
+        return saida
+
+    # -- execução ----------------------------------------------------------------------
+
+    def executar(self):
+        """Roda a partir de main (ou da primeira instrução) até uma syscall de saída ou o fim do texto"""
+        blocos, contagem = self._blocos, self._contagem
+        limite = self.limite_instrucoes
+        executadas = 0
+        b = self._bloco_inicial
+        while b >= 0:
+            contagem[b] += 1
+            corpo, saida, tamanho = blocos[b]
+            for op in corpo:
+                op()
+            b = saida()
+            executadas += tamanho
+            if executadas > limite:
+                raise ErroSimulacao(f"Limite de {limite} instruções atingido")
+        return ''.join(self.saida)
+
+    def estatisticas(self):
+        """
+        Contagens dinâmicas: instruções (como escritas e depois da expansão das pseudo-instruções),
+        por classe e por mnemônico, loads, stores, desvios tomados e a estimativa de ciclos
+        """
+        programa = self.programa
+        por_mnemonico = Counter()
+        por_classe = Counter()
+        reais = ciclos = 0
+        for (inicio, fim), vezes in zip(self._limites, self._contagem):
+            if not vezes:
+                continue
+            for i in range(inicio, fim):
+                nome = programa.instrucoes[i][0]
+                classe = CLASSES.get(nome, 'alu')
+                quantas = programa.reais(i)
+                por_mnemonico[nome] += vezes
+                por_classe[classe] += vezes
+                reais += quantas * vezes
+                # Nas pseudo-instruções, as instruções extras são de ALU (lui, ori, slt)
+                ciclos += (CICLOS[classe] + quantas - 1) * vezes
+        tomados = sum(self._tomados.values())
+        ciclos += tomados * PENALIDADE_DESVIO_TOMADO
+        return {
+            'instrucoes': sum(por_mnemonico.values()),
+            'reais': reais,
+            'loads': por_classe['load'],
+            'stores': por_classe['store'],
+            'desvios_tomados': tomados,
+            'ciclos': ciclos,
+            'por_classe': por_classe,
+            'por_mnemonico': por_mnemonico,
+        }
+
+
+def simular(assembly, entrada='', limite_instrucoes=100_000_000):
+    """Monta e executa o assembly; retorna (texto escrito pelo programa, estatísticas)"""
+    simulador = Simulador(assembly, entrada, limite_instrucoes)
+    saida = simulador.executar()
+    return saida, simulador.estatisticas()
+
+
+# Fábricas das funções de cada instrução: recebem os registradores e índices já decodificados
+
+def _soma(r, d, s, t):
+    def op():
+        r[d] = ((r[s] + r[t] + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+    return op
+
+
+def _subtracao(r, d, s, t):
+    def op():
+        r[d] = ((r[s] - r[t] + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+    return op
+
+
+def _multiplicacao(r, d, s, t):
+    def op():
+        r[d] = ((r[s] * r[t] + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+    return op
+
+
+def _binaria(calcular):
+    def fabrica(r, d, s, t):
+        def op():
+            r[d] = calcular(r[s], r[t])
+        return op
+    return fabrica
+
+
+_OPERACOES_REGISTRADOR = {
+    'add': _soma, 'sub': _subtracao, 'mul': _multiplicacao,
+    'and': _binaria(lambda a, b: a & b), 'or': _binaria(lambda a, b: a | b),
+    'xor': _binaria(lambda a, b: a ^ b), 'nor': _binaria(lambda a, b: ~(a | b)),
+    'slt': _binaria(lambda a, b: int(a < b)),
+    'sltu': _binaria(lambda a, b: int((a & 0xFFFFFFFF) < (b & 0xFFFFFFFF))),
+}
+
+
+def _soma_imediato(r, d, s, imediato):
+    def op():
+        r[d] = ((r[s] + imediato + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+    return op
+
+
+def _com_imediato(calcular):
+    def fabrica(r, d, s, imediato):
+        def op():
+            r[d] = calcular(r[s], imediato)
+        return op
+    return fabrica
+
+
+_OPERACOES_IMEDIATO = {
+    'add': _soma_imediato,
+    'sub': lambda r, d, s, imediato: _soma_imediato(r, d, s, -imediato),
+    'mul': _com_imediato(lambda a, b: _inteiro32(a * b)),
+    'and': _com_imediato(lambda a, b: a & b), 'or': _com_imediato(lambda a, b: _inteiro32(a | b)),
+    'xor': _com_imediato(lambda a, b: _inteiro32(a ^ b)), 'nor': _com_imediato(lambda a, b: ~(a | b)),
+    'slt': _com_imediato(lambda a, b: int(a < b)),
+    'sltu': _com_imediato(lambda a, b: int((a & 0xFFFFFFFF) < (b & 0xFFFFFFFF))),
+}
+
+
+def _deslocamento(calcular):
+    def fabrica(r, d, t, quantidade):
+        def op():
+            r[d] = calcular(r[t], quantidade())
+        return op
+    return fabrica
+
+
+_DESLOCAMENTOS = {
+    'sll': _deslocamento(lambda a, n: _inteiro32(a << n)),
+    'srl': _deslocamento(lambda a, n: _inteiro32((a & 0xFFFFFFFF) >> n)),
+    'sra': _deslocamento(lambda a, n: a >> n),
+}
+
+
+def _unaria(calcular):
+    def fabrica(r, d, s):
+        def op():
+            r[d] = calcular(r[s])
+        return op
+    return fabrica
+
+
+def _mover(r, d, s):
+    def op():
+        r[d] = r[s]
+    return op
+
+
+_UNARIAS = {
+    'move': _mover, 'neg': _unaria(lambda a: _inteiro32(-a)), 'negu': _unaria(lambda a: _inteiro32(-a)),
+    'not': _unaria(lambda a: ~a), 'abs': _unaria(lambda a: _inteiro32(abs(a))),
+}
+
+
+def _dividir_float(a, b):
+    if b:
+        return a / b
+    if a == 0 or math.isnan(a):
+        return math.nan
+    return math.copysign(math.inf, a) * math.copysign(1, b)
+
+
+def _operacao_float(calcular):
+    def fabrica(f, d, s, t):
+        def op():
+            f[d] = calcular(f[s], f[t])
+        return op
+    return fabrica
+
+
+# Resultados grandes demais para 32 bits viram infinito ao serem guardados no array('f')
+_OPERACOES_FLOAT = {
+    'add.s': _operacao_float(lambda a, b: a + b), 'sub.s': _operacao_float(lambda a, b: a - b),
+    'mul.s': _operacao_float(lambda a, b: a * b), 'div.s': _operacao_float(_dividir_float),
+}
+
+
+def _unaria_float(calcular):
+    def fabrica(f, d, s):
+        def op():
+            f[d] = calcular(f[s])
+        return op
+    return fabrica
+
+
+_UNARIAS_FLOAT = {
+    'mov.s': _unaria_float(lambda a: a), 'neg.s': _unaria_float(lambda a: -a),
+    'abs.s': _unaria_float(abs),
+    'sqrt.s': _unaria_float(lambda a: math.sqrt(a) if a >= 0 else math.nan),
+}
+_COMPARACOES_FLOAT = {
+    'c.eq.s': lambda a, b: a == b, 'c.lt.s': lambda a, b: a < b, 'c.le.s': lambda a, b: a <= b,
+}
+_ARREDONDAMENTOS = {
+    'cvt.w.s': lambda a: int(round(a)), 'round.w.s': lambda a: int(round(a)), 'trunc.w.s': int,
+    'floor.w.s': math.floor, 'ceil.w.s': math.ceil,
+}
+_DESVIOS = {
+    'beq': lambda a, b: a == b, 'bne': lambda a, b: a != b, 'blt': lambda a, b: a < b,
+    'ble': lambda a, b: a <= b, 'bgt': lambda a, b: a > b, 'bge': lambda a, b: a >= b,
+    'bltu': lambda a, b: (a & 0xFFFFFFFF) < (b & 0xFFFFFFFF),
+    'bgeu': lambda a, b: (a & 0xFFFFFFFF) >= (b & 0xFFFFFFFF),
+}
+_FORMATOS = {'w': ('<i', 4), 'h': ('<h', 2), 'hu': ('<H', 2), 'b': ('<b', 1), 'bu': ('<B', 1)}
+
+
+if __name__ == "__main__":
+    from gerador_mips import gerar_mips
+
+    with open('main.py', 'r') as f:
+        codigo = f.read()
+    with open('assembly.asm', 'r') as f:
+        manual = f.read()
+
+    # Uma opção inválida e depois juros simples
+    entrada = "3\n1\n1000\n5\n12\n"
+    for nome, assembly in (("gerado", gerar_mips(codigo)), ("assembly.asm", manual)):
+        saida, estatisticas = simular(assembly, entrada)
+        print(f"== {nome}: {estatisticas['instrucoes']} instruções, {estatisticas['reais']} reais, "
+              f"{estatisticas['ciclos']} ciclos, {estatisticas['loads']} loads, {estatisticas['stores']} stores")
+        print(dict(estatisticas['por_classe']))
+        print(saida)
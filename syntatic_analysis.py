@@ -1,33 +1,61 @@
 import ast
-import astpretty
-from graphviz import Digraph
+from exportador_dot import exportar_ast_dot, renderizar_grafo
+from instrumentacao import instrumentar
 
-def gerar_ast(codigo_fonte):
+
+def _contar_nos(resultado):
+    arvore, erro = resultado
+    if arvore is None:
+        return {'erros': 1}
+    return {'nos': sum(1 for _ in ast.walk(arvore))}
+
+@instrumentar('sintaxe.analisar_sintaxe', contar=_contar_nos)
+def analisar_sintaxe(codigo_fonte):
+    """
+    Versão silenciosa de gerar_ast: retorna (arvore, None) ou, em caso de erro de sintaxe,
+    (None, erro) com erro sendo um dict com linha, coluna, texto e mensagem.
+    """
     try:
-        arvore = ast.parse(codigo_fonte)
-        return arvore
+        return ast.parse(codigo_fonte), None
     except SyntaxError as e:
+        return None, {
+            'linha': e.lineno,
+            'coluna': e.offset,
+            'texto': e.text.strip() if e.text is not None else "",
+            'mensagem': e.msg,
+        }
+
+def gerar_ast(codigo_fonte):
+    arvore, erro = analisar_sintaxe(codigo_fonte)
+    if erro is not None:
         print("❌ Erro de sintaxe encontrado:")
-        linha_erro = e.text.strip() if e.text is not None else ""
-        print(f"Linha {e.lineno}, coluna {e.offset}: {linha_erro}")
-        print(f"Detalhes: {e.msg}")
-        return None
+        print(f"Linha {erro['linha']}, coluna {erro['coluna']}: {erro['texto']}")
+        print(f"Detalhes: {erro['mensagem']}")
+    return arvore
 
 def ast_para_graphviz(node, dot=None, parent=None):
+    # Percorre a árvore com uma pilha explícita, sem estourar o limite de recursão
     if dot is None:
+        # graphviz só é necessário aqui; a análise sintática em si não depende dele
+        from graphviz import Digraph
         dot = Digraph()
         dot.attr('node', shape='box')
-    node_id = str(id(node))
-    label = type(node).__name__
-    dot.node(node_id, label)
-    if parent:
-        dot.edge(str(id(parent)), node_id)
-    for child in ast.iter_child_nodes(node):
-        ast_para_graphviz(child, dot, node)
+    pilha = [(node, parent)]
+    while pilha:
+        atual, pai = pilha.pop()
+        node_id = str(id(atual))
+        dot.node(node_id, type(atual).__name__)
+        if pai:
+            dot.edge(str(id(pai)), node_id)
+        filhos = [(filho, atual) for filho in ast.iter_child_nodes(atual)]
+        filhos.reverse()
+        pilha.extend(filhos)
     return dot
 
 # Exemplo de uso
 if __name__ == "__main__":
+    import astpretty
+
     with open("main.py", "r", encoding="utf-8") as f:
         codigo = f.read()
 
@@ -36,7 +64,8 @@ if __name__ == "__main__":
         print("✅ Código sintaticamente correto!\n")
         print("🌳 Árvore Sintática Abstrata (AST):\n")
         astpretty.pprint(ast_gerada)
-        # Gerar imagem da AST
-        dot = ast_para_graphviz(ast_gerada)
-        dot.render("./images/ast_tree", format="png", cleanup=True)
+        # Gerar imagem da AST: o DOT é escrito direto no arquivo e só é renderizado se mudou
+        from agendador_renderizacao import AgendadorRenderizacao
+        with AgendadorRenderizacao() as agendador:
+            renderizar_grafo(lambda f: exportar_ast_dot(ast_gerada, f), "./images/ast_tree.png", agendador=agendador)
         print("🖼️ Imagem da AST salva como 'ast_tree.png'")
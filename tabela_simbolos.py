@@ -0,0 +1,282 @@
+import ast
+import builtins
+
+# Conjuntos congelados: a busca de um nome embutido é O(1)
+NOMES_EMBUTIDOS = frozenset(dir(builtins))
+NOMES_IMPLICITOS_MODULO = frozenset(['__file__', '__builtins__', '__cached__', '__annotations__'])
+NOMES_IMPLICITOS_CLASSE = frozenset(['__module__', '__qualname__'])
+
+# Marcador devolvido quando um nome é resolvido para um embutido do Python
+EMBUTIDO = 'embutido'
+
+_COMPREENSOES = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+
+class Simbolo:
+    """Um nome ligado em um escopo, com os nós que o definem e os usos resolvidos para ele"""
+    __slots__ = ('nome', 'escopo', 'definicoes', 'atribuicoes', 'usos')
+
+    def __init__(self, nome, escopo):
+        self.nome = nome
+        self.escopo = escopo
+        self.definicoes = []
+        # Somente alvos diretos de atribuições simples (x = ...)
+        self.atribuicoes = []
+        self.usos = []
+
+    def __repr__(self):
+        return f"Simbolo({self.nome!r}, escopo={self.escopo.nome!r})"
+
+
+class Escopo:
+    """Escopo léxico: 'modulo', 'funcao', 'classe' ou 'compreensao'"""
+    __slots__ = ('tipo', 'nome', 'no', 'pai', 'filhos', 'simbolos', 'globais', 'nao_locais')
+
+    def __init__(self, tipo, nome, no, pai=None):
+        self.tipo = tipo
+        self.nome = nome
+        self.no = no
+        self.pai = pai
+        self.filhos = []
+        self.simbolos = {}
+        self.globais = set()
+        self.nao_locais = set()
+        if pai is not None:
+            pai.filhos.append(self)
+
+    def simbolo(self, nome):
+        simbolo = self.simbolos.get(nome)
+        if simbolo is None:
+            simbolo = self.simbolos[nome] = Simbolo(nome, self)
+        return simbolo
+
+    def funcao_envolvente(self):
+        """Escopo de função mais próximo (o próprio escopo inclusive), ou None"""
+        escopo = self
+        while escopo is not None and escopo.tipo != 'funcao':
+            escopo = escopo.pai
+        return escopo
+
+    def __repr__(self):
+        return f"Escopo({self.tipo!r}, {self.nome!r})"
+
+
+class TabelaSimbolos:
+    """
+    Tabela de símbolos de um módulo, montada uma única vez com construir_tabela_simbolos.
+    Guarda o escopo de cada nó e a resolução de cada nome lido.
+    """
+
+    def __init__(self, modulo):
+        self.modulo = modulo
+        self.escopos = [modulo]
+        self._escopo_por_no = {}
+        self._resolucoes = {}
+        self._cache = {}
+        # Nomes lidos na ordem da travessia: (nó Name, escopo)
+        self.leituras = []
+
+    def escopo_de(self, node):
+        """Escopo em que o nó é avaliado"""
+        return self._escopo_por_no.get(node)
+
+    def resolver(self, node):
+        """
+        Resolve um nó Name lido: retorna o Simbolo, EMBUTIDO para nomes embutidos
+        ou None quando o nome não está definido em nenhum escopo visível.
+        """
+        if node in self._resolucoes:
+            return self._resolucoes[node]
+        return self.resolver_nome(node.id, node)
+
+    def resolver_nome(self, nome, node):
+        """Resolve o nome como ele seria visto no ponto do nó"""
+        return self._resolver_no_escopo(nome, self._escopo_por_no[node])
+
+    def nao_resolvidos(self):
+        """Leituras de nomes que não resolvem para nenhum símbolo nem embutido"""
+        return [(n, escopo) for n, escopo in self.leituras if self._resolucoes[n] is None]
+
+    def _resolver_no_escopo(self, nome, escopo):
+        chave = (id(escopo), nome)
+        if chave in self._cache:
+            return self._cache[chave]
+        resultado = self._buscar(nome, escopo)
+        self._cache[chave] = resultado
+        return resultado
+
+    def _buscar(self, nome, escopo):
+        if nome in escopo.globais:
+            return self._buscar_global(nome)
+        if nome in escopo.simbolos and nome not in escopo.nao_locais:
+            return escopo.simbolos[nome]
+        if escopo.tipo == 'classe' and nome in NOMES_IMPLICITOS_CLASSE:
+            return EMBUTIDO
+        # Escopos de classe não são visíveis para os escopos aninhados neles
+        atual = escopo.pai
+        while atual is not None and atual.tipo != 'modulo':
+            if atual.tipo != 'classe':
+                if nome in atual.globais:
+                    return self._buscar_global(nome)
+                if nome in atual.simbolos and nome not in atual.nao_locais:
+                    return atual.simbolos[nome]
+            elif nome == '__class__':
+                return EMBUTIDO
+            atual = atual.pai
+        return self._buscar_global(nome)
+
+    def _buscar_global(self, nome):
+        simbolo = self.modulo.simbolos.get(nome)
+        if simbolo is not None:
+            return simbolo
+        if nome in NOMES_EMBUTIDOS or nome in NOMES_IMPLICITOS_MODULO:
+            return EMBUTIDO
+        return None
+
+
+def _nomes_do_import(alias):
+    if alias.name == '*':
+        return None
+    return alias.asname or alias.name.split('.')[0]
+
+
+def construir_tabela_simbolos(tree):
+    """Monta a tabela de símbolos do módulo em uma travessia iterativa (sem recursão)"""
+    modulo = Escopo('modulo', '<módulo>', tree)
+    tabela = TabelaSimbolos(modulo)
+    escopo_por_no = tabela._escopo_por_no
+    ligacoes = []
+
+    def ligar(escopo, nome, node, atribuicao=False):
+        ligacoes.append((escopo, nome, node, atribuicao))
+
+    pilha = [(tree, modulo)]
+    while pilha:
+        node, escopo = pilha.pop()
+        escopo_por_no[node] = escopo
+        filhos = []
+
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            ligar(escopo, node.name, node)
+            tipo = 'classe' if isinstance(node, ast.ClassDef) else 'funcao'
+            novo = Escopo(tipo, node.name, node, escopo)
+            tabela.escopos.append(novo)
+            # Decoradores, bases, valores padrão e anotações são avaliados no escopo externo
+            filhos.extend((n, escopo) for n in node.decorator_list)
+            if tipo == 'classe':
+                filhos.extend((n, escopo) for n in node.bases)
+                filhos.extend((n, escopo) for n in node.keywords)
+            else:
+                filhos.append((node.args, novo))
+                if node.returns is not None:
+                    filhos.append((node.returns, escopo))
+            filhos.extend((n, novo) for n in node.body)
+        elif isinstance(node, ast.Lambda):
+            novo = Escopo('funcao', '<lambda>', node, escopo)
+            tabela.escopos.append(novo)
+            filhos.append((node.args, novo))
+            filhos.append((node.body, novo))
+        elif isinstance(node, ast.arguments):
+            for a in node.posonlyargs + node.args + node.kwonlyargs + [node.vararg, node.kwarg]:
+                if a is not None:
+                    ligar(escopo, a.arg, a)
+                    escopo_por_no[a] = escopo
+                    if a.annotation is not None:
+                        filhos.append((a.annotation, escopo.pai))
+            filhos.extend((n, escopo.pai) for n in node.defaults)
+            filhos.extend((n, escopo.pai) for n in node.kw_defaults if n is not None)
+        elif isinstance(node, _COMPREENSOES):
+            novo = Escopo('compreensao', f'<{type(node).__name__.lower()}>', node, escopo)
+            tabela.escopos.append(novo)
+            # O iterável do primeiro "for" é avaliado no escopo externo
+            primeiro = node.generators[0]
+            filhos.append((primeiro.iter, escopo))
+            filhos.append((primeiro.target, novo))
+            filhos.extend((n, novo) for n in primeiro.ifs)
+            for gerador in node.generators[1:]:
+                filhos.append((gerador, novo))
+            if isinstance(node, ast.DictComp):
+                filhos.append((node.key, novo))
+                filhos.append((node.value, novo))
+            else:
+                filhos.append((node.elt, novo))
+        else:
+            if isinstance(node, ast.Name):
+                if isinstance(node.ctx, ast.Load):
+                    tabela.leituras.append((node, escopo))
+                else:
+                    ligar(escopo, node.id, node)
+            elif isinstance(node, ast.Assign):
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        ligar(escopo, target.id, target, atribuicao=True)
+            elif isinstance(node, ast.NamedExpr):
+                # O alvo de ":=" em uma compreensão pertence ao escopo que a contém
+                destino = escopo
+                while destino.tipo == 'compreensao':
+                    destino = destino.pai
+                ligar(destino, node.target.id, node.target)
+                escopo_por_no[node.target] = destino
+                filhos.append((node.value, escopo))
+                pilha.extend(reversed(filhos))
+                continue
+            elif isinstance(node, (ast.Import, ast.ImportFrom)):
+                for alias in node.names:
+                    nome = _nomes_do_import(alias)
+                    if nome is not None:
+                        ligar(escopo, nome, alias)
+            elif isinstance(node, ast.ExceptHandler) and node.name:
+                ligar(escopo, node.name, node)
+            elif isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name:
+                ligar(escopo, node.name, node)
+            elif isinstance(node, ast.MatchMapping) and node.rest:
+                ligar(escopo, node.rest, node)
+            elif isinstance(node, ast.Global):
+                escopo.globais.update(node.names)
+            elif isinstance(node, ast.Nonlocal):
+                escopo.nao_locais.update(node.names)
+            filhos.extend((n, escopo) for n in ast.iter_child_nodes(node))
+
+        pilha.extend(reversed(filhos))
+
+    # As declarações global/nonlocal valem para o escopo inteiro, por isso as ligações
+    # só são distribuídas depois da travessia; as de nomes nonlocal vão por último,
+    # quando os escopos externos já conhecem todos os seus nomes
+    ligacoes.sort(key=lambda ligacao: ligacao[1] in ligacao[0].nao_locais)
+    for escopo, nome, node, atribuicao in ligacoes:
+        destino = _escopo_da_ligacao(escopo, nome)
+        simbolo = destino.simbolo(nome)
+        simbolo.definicoes.append(node)
+        if atribuicao:
+            simbolo.atribuicoes.append(node)
+
+    for node, escopo in tabela.leituras:
+        resultado = tabela._resolver_no_escopo(node.id, escopo)
+        tabela._resolucoes[node] = resultado
+        if isinstance(resultado, Simbolo):
+            resultado.usos.append(node)
+
+    return tabela
+
+
+def _escopo_da_ligacao(escopo, nome):
+    if nome in escopo.globais:
+        while escopo.pai is not None:
+            escopo = escopo.pai
+        return escopo
+    if nome in escopo.nao_locais:
+        atual = escopo.pai
+        while atual is not None:
+            if atual.tipo == 'funcao' and nome in atual.simbolos and nome not in atual.nao_locais:
+                return atual
+            atual = atual.pai
+    return escopo
+
+
+# Exemplo de uso:
+if __name__ == "__main__":
+    with open("main.py", "r", encoding="utf-8") as f:
+        tabela = construir_tabela_simbolos(ast.parse(f.read()))
+
+    for escopo in tabela.escopos:
+        print(f"{escopo.tipo} {escopo.nome}: {sorted(escopo.simbolos)}")
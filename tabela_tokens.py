@@ -0,0 +1,160 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping, Sequence
+from io import BytesIO
+
+from lexical_analysis import iterar_analise_lexica
+
+COLUNAS = ("Nome", "Token", "Tipo", "Descrição", "Linha")
+
+
+class Interning:
+    """Tabela de strings distintas: cada texto é guardado uma vez e referenciado por um código"""
+    __slots__ = ('textos', 'codigos')
+
+    def __init__(self):
+        self.textos = []
+        self.codigos = {}
+
+    def codigo(self, texto):
+        codigo = self.codigos.get(texto)
+        if codigo is None:
+            codigo = len(self.textos)
+            self.codigos[texto] = codigo
+            self.textos.append(texto)
+        return codigo
+
+
+class _Colunas:
+    """Armazenamento em colunas (struct-of-arrays) compartilhado entre a tabela e suas fatias"""
+    __slots__ = ('lexemas', 'tipos', 'nomes', 'descricoes', 'linhas',
+                 'textos_lexema', 'textos_tipo', 'textos_nome', 'textos_descricao')
+
+    def __init__(self):
+        self.lexemas = array('I')
+        self.tipos = array('H')
+        self.nomes = array('H')
+        self.descricoes = array('H')
+        self.linhas = array('I')
+        self.textos_lexema = Interning()
+        self.textos_tipo = Interning()
+        self.textos_nome = Interning()
+        self.textos_descricao = Interning()
+
+
+class RegistroToken(Mapping):
+    """Visão somente leitura de um token, com as mesmas chaves dos dicts de analisar_lexico"""
+    __slots__ = ('_colunas', '_indice')
+
+    def __init__(self, colunas, indice):
+        self._colunas = colunas
+        self._indice = indice
+
+    def __getitem__(self, chave):
+        c = self._colunas
+        i = self._indice
+        if chave == 'Token':
+            return c.textos_lexema.textos[c.lexemas[i]]
+        if chave == 'Tipo':
+            return c.textos_tipo.textos[c.tipos[i]]
+        if chave == 'Nome':
+            return c.textos_nome.textos[c.nomes[i]]
+        if chave == 'Descrição':
+            return c.textos_descricao.textos[c.descricoes[i]]
+        if chave == 'Linha':
+            return c.linhas[i]
+        raise KeyError(chave)
+
+    def __iter__(self):
+        return iter(('Token', 'Tipo', 'Descrição', 'Linha', 'Nome'))
+
+    def __len__(self):
+        return len(COLUNAS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class TabelaTokens(Sequence):
+    """
+    Tabela compacta de tokens: cada coluna é um array de códigos e os textos repetidos
+    (tipos, nomes, descrições e lexemas) são guardados uma única vez.
+    Fatias (por índice ou por intervalo de linhas) compartilham o armazenamento, sem cópia.
+    """
+
+    def __init__(self, _colunas=None, _inicio=0, _fim=None):
+        self._colunas = _colunas if _colunas is not None else _Colunas()
+        self._inicio = _inicio
+        self._fim = _fim
+
+    @classmethod
+    def de_registros(cls, registros):
+        """Monta a tabela a partir de registros no formato de analisar_lexico"""
+        tabela = cls()
+        for r in registros:
+            tabela.adicionar(r['Nome'], r['Token'], r['Tipo'], r['Descrição'], r['Linha'])
+        return tabela
+
+    def adicionar(self, nome, lexema, tipo, descricao, linha):
+        if self._inicio or self._fim is not None:
+            raise TypeError("Fatias de TabelaTokens são somente leitura")
+        c = self._colunas
+        if c.linhas and linha < c.linhas[-1]:
+            raise ValueError("Os tokens devem ser adicionados em ordem de linha")
+        c.lexemas.append(c.textos_lexema.codigo(lexema))
+        c.tipos.append(c.textos_tipo.codigo(tipo))
+        c.nomes.append(c.textos_nome.codigo(nome))
+        c.descricoes.append(c.textos_descricao.codigo(descricao))
+        c.linhas.append(linha)
+
+    def _limite(self):
+        return len(self._colunas.linhas) if self._fim is None else self._fim
+
+    def __len__(self):
+        return self._limite() - self._inicio
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            inicio, fim, passo = indice.indices(len(self))
+            if passo != 1:
+                raise ValueError("TabelaTokens só aceita fatias contíguas")
+            fim = max(inicio, fim)
+            return TabelaTokens(self._colunas, self._inicio + inicio, self._inicio + fim)
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice de token fora da tabela")
+        return RegistroToken(self._colunas, self._inicio + indice)
+
+    def __iter__(self):
+        colunas = self._colunas
+        for i in range(self._inicio, self._limite()):
+            yield RegistroToken(colunas, i)
+
+    def fatiar_linhas(self, primeira, ultima):
+        """Retorna, sem copiar, os tokens das linhas primeira..ultima (inclusive)"""
+        linhas = self._colunas.linhas
+        fim = self._limite()
+        inicio = bisect_left(linhas, primeira, self._inicio, fim)
+        fim = bisect_right(linhas, ultima, inicio, fim)
+        return TabelaTokens(self._colunas, inicio, fim)
+
+    def como_dicts(self):
+        """Converte para a lista de dicts usada por analisar_lexico"""
+        return [dict(registro) for registro in self]
+
+
+def analisar_lexico_compacto(codigo_fonte):
+    """Mesmos tokens de analisar_lexico, guardados em uma TabelaTokens"""
+    return TabelaTokens.de_registros(iterar_analise_lexica(BytesIO(codigo_fonte.encode('utf-8'))))
+
+
+# Exemplo de uso:
+if __name__ == "__main__":
+    with open("main.py", "r", encoding="utf-8") as f:
+        codigo = f.read()
+
+    tabela = analisar_lexico_compacto(codigo)
+    print(f"{len(tabela)} tokens")
+    for t in tabela.fatiar_linhas(3, 6):
+        print(f"{t['Nome']:<20} {t['Token']:<40} {t['Tipo']:<20} {t['Descrição']:<40} {t['Linha']:<5}")